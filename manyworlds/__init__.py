@@ -1,4 +1,90 @@
-from .feature import Feature
+import importlib
+from typing import Any, TYPE_CHECKING
 
-__all__ = ["Feature"]
+if TYPE_CHECKING:
+    from .feature import Feature
+    from .feature_cache import FeatureCache
+    from .events import EventHandler, EventParser
+    from .flat_suite import FlatSuite
+    from .ledger import Ledger
+    from .durations import StepDurations
+    from .smoke import SmokeSuite
+    from .plan import FlatteningPlan
+    from .output import OutputFile
+    from .source_map import SourceMap
+    from .step_definitions import StepDefinitions, MatchTable
+    from .fold import ScenarioTrie
+    from .parallel import flatten_parallel, flatten_streaming
+    from .tag_expression import TagExpression
+    from .validation import validate
+    from .client import Client
+    from .daemon import Daemon
+
+# Exports are imported on first access, so that the command line interface
+# can hand requests to a running daemon without importing igraph:
+_EXPORTS = {
+    "Client": ".client",
+    "Daemon": ".daemon",
+    "EventHandler": ".events",
+    "EventParser": ".events",
+    "Feature": ".feature",
+    "FeatureCache": ".feature_cache",
+    "FlatSuite": ".flat_suite",
+    "FlatteningPlan": ".plan",
+    "Ledger": ".ledger",
+    "MatchTable": ".step_definitions",
+    "OutputFile": ".output",
+    "ScenarioTrie": ".fold",
+    "SmokeSuite": ".smoke",
+    "SourceMap": ".source_map",
+    "StepDefinitions": ".step_definitions",
+    "StepDurations": ".durations",
+    "TagExpression": ".tag_expression",
+    "flatten_parallel": ".parallel",
+    "flatten_streaming": ".parallel",
+    "validate": ".validation",
+}
+
+__all__ = [
+    "Client",
+    "Daemon",
+    "EventHandler",
+    "EventParser",
+    "Feature",
+    "FeatureCache",
+    "FlatSuite",
+    "FlatteningPlan",
+    "Ledger",
+    "MatchTable",
+    "OutputFile",
+    "ScenarioTrie",
+    "SmokeSuite",
+    "SourceMap",
+    "StepDefinitions",
+    "StepDurations",
+    "TagExpression",
+    "flatten_parallel",
+    "flatten_streaming",
+    "validate",
+]
 __version__ = "0.5.0"
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        value: Any = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    else:
+        try:  # Submodules (such as manyworlds.exceptions)
+            value = importlib.import_module("." + name, __name__)
+        except ModuleNotFoundError as error:
+            if error.name != "{}.{}".format(__name__, name):
+                raise  # A missing dependency of an existing submodule
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name)
+            ) from None
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals().keys()) + __all__)
@@ -1,21 +1,53 @@
 # __main__.py
 
-from typing import Optional, Dict
+from __future__ import annotations
+
+from contextlib import nullcontext
+from typing import Optional, Dict, List, Callable, Any
 import argparse
+import os
+import sys
 
 import manyworlds as mw
 
 
 def main():
-    parser = argparse.ArgumentParser(prog="manyworlds")
-    parser.add_argument("--input", "-i", help="input scenario file")
+    # commands other than flattening:
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
+
+    parser = argparse.ArgumentParser(
+        prog="manyworlds",
+        epilog="other commands: {} (see 'manyworlds <command> --help')".format(
+            ", ".join(COMMANDS.keys())
+        ),
+    )
+    parser.add_argument(
+        "--input", "-i", help="input scenario file ('-' to read from stdin)"
+    )
     parser.add_argument("--output", "-o", help="output scenario file")
     parser.add_argument(
         "--mode",
         "-m",
-        choices=["strict", "relaxed"],
+        choices=["strict", "relaxed", "smoke", "auto"],
         default="strict",
-        help="flattening mode",
+        help="flattening mode ('smoke': fewest scenarios exercising every "
+        "distinct step, 'auto': strict or relaxed per subtree, whichever "
+        "is cheaper)",
+    )
+    parser.add_argument(
+        "--durations",
+        metavar="FILE",
+        help="JUnit XML report or CSV file with step durations "
+        "('When I click \"OK\"',0.25) to weight scenarios by "
+        "in smoke and auto mode",
+    )
+    parser.add_argument(
+        "--max-steps",
+        type=int,
+        metavar="N",
+        help="maximum number of steps of scenarios of subtrees flattened "
+        "in relaxed mode in auto mode",
     )
     parser.add_argument(
         "--write-comments",
@@ -24,65 +56,684 @@ def main():
         action="store_true",
         help="output comments",
     )
+    parser.add_argument(
+        "--format",
+        "-f",
+        choices=["feature", "binary", "ndjson"],
+        default="feature",
+        help="output format",
+    )
+    parser.add_argument(
+        "--tags",
+        "-t",
+        help="only output scenarios matching tag expression ('@smoke and not @slow')",
+    )
+    parser.add_argument(
+        "--ledger",
+        "-l",
+        help="result ledger file (see 'manyworlds ledger --help')",
+    )
+    parser.add_argument(
+        "--only-unverified",
+        default=False,
+        action="store_true",
+        help="only output scenarios that are new, changed or failed in the ledger",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="parse and flatten root scenarios in this many processes "
+        "(0 for one per CPU, no outline output)",
+    )
+    parser.add_argument(
+        "--stream",
+        "-s",
+        default=False,
+        action="store_true",
+        help="flatten one root scenario at a time to limit memory use "
+        "(no outline output)",
+    )
+    parser.add_argument(
+        "--source-map",
+        metavar="FILE",
+        help="write a map from output lines to input lines "
+        "(see 'manyworlds locate --help')",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        default=False,
+        action="store_true",
+        help="do not hand the request to a running daemon "
+        "(see 'manyworlds serve --help')",
+    )
+    parser.add_argument(
+        "--check",
+        nargs="+",
+        metavar="FILE",
+        help="validate input scenario files only",
+    )
     args = parser.parse_args()
 
+    # hand the request to a running daemon if possible:
+    if not args.no_daemon:
+        daemon_exit_status: Optional[int] = request_daemon(args)
+        if daemon_exit_status is not None:
+            sys.exit(daemon_exit_status)
+
+    # validate hierarchical feature files only:
+    if args.check:
+        sys.exit(check_feature_files(args.check))
+
+    if args.only_unverified and not args.ledger:
+        parser.error("--only-unverified requires --ledger")
+
+    if args.durations and args.mode not in ["smoke", "auto"]:
+        parser.error("--durations requires --mode smoke or --mode auto")
+
+    if args.max_steps is not None and args.mode != "auto":
+        parser.error("--max-steps requires --mode auto")
+
+    if args.mode in ["smoke", "auto"] and (args.stream or args.jobs is not None):
+        parser.error("--mode {} does not support --stream and --jobs".format(args.mode))
+
+    if args.source_map and (
+        args.input == "-"
+        or not args.output
+        or args.format != "feature"
+        or args.stream
+        or args.jobs is not None
+    ):
+        parser.error(
+            "--source-map requires --input and --output files "
+            "and flat feature file output"
+        )
+
+    # parse and flatten one root scenario at a time:
+    if args.stream:
+        if args.input == "-" or not args.output:
+            parser.error("--stream requires --input and --output files")
+        if args.format != "feature" or args.jobs is not None:
+            parser.error("--stream supports flat feature file output only")
+        with (
+            mw.Ledger(args.ledger) if args.only_unverified else nullcontext()
+        ) as ledger:
+            output_file: mw.OutputFile = mw.flatten_streaming(
+                args.input,
+                args.output,
+                mode=args.mode,
+                write_comments=args.write_comments,
+                tags=args.tags,
+                ledger=ledger,
+            )
+        print_output_file_summary(output_file.changed, output_file.size)
+        return
+
+    # parse and flatten root scenarios in parallel:
+    if args.jobs is not None:
+        if args.input == "-" or not args.output:
+            parser.error("--jobs requires --input and --output files")
+        if args.format != "feature" or args.only_unverified:
+            parser.error("--jobs supports flat feature file output only")
+        output_file = mw.flatten_parallel(
+            args.input,
+            args.output,
+            mode=args.mode,
+            write_comments=args.write_comments,
+            tags=args.tags,
+            processes=args.jobs or None,
+        )
+        print_output_file_summary(output_file.changed, output_file.size)
+        return
+
     # read hierarchical feature file:
-    feature = mw.Feature.from_file(args.input)
+    if args.input == "-":
+        feature = mw.Feature.from_stream(sys.stdin)
+        # imports are relative to the current directory:
+        mw.FeatureCache().resolve(feature)
+    else:
+        feature = mw.Feature.from_file(args.input)
 
     print_feature_outline(feature)
 
     # write flat feature file:
     if args.output:
-        feature.flatten(args.output, mode=args.mode, write_comments=args.write_comments)
+        ledger: Optional[mw.Ledger] = (
+            mw.Ledger(args.ledger) if args.only_unverified else None
+        )
+        durations: Optional[mw.StepDurations] = (
+            mw.StepDurations.from_file(args.durations) if args.durations else None
+        )
+        if args.format == "feature":
+            output_file = feature.flatten(
+                args.output,
+                mode=args.mode,
+                write_comments=args.write_comments,
+                tags=args.tags,
+                ledger=ledger,
+                source_map_path=args.source_map,
+                durations=durations,
+                max_steps=args.max_steps,
+            )
+            print_output_file_summary(output_file.changed, output_file.size)
+        else:
+            suite_file: mw.OutputFile = mw.FlatSuite.write(
+                args.output,
+                feature,
+                mode=args.mode,
+                format=args.format,
+                tags=args.tags,
+                ledger=ledger,
+                durations=durations,
+                max_steps=args.max_steps,
+            )
+            print_output_file_summary(suite_file.changed, suite_file.size)
+        if ledger is not None:
+            ledger.close()
+        if args.mode == "smoke":
+            print_smoke_suite_report(feature, tags=args.tags, durations=durations)
+        elif args.mode == "auto":
+            print_flattening_plan(
+                feature.flattening_plan(durations=durations, max_steps=args.max_steps)
+            )
+
+
+def check_feature_files(file_paths: List[str]) -> int:
+    """print all errors of the feature files to terminal
+
+    Returns exit status (1 if any file is invalid)"""
+    exit_status: int = 0
+    for file_path in file_paths:
+        for error in mw.validate(file_path):
+            print("{path}: {error}".format(path=file_path, error=error))
+            exit_status = 1
+
+    return exit_status
+
+
+def request_daemon(args: argparse.Namespace) -> Optional[int]:
+    """hand a validate, outline or flatten request to a running daemon
+
+    Returns exit status, or None if the request has to be handled locally
+    (no daemon running, or options the daemon does not support)"""
+    request: Dict[str, Any]
+    if args.check:
+        request = {
+            "command": "validate",
+            "files": [os.path.abspath(path) for path in args.check],
+        }
+    elif (
+        args.input
+        and args.input != "-"
+        and args.format == "feature"
+        and args.mode not in ["smoke", "auto"]
+        and not (args.ledger or args.only_unverified or args.source_map)
+        and not (args.jobs is not None or args.stream)
+    ):
+        request = {
+            "command": "flatten",
+            "input": os.path.abspath(args.input),
+            "output": os.path.abspath(args.output) if args.output else None,
+            "mode": args.mode,
+            "write_comments": args.write_comments,
+            "tags": args.tags,
+        }
+    else:
+        return None
+
+    response: Optional[Dict[str, Any]] = mw.Client().try_request(request)
+    if response is None:
+        return None
+    if not response["ok"]:
+        if "line_no" in response:
+            raise mw.exceptions.InvalidFeatureFileError(
+                response["error"], line_no=response["line_no"]
+            )
+        print(response["error"], file=sys.stderr)
+        return 1
+
+    if request["command"] == "validate":
+        exit_status: int = 0
+        for path, absolute_path in zip(args.check, request["files"]):
+            for error in response["errors"][absolute_path]:
+                print("{path}: {error}".format(path=path, error=error["message"]))
+                exit_status = 1
+        return exit_status
+
+    for line in response["outline"]:
+        print(line)
+    if "changed" in response:
+        print_output_file_summary(response["changed"], response["size"])
+    return 0
+
+
+def print_write_summary(
+    written: int,
+    bytes_written: int,
+    unchanged: int,
+    up_to_date: Optional[int] = None,
+    parsed: Optional[int] = None,
+) -> None:
+    """print the numbers of written and skipped flat feature files
+    and the bytes written to terminal"""
+    print(
+        "flattened {written} scenario files ({bytes} bytes written), "
+        "skipped {unchanged} unchanged{up_to_date} scenario files{parsed}".format(
+            written=written,
+            bytes=bytes_written,
+            unchanged=unchanged,
+            up_to_date=(
+                " and {} up-to-date".format(up_to_date)
+                if up_to_date is not None
+                else ""
+            ),
+            parsed=(
+                ", parsed {} scenario files".format(parsed)
+                if parsed is not None
+                else ""
+            ),
+        )
+    )
+
+
+def print_output_file_summary(changed: Optional[bool], size: int) -> None:
+    """print whether a single output file was written or skipped
+    (unchanged) and the bytes written to terminal"""
+    print_write_summary(
+        1 if changed else 0, size if changed else 0, 0 if changed else 1
+    )
 
 
 def print_feature_outline(feature: mw.Feature) -> None:
     """print feature outline to terminal"""
-    level_open: Dict[int, bool] = {}
-    branch_shape: str
-    later_sibling: bool
-    sib: mw.scenario.Scenario
-    sib_index: Optional[int]
-
-    for sc in feature.scenarios():
-        scenario_string = sc.name
-
-        # Indentation and branch shapes:
-        level: Optional[int] = sc.level()
-        index: Optional[int] = sc.index()
-        if level is None or index is None:
-            continue
-        if level > 1:
-            # indentation:
-            indentation: str = ""
-            for lvl in range(2, level):
-                indentation += (
-                    "│   " if (lvl in level_open.keys() and level_open[lvl]) else "    "
+    for line in feature.outline():
+        print(line)
+
+
+def print_smoke_suite_report(
+    feature: mw.Feature,
+    tags: Optional[str] = None,
+    durations: Optional[mw.StepDurations] = None,
+) -> None:
+    """print coverage and size of the smoke suite compared to the strict
+    and relaxed flat scenarios to terminal"""
+    suite = feature.smoke_suite(tags=tags, durations=durations)
+    unit: str = "steps" if durations is None else "seconds"
+
+    def cost(flat_scenarios: List[Any]) -> float:
+        steps: List[Any] = [step for fs in flat_scenarios for step in fs.steps]
+        return len(steps) if durations is None else durations.total(steps)
+
+    smoke_cost: float = cost(suite.flat_scenarios)
+    print(
+        "smoke suite: {scenarios} scenarios ({cost:g} {unit}) exercising "
+        "{covered} of {steps} distinct steps ({percent:.0f}%) and "
+        "{covered_assertions} of {assertions} distinct assertions".format(
+            scenarios=len(suite.flat_scenarios),
+            cost=round(smoke_cost, 2),
+            unit=unit,
+            covered=suite.covered_step_count,
+            steps=suite.step_count,
+            percent=100 * suite.covered_step_count / max(suite.step_count, 1),
+            covered_assertions=suite.covered_assertion_count,
+            assertions=suite.assertion_count,
+        )
+    )
+    for mode, flat_scenarios in [
+        ("strict", list(feature.flat_scenarios_strict(tags=tags))),
+        ("relaxed", list(feature.flat_scenarios_relaxed(tags=tags))),
+    ]:
+        mode_cost: float = cost(flat_scenarios)
+        print(
+            "{mode}: {scenarios} scenarios ({cost:g} {unit}), smoke suite "
+            "{fewer:.0f}% fewer scenarios, {less:.0f}% {less_unit}".format(
+                mode=mode,
+                scenarios=len(flat_scenarios),
+                cost=round(mode_cost, 2),
+                unit=unit,
+                fewer=100
+                * (1 - len(suite.flat_scenarios) / max(len(flat_scenarios), 1)),
+                less=100 * (1 - smoke_cost / mode_cost) if mode_cost else 0,
+                less_unit="fewer steps" if durations is None else "less time",
+            )
+        )
+
+
+def print_flattening_plan(plan: mw.FlatteningPlan) -> None:
+    """print the subtrees flattened in relaxed mode and the estimated
+    savings to terminal"""
+    for line in plan.lines():
+        print(line)
+
+    scenarios, cost, _ = plan.estimates["auto"]
+    print(
+        "auto: {scenarios} scenarios ({cost:g} {unit}, estimated)".format(
+            scenarios=scenarios, cost=round(cost, 2), unit=plan.unit
+        )
+    )
+    for mode in ["strict", "relaxed"]:
+        mode_scenarios, mode_cost, _ = plan.estimates[mode]
+        print(
+            "{mode}: {scenarios} scenarios ({cost:g} {unit}), auto takes "
+            "{difference:g} {unit} ({percent:.0f}%) {less_or_more}".format(
+                mode=mode,
+                scenarios=mode_scenarios,
+                cost=round(mode_cost, 2),
+                unit=plan.unit,
+                difference=round(abs(mode_cost - cost), 2),
+                percent=100 * abs(mode_cost - cost) / mode_cost if mode_cost else 0,
+                less_or_more="less" if cost <= mode_cost else "more",
+            )
+        )
+
+
+def diff_command(argv: List[str]) -> int:
+    """print added, removed and changed flat scenarios to terminal
+
+    Returns exit status"""
+    parser = argparse.ArgumentParser(
+        prog="manyworlds diff",
+        description="compare the strict flat scenarios of two versions "
+        "of a scenario file by fingerprint",
+    )
+    parser.add_argument("old", help="old input scenario file")
+    parser.add_argument("new", help="new input scenario file")
+    args = parser.parse_args(argv)
+
+    added, removed, changed = mw.Feature.from_file(args.old).diff(
+        mw.Feature.from_file(args.new)
+    )
+    for prefix, names in [("+", added), ("-", removed), ("~", changed)]:
+        for name in names:
+            print("{prefix} {name}".format(prefix=prefix, name=name))
+
+    return 0
+
+
+def ledger_command(argv: List[str]) -> int:
+    """record flat scenario results in or compact a result ledger
+
+    Returns exit status"""
+    parser = argparse.ArgumentParser(
+        prog="manyworlds ledger",
+        description="maintain a local ledger of flat scenario results "
+        "keyed by fingerprint",
+    )
+    parser.add_argument("ledger", help="result ledger file")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+    record_parser = subparsers.add_parser("record", help="record a result")
+    record_parser.add_argument("fingerprint", help="flat scenario fingerprint")
+    record_parser.add_argument("result", choices=["passed", "failed"])
+    compact_parser = subparsers.add_parser("compact", help="drop superseded results")
+    compact_parser.add_argument(
+        "--input",
+        "-i",
+        help="also drop results for scenarios no longer in this scenario file",
+    )
+    compact_parser.add_argument(
+        "--mode",
+        "-m",
+        choices=["strict", "relaxed"],
+        default="strict",
+        help="flattening mode of the scenario file",
+    )
+    args = parser.parse_args(argv)
+
+    with mw.Ledger(args.ledger) as ledger:
+        if args.action == "record":
+            ledger.record(args.fingerprint, args.result == "passed")
+        else:
+            keep: Optional[List[str]] = None
+            if args.input:
+                keep = [
+                    fs.fingerprint()
+                    for fs in mw.Feature.from_file(args.input).flat_scenarios(args.mode)
+                ]
+            print("dropped {} results".format(ledger.compact(keep=keep)))
+
+    return 0
+
+
+def fold_command(argv: List[str]) -> int:
+    """fold a flat feature file into an indented feature file
+
+    Returns exit status"""
+    parser = argparse.ArgumentParser(
+        prog="manyworlds fold",
+        description="turn the shared step prefixes of the scenarios "
+        "of a flat feature file into a scenario tree",
+    )
+    parser.add_argument("input", help="flat input scenario file")
+    parser.add_argument(
+        "--output", "-o", required=True, help="indented output scenario file"
+    )
+    parser.add_argument(
+        "--write-comments",
+        "-c",
+        default=False,
+        action="store_true",
+        help="output comments",
+    )
+    args = parser.parse_args(argv)
+
+    trie = mw.ScenarioTrie.from_file(args.input)
+    scenario_count, step_count = trie.write(
+        args.output, write_comments=args.write_comments
+    )
+    saved: int = trie.flat_step_count - step_count
+    print(
+        "folded {flat_scenarios} flat scenarios ({flat_steps} steps) "
+        "into {scenarios} scenarios ({steps} steps): "
+        "{saved} step executions saved ({percent:.0f}%)".format(
+            flat_scenarios=trie.flat_scenario_count,
+            flat_steps=trie.flat_step_count,
+            scenarios=scenario_count,
+            steps=step_count,
+            saved=saved,
+            percent=100 * saved / max(trie.flat_step_count, 1),
+        )
+    )
+
+    return 0
+
+
+def match_command(argv: List[str]) -> int:
+    """match the distinct steps of a feature file against step definitions
+
+    Returns exit status"""
+    parser = argparse.ArgumentParser(
+        prog="manyworlds match",
+        description="match each distinct step of a scenario file once against "
+        "the regular expressions of step definitions and report undefined "
+        "and ambiguous steps",
+    )
+    parser.add_argument(
+        "step_definitions",
+        help="Python module with step definitions (regular expressions passed "
+        "to given, when, then and step decorators) or file with one regular "
+        "expression per line",
+    )
+    parser.add_argument("input", help="input scenario file")
+    parser.add_argument("--output", "-o", help="match table file (JSON)")
+    args = parser.parse_args(argv)
+
+    definitions = mw.StepDefinitions.from_file(args.step_definitions)
+    feature = mw.Feature.from_file(args.input)
+    # Steps of subtrees are matched once, however often they are referenced:
+    features = [feature] + [subtree.feature for subtree in feature.subtrees.values()]
+    table = definitions.match_steps(
+        step for ft in features for sc in ft.scenarios() for step in sc.steps
+    )
+    if args.output:
+        table.write(args.output)
+
+    for status, steps in [
+        ("undefined", table.undefined()),
+        ("ambiguous", table.ambiguous()),
+    ]:
+        for conjunction, name in steps:
+            locations: str = ", ".join(
+                step_match.definition.location
+                for step_match in table.matches[(conjunction, name)]
+            )
+            print(
+                "{status}: {conjunction} {name}{locations}".format(
+                    status=status,
+                    conjunction=conjunction,
+                    name=name,
+                    locations=" ({})".format(locations) if locations else "",
                 )
+            )
+    print(
+        "matched {distinct} distinct steps ({steps} steps) against "
+        "{definitions} step definitions running {regexes} regular expressions: "
+        "{undefined} undefined, {ambiguous} ambiguous".format(
+            distinct=len(table.matches),
+            steps=table.step_count,
+            definitions=len(definitions.definitions),
+            regexes=table.regex_count,
+            undefined=len(table.undefined()),
+            ambiguous=len(table.ambiguous()),
+        )
+    )
+
+    return 1 if table.undefined() or table.ambiguous() else 0
+
+
+def locate_command(argv: List[str]) -> int:
+    """print the input line a line of a flat feature file originates from
+
+    Returns exit status"""
+    parser = argparse.ArgumentParser(
+        prog="manyworlds locate",
+        description="map a line of a flat output scenario file back to "
+        "the input scenario file using a source map (see --source-map)",
+    )
+    parser.add_argument("source_map", help="source map file")
+    parser.add_argument(
+        "line", type=int, help="line number in the output scenario file"
+    )
+    args = parser.parse_args(argv)
+
+    input_line: Optional[int] = mw.SourceMap.read(args.source_map).lookup(args.line - 1)
+    if input_line is None:
+        print("line {} is not mapped".format(args.line), file=sys.stderr)
+        return 1
+    print(input_line + 1)
+
+    return 0
+
+
+def serve_command(argv: List[str]) -> int:
+    """run the daemon, or stop a running daemon
+
+    Returns exit status"""
+    parser = argparse.ArgumentParser(
+        prog="manyworlds serve",
+        description="keep parsed scenario files in memory and answer "
+        "flatten, outline and validate requests of the command line interface "
+        "over a Unix socket",
+    )
+    parser.add_argument(
+        "--socket",
+        help="Unix socket path (default: $MANYWORLDS_SOCKET "
+        "or a per-user path in the temporary directory)",
+    )
+    parser.add_argument(
+        "--stop", default=False, action="store_true", help="stop a running daemon"
+    )
+    args = parser.parse_args(argv)
+
+    if args.stop:
+        client = mw.Client(args.socket)
+        if client.try_request({"command": "shutdown"}) is None:
+            print("no daemon running at {}".format(client.socket_path), file=sys.stderr)
+            return 1
+        return 0
+
+    if mw.Client(args.socket).is_running():
+        print("a daemon is already running", file=sys.stderr)
+        return 1
+
+    daemon = mw.Daemon(args.socket)
+    print("serving on {}".format(daemon.server_address), flush=True)
+    try:
+        daemon.serve()
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+def batch_command(argv: List[str]) -> int:
+    """flatten all feature files of a directory that changed
+    or extend a feature file that changed
+
+    Returns exit status"""
+    parser = argparse.ArgumentParser(
+        prog="manyworlds batch",
+        description="flatten the scenario files of a directory, parsing "
+        "scenario files extended by several others once and skipping output "
+        "files whose input file and the files it extends are unchanged",
+    )
+    parser.add_argument("input", help="input directory")
+    parser.add_argument("--output", "-o", required=True, help="output directory")
+    parser.add_argument(
+        "--mode",
+        "-m",
+        choices=["strict", "relaxed"],
+        default="strict",
+        help="flattening mode",
+    )
+    parser.add_argument(
+        "--write-comments",
+        "-c",
+        default=False,
+        action="store_true",
+        help="output comments",
+    )
+    parser.add_argument(
+        "--tags",
+        "-t",
+        help="only output scenarios matching tag expression ('@smoke and not @slow')",
+    )
+    parser.add_argument(
+        "--force",
+        default=False,
+        action="store_true",
+        help="also flatten scenario files with up-to-date output files",
+    )
+    args = parser.parse_args(argv)
+
+    cache = mw.FeatureCache()
+    written, unchanged, skipped = cache.flatten_directory(
+        args.input,
+        args.output,
+        mode=args.mode,
+        write_comments=args.write_comments,
+        tags=args.tags,
+        force=args.force,
+    )
+    print_write_summary(
+        len(written),
+        sum(os.path.getsize(path) for path in written),
+        len(unchanged),
+        up_to_date=len(skipped),
+        parsed=cache.misses,
+    )
+
+    return 0
+
 
-            # branch shape:
-            later_sibling = False
-            for sib in sc.siblings():
-                sib_index = sib.index()
-                if sib_index is None:
-                    continue
-                if sib_index > index:
-                    later_sibling = True
-
-            if later_sibling is True:
-                branch_shape = "├──"
-                level_open[level] = True
-            else:
-                branch_shape = "└──"
-                level_open[level] = False
-
-            scenario_string = indentation + branch_shape + " " + scenario_string
-
-        # Colon for organizational scenarios:
-        if sc.is_organizational():
-            scenario_string += ":"
-
-        print(scenario_string)
+COMMANDS: Dict[str, Callable[[List[str]], int]] = {
+    "batch": batch_command,
+    "diff": diff_command,
+    "ledger": ledger_command,
+    "fold": fold_command,
+    "locate": locate_command,
+    "match": match_command,
+    "serve": serve_command,
+}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+"""Defines the Client Class for talking to a running daemon (see Daemon)
+
+Only uses the standard library, so that the CLI can hand requests to a
+running daemon without importing igraph.
+"""
+
+import json
+import os
+import socket
+import stat
+import tempfile
+from typing import Optional, Dict, Any
+
+
+def default_socket_path() -> str:
+    """Returns the path of the daemon's Unix socket
+
+    Returns
+    -------
+    str
+        The MANYWORLDS_SOCKET environment variable if set, otherwise a path
+        in the user's runtime directory (XDG_RUNTIME_DIR) or, without one,
+        a per-user path in the temporary directory
+    """
+
+    return os.environ.get("MANYWORLDS_SOCKET") or os.path.join(
+        os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(),
+        "manyworlds-{uid}.sock".format(uid=os.getuid()),
+    )
+
+
+def is_own_socket(socket_path: str) -> bool:
+    """Returns whether a path is a Unix socket owned by the current user
+    (and not a symbolic link), so that requests are not sent to a socket
+    created by another user in a shared directory
+
+    Parameters
+    ----------
+    socket_path : str
+        The path of the socket
+
+    Returns
+    -------
+    bool
+        Whether or not the path is a socket owned by the current user
+    """
+
+    try:
+        socket_stat: os.stat_result = os.lstat(socket_path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(socket_stat.st_mode) and socket_stat.st_uid == os.getuid()
+
+
+class Client:
+    """A client for the daemon's JSON protocol.
+
+    Requests and responses are JSON objects, one per line. Every request
+    has a "command" ("ping", "flatten", "validate", "stats" or "shutdown").
+    Every response has an "ok" flag, and an "error" message (and
+    "line_no" for invalid feature files) if "ok" is false.
+    """
+
+    socket_path: str
+    """The path of the daemon's Unix socket"""
+    timeout: Optional[float]
+    """The timeout for connecting and for each response (in seconds)"""
+
+    def __init__(
+        self, socket_path: Optional[str] = None, timeout: Optional[float] = 60.0
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        socket_path : str, optional
+            The path of the daemon's Unix socket (default: default_socket_path())
+
+        timeout : float, optional, default = 60.0
+            The timeout for connecting and for each response (in seconds)
+        """
+
+        self.socket_path = (
+            socket_path if socket_path is not None else default_socket_path()
+        )
+        self.timeout = timeout
+
+    def request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Sends a request to the daemon and returns its response.
+
+        Parameters
+        ----------
+        request : Dict[str, Any]
+            The request
+
+        Returns
+        -------
+        Dict[str, Any]
+            The response
+
+        Raises
+        ------
+        OSError
+            If the daemon is not running or does not respond
+            (PermissionError if the socket is not a socket owned
+            by the current user, see is_own_socket)
+        """
+
+        if os.path.exists(self.socket_path) and not is_own_socket(self.socket_path):
+            raise PermissionError(
+                "Not a socket owned by the current user: {}".format(self.socket_path)
+            )
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(self.timeout)
+            connection.connect(self.socket_path)
+            with connection.makefile("rwb") as stream:
+                stream.write(json.dumps(request).encode() + b"\n")
+                stream.flush()
+                response_line: bytes = stream.readline()
+        if not response_line:
+            raise ConnectionError("The daemon closed the connection")
+        return json.loads(response_line)
+
+    def try_request(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Sends a request to the daemon if it is running.
+
+        Parameters
+        ----------
+        request : Dict[str, Any]
+            The request
+
+        Returns
+        -------
+        Dict[str, Any], optional
+            The response. None if the daemon is not running, or if the
+            socket is not owned by the current user (see is_own_socket)
+        """
+
+        if not is_own_socket(self.socket_path):
+            return None
+        try:
+            return self.request(request)
+        except OSError:
+            return None
+
+    def is_running(self) -> bool:
+        """Returns whether the daemon is running
+
+        Returns
+        -------
+        bool
+            Whether or not the daemon responds to "ping"
+        """
+
+        response: Optional[Dict[str, Any]] = self.try_request({"command": "ping"})
+        return response is not None and response.get("ok") is True
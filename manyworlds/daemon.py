@@ -0,0 +1,179 @@
+"""Defines the Daemon Class"""
+
+import json
+import os
+import socketserver
+from typing import Optional, Dict, List, Any
+
+from .feature import Feature
+from .feature_cache import FeatureCache
+from .output import OutputFile
+from .validation import validate
+from .exceptions import InvalidFeatureFileError
+from .client import default_socket_path
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Answers the requests of one connection (one JSON object per line)"""
+
+    server: "Daemon"
+
+    def handle(self) -> None:
+        for request_line in self.rfile:
+            response: Dict[str, Any]
+            try:
+                response = self.server.respond(json.loads(request_line))
+            except ValueError as error:
+                response = {"ok": False, "error": "Invalid request: {}".format(error)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class Daemon(socketserver.UnixStreamServer):
+    """A daemon keeping parsed features in memory, answering flatten,
+    outline and validate requests over a Unix socket (see Client).
+
+    Requests are answered one at a time.
+    """
+
+    cache: FeatureCache
+    """The parsed features"""
+    stopping: bool
+    """Whether or not a shutdown has been requested"""
+
+    def __init__(self, socket_path: Optional[str] = None) -> None:
+        """Constructor method
+
+        Binds the socket. A stale socket file (left behind by a daemon that
+        is no longer running) is replaced.
+
+        Parameters
+        ----------
+        socket_path : str, optional
+            The path of the Unix socket (default: default_socket_path())
+        """
+
+        if socket_path is None:
+            socket_path = default_socket_path()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.cache = FeatureCache()
+        self.stopping = False
+        old_umask: int = os.umask(0o177)  # Only the current user may connect
+        try:
+            super().__init__(socket_path, RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def serve(self) -> None:
+        """Answers requests until a "shutdown" request is received"""
+
+        try:
+            while not self.stopping:
+                self.handle_request()
+        finally:
+            self.server_close()
+            if os.path.exists(self.server_address):  # type: ignore
+                os.unlink(self.server_address)  # type: ignore
+
+    def respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answers a request
+
+        Parameters
+        ----------
+        request : Dict[str, Any]
+            The request
+
+        Returns
+        -------
+        Dict[str, Any]
+            The response
+        """
+
+        command: Any = request.get("command")
+        try:
+            if command == "ping":
+                return {"ok": True}
+            elif command == "flatten":
+                return self.flatten(request)
+            elif command == "validate":
+                return self.validate(request)
+            elif command == "stats":
+                return {
+                    "ok": True,
+                    "cached": len(self.cache.entries),
+                    "hits": self.cache.hits,
+                    "misses": self.cache.misses,
+                }
+            elif command == "shutdown":
+                self.stopping = True
+                return {"ok": True}
+            else:
+                return {"ok": False, "error": "Unknown command: {}".format(command)}
+        except InvalidFeatureFileError as error:
+            return {"ok": False, "error": str(error), "line_no": error.line_no}
+        except (OSError, KeyError, TypeError, ValueError) as error:
+            return {"ok": False, "error": "{}: {}".format(type(error).__name__, error)}
+
+    def flatten(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answers a "flatten" request.
+
+        The request has an "input" path and optionally an "output" path,
+        "mode", "write_comments" and "tags" (see Feature.flatten). Without
+        an "output" path, only the outline is returned.
+
+        Parameters
+        ----------
+        request : Dict[str, Any]
+            The request
+
+        Returns
+        -------
+        Dict[str, Any]
+            The response, with the outline of the feature (see Feature.outline)
+            and, if the flat feature file was written to, whether it "changed"
+            and its "size" (see OutputFile)
+        """
+
+        feature: Feature = self.cache.get(request["input"])
+        response: Dict[str, Any] = {"ok": True, "outline": feature.outline()}
+        if request.get("output"):
+            output_file: OutputFile = feature.flatten(
+                request["output"],
+                mode=request.get("mode", "strict"),
+                write_comments=request.get("write_comments", False),
+                tags=request.get("tags"),
+            )
+            response["changed"] = output_file.changed
+            response["size"] = output_file.size
+        return response
+
+    def validate(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answers a "validate" request.
+
+        The request has a list of "files". Files with a cached feature
+        are valid without validating them again.
+
+        Parameters
+        ----------
+        request : Dict[str, Any]
+            The request
+
+        Returns
+        -------
+        Dict[str, Any]
+            The response, with a list of "errors" (message and line_no) per file
+        """
+
+        errors: Dict[str, List[Dict[str, Any]]] = {}
+        for file_path in request["files"]:
+            file_errors: List[InvalidFeatureFileError] = []
+            try:
+                self.cache.get(file_path)
+            except InvalidFeatureFileError:
+                file_errors = validate(file_path)
+            errors[file_path] = [
+                {"message": str(error), "line_no": error.line_no}
+                for error in file_errors
+            ]
+        return {"ok": True, "errors": errors}
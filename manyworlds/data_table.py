@@ -1,7 +1,24 @@
-"""Defines the DataTable and DataTableRow classes"""
+"""Defines the DataTable, DataTableView, DataTableRows and DataTableRow classes"""
 
+import copy
 import re
-from typing import Optional, List
+import sys
+from typing import (
+    Optional,
+    List,
+    Dict,
+    Callable,
+    Iterable,
+    Iterator,
+    Sequence,
+    TypeVar,
+    Union,
+    overload,
+)
+
+from .source import SourceSpan
+from .examples import substitute
+from .exceptions import DataTableRowLengthError
 
 
 class DataTableRow:
@@ -9,6 +26,7 @@ class DataTableRow:
 
     values: List[str]
     comment: Optional[str]
+    span: Optional[SourceSpan]
 
     def __init__(self, values: List[str], comment: Optional[str] = None):
         """Constructor method
@@ -24,10 +42,98 @@ class DataTableRow:
 
         self.values = values
         self.comment = comment
+        self.span = None
+
+
+T = TypeVar("T")
+
+
+class DataTableView(Sequence[T]):
+    """A read-only sequence of the rows of a data table,
+    each created when accessed (see DataTable.to_list_of_list,
+    DataTable.to_list_of_dict and DataTable.to_list)"""
+
+    data_table: "DataTable"
+    """The data table"""
+    start: int
+    """The number of the first row (0 for the header row)"""
+
+    def __init__(
+        self, data_table: "DataTable", row: Callable[[int], T], start: int = 0
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        data_table : DataTable
+            The data table
+
+        row : Callable[[int], T]
+            Creates the item for a row number
+
+        start : int, default = 0
+            The number of the first row (0 for the header row)
+        """
+
+        self.data_table = data_table
+        self._row = row
+        self.start = start
+
+    def __len__(self) -> int:
+        return self.data_table.row_count - self.start
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[T]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        if isinstance(index, slice):
+            return [self._row(self.start + i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("data table row index out of range")
+        return self._row(self.start + index)
+
+    def __iter__(self) -> Iterator[T]:
+        for row_num in range(self.start, self.data_table.row_count):
+            yield self._row(row_num)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (DataTableView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class DataTableRows(DataTableView[DataTableRow]):
+    """The rows of a data table, excluding the header row (see DataTable.rows).
+
+    Read-only except for append, which appends to the data table."""
+
+    def append(self, row: DataTableRow) -> None:
+        """Appends a row to the data table (see DataTable.append)
+
+        Parameters
+        ----------
+        row : DataTableRow
+            The row to append
+        """
+
+        self.data_table.append(row)
 
 
 class DataTable:
-    """A Gherkin data table"""
+    """A Gherkin data table
+
+    Values are stored by column, with the values of the header row first.
+    Values are interned, so repeated values are stored once. Comments and
+    source spans are stored for the rows that have them only.
+    """
 
     TABLE_ROW_PATTERN = re.compile(
         r"""
@@ -45,8 +151,16 @@ class DataTable:
     followed by an optional comment
     """
 
-    header_row: DataTableRow
-    rows: List[DataTableRow]
+    columns: List[List[str]]
+    """The values of each column, header row first"""
+    column_widths: List[int]
+    """The length of the longest value of each column"""
+    comments: Dict[int, str]
+    """The comments by row number (0 for the header row)"""
+    spans: Dict[int, SourceSpan]
+    """The source spans by row number (0 for the header row)"""
+    row_count: int
+    """The number of rows, including the header row"""
 
     def __init__(self, header_row: DataTableRow) -> None:
         """Constructor method
@@ -57,43 +171,221 @@ class DataTable:
             The header row
         """
 
-        self.header_row = header_row
-        self.rows = []
+        self.columns = [[] for _ in header_row.values]
+        self.column_widths = [0 for _ in header_row.values]
+        self.comments = {}
+        self.spans = {}
+        self.row_count = 0
+        self.append(header_row)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[DataTableRow]) -> "DataTable":
+        """Creates a data table from its rows
+
+        Parameters
+        ----------
+        rows : Iterable[DataTableRow]
+            The rows, header row first
+
+        Returns
+        -------
+        DataTable
+            A new DataTable instance
+        """
+
+        row_iterator: Iterator[DataTableRow] = iter(rows)
+        data_table: DataTable = DataTable(next(row_iterator))
+        for row in row_iterator:
+            data_table.append(row)
+        return data_table
+
+    def append(self, row: DataTableRow, line_no: Optional[int] = None) -> None:
+        """Appends a row.
+
+        Parameters
+        ----------
+        row : DataTableRow
+            The row to append
+
+        line_no : int, optional
+            The number of the row's line (starting at 1), for error messages
+
+        Raises
+        ------
+        DataTableRowLengthError
+            If the row has more or fewer values than the header row
+        """
+
+        if len(row.values) != len(self.columns):
+            raise self.row_length_error(len(row.values), len(self.columns), line_no)
+        for col_num, value in enumerate(map(sys.intern, row.values)):
+            self.columns[col_num].append(value)
+            if len(value) > self.column_widths[col_num]:
+                self.column_widths[col_num] = len(value)
+        if row.comment is not None:
+            self.comments[self.row_count] = row.comment
+        if row.span is not None:
+            self.spans[self.row_count] = row.span
+        self.row_count += 1
+
+    @classmethod
+    def row_length_error(
+        cls, count: int, expected: int, line_no: Optional[int] = None
+    ) -> DataTableRowLengthError:
+        """Returns the error for a row with more or fewer values
+        than the header row
+
+        Parameters
+        ----------
+        count : int
+            The number of values of the row
+
+        expected : int
+            The number of values of the header row
+
+        line_no : int, optional
+            The number of the row's line (starting at 1)
+
+        Returns
+        -------
+        DataTableRowLengthError
+            The error
+        """
+
+        return DataTableRowLengthError(
+            "Data table row with {count} instead of {expected} values"
+            "{at_line}".format(
+                count=count,
+                expected=expected,
+                at_line="" if line_no is None else " at line {}".format(line_no),
+            ),
+            line_no=line_no,
+        )
+
+    @property
+    def header_row(self) -> DataTableRow:
+        """The header row
+
+        Returns
+        -------
+        DataTableRow
+            The header row
+        """
+
+        return self.row(0)
+
+    @property
+    def rows(self) -> DataTableRows:
+        """The rows, excluding the header row
+
+        Returns
+        -------
+        DataTableRows
+            The rows
+        """
+
+        return DataTableRows(self, self.row, start=1)
+
+    def row_values(self, row_num: int) -> List[str]:
+        """Returns the values of a row
+
+        Parameters
+        ----------
+        row_num : int
+            The row number (0 for the header row)
+
+        Returns
+        -------
+        List[str]
+            The values of the row
+        """
+
+        return [column[row_num] for column in self.columns]
+
+    def row(self, row_num: int) -> DataTableRow:
+        """Returns a row
+
+        Parameters
+        ----------
+        row_num : int
+            The row number (0 for the header row)
+
+        Returns
+        -------
+        DataTableRow
+            The row (a new DataTableRow instance)
+        """
+
+        row = DataTableRow(self.row_values(row_num), self.comments.get(row_num))
+        row.span = self.spans.get(row_num)
+        return row
 
-    def to_list_of_list(self) -> List[List[str]]:
+    def to_list_of_list(self) -> "DataTableView[List[str]]":
         """Returns a list of list of str representation of itself
 
         First row is header row
 
         Returns
         -------
-        List[List[str]]
+        DataTableView[List[str]]
             The list of list of str representation of itself
         """
 
-        return [self.header_row.values] + [row.values for row in self.rows]
+        return DataTableView(self, self.row_values)
 
-    def to_list_of_dict(self) -> List[dict]:
+    def to_list_of_dict(self) -> "DataTableView[Dict[str, str]]":
         """Returns a list of dict representation of itself
 
         Returns
         -------
-        List[dict]
+        DataTableView[Dict[str, str]]
             The list of dict representation of itself
         """
 
-        return [dict(zip(self.header_row.values, row.values)) for row in self.rows]
+        header: List[str] = self.row_values(0)
+        return DataTableView(
+            self,
+            lambda row_num: dict(zip(header, self.row_values(row_num))),
+            start=1,
+        )
 
-    def to_list(self) -> List[DataTableRow]:
+    def to_list(self) -> "DataTableView[DataTableRow]":
         """Returns a list of DataTableRow representation of itself
 
         Returns
         -------
-        List[DataTableRow]
+        DataTableView[DataTableRow]
             The list of DataTableRow representation of itself
         """
 
-        return [self.header_row] + self.rows
+        return DataTableView(self, self.row)
+
+    def substitute(self, bindings: Dict[str, str]) -> "DataTable":
+        """Returns a copy of the data table with the placeholders
+        in its values replaced by example values.
+
+        Parameters
+        ----------
+        bindings : Dict[str, str]
+            The example values by placeholder name
+
+        Returns
+        -------
+        DataTable
+            A new DataTable instance
+        """
+
+        data_table: DataTable = copy.copy(self)
+        data_table.columns = [
+            [sys.intern(substitute(value, bindings)) for value in column]
+            for column in self.columns
+        ]
+        data_table.column_widths = [
+            max(len(value) for value in column) for column in data_table.columns
+        ]
+        data_table.comments = dict(self.comments)
+        data_table.spans = dict(self.spans)
+        return data_table
 
     @classmethod
     def parse_line(cls, line: str) -> Optional[DataTableRow]:
@@ -112,8 +404,24 @@ class DataTable:
         match: Optional[re.Match] = DataTable.TABLE_ROW_PATTERN.match(line)
 
         if match:
-            values = [s.strip() for s in match.group("table_row").split("|")[1:-1]]
-            comment = match.group("comment")
-            return DataTableRow(values, comment)
+            return cls.parse_match(match)
         else:
             return None
+
+    @classmethod
+    def parse_match(cls, match: re.Match) -> DataTableRow:
+        """Creates a DataTableRow from a match of DataTable.TABLE_ROW_PATTERN
+
+        Parameters
+        ----------
+        match : re.Match
+            The match of a pipe delimited data table line
+
+        Returns
+        -------
+        DataTableRow
+        """
+
+        values = [s.strip() for s in match.group("table_row").split("|")[1:-1]]
+        comment = match.group("comment")
+        return DataTableRow(values, comment)
@@ -0,0 +1,259 @@
+"""Defines the StepDurations Class"""
+
+import csv
+import re
+import xml.etree.ElementTree as ET
+from typing import Optional, Dict, List, Tuple, Iterable, Iterator
+
+from .step import Step
+
+
+class StepDurations:
+    """Measured step durations, for weighting flat scenarios by their
+    estimated running time instead of their step count.
+
+    Durations are keyed by step type and name ('When I click "OK"').
+    Steps without a measured duration are assumed to take the average
+    measured duration.
+    """
+
+    STEP_RESULT_PATTERN: re.Pattern = re.compile(
+        r"""
+        ^\s*                                    # indentation
+        (?P<conjunction>Given|When|Then|And|But) # conjunction
+        [ ]                                      # space
+        (?P<name>.+?)                            # name
+        [ ]\.\.\.[ ]\w+[ ]in[ ]                  # " ... passed in "
+        (?P<seconds>[0-9.]+)s                    # duration
+        \s*$                                    # end of line
+        """,
+        re.VERBOSE,
+    )
+    """
+    re.Pattern
+
+    Pattern describing a step result line in the captured output
+    of a JUnit XML report ('Given I go to "Users" ... passed in 0.012s')
+    """
+
+    durations: Dict[str, float]
+    """The durations (seconds) by step type and name"""
+    default: float
+    """The duration (seconds) assumed for steps without a measured duration"""
+
+    def __init__(
+        self, durations: Dict[str, float], default: Optional[float] = None
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        durations : Dict[str, float]
+            The durations (seconds) by step type and name
+
+        default : float, optional
+            The duration assumed for steps without a measured duration.
+            Defaults to the average measured duration (1 if there are none)
+        """
+
+        self.durations = durations
+        if default is None:
+            default = sum(durations.values()) / len(durations) if durations else 1.0
+        self.default = default
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "StepDurations":
+        """Reads step durations from a JUnit XML report (".xml")
+        or a CSV file (see from_junit_xml and from_csv).
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file
+
+        Returns
+        -------
+        StepDurations
+            A new StepDurations instance
+        """
+
+        if file_path.lower().endswith(".xml"):
+            return cls.from_junit_xml(file_path)
+        return cls.from_csv(file_path)
+
+    @classmethod
+    def from_measurements(
+        cls, measurements: Iterable[Tuple[str, float]]
+    ) -> "StepDurations":
+        """Creates step durations from measurements,
+        averaging the durations of steps measured more than once.
+
+        Parameters
+        ----------
+        measurements : Iterable[Tuple[str, float]]
+            The step type and name, and the duration (seconds) of each
+            measurement
+
+        Returns
+        -------
+        StepDurations
+            A new StepDurations instance
+        """
+
+        totals: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        for step_key, duration in measurements:
+            totals[step_key] = totals.get(step_key, 0.0) + duration
+            counts[step_key] = counts.get(step_key, 0) + 1
+
+        return StepDurations(
+            {step_key: totals[step_key] / counts[step_key] for step_key in totals}
+        )
+
+    @classmethod
+    def from_junit_xml(cls, file_path: str) -> "StepDurations":
+        """Reads step durations from a JUnit XML report.
+
+        Step durations are read from step result lines in the captured output
+        of test cases ('Given I go to "Users" ... passed in 0.012s', written
+        by behave for example) and from test cases named after steps
+        ('<testcase name="Given I go to &quot;Users&quot;" time="0.012">').
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the JUnit XML report
+
+        Returns
+        -------
+        StepDurations
+            A new StepDurations instance
+        """
+
+        def measurements(root: ET.Element) -> Iterator[Tuple[str, float]]:
+            for element in root.iter():
+                if element.tag == "testcase":
+                    name: str = element.get("name", "").strip()
+                    if name.split(" ", 1)[0] in ["Given", "When", "Then"]:
+                        try:
+                            yield name, float(element.get("time", ""))
+                        except ValueError:
+                            pass
+                elif element.tag in ["system-out", "system-err"] and element.text:
+                    conjunction: str = "Given"
+                    for line in element.text.splitlines():
+                        match: Optional[re.Match] = cls.STEP_RESULT_PATTERN.match(line)
+                        if match is None:
+                            continue
+                        if match["conjunction"] not in ["And", "But"]:
+                            conjunction = match["conjunction"]
+                        yield (
+                            "{} {}".format(conjunction, match["name"].strip()),
+                            float(match["seconds"]),
+                        )
+
+        return cls.from_measurements(measurements(ET.parse(file_path).getroot()))
+
+    @classmethod
+    def from_csv(cls, file_path: str) -> "StepDurations":
+        """Reads step durations from a CSV file with one step per row:
+        step type and name ('When I go to "Users"'), and duration in seconds.
+        A header row is skipped.
+
+        Durations of steps listed more than once are averaged.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the CSV file
+
+        Returns
+        -------
+        StepDurations
+            A new StepDurations instance
+        """
+
+        measurements: List[Tuple[str, float]] = []
+        with open(file_path, newline="") as csv_file:
+            for row in csv.reader(csv_file):
+                if len(row) < 2:
+                    continue
+                try:
+                    measurements.append((row[0].strip(), float(row[1])))
+                except ValueError:
+                    continue  # header row
+
+        return cls.from_measurements(measurements)
+
+    @classmethod
+    def step_key(cls, step: Step) -> str:
+        """Returns the key of a step: its type and name
+
+        Parameters
+        ----------
+        step : Step
+            The step
+
+        Returns
+        -------
+        str
+            The step type and name ('When I click "OK"')
+        """
+
+        return "{} {}".format(step.conjunction, step.name)
+
+    def duration(self, step: Step) -> float:
+        """Returns the (estimated) duration of a step
+
+        Parameters
+        ----------
+        step : Step
+            The step
+
+        Returns
+        -------
+        float
+            The duration (seconds)
+        """
+
+        return self.durations.get(self.step_key(step), self.default)
+
+    def total(self, steps: Iterable[Step]) -> float:
+        """Returns the (estimated) total duration of steps
+
+        Parameters
+        ----------
+        steps : Iterable[Step]
+            The steps
+
+        Returns
+        -------
+        float
+            The total duration (seconds)
+        """
+
+        return sum(self.duration(step) for step in steps)
+
+    def __str__(self) -> str:
+        """Returns a string representation of the StepDurations instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the StepDurations instance
+        """
+
+        return "<StepDurations: {} steps>".format(len(self.durations))
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the StepDurations instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the StepDurations instance
+        """
+
+        return self.__str__()
@@ -0,0 +1,481 @@
+"""Defines the Event, EventHandler and EventParser Classes"""
+
+import re
+from typing import Optional, List, Iterable, Iterator, Dict, Tuple, Sequence
+
+from .step import Step, Prerequisite, Action, Assertion
+from .data_table import DataTable, DataTableRow
+from .source import SourceSpan, MappedSource
+from .tokens import Token
+from .validation import Validator
+from .feature_cache import FeatureImport
+from .exceptions import InvalidFeatureFileError
+
+
+class Event:
+    """A parse event of an indented feature"""
+
+    __slots__ = (
+        "kind",
+        "line_no",
+        "level",
+        "name",
+        "comment",
+        "tags",
+        "outline",
+        "scenario_names",
+        "step",
+        "row",
+        "span",
+    )
+
+    FEATURE: str = "feature"
+    """The feature line ("Feature: …"). Sets name"""
+    DESCRIPTION: str = "description"
+    """A feature description line. Sets name (the line)"""
+    SCENARIO_OPEN: str = "scenario_open"
+    """A scenario line ("Scenario: …" or "Scenario Outline: …").
+    Sets name, comment, tags and outline"""
+    SCENARIO_CLOSE: str = "scenario_close"
+    """The end of a scenario and all of its child scenarios. Sets name"""
+    STEP: str = "step"
+    """A step line ("Given …", "When …", …). Sets step"""
+    TABLE_ROW: str = "table_row"
+    """A data table row of the last step ("| … |"). Sets row"""
+    EXAMPLES: str = "examples"
+    """An examples line of the last scenario ("Examples:").
+    Sets comment and row (the header row of the examples table)"""
+    EXAMPLES_ROW: str = "examples_row"
+    """A row of the last examples table ("| … |"). Sets row"""
+    SUBTREE: str = "subtree"
+    """A subtree declaration line ("Subtree: …"). Sets name and comment.
+    The scenarios of the subtree follow one level deeper"""
+    INCLUDE: str = "include"
+    """A subtree reference line ("Include: …"). Sets name (the name
+    of the referenced subtree), comment and tags"""
+    EXTENDS: str = "extends"
+    """An import line ("Extends: … > …"). Sets name (the path of the extended
+    feature file), scenario_names and comment"""
+
+    kind: str
+    """The kind of event (one of the kind constants above)"""
+    line_no: int
+    """The line number in the input (starting at 0). For SCENARIO_CLOSE events,
+    the line number of the scenario line"""
+    level: int
+    """The indentation level (1 for root scenarios)"""
+    name: Optional[str]
+    """The feature name, description line, scenario name or subtree name"""
+    comment: Optional[str]
+    """The scenario comment"""
+    tags: List[str]
+    """The scenario's own tags (including "@")"""
+    outline: bool
+    """Whether the scenario is a scenario outline"""
+    scenario_names: List[str]
+    """The names of the scenarios along the path to the imported scenario"""
+    step: Optional[Step]
+    """The step (without data table, which follows as TABLE_ROW events)"""
+    row: Optional[DataTableRow]
+    """The data table or examples table row"""
+    span: Optional[SourceSpan]
+    """The location of the scenario, step or data table row line
+    (only when parsing a MappedSource)"""
+
+    def __init__(
+        self,
+        kind: str,
+        line_no: int,
+        level: int,
+        name: Optional[str] = None,
+        comment: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        outline: bool = False,
+        scenario_names: Optional[List[str]] = None,
+        step: Optional[Step] = None,
+        row: Optional[DataTableRow] = None,
+        span: Optional[SourceSpan] = None,
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        kind : str
+            The kind of event (Event.FEATURE, Event.SCENARIO_OPEN, …)
+
+        line_no : int
+            The line number in the input (starting at 0)
+
+        level : int
+            The indentation level
+
+        name : str, optional
+            The feature name, description line, scenario name or subtree name
+
+        comment : str, optional
+            The scenario comment
+
+        tags : List[str], optional
+            The scenario's own tags (including "@")
+
+        outline : bool, default = False
+            Whether the scenario is a scenario outline
+
+        scenario_names : List[str], optional
+            The names of the scenarios along the path to the imported scenario
+
+        step : Step, optional
+            The step
+
+        row : DataTableRow, optional
+            The data table or examples table row
+
+        span : SourceSpan, optional
+            The location of the line
+        """
+
+        self.kind = kind
+        self.line_no = line_no
+        self.level = level
+        self.name = name
+        self.comment = comment
+        self.tags = tags if tags is not None else []
+        self.outline = outline
+        self.scenario_names = scenario_names if scenario_names is not None else []
+        self.step = step
+        self.row = row
+        self.span = span
+
+    def __str__(self) -> str:
+        """Returns a string representation of the Event instance for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the Event instance
+        """
+
+        return "<Event: {} at line {} (level {})>".format(
+            self.kind, self.line_no + 1, self.level
+        )
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the Event instance for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the Event instance
+        """
+
+        return self.__str__()
+
+
+class EventHandler:
+    """Receives the parse events of an indented feature (see EventParser.parse).
+
+    Subclasses override the methods for the events they are interested in.
+    """
+
+    def feature(self, event: Event) -> None:
+        """Called for the feature line"""
+
+    def description(self, event: Event) -> None:
+        """Called for each feature description line"""
+
+    def scenario_open(self, event: Event) -> None:
+        """Called for each scenario line"""
+
+    def scenario_close(self, event: Event) -> None:
+        """Called at the end of each scenario (after its child scenarios)"""
+
+    def step(self, event: Event) -> None:
+        """Called for each step line"""
+
+    def table_row(self, event: Event) -> None:
+        """Called for each data table row"""
+
+    def examples(self, event: Event) -> None:
+        """Called for each examples line (with the header row of its table)"""
+
+    def examples_row(self, event: Event) -> None:
+        """Called for each examples table row after the header row"""
+
+    def subtree(self, event: Event) -> None:
+        """Called for each subtree declaration line"""
+
+    def include(self, event: Event) -> None:
+        """Called for each subtree reference line"""
+
+    def extends(self, event: Event) -> None:
+        """Called for the import line"""
+
+
+class EventParser:
+    """An event-driven parser for indented features.
+
+    Classifies and validates the lines of an indented feature and reports
+    parse events without building a scenario graph. Feature.from_lines is
+    one consumer of these events.
+    """
+
+    STEP_CLASSES: Dict[str, type] = {
+        "Given": Prerequisite,
+        "When": Action,
+        "Then": Assertion,
+    }
+    """
+    Dict[str, type]
+
+    The Step subclass for each conjunction ("And" and "But" steps
+    have the type of the preceding step)
+    """
+
+    @classmethod
+    def events(
+        cls,
+        lines: Iterable[str],
+        start_line_no: int = 0,
+        enclosing: Sequence[Tuple[str, int]] = (),
+        known_subtrees: Iterable[str] = (),
+    ) -> Iterator[Event]:
+        """Yields the parse events of an indented feature.
+
+        The lines are consumed lazily, one at a time. If the lines are
+        a MappedSource, scenario, step and data table row events (and their
+        steps and rows) carry source spans.
+
+        Parameters
+        ----------
+        lines : Iterable[str]
+            The lines of the indented feature (with or without newlines)
+
+        start_line_no : int, default = 0
+            The line number of the first line (starting at 0)
+
+        enclosing : Sequence[Tuple[str, int]], default = ()
+            The names and line numbers of the scenarios enclosing the lines,
+            one per level, when the lines are a part of a larger feature file
+            beginning with a scenario (or its tags)
+
+        known_subtrees : Iterable[str], default = ()
+            The names of subtrees declared outside of the lines
+            that may be referenced
+
+        Returns
+        -------
+        Iterator[Event]
+            The events, in file order
+
+        Raises
+        ------
+        InvalidFeatureFileError
+            At the first invalid line
+        """
+
+        from .feature import Feature  # avoids a circular import
+
+        validator: Validator = Validator(known_subtrees=known_subtrees)
+        if len(enclosing) > 0:
+            validator.feature_name_seen = True
+            validator.scenario_level = len(enclosing)
+        check = validator.check  # bound once, called for every line
+        tags: List[str] = []  # tags for the next scenario
+        # Name and line number of the open scenario at each level:
+        open_scenarios: List[Tuple[str, int]] = list(enclosing)
+        # Whether the first open scenario is a subtree declaration
+        # (subtree declarations are not closed):
+        subtree_open: bool = False
+
+        def close_scenarios(level: int) -> Iterator[Event]:
+            nonlocal subtree_open
+            while len(open_scenarios) >= level:
+                name, line_no = open_scenarios.pop()
+                if subtree_open and len(open_scenarios) == 0:
+                    subtree_open = False
+                else:
+                    yield Event(
+                        Event.SCENARIO_CLOSE,
+                        line_no,
+                        len(open_scenarios) + 1,
+                        name=name,
+                    )
+
+        last_step: Optional[Step] = None
+        # The examples line awaiting its header row, and whether
+        # table rows belong to an examples table:
+        examples_token: Optional[Token] = None
+        in_examples: bool = False
+        source: Optional[MappedSource] = (
+            lines if isinstance(lines, MappedSource) else None
+        )
+        span: Optional[SourceSpan] = None
+        for token in Feature.tokenize(lines, start_line_no=start_line_no):
+            errors: List[InvalidFeatureFileError] = check(token)
+            if errors:
+                raise errors[0]
+
+            kind: str = token.kind
+            match: re.Match = token.match  # type: ignore
+            level: int = token.level  # type: ignore
+
+            if source is not None:
+                span = source.span(token.line_no - start_line_no)
+
+            # Most frequent kinds first:
+            if kind == Token.STEP:
+                conjunction, step_name, step_comment = match.group(
+                    "conjunction", "name", "comment"
+                )
+                step_class: type = (
+                    last_step.__class__
+                    if conjunction in ["And", "But"]
+                    else cls.STEP_CLASSES[conjunction]
+                )
+                last_step = step_class(step_name, comment=step_comment)
+                last_step.span = span  # type: ignore
+                yield Event(Event.STEP, token.line_no, level, step=last_step, span=span)
+
+            elif kind == Token.TABLE_ROW:
+                row: DataTableRow = DataTable.parse_match(match)
+                row.span = span
+                if examples_token is not None:
+                    yield Event(
+                        Event.EXAMPLES,
+                        examples_token.line_no,
+                        examples_token.level,  # type: ignore
+                        comment=examples_token.match["comment"],  # type: ignore
+                        row=row,
+                    )
+                    examples_token = None
+                elif in_examples:
+                    yield Event(
+                        Event.EXAMPLES_ROW, token.line_no, level, row=row, span=span
+                    )
+                else:
+                    yield Event(
+                        Event.TABLE_ROW, token.line_no, level, row=row, span=span
+                    )
+
+            elif kind == Token.SCENARIO:
+                yield from close_scenarios(level)
+                if level > len(open_scenarios) + 1:
+                    raise InvalidFeatureFileError(
+                        "Excessive indentation at line {line_no}: "
+                        "Scenario: {name}".format(
+                            line_no=token.line_no + 1,
+                            name=match.group("scenario_name"),
+                        ),
+                        line_no=token.line_no + 1,
+                    )
+                name = match.group("scenario_name").strip()
+                comment: Optional[str] = match.group("comment")
+                yield Event(
+                    Event.SCENARIO_OPEN,
+                    token.line_no,
+                    level,
+                    name=name,
+                    comment=comment.strip() if comment is not None else None,
+                    tags=tags,
+                    outline=match["outline"] is not None,
+                    span=span,
+                )
+                open_scenarios.append((name, token.line_no))
+                tags = []
+                last_step = None
+                in_examples = False
+
+            elif kind == Token.TAGS:
+                tags = match.group("tags").split()
+
+            elif kind == Token.EXAMPLES:
+                examples_token = token
+                in_examples = True
+
+            elif kind == Token.INCLUDE:
+                yield from close_scenarios(level)
+                comment = match.group("comment")
+                if level > len(open_scenarios) + 1:
+                    raise InvalidFeatureFileError(
+                        "Excessive indentation at line {line_no}: {line}".format(
+                            line_no=token.line_no + 1, line=token.line
+                        ),
+                        line_no=token.line_no + 1,
+                    )
+                yield Event(
+                    Event.INCLUDE,
+                    token.line_no,
+                    level,
+                    name=match["subtree_name"].strip(),
+                    comment=comment.strip() if comment is not None else None,
+                    tags=tags,
+                    span=span,
+                )
+                tags = []
+                last_step = None
+                in_examples = False
+
+            elif kind == Token.SUBTREE:
+                yield from close_scenarios(1)
+                name = match["subtree_name"].strip()
+                comment = match.group("comment")
+                yield Event(
+                    Event.SUBTREE,
+                    token.line_no,
+                    level,
+                    name=name,
+                    comment=comment.strip() if comment is not None else None,
+                )
+                open_scenarios.append((name, token.line_no))
+                subtree_open = True
+                last_step = None
+                in_examples = False
+
+            elif kind == Token.EXTENDS:
+                feature_import = FeatureImport.from_match(match, token.line_no)
+                yield Event(
+                    Event.EXTENDS,
+                    token.line_no,
+                    level,
+                    name=feature_import.file_path,
+                    comment=feature_import.comment,
+                    scenario_names=feature_import.scenario_names,
+                )
+
+            elif kind == Token.TEXT:
+                yield Event(Event.DESCRIPTION, token.line_no, level, name=token.line)
+
+            elif kind == Token.FEATURE:
+                yield Event(
+                    Event.FEATURE, token.line_no, level, name=match["feature_name"]
+                )
+
+            # Comment lines are skipped
+
+        errors = validator.finish()
+        if len(errors) > 0:
+            raise errors[0]
+
+        yield from close_scenarios(1)
+
+    @classmethod
+    def parse(
+        cls, lines: Iterable[str], handler: EventHandler, start_line_no: int = 0
+    ) -> None:
+        """Parses an indented feature, calling the handler method
+        named after the kind of each event.
+
+        Parameters
+        ----------
+        lines : Iterable[str]
+            The lines of the indented feature (with or without newlines)
+
+        handler : EventHandler
+            The handler
+
+        start_line_no : int, default = 0
+            The line number of the first line (starting at 0)
+        """
+
+        for event in cls.events(lines, start_line_no=start_line_no):
+            getattr(handler, event.kind)(event)
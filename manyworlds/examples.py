@@ -0,0 +1,81 @@
+"""Defines the functions for expanding scenario outlines"""
+
+import re
+from typing import Dict, Iterator, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .scenario import Scenario
+
+PLACEHOLDER_PATTERN: re.Pattern = re.compile(
+    r"""
+    <                       # opening angle bracket
+    (?P<placeholder>[^<>]+) # placeholder name
+    >                       # closing angle bracket
+    """,
+    re.VERBOSE,
+)
+"""
+re.Pattern
+
+Pattern describing a placeholder ("<name>") in a scenario name, step name
+or data table value of a scenario outline
+"""
+
+
+def substitute(text: str, bindings: Dict[str, str]) -> str:
+    """Replaces the placeholders in a text with their example values.
+
+    Placeholders without an example value are left unchanged.
+
+    Parameters
+    ----------
+    text : str
+        A scenario name, step name or data table value
+
+    bindings : Dict[str, str]
+        The example values by placeholder name
+
+    Returns
+    -------
+    str
+        The text with the bound placeholders replaced
+    """
+
+    if "<" not in text:
+        return text
+    return PLACEHOLDER_PATTERN.sub(
+        lambda match: bindings.get(match["placeholder"], match[0]), text
+    )
+
+
+def example_bindings(scenarios: List["Scenario"]) -> Iterator[Dict[str, str]]:
+    """Yields the example values for each combination of the examples rows
+    of the scenario outlines along a path.
+
+    The combinations are generated lazily, one at a time, in file order
+    (the rows of the first outline vary slowest). Values of outlines further
+    down the path override values of their ancestors for the same placeholder.
+
+    Parameters
+    ----------
+    scenarios : List[Scenario]
+        The scenarios along a path, root scenario first
+
+    Returns
+    -------
+    Iterator[Dict[str, str]]
+        The example values by placeholder name. A single empty dict if there
+        are no scenario outlines with examples along the path
+    """
+
+    outlines: List["Scenario"] = [sc for sc in scenarios if sc.examples]
+
+    def expand(depth: int, bindings: Dict[str, str]) -> Iterator[Dict[str, str]]:
+        if depth == len(outlines):
+            yield bindings
+            return
+        for table in outlines[depth].examples:
+            for row in table.to_list_of_dict():
+                yield from expand(depth + 1, {**bindings, **row})
+
+    return expand(0, {})
@@ -1,4 +1,42 @@
+from typing import Optional
+
+
 class InvalidFeatureFileError(Exception):
     """Exception for invalid line in a feature file"""
 
+    line_no: Optional[int]
+    """The number of the invalid line (starting at 1), if known"""
+
+    def __init__(self, message: str, line_no: Optional[int] = None) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        message : str
+            The error message
+
+        line_no : int, optional
+            The number of the invalid line (starting at 1)
+        """
+
+        super().__init__(message)
+        self.line_no = line_no
+
+    def __reduce__(self) -> tuple:
+        """Keeps the line number when the error is pickled
+        (for example when raised in a worker process)"""
+
+        return (self.__class__, (str(self), self.line_no))
+
+
+class DataTableRowLengthError(InvalidFeatureFileError):
+    """Exception for a data table row with more or fewer values
+    than the header row"""
+
+    pass
+
+
+class InvalidTagExpressionError(Exception):
+    """Exception for an invalid tag expression"""
+
     pass
@@ -1,14 +1,47 @@
 """Defines the Feature Class"""
 
+import io
 import re
+from array import array
+from bisect import bisect_left
 import igraph as ig  # type: ignore
-from typing import Optional, TextIO, Literal, List, Tuple
+from typing import (
+    Optional,
+    TextIO,
+    Literal,
+    List,
+    Tuple,
+    Dict,
+    Iterator,
+    Iterable,
+    Union,
+    Set,
+    Sequence,
+    TYPE_CHECKING,
+    cast,
+)
 
 from .scenario import Scenario
 from .step import Step, Prerequisite, Action, Assertion
 from .data_table import DataTable, DataTableRow
+from .flat_scenario import FlatScenario
+from .subtree import Subtree, SubtreePath
+from .feature_cache import FeatureImport, FeatureCache
+from .ledger import Ledger
+from .durations import StepDurations
+from .smoke import SmokeSuite
+from .plan import FlatteningPlan
+from .tag_expression import TagExpression
+from .source import SourceSpan, MappedSource
+from .source_map import SourceMap
+from .output import OutputFile
+from .tokens import Token
+from .events import Event, EventParser
 from .exceptions import InvalidFeatureFileError
 
+if TYPE_CHECKING:
+    from .forest_index import ForestIndex  # NumPy is an optional dependency
+
 
 class Feature:
     """A collection of one or more directed trees
@@ -53,19 +86,170 @@ class Feature:
     Pattern describing a comment line ("# …")
     """
 
-    graph: ig.Graph
-    """The graph representing the scenario tree(s)"""
+    SUBTREE_PATTERN: re.Pattern = re.compile(
+        r"""
+        ^                       # start of line
+        Subtree:                # "Subtree:" keyword
+        [ ]                     # space
+        (?P<subtree_name>[^#]*) # subtree name
+        (?:\# (?P<comment>.+))? # optional comment
+        $                       # end of line
+        """,
+        re.VERBOSE,
+    )
+    """
+    re.Pattern
+
+    Pattern describing a subtree declaration line ("Subtree: …")
+    followed by an optional comment
+    """
+
+    INCLUDE_PATTERN: re.Pattern = re.compile(
+        r"""
+        ^                       # start of line
+        Include:                # "Include:" keyword
+        [ ]                     # space
+        (?P<subtree_name>[^#]*) # subtree name
+        (?:\# (?P<comment>.+))? # optional comment
+        $                       # end of line
+        """,
+        re.VERBOSE,
+    )
+    """
+    re.Pattern
+
+    Pattern describing a subtree reference line ("Include: …")
+    followed by an optional comment
+    """
+
+    EXTENDS_PATTERN: re.Pattern = re.compile(
+        r"""
+        ^                         # start of line
+        Extends:                  # "Extends:" keyword
+        [ ]                       # space
+        (?P<file_path>[^>#]+)     # path of the extended feature file
+        >                         # ">" separator
+        (?P<scenario_names>[^#]+) # scenario names along the path, separated by ">"
+        (?:\# (?P<comment>.+))?   # optional comment
+        $                         # end of line
+        """,
+        re.VERBOSE,
+    )
+    """
+    re.Pattern
+
+    Pattern describing an import line ("Extends: login.feature > Log in")
+    followed by an optional comment
+    """
+
     name: Optional[str]
     """The name of the feature"""
     description: List[str]
     """The description lines for the feature"""
+    tag_index: Dict[str, List[int]]
+    """The indices of the vertices of the scenarios tagged with each tag"""
+    subtrees: Dict[str, Subtree]
+    """The declared subtrees by name (see Scenario.reference)"""
+    extends: Optional[FeatureImport]
+    """The scenario of another feature file the root scenarios continue from"""
+    base_scenarios: List[Scenario]
+    """The scenarios along the path to the imported scenario, once resolved
+    (see FeatureCache.resolve)"""
+    lines: Optional[List[str]]
+    """The lines of the indented feature (without newlines), if kept
+    for incremental re-parsing (see apply_edit)"""
+    _graph: ig.Graph
+    _subtree: Optional[Subtree]
+    """The subtree receiving the scenarios, steps and data table rows
+    one level deeper than its declaration line, if any"""
+    _pending_scenarios: List[Scenario]
+    """Appended scenarios not yet added to the graph"""
+    _pending_edges: List[Tuple[int, int]]
+    """Parent edges (vertex indices) of the pending scenarios"""
+    _open_scenarios: List[Tuple[Scenario, int]]
+    """The last appended scenario and its ancestors (with their vertex indices),
+    one per level. Scenarios can be appended as children to these only"""
+    _scenario_line_nos: array
+    """The line number of each scenario, by vertex index"""
+    _scenario_levels: array
+    """The indentation level of each scenario, by vertex index"""
+    _unparsed_edit: Optional[Tuple[int, int, int]]
+    """The lines not yet re-parsed after an invalid edit: their first line,
+    their end in the last valid lines and their end in the current lines"""
+    _revision: int
+    """Incremented whenever scenarios are added to or replaced in the graph"""
+    _scenario_lists: Dict[str, Tuple[Tuple[int, int, int], Tuple[Scenario, ...]]]
+    """The cached lists of all, root and leaf scenarios, with the revision,
+    vertex count and edge count of the graph they were listed from"""
 
     def __init__(self) -> None:
         """Constructor method"""
 
-        self.graph = ig.Graph(directed=True)
+        self._graph = ig.Graph(directed=True)
         self.name = None
         self.description = []
+        self.tag_index = {}
+        self.subtrees = {}
+        self.extends = None
+        self.base_scenarios = []
+        self.lines = None
+        self._subtree = None
+        self._pending_scenarios = []
+        self._pending_edges = []
+        self._open_scenarios = []
+        self._scenario_line_nos = array("q")
+        self._scenario_levels = array("q")
+        self._unparsed_edit = None
+        self._revision = 0
+        self._scenario_lists = {}
+
+    @property
+    def graph(self) -> ig.Graph:
+        """The graph representing the scenario tree(s)
+
+        Scenarios appended since the graph was last accessed are added first.
+
+        Returns
+        -------
+        igraph.Graph
+            The graph
+        """
+
+        self.add_pending_scenarios()
+        return self._graph
+
+    def add_pending_scenarios(self) -> None:
+        """Adds the vertices and edges of all pending scenarios to the graph
+        in bulk and links the scenarios to their vertices.
+
+        Adding vertices and edges one at a time is slow in igraph as its
+        index structures and attribute vectors are rebuilt each time.
+        """
+
+        if len(self._pending_scenarios) == 0:
+            return
+
+        first_index: int = self._graph.vcount()
+        if first_index == 0:
+            self._graph = ig.Graph(
+                n=len(self._pending_scenarios),
+                edges=self._pending_edges,
+                directed=True,
+                vertex_attrs={"scenario": self._pending_scenarios},
+            )
+        else:
+            self._graph.add_vertices(
+                len(self._pending_scenarios),
+                attributes={"scenario": self._pending_scenarios},
+            )
+            self._graph.add_edges(self._pending_edges)
+
+        for index, scenario in enumerate(self._pending_scenarios, start=first_index):
+            scenario.attach(self._graph, self._graph.vs[index])
+        self._revision += 1
+
+        self._pending_scenarios = []
+        self._pending_edges = []
 
     @classmethod
     def split_line(cls, raw_line: str) -> Tuple[int, str]:
@@ -109,10 +293,30 @@ class Feature:
         if match is None:
             return None
 
+        return self.parse_step_match(match)
+
+    def parse_step_match(self, match: re.Match) -> Step:
+        """Creates the appropriate Step subclass instance from a match
+        of Step.STEP_PATTERN.
+
+        If the step begins with "And" or "But" then the step type is determined
+        by the type of the last step.
+
+        Parameters
+        ----------
+        match : re.Match
+            The match of the step line
+
+        Returns
+        -------
+        Prerequisite or Action or Assertion
+            An instance of a Step subclass
+        """
+
         conjunction, name, comment = match.group("conjunction", "name", "comment")
 
         if conjunction in ["And", "But"]:
-            previous_step = self.scenarios()[-1].steps[-1]
+            previous_step = self._open_scenarios[-1][0].steps[-1]
             conjunction = previous_step.conjunction
 
         if conjunction == "Given":
@@ -123,107 +327,286 @@ class Feature:
             return Assertion(name, comment=comment)
 
     @classmethod
-    def from_file(cls, file_path) -> "Feature":
+    def tokenize(cls, lines: Iterable[str], start_line_no: int = 0) -> Iterator[Token]:
+        """Classifies the non-empty lines of an indented feature.
+
+        Only the indentation and the grammar of each individual line are
+        checked. Lines are consumed lazily, one at a time.
+
+        Parameters
+        ----------
+        lines : Iterable[str]
+            The lines of the indented feature (with or without newlines)
+
+        start_line_no : int, default = 0
+            The line number of the first line (starting at 0). Used when the
+            lines are a part of a larger feature file
+
+        Returns
+        -------
+        Iterator[Token]
+            One token per non-empty line
+        """
+
+        for line_no, raw_line in enumerate(lines, start=start_line_no):
+            if raw_line.strip() == "":
+                continue  # Skip empty lines
+
+            indentation: int
+            line: str
+            indentation, line = cls.split_line(raw_line)
+
+            # Determine indentation level:
+            level: Optional[int] = None
+            if indentation % cls.TAB_SIZE == 0:
+                level = indentation // cls.TAB_SIZE + 1
+
+            # Classify line:
+            match: Optional[re.Match]
+            if (match := cls.FEATURE_PATTERN.match(line)) is not None:
+                yield Token(line_no, level, Token.FEATURE, line, match)
+            elif (match := Scenario.SCENARIO_PATTERN.match(line)) is not None:
+                yield Token(line_no, level, Token.SCENARIO, line, match)
+            elif (match := Step.STEP_PATTERN.match(line)) is not None:
+                yield Token(line_no, level, Token.STEP, line, match)
+            elif (match := DataTable.TABLE_ROW_PATTERN.match(line)) is not None:
+                yield Token(line_no, level, Token.TABLE_ROW, line, match)
+            elif (match := Scenario.TAGS_PATTERN.match(line)) is not None:
+                yield Token(line_no, level, Token.TAGS, line, match)
+            elif (match := Scenario.EXAMPLES_PATTERN.match(line)) is not None:
+                yield Token(line_no, level, Token.EXAMPLES, line, match)
+            elif (match := cls.SUBTREE_PATTERN.match(line)) is not None:
+                yield Token(line_no, level, Token.SUBTREE, line, match)
+            elif (match := cls.INCLUDE_PATTERN.match(line)) is not None:
+                yield Token(line_no, level, Token.INCLUDE, line, match)
+            elif (match := cls.EXTENDS_PATTERN.match(line)) is not None:
+                yield Token(line_no, level, Token.EXTENDS, line, match)
+            elif (match := cls.COMMENT_PATTERN.match(line)) is not None:
+                yield Token(line_no, level, Token.COMMENT, line, match)
+            else:
+                yield Token(line_no, level, Token.TEXT, line)
+
+    @classmethod
+    def from_file(
+        cls, file_path: str, cache: Optional[FeatureCache] = None
+    ) -> "Feature":
         """Parses an indented feature file into a Feature instance.
 
+        The file is memory-mapped and read one line at a time. Scenarios,
+        steps and data table rows keep the source spans of their lines.
+        If the feature extends another feature file, the import is resolved.
+
         Parameters
         ----------
         file_path : str
             The path to the feature file
 
+        cache : FeatureCache, optional
+            The cache of extended feature files (default: a new cache)
+
         Returns
         -------
         Feature
             A new Feature instance
         """
 
-        feature = Feature()
-        with open(file_path) as indented_file:
-            for line_no, raw_line in enumerate(indented_file.readlines()):
-                if raw_line.strip() == "":
-                    continue  # Skip empty lines
-
-                indentation: int
-                line: str
-                indentation, line = cls.split_line(raw_line)
-
-                # (1) Determine and validate indentation level:
-                if indentation % cls.TAB_SIZE == 0:
-                    level: int = int(indentation / cls.TAB_SIZE) + 1
-                else:
-                    raise InvalidFeatureFileError(
-                        "Invalid indentation at line {line_no}: {line}".format(
-                            line_no=line_no + 1, line=line
-                        )
-                    )
+        with MappedSource(file_path) as source:
+            feature: Feature = cls.from_lines(source)
+        if feature.extends is not None:
+            (cache if cache is not None else FeatureCache()).resolve(feature, file_path)
+        return feature
 
-                # (2) Parse line:
+    @classmethod
+    def from_stream(cls, stream: TextIO) -> "Feature":
+        """Parses an indented feature from a text stream (such as stdin)
+        into a Feature instance.
 
-                # Feature line?
-                feature_match: Optional[re.Match] = cls.FEATURE_PATTERN.match(line)
-                if feature_match is not None:
-                    if len(feature.scenarios()) == 0:
-                        feature.name = feature_match["feature_name"]
-                        continue
-                    else:
-                        raise InvalidFeatureFileError(
-                            "Feature line is allowed only at beginning of file "
-                            "but was encountered at line {line_no}: {line}".format(
-                                line_no=line_no + 1, line=line
-                            )
-                        )
+        Lines are read from the stream one at a time.
 
-                # Scenario line?
-                scenario_match: Optional[re.Match] = Scenario.SCENARIO_PATTERN.match(
-                    line
-                )
-                if scenario_match is not None:
-                    feature.append_scenario(
-                        scenario_match.group("scenario_name"),
-                        comment=scenario_match.group("comment"),
-                        at_level=level,
-                        line_no=line_no,
-                    )
-                    continue
-
-                # Step line?
-                new_step: Optional[Step] = feature.parse_step_line(line)
-                if new_step:
-                    feature.append_step(new_step, at_level=level, line_no=line_no)
-                    continue
-
-                # Data table line?
-                new_data_row: Optional[DataTableRow] = DataTable.parse_line(line)
-                if new_data_row:
-                    feature.append_data_row(
-                        new_data_row, at_level=level, line_no=line_no
-                    )
-                    continue
+        Parameters
+        ----------
+        stream : TextIO
+            The text stream
+
+        Returns
+        -------
+        Feature
+            A new Feature instance
+        """
 
-                # Comment line?
-                comment_match: Optional[re.Match] = cls.COMMENT_PATTERN.match(line)
-                if comment_match is not None:
-                    continue  # skip comment lines
+        return cls.from_lines(stream)
 
-                # Feature description line?
-                if feature.name is not None and len(feature.scenarios()) == 0:
-                    feature.description.append(line)
-                    continue
+    @classmethod
+    def from_string(cls, string: str, keep_lines: bool = False) -> "Feature":
+        """Parses an indented feature string into a Feature instance.
 
-                # Not a valid line!
-                raise InvalidFeatureFileError(
-                    "Unable to parse line {line_no}: {line}".format(
-                        line_no=line_no + 1, line=line
-                    )
-                )
+        Parameters
+        ----------
+        string : str
+            The indented feature
 
+        keep_lines : bool, default = False
+            Whether or not to keep the lines of the feature so that
+            edits can be applied to it (see apply_edit)
+
+        Returns
+        -------
+        Feature
+            A new Feature instance
+        """
+
+        if not keep_lines:
+            return cls.from_lines(io.StringIO(string))
+
+        lines: List[str] = string.splitlines()
+        feature: Feature = cls.from_lines(lines)
+        feature.lines = lines
+        return feature
+
+    @classmethod
+    def from_lines(
+        cls,
+        lines: Iterable[str],
+        start_line_no: int = 0,
+        subtrees: Optional[Dict[str, Subtree]] = None,
+    ) -> "Feature":
+        """Parses indented feature lines into a Feature instance.
+
+        The lines are consumed lazily, one at a time (see EventParser).
+
+        Parameters
+        ----------
+        lines : Iterable[str]
+            The lines of the indented feature (with or without newlines)
+
+        start_line_no : int, default = 0
+            The line number of the first line (starting at 0). Used in
+            InvalidFeatureFileError messages when the lines are a part
+            of a larger feature file
+
+        subtrees : Dict[str, Subtree], optional
+            Subtrees declared outside of the lines that may be referenced
+            (when the lines are a part of a larger feature file)
+
+        Returns
+        -------
+        Feature
+            A new Feature instance
+        """
+
+        feature = Feature()
+        if subtrees is not None:
+            feature.subtrees.update(subtrees)
+        append_event = feature.append_event  # bound once, called for every event
+        for event in EventParser.events(
+            lines, start_line_no=start_line_no, known_subtrees=feature.subtrees
+        ):
+            append_event(event)
+
+        feature.update_fingerprints()
+        for subtree in feature.subtrees.values():
+            subtree.feature.update_fingerprints()
         return feature
 
+    def append_event(self, event: Event) -> None:
+        """Appends the feature line, description line, scenario, step,
+        data table row or examples table row of a parse event to the feature.
+
+        Parameters
+        ----------
+        event : Event
+            The parse event (see EventParser). Scenario close events are ignored
+        """
+
+        if self._subtree is not None:
+            if event.level > 1 and event.kind != Event.DESCRIPTION:
+                # Part of the subtree:
+                event.level -= 1
+                self._subtree.feature.append_event(event)
+                return
+            self._subtree = None  # Root lines end the subtree
+
+        if event.kind == Event.STEP:
+            self.append_step(
+                event.step,  # type: ignore
+                at_level=event.level,
+                line_no=event.line_no,
+            )
+
+        elif event.kind == Event.TABLE_ROW:
+            self.append_data_row(
+                event.row,  # type: ignore
+                at_level=event.level,
+                line_no=event.line_no,
+            )
+
+        elif event.kind == Event.SCENARIO_OPEN:
+            self.append_scenario(
+                event.name,  # type: ignore
+                comment=event.comment,
+                at_level=event.level,
+                line_no=event.line_no,
+                tags=event.tags,
+                span=event.span,
+                outline=event.outline,
+            )
+
+        elif event.kind == Event.EXAMPLES_ROW:
+            self.append_examples_row(event.row, line_no=event.line_no)  # type: ignore
+
+        elif event.kind == Event.EXAMPLES:
+            self.append_examples(
+                event.row,  # type: ignore
+                at_level=event.level,
+                line_no=event.line_no,
+            )
+
+        elif event.kind == Event.INCLUDE:
+            self.append_reference(
+                event.name,  # type: ignore
+                comment=event.comment,
+                tags=event.tags,
+                at_level=event.level,
+                line_no=event.line_no,
+                span=event.span,
+            )
+
+        elif event.kind == Event.SUBTREE:
+            self.append_subtree(
+                event.name,  # type: ignore
+                comment=event.comment,
+                line_no=event.line_no,
+            )
+
+        elif event.kind == Event.EXTENDS:
+            self.extends = FeatureImport(
+                event.name,  # type: ignore
+                event.scenario_names,
+                event.line_no,
+                comment=event.comment,
+            )
+
+        elif event.kind == Event.DESCRIPTION:
+            self.description.append(event.name)  # type: ignore
+
+        elif event.kind == Event.FEATURE:
+            self.name = event.name
+
     def append_scenario(
-        self, scenario_name: str, comment: Optional[str], at_level: int, line_no: int
+        self,
+        scenario_name: str,
+        comment: Optional[str],
+        at_level: int,
+        line_no: int,
+        tags: Optional[List[str]] = None,
+        span: Optional[SourceSpan] = None,
+        outline: bool = False,
     ) -> Scenario:
         """Append a scenario to the feature.
 
+        The scenario is added to the graph (together with all other
+        pending scenarios) the next time the graph is accessed.
+
         Parameters
         ----------
         scenario : Scenario
@@ -239,32 +622,135 @@ class Feature:
         line_no : int
             The line number of the scenario in the input file.
             Used in InvalidFeatureFile error message.
+
+        tags : List[str], optional
+            The scenario's own tags (including "@")
+
+        span : SourceSpan, optional
+            The location of the scenario line in the input file
+
+        outline : bool, default = False
+            Whether or not the scenario is a scenario outline
         """
 
+        parent_index: Optional[int] = None
         if at_level > 1:  # Non-root scenario:
-            # Find the parent to connect scenario to:
-            parent_level: int = at_level - 1
-            parent_level_scenarios: List[Scenario] = [
-                sc
-                for sc in self.scenarios()
-                if sc.level() == parent_level and not sc.is_closed()
-            ]
-            if len(parent_level_scenarios) > 0:
-                return Scenario(
-                    scenario_name,
-                    self.graph,
-                    parent_scenario=parent_level_scenarios[-1],
-                    comment=comment,
-                )
+            # Connect the scenario to the open scenario at the parent level:
+            if at_level - 1 <= len(self._open_scenarios):
+                parent_index = self._open_scenarios[at_level - 2][1]
             else:
                 raise InvalidFeatureFileError(
                     "Excessive indentation at line {line_no}: Scenario: {name}".format(
                         line_no=line_no + 1, name=scenario_name
-                    )
+                    ),
+                    line_no=line_no + 1,
                 )
 
-        else:  # Root scenario:
-            return Scenario(scenario_name, self.graph, comment=comment)
+        scenario: Scenario = Scenario(
+            scenario_name, comment=comment, tags=tags, outline=outline
+        )
+        scenario.span = span
+        index: int = self._graph.vcount() + len(self._pending_scenarios)
+        self._pending_scenarios.append(scenario)
+        if parent_index is not None:
+            self._pending_edges.append((parent_index, index))
+        del self._open_scenarios[at_level - 1 :]
+        self._open_scenarios.append((scenario, index))
+        self._scenario_line_nos.append(line_no)
+        self._scenario_levels.append(at_level)
+
+        # Maintain the tag index:
+        for tag in scenario.tags:
+            self.tag_index.setdefault(tag, []).append(index)
+
+        return scenario
+
+    def append_reference(
+        self,
+        subtree_name: str,
+        comment: Optional[str],
+        at_level: int,
+        line_no: int,
+        span: Optional[SourceSpan] = None,
+        tags: Optional[List[str]] = None,
+    ) -> Scenario:
+        """Appends a reference to a subtree to the feature.
+
+        The reference is a scenario without steps named after the subtree.
+        It is replaced by the scenarios of the subtree when flattening.
+
+        Parameters
+        ----------
+        subtree_name : str
+            The name of the referenced subtree
+
+        comment : str, optional
+            A comment
+
+        at_level : int
+            The indentation level of the reference in the input file
+
+        line_no : int
+            The line number of the reference in the input file
+
+        span : SourceSpan, optional
+            The location of the reference line in the input file
+
+        tags : List[str], optional
+            The reference's tags (inherited by the scenarios of the subtree)
+
+        Returns
+        -------
+        Scenario
+            The reference scenario
+        """
+
+        scenario: Scenario = self.append_scenario(
+            subtree_name,
+            comment=comment,
+            at_level=at_level,
+            line_no=line_no,
+            span=span,
+            tags=tags,
+        )
+        scenario.reference = subtree_name
+        return scenario
+
+    def append_subtree(
+        self, subtree_name: str, comment: Optional[str], line_no: int
+    ) -> Subtree:
+        """Declares a subtree. The following scenarios one level deeper
+        than the declaration line are appended to the subtree.
+
+        Parameters
+        ----------
+        subtree_name : str
+            The name of the subtree
+
+        comment : str, optional
+            A comment
+
+        line_no : int
+            The line number of the declaration line in the input file
+
+        Returns
+        -------
+        Subtree
+            The new subtree
+        """
+
+        if subtree_name in self.subtrees:
+            raise InvalidFeatureFileError(
+                "Duplicate subtree at line {line_no}: Subtree: {name}".format(
+                    line_no=line_no + 1, name=subtree_name
+                ),
+                line_no=line_no + 1,
+            )
+        subtree: Subtree = Subtree(subtree_name, Feature(), line_no, comment=comment)
+        self.subtrees[subtree_name] = subtree
+        self._open_scenarios = []
+        self._subtree = subtree
+        return subtree
 
     def append_step(self, step: Step, at_level: int, line_no: int) -> None:
         """Appends a step to the feature.
@@ -285,14 +771,14 @@ class Feature:
 
         # Ensure the indentation level of the step matches
         # the last scenario indentation level
-        last_scenario: Scenario = self.scenarios()[-1]
-        if at_level == last_scenario.level():
-            last_scenario.steps.append(step)
+        if at_level == len(self._open_scenarios):
+            self._open_scenarios[-1][0].steps.append(step)
         else:
             raise InvalidFeatureFileError(
                 "Invalid indentation at line {line_no}: {name}".format(
                     line_no=line_no + 1, name=step.name
-                )
+                ),
+                line_no=line_no + 1,
             )
 
     def append_data_row(
@@ -317,110 +803,559 @@ class Feature:
             Used in InvalidFeatureFile error message.
         """
 
-        last_step: Step = self.scenarios()[-1].steps[-1]
+        last_step: Step = self._open_scenarios[-1][0].steps[-1]
         if last_step.data:
             # Row is an additional row for an existing table
-            last_step.data.rows.append(data_row)
+            last_step.data.append(data_row, line_no=line_no + 1)
         else:
             # Row is the header row of a new table
             last_step.data = DataTable(data_row)
 
-    @classmethod
-    def write_feature_declaration(cls, file_handle: TextIO, feature: "Feature") -> None:
-        """Writes feature name and (optional) description
-        to the end of a flat feature file.
+    def append_examples(
+        self, header_row: DataTableRow, at_level: int, line_no: int
+    ) -> None:
+        """Appends an examples table to the last scenario.
 
         Parameters
         ----------
-        file_handle : TextIO
-            The file to which to append the feature declaration
+        header_row : DataTableRow
+            The header row of the examples table (the placeholder names)
+
+        at_level : int
+            The level of the examples line.
+            Used for indentation validation.
+
+        line_no : int
+            The line number of the examples line in the input file.
+            Used in InvalidFeatureFile error message.
         """
-        if feature.name is not None:
-            file_handle.write(
-                "Feature: {feature_name}\n\n".format(feature_name=feature.name)
+
+        scenario: Scenario = self._open_scenarios[-1][0]
+        if at_level != len(self._open_scenarios) or not scenario.outline:
+            raise InvalidFeatureFileError(
+                "Examples outside of scenario outline at line {line_no}".format(
+                    line_no=line_no + 1
+                ),
+                line_no=line_no + 1,
             )
-        if len(feature.description) > 0:
-            for line in feature.description:
-                file_handle.write("    {line}\n".format(line=line))
-            file_handle.write("\n")
+        scenario.examples.append(DataTable(header_row))
 
-    @classmethod
-    def write_scenario_name(
-        cls, file_handle: TextIO, scenarios: List[Scenario], write_comment: bool = False
+    def append_examples_row(
+        self, data_row: DataTableRow, line_no: Optional[int] = None
     ) -> None:
-        """Writes formatted scenario name to the end of a "relaxed" flat feature file.
+        """Appends a row to the last examples table of the last scenario.
 
         Parameters
         ----------
-        file_handle : TextIO
-            The file to which to append the scenario name
-
-        scenarios : List[Scenario]
-            Organizational and validated scenarios along the path
+        data_row : DataTableRow
+            The examples row to append
 
-        write_comment : bool, default = False
-            Whether or not to write comment if present
+        line_no : int, optional
+            The line number of the examples row in the input file.
+            Used in InvalidFeatureFile error message.
         """
 
-        # (1) Group consecutive regular or organizational scenarios:
-        groups: List[List[Scenario]] = []
+        self._open_scenarios[-1][0].examples[-1].append(
+            data_row, line_no=None if line_no is None else line_no + 1
+        )
 
-        # Function for determining whether a scenario can be added to a current group:
-        def group_available_for_scenario(
-            gr: List[List[Scenario]], sc: Scenario
-        ) -> bool:
-            return (
-                len(gr) > 0
-                and len(gr[-1]) > 0
-                and gr[-1][-1].is_organizational() == sc.is_organizational()
-            )
+    def apply_edit(self, start_line: int, end_line: int, new_text: str) -> None:
+        """Replaces lines of the feature and re-parses only the scenarios
+        affected by the edit (for editor integrations).
 
-        for sc in scenarios:
-            if group_available_for_scenario(groups, sc):
-                groups[-1].append(sc)  # add to current group
-            else:
-                groups.append([sc])  # start new group
+        The re-parsed lines begin with the scenario enclosing the first replaced
+        line and end before the first scenario following the replaced lines
+        at the same or a lower level than all scenarios in between, so the time
+        taken depends on the size of the edit rather than on that of the feature.
+        Edits before the first scenario re-parse the whole feature.
 
-        # (2) Format each group to strings:
-        group_strings: List[str] = []
+        If the edited feature is invalid, the lines are replaced nevertheless
+        but the scenarios are left unchanged. The next edit then re-parses
+        the lines of both edits.
 
-        for group in groups:
-            if group[-1].is_organizational():
-                group_strings.append(
-                    "[{}]".format(" / ".join([sc.name for sc in group]))
-                )
-            else:
-                group_strings.append(" > ".join([sc.name for sc in group]))
+        Parameters
+        ----------
+        start_line : int
+            The first line to replace (starting at 0)
 
-        # (3) Assemble name:
-        scenario_string: str = "Scenario: {}".format(" ".join(group_strings))
+        end_line : int
+            The line following the last line to replace
+            (equal to start_line to insert lines)
 
-        # (4) Optional comment:
-        destination_scenario: Scenario = scenarios[-1]
-        if write_comment is True and destination_scenario.comment is not None:
-            scenario_string += " # {comment}".format(
-                comment=destination_scenario.comment
-            )
+        new_text : str
+            The replacement lines, each followed by a newline
+            (optional for the last line). Empty to delete lines
 
-        # (4) Write name:
-        file_handle.write(scenario_string + "\n")
+        Raises
+        ------
+        ValueError
+            If the lines of the feature were not kept (see from_string)
+            or the line range is invalid
 
-    @classmethod
-    def write_scenario_steps(
-        cls, file_handle: TextIO, steps: List[Step], write_comments: bool = False
-    ) -> None:
-        """Writes formatted scenario steps to the end of the flat feature file.
+        InvalidFeatureFileError
+            If the edited feature is invalid
+        """
+
+        if self.lines is None:
+            raise ValueError("The lines of the feature were not kept")
+        if not 0 <= start_line <= end_line <= len(self.lines):
+            raise ValueError(
+                "Invalid line range: {start}-{end}".format(
+                    start=start_line, end=end_line
+                )
+            )
+
+        new_lines: List[str] = new_text.splitlines()
+        edit_start: int = start_line
+        old_end: int = end_line  # in the lines last parsed successfully
+        current_end: int = end_line
+        if self._unparsed_edit is not None:
+            # Also re-parse the lines replaced by the preceding invalid edit(s):
+            unparsed_start, unparsed_old_end, unparsed_end = self._unparsed_edit
+            edit_start = min(start_line, unparsed_start)
+            current_end = max(end_line, unparsed_end)
+            old_end = current_end - (unparsed_end - unparsed_old_end)
+
+        self.lines[start_line:end_line] = new_lines
+        new_end: int = current_end + len(new_lines) - (end_line - start_line)
+        self._unparsed_edit = (edit_start, old_end, new_end)
+        self.reparse_lines(edit_start, old_end, new_end)
+        self._unparsed_edit = None
+
+    def reparse_lines(self, start_line: int, old_end_line: int, end_line: int) -> None:
+        """Re-parses replaced lines together with the scenarios they affect
+        and splices the resulting scenarios into the graph.
+
+        Scenarios following the affected ones keep their parents and
+        fingerprints. The graph is rebuilt in bulk so that vertex indices
+        remain in file order.
 
         Parameters
         ----------
-        file_handle : io.TextIOWrapper
-            The file to which to append the steps
+        start_line : int
+            The first replaced line
 
-        steps : List[Step]
-            Steps to append to file_handle
+        old_end_line : int
+            The end of the replaced lines in the lines last parsed successfully
 
-        write_comments: bool, default = False
+        end_line : int
+            The end of the replacement lines in the current lines
+
+        Raises
+        ------
+        InvalidFeatureFileError
+            If the replacement lines are invalid (the scenarios are left unchanged)
+        """
+
+        lines: List[str] = self.lines  # type: ignore
+        line_nos: array = self._scenario_line_nos
+        levels: array = self._scenario_levels
+        graph: ig.Graph = self.graph
+        scenario_count: int = graph.vcount()
+
+        # The enclosing scenario (the last scenario before the replaced lines):
+        first: int = bisect_left(line_nos, start_line) - 1
+        if first < 0 or len(self.subtrees) > 0:
+            # Subtrees are resolved across the whole feature:
+            self.reparse_all()
+            return
+
+        # The first scenario not affected by the edit: the first scenario
+        # following the replaced lines at the level of the enclosing scenario,
+        # the replacement scenarios and the scenarios in between or lower:
+        min_level: int = levels[first]
+        for token in self.tokenize(lines[start_line:end_line]):
+            if token.kind in [Token.SUBTREE, Token.INCLUDE, Token.EXTENDS]:
+                self.reparse_all()
+                return
+            if token.kind == Token.SCENARIO and token.level is not None:
+                min_level = min(min_level, token.level)
+        end: int = bisect_left(line_nos, old_end_line)
+        for index in range(first + 1, end):
+            min_level = min(min_level, levels[index])
+        while end < scenario_count and levels[end] > min_level:
+            end += 1
+
+        # Include the tag and comment lines preceding the enclosing scenario:
+        head_start: int = line_nos[first]
+        while head_start > 0:
+            head_token: Optional[Token] = next(
+                self.tokenize(lines[head_start - 1 : head_start]), None
+            )
+            if head_token is not None and head_token.kind not in [
+                Token.TAGS,
+                Token.COMMENT,
+            ]:
+                break
+            head_start -= 1
+
+        # Include the first unaffected scenario line (to validate it
+        # and its tags in the context of the replacement lines):
+        line_shift: int = end_line - old_end_line
+        closing_line_no: Optional[int] = None
+        region_end: int = len(lines)
+        if end < scenario_count:
+            closing_line_no = line_nos[end] + line_shift
+            region_end = closing_line_no + 1
+
+        enclosing: List[int] = self.path_indices(first)[:-1]
+        open_scenarios: List[Tuple[Scenario, int]] = self._open_scenarios
+        self._open_scenarios = [
+            (graph.vs[index]["scenario"], index) for index in enclosing
+        ]
+        closing_tags: Optional[List[str]] = None
+        try:
+            for event in EventParser.events(
+                lines[head_start:region_end],
+                start_line_no=head_start,
+                enclosing=[
+                    (graph.vs[index]["scenario"].name, line_nos[index])
+                    for index in enclosing
+                ],
+            ):
+                if (
+                    event.line_no == closing_line_no
+                    and event.kind == Event.SCENARIO_OPEN
+                ):
+                    closing_tags = event.tags
+                    break
+                self.append_event(event)
+        finally:
+            # Take the replacement scenarios (appended with vertex indices
+            # from scenario_count) out of the feature again:
+            new_scenarios: List[Scenario] = self._pending_scenarios
+            pending_edges: List[Tuple[int, int]] = self._pending_edges
+            self._pending_scenarios = []
+            self._pending_edges = []
+            for new_scenario in new_scenarios:
+                for tag in new_scenario.tags:
+                    self.tag_index[tag].pop()
+                    if len(self.tag_index[tag]) == 0:
+                        del self.tag_index[tag]
+            new_line_nos: array = line_nos[scenario_count:]
+            new_levels: array = levels[scenario_count:]
+            del line_nos[scenario_count:]
+            del levels[scenario_count:]
+            self._open_scenarios = open_scenarios
+
+        # Splice the replacement scenarios into the graph
+        # in place of the affected scenarios:
+        new_count: int = len(new_scenarios)
+        index_shift: int = new_count - (end - first)
+        new_edges: List[Tuple[int, int]] = [
+            (
+                parent if parent < first else parent - scenario_count + first,
+                child - scenario_count + first,
+            )
+            for parent, child in pending_edges
+        ]
+        old_edges: List[Tuple[int, int]] = [
+            (parent, index)
+            for index in range(first, end)
+            for parent in graph.predecessors(index)
+        ]
+        if new_count == end - first:
+            # Vertex indices are unchanged: replace the scenarios
+            # of the vertices (and their edges, if the tree shape changed)
+            if new_edges != old_edges:
+                graph.delete_edges(graph.get_eids(old_edges))
+                graph.add_edges(new_edges)
+            graph.vs[first:end]["scenario"] = new_scenarios
+            for index, new_scenario in enumerate(new_scenarios, start=first):
+                new_scenario.attach(graph, graph.vs[index])
+        else:
+            # Join the preceding, replacement and following scenarios
+            # (vertex indices remain in file order):
+            region: ig.Graph = ig.Graph(
+                n=new_count,
+                edges=[
+                    (parent - first, child - first)
+                    for parent, child in new_edges
+                    if parent >= first
+                ],
+                directed=True,
+                vertex_attrs={"scenario": new_scenarios},
+            )
+            cross_edges: List[Tuple[int, int]] = [
+                edge for edge in new_edges if edge[0] < first
+            ]
+            for enclosing_index in enclosing:
+                children: List[int] = graph.successors(enclosing_index)
+                cross_edges.extend(
+                    (enclosing_index, child + index_shift)
+                    for child in children[bisect_left(children, end) :]
+                )
+            graph = graph.induced_subgraph(range(first)).disjoint_union(
+                [region, graph.induced_subgraph(range(end, scenario_count))]
+            )
+            graph.add_edges(cross_edges)
+            self._graph = graph
+            for scenario, vertex in zip(graph.vs["scenario"], graph.vs):
+                scenario.attach(graph, vertex)
+
+        self._revision += 1
+
+        # Update the line numbers, levels and tag index:
+        line_nos[first:end] = new_line_nos
+        levels[first:end] = new_levels
+        following: int = first + new_count
+        if line_shift != 0:
+            line_nos[following:] = array(
+                "q", [line_no + line_shift for line_no in line_nos[following:]]
+            )
+
+        tagged_scenarios: List[Scenario] = list(new_scenarios)
+        tagged_end: int = end
+        if closing_tags is not None:
+            # The tags of the first unaffected scenario may have been edited:
+            graph.vs[following]["scenario"].tags = closing_tags
+            tagged_scenarios.append(graph.vs[following]["scenario"])
+            tagged_end = end + 1
+        region_tags: Dict[str, List[int]] = {}
+        for index, tagged_scenario in enumerate(tagged_scenarios, start=first):
+            for tag in tagged_scenario.tags:
+                region_tags.setdefault(tag, []).append(index)
+        for tag in list(self.tag_index.keys() | region_tags.keys()):
+            indices: List[int] = self.tag_index.get(tag, [])
+            low: int = bisect_left(indices, first)
+            high: int = bisect_left(indices, tagged_end)
+            if low == high and tag not in region_tags and index_shift == 0:
+                continue
+            indices = (
+                indices[:low]
+                + region_tags.get(tag, [])
+                + [index + index_shift for index in indices[high:]]
+            )
+            if len(indices) > 0:
+                self.tag_index[tag] = indices
+            else:
+                del self.tag_index[tag]
+
+        base_fingerprint: Optional[str] = (
+            self.base_scenarios[-1].fingerprint if self.base_scenarios else None
+        )
+        for new_scenario in new_scenarios:
+            parent: Optional[Scenario] = new_scenario.parent()
+            new_scenario.update_fingerprint(
+                parent.fingerprint if parent is not None else base_fingerprint
+            )
+
+        self._open_scenarios = [
+            (graph.vs[index]["scenario"], index)
+            for index in self.path_indices(graph.vcount() - 1)
+        ]
+
+    def reparse_all(self) -> None:
+        """Re-parses all lines of the feature, replacing its name, description
+        and scenarios.
+
+        Raises
+        ------
+        InvalidFeatureFileError
+            If the lines are invalid (the feature is left unchanged)
+        """
+
+        lines: List[str] = self.lines  # type: ignore
+        feature: Feature = Feature.from_lines(lines)
+        if feature.extends is not None and feature.extends == self.extends:
+            # The import is unchanged, keep it resolved:
+            feature.base_scenarios = self.base_scenarios
+            feature.update_fingerprints()
+        vars(self).update(vars(feature))
+        self.lines = lines
+
+    def path_indices(self, index: int) -> List[int]:
+        """Returns the vertex indices of the scenarios along the path
+        from a root scenario to a scenario.
+
+        Parameters
+        ----------
+        index : int
+            The vertex index of the scenario
+
+        Returns
+        -------
+        List[int]
+            The vertex indices, starting with that of the root scenario
+        """
+
+        indices: List[int] = []
+        while index >= 0:
+            indices.append(index)
+            predecessors: List[int] = self.graph.predecessors(index)
+            index = predecessors[0] if len(predecessors) > 0 else -1
+        indices.reverse()
+        return indices
+
+    @classmethod
+    def write_feature_declaration(
+        cls,
+        file_handle: TextIO,
+        feature: "Feature",
+        source_map: Optional[SourceMap] = None,
+    ) -> None:
+        """Writes feature name and (optional) description
+        to the end of a flat feature file.
+
+        Parameters
+        ----------
+        file_handle : TextIO
+            The file to which to append the feature declaration
+
+        source_map : SourceMap, optional
+            Source map to add the written lines to
+        """
+        if feature.name is not None:
+            file_handle.write(
+                "Feature: {feature_name}\n\n".format(feature_name=feature.name)
+            )
+            if source_map is not None:
+                source_map.skip(2)
+        if len(feature.description) > 0:
+            for line in feature.description:
+                file_handle.write("    {line}\n".format(line=line))
+            file_handle.write("\n")
+            if source_map is not None:
+                source_map.skip(len(feature.description) + 1)
+
+    @classmethod
+    def write_scenario_name(
+        cls, file_handle: TextIO, scenarios: List[Scenario], write_comment: bool = False
+    ) -> None:
+        """Writes formatted scenario name to the end of a "relaxed" flat feature file.
+
+        Parameters
+        ----------
+        file_handle : TextIO
+            The file to which to append the scenario name
+
+        scenarios : List[Scenario]
+            Organizational and validated scenarios along the path
+
+        write_comment : bool, default = False
+            Whether or not to write comment if present
+        """
+
+        Feature.write_flat_scenario_name(
+            file_handle,
+            FlatScenario.from_path(scenarios, []),
+            write_comment=write_comment,
+        )
+
+    @classmethod
+    def write_flat_scenario_name(
+        cls,
+        file_handle: TextIO,
+        flat_scenario: FlatScenario,
+        write_comment: bool = False,
+        source_map: Optional[SourceMap] = None,
+    ) -> None:
+        """Writes the formatted name of a flat scenario
+        to the end of a flat feature file.
+
+        Parameters
+        ----------
+        file_handle : TextIO
+            The file to which to append the scenario name
+
+        flat_scenario : FlatScenario
+            The flat scenario
+
+        write_comment : bool, default = False
+            Whether or not to write comment if present
+
+        source_map : SourceMap, optional
+            Source map to add the written lines to
+        """
+
+        scenario_string: str = "Scenario: {}".format(flat_scenario.name)
+
+        # Optional comment:
+        if write_comment is True and flat_scenario.comment is not None:
+            scenario_string += " # {comment}".format(comment=flat_scenario.comment)
+
+        # Write name:
+        file_handle.write(scenario_string + "\n")
+        if source_map is not None:
+            source_map.add(
+                flat_scenario.scenario.span
+                if flat_scenario.scenario is not None
+                else None
+            )
+
+    @classmethod
+    def write_flat_scenario(
+        cls,
+        file_handle: TextIO,
+        flat_scenario: FlatScenario,
+        write_comments: bool = False,
+        source_map: Optional[SourceMap] = None,
+    ) -> None:
+        """Writes a flat scenario (name and steps) to the end of a flat feature file.
+
+        Parameters
+        ----------
+        file_handle : TextIO
+            The file to which to append the flat scenario
+
+        flat_scenario : FlatScenario
+            The flat scenario
+
+        write_comments : bool, default = False
+            Whether or not to write comments if present
+
+        source_map : SourceMap, optional
+            Source map to add the written lines to
+        """
+
+        if len(flat_scenario.tags) > 0:
+            file_handle.write(" ".join(flat_scenario.tags) + "\n")
+            if source_map is not None:
+                source_map.skip(1)
+        Feature.write_flat_scenario_name(
+            file_handle,
+            flat_scenario,
+            write_comment=write_comments,
+            source_map=source_map,
+        )
+        Feature.write_scenario_steps(
+            file_handle,
+            flat_scenario.steps,
+            write_comments=write_comments,
+            source_map=source_map,
+        )
+        file_handle.write("\n")  # Empty line to separate scenarios
+        if source_map is not None:
+            source_map.skip(1)
+
+    @classmethod
+    def write_scenario_steps(
+        cls,
+        file_handle: TextIO,
+        steps: List[Step],
+        write_comments: bool = False,
+        indentation: Optional[str] = None,
+        source_map: Optional[SourceMap] = None,
+    ) -> None:
+        """Writes formatted scenario steps to the end of the flat feature file.
+
+        Parameters
+        ----------
+        file_handle : io.TextIOWrapper
+            The file to which to append the steps
+
+        steps : List[Step]
+            Steps to append to file_handle
+
+        write_comments: bool, default = False
             Whether or not to write comments if present
+
+        indentation: str, optional
+            Indentation to prepend to each line when writing an indented
+            feature file. "And" steps are not aligned in indented feature files
+
+        source_map : SourceMap, optional
+            Source map to add the written lines to
         """
 
         last_step: Optional[Step] = None
@@ -431,17 +1366,30 @@ class Feature:
             step_string: str = step.format(first_of_type=first_of_type)
             if write_comments is True and step.comment is not None:
                 step_string += " # {comment}".format(comment=step.comment)
+            if indentation is not None:
+                step_string = indentation + step_string.lstrip()
             file_handle.write(step_string + "\n")
+            if source_map is not None:
+                source_map.add(step.span)
 
             if step.data:
                 Feature.write_data_table(
-                    file_handle, step.data, write_comment=write_comments
+                    file_handle,
+                    step.data,
+                    write_comment=write_comments,
+                    indentation=indentation or "",
+                    source_map=source_map,
                 )
             last_step = step
 
     @classmethod
     def write_data_table(
-        cls, file_handle: TextIO, data_table: DataTable, write_comment: bool = False
+        cls,
+        file_handle: TextIO,
+        data_table: DataTable,
+        write_comment: bool = False,
+        indentation: str = "",
+        source_map: Optional[SourceMap] = None,
     ) -> None:
         """Writes formatted data table to the end of the flat feature file.
 
@@ -455,65 +1403,129 @@ class Feature:
 
         write_comment : bool
             Whether or not to write comment if present
+
+        indentation: str, default = ""
+            Indentation to prepend to each row (for indented feature files)
+
+        source_map : SourceMap, optional
+            Source map to add the written lines to
         """
 
-        # Determine column widths to accommodate all values:
-        col_widths: List[int] = [
-            max([len(cell) for cell in col])
-            for col in list(zip(*data_table.to_list_of_list()))
+        # Pad values with spaces to column width, one column at a time:
+        padded_columns: List[List[str]] = [
+            [value.ljust(col_width) for value in column]
+            for column, col_width in zip(data_table.columns, data_table.column_widths)
         ]
 
-        for row in data_table.to_list():
-            # pad values with spaces to column width:
-            padded_row: List[str] = [
-                row.values[col_num].ljust(col_width)
-                for col_num, col_width in enumerate(col_widths)
-            ]
-
+        for row_num, padded_row in enumerate(zip(*padded_columns)):
             # add column enclosing pipes:
-            table_row_string: str = "    | {columns} |".format(
-                columns=" | ".join(padded_row)
+            table_row_string: str = "{indentation}    | {columns} |".format(
+                indentation=indentation, columns=" | ".join(padded_row)
             )
 
             # add comments:
-            if write_comment is True and row.comment is not None:
-                table_row_string += " # {comment}".format(comment=row.comment)
+            comment: Optional[str] = data_table.comments.get(row_num)
+            if write_comment is True and comment is not None:
+                table_row_string += " # {comment}".format(comment=comment)
 
             # write line:
             file_handle.write(table_row_string + "\n")
+            if source_map is not None:
+                source_map.add(data_table.spans.get(row_num))
 
     def flatten(
         self,
         file_path: str,
-        mode: Literal["strict", "relaxed"] = "strict",
+        mode: Literal["strict", "relaxed", "smoke", "auto"] = "strict",
         write_comments: bool = False,
-    ) -> None:
+        tags: Optional[Union[str, TagExpression]] = None,
+        ledger: Optional[Ledger] = None,
+        source_map_path: Optional[str] = None,
+        durations: Optional[StepDurations] = None,
+        max_steps: Optional[int] = None,
+    ) -> OutputFile:
         """Writes a flat (no indentation) feature file representing the feature.
 
+        The flat feature file is replaced atomically, and only if its content
+        changed (see OutputFile).
+
         Parameters
         ----------
         file_path : str
             Path to flat feature file to be written
 
-        mode : {"strict", "relaxed"}, default="strict"
-            Flattening mode. Either "strict" or "relaxed"
+        mode : {"strict", "relaxed", "smoke", "auto"}, default="strict"
+            Flattening mode. Either "strict", "relaxed", "smoke" or "auto"
 
         comments : bool, default = False
             Whether or not to write comments
+
+        tags : str or TagExpression, optional
+            Only write scenarios matching this tag expression
+
+        ledger : Ledger, optional
+            Only write scenarios that are new, changed or previously failing
+            according to this ledger
+
+        source_map_path : str, optional
+            Path to a source map file to be written, mapping the lines of the
+            flat feature file to the lines of the indented feature file
+            (see SourceMap). Requires a feature parsed with Feature.from_file
+
+        durations : StepDurations, optional
+            Step durations to weight flat scenarios by in the "smoke" and
+            "auto" flattening modes (see smoke_suite and flattening_plan)
+
+        max_steps : int, optional
+            The maximum number of steps of the flat scenarios of subtrees
+            flattened in "relaxed" mode in the "auto" flattening mode
+            (defaults to FlatteningPlan.MAX_STEPS)
+
+        Returns
+        -------
+        OutputFile
+            The written flat feature file (whether it changed,
+            and the number of bytes written)
         """
 
-        with open(file_path, "w") as flat_file:
+        source_map: Optional[SourceMap] = (
+            SourceMap() if source_map_path is not None else None
+        )
+        with OutputFile(file_path) as output_file:
+            flat_file: TextIO = cast(TextIO, output_file)
+
             # Feature declaration:
             if self.name is not None:
-                Feature.write_feature_declaration(flat_file, self)
+                Feature.write_feature_declaration(
+                    flat_file, self, source_map=source_map
+                )
 
             # Scenarios:
-            if mode == "strict":
-                self.flatten_strict(flat_file, write_comments=write_comments)
-            elif mode == "relaxed":
-                self.flatten_relaxed(flat_file, write_comments=write_comments)
+            for flat_scenario in self.flat_scenarios(
+                mode,
+                tags=tags,
+                ledger=ledger,
+                durations=durations,
+                max_steps=max_steps,
+            ):
+                Feature.write_flat_scenario(
+                    flat_file,
+                    flat_scenario,
+                    write_comments=write_comments,
+                    source_map=source_map,
+                )
 
-    def flatten_strict(self, flat_file: TextIO, write_comments: bool = False) -> None:
+        if source_map is not None:
+            source_map.write(source_map_path)  # type: ignore
+
+        return output_file
+
+    def flatten_strict(
+        self,
+        flat_file: TextIO,
+        write_comments: bool = False,
+        tags: Optional[Union[str, TagExpression]] = None,
+    ) -> None:
         """Write. a flat (no indentation) feature file representing the feature
         using the "strict" flattening mode.
 
@@ -528,35 +1540,22 @@ class Feature:
 
         write_comments : bool, default = False
             Whether or not to write comments
-        """
 
-        for scenario in [sc for sc in self.scenarios() if not sc.is_organizational()]:
-            # Scenario name:
-            scenarios_for_naming: List[Scenario] = [
-                sc
-                for sc in scenario.path_scenarios()
-                if sc.is_organizational() or sc == scenario
-            ]
-            Feature.write_scenario_name(
-                flat_file, scenarios_for_naming, write_comment=write_comments
-            )
-
-            ancestor_scenarios = scenario.ancestors()
-            steps: List[Step] = []
-            # collect prerequisites from all scenarios along the path
-            steps += [st for sc in ancestor_scenarios for st in sc.prerequisites()]
-            # collect actions from all scenarios along the path
-            steps += [st for sc in ancestor_scenarios for st in sc.actions()]
-            # add all steps from the destination scenario only
-            steps += scenario.steps
+        tags : str or TagExpression, optional
+            Only write scenarios matching this tag expression
+        """
 
-            # Write steps:
-            Feature.write_scenario_steps(
-                flat_file, steps, write_comments=write_comments
+        for flat_scenario in self.flat_scenarios_strict(tags=tags):
+            Feature.write_flat_scenario(
+                flat_file, flat_scenario, write_comments=write_comments
             )
-            flat_file.write("\n")  # Empty line to separate scenarios
 
-    def flatten_relaxed(self, flat_file: TextIO, write_comments: bool = False) -> None:
+    def flatten_relaxed(
+        self,
+        flat_file: TextIO,
+        write_comments: bool = False,
+        tags: Optional[Union[str, TagExpression]] = None,
+    ) -> None:
         """Writes a flat (no indentation) feature file representing the feature
         using the "relaxed" flattening mode.
 
@@ -571,41 +1570,781 @@ class Feature:
 
         write_comments : bool, default = False
             Whether or not to write comments if present
+
+        tags : str or TagExpression, optional
+            Only write scenarios whose leaf scenario matches this tag expression
+        """
+
+        for flat_scenario in self.flat_scenarios_relaxed(tags=tags):
+            Feature.write_flat_scenario(
+                flat_file, flat_scenario, write_comments=write_comments
+            )
+
+    def flat_scenarios(
+        self,
+        mode: Literal["strict", "relaxed", "smoke", "auto"] = "strict",
+        tags: Optional[Union[str, TagExpression]] = None,
+        ledger: Optional[Ledger] = None,
+        durations: Optional[StepDurations] = None,
+        max_steps: Optional[int] = None,
+    ) -> Iterator[FlatScenario]:
+        """Yields the flat scenarios representing the feature.
+
+        Parameters
+        ----------
+        mode : {"strict", "relaxed", "smoke", "auto"}, default="strict"
+            Flattening mode. Either "strict", "relaxed", "smoke" or "auto"
+
+        tags : str or TagExpression, optional
+            Only yield scenarios matching this tag expression
+
+        ledger : Ledger, optional
+            Only yield scenarios whose fingerprint has not passed according to
+            this ledger (new, changed or previously failing scenarios)
+
+        durations : StepDurations, optional
+            Step durations to weight flat scenarios by in the "smoke" and
+            "auto" flattening modes (see smoke_suite and flattening_plan)
+
+        max_steps : int, optional
+            The maximum number of steps of the flat scenarios of subtrees
+            flattened in "relaxed" mode in the "auto" flattening mode
+            (defaults to FlatteningPlan.MAX_STEPS)
+
+        Returns
+        -------
+        Iterator[FlatScenario]
+            The flat scenarios in output order
+        """
+
+        flat_scenarios: Iterator[FlatScenario]
+        if mode == "strict":
+            flat_scenarios = self.flat_scenarios_strict(tags=tags)
+        elif mode == "relaxed":
+            flat_scenarios = self.flat_scenarios_relaxed(tags=tags)
+        elif mode == "smoke":
+            flat_scenarios = iter(
+                self.smoke_suite(tags=tags, durations=durations).flat_scenarios
+            )
+        elif mode == "auto":
+            flat_scenarios = self.flat_scenarios_auto(
+                tags=tags, durations=durations, max_steps=max_steps
+            )
+        else:
+            raise ValueError("Invalid flattening mode: {}".format(mode))
+
+        if ledger is None:
+            return flat_scenarios
+
+        verified_fingerprints: Set[str] = ledger.verified_fingerprints()
+        return (
+            fs for fs in flat_scenarios if fs.fingerprint() not in verified_fingerprints
+        )
+
+    def flat_scenarios_strict(
+        self, tags: Optional[Union[str, TagExpression]] = None
+    ) -> Iterator[FlatScenario]:
+        """Yields the flat scenarios representing the feature
+        using the "strict" flattening mode (one per non-organizational scenario).
+
+        Scenario outlines are expanded lazily: one flat scenario is yielded
+        per combination of the examples rows of the outlines along the path.
+
+        Parameters
+        ----------
+        tags : str or TagExpression, optional
+            Only yield scenarios matching this tag expression
+
+        Returns
+        -------
+        Iterator[FlatScenario]
+            The flat scenarios in output order
+        """
+
+        expression: Optional[TagExpression] = TagExpression.coerce(tags)
+        base_scenarios: List[Scenario] = self.resolved_base_scenarios()
+        scenarios: Sequence[Scenario] = (
+            self.scenarios()
+            if expression is None
+            else self.with_references(self.tagged_scenarios(expression))
+        )
+        for scenario in scenarios:
+            yield from self.flat_scenarios_strict_for_scenario(
+                scenario, base_scenarios, expression
+            )
+
+    def flat_scenarios_strict_for_scenario(
+        self,
+        scenario: Scenario,
+        base_scenarios: List[Scenario],
+        expression: Optional[TagExpression] = None,
+    ) -> Iterator[FlatScenario]:
+        """Yields the "strict" flat scenarios of a scenario: one per combination
+        of the examples rows of the scenario outlines along the path, none
+        for organizational scenarios, those of the scenarios of the subtree
+        for subtree references.
+
+        Parameters
+        ----------
+        scenario : Scenario
+            The scenario
+
+        base_scenarios : List[Scenario]
+            The scenarios along the path to the imported scenario
+            (see resolved_base_scenarios)
+
+        expression : TagExpression, optional
+            Only yield scenarios of a referenced subtree matching this
+            tag expression
+
+        Returns
+        -------
+        Iterator[FlatScenario]
+            The flat scenarios in output order
+        """
+
+        if scenario.reference is not None:
+            yield from self.flat_scenarios_strict_for_reference(scenario, expression)
+            return
+        if scenario.is_organizational():
+            return
+
+        # Scenario name:
+        path_scenarios: List[Scenario] = scenario.path_scenarios()
+        if base_scenarios:
+            path_scenarios = base_scenarios + path_scenarios
+        scenarios_for_naming: List[Scenario] = [
+            sc for sc in path_scenarios if sc.is_organizational() or sc == scenario
+        ]
+
+        ancestor_scenarios = path_scenarios[:-1]
+        steps: List[Step] = []
+        # collect prerequisites from all scenarios along the path
+        steps += [st for sc in ancestor_scenarios for st in sc.prerequisites()]
+        # collect actions from all scenarios along the path
+        steps += [st for sc in ancestor_scenarios for st in sc.actions()]
+        # add all steps from the destination scenario only
+        steps += scenario.steps
+
+        yield from FlatScenario.expand(path_scenarios, scenarios_for_naming, steps)
+
+    def flat_scenarios_strict_for_reference(
+        self, reference: Scenario, expression: Optional[TagExpression] = None
+    ) -> Iterator[FlatScenario]:
+        """Yields the "strict" flat scenarios of the scenarios
+        of a referenced subtree.
+
+        The step blocks of the path to the reference are collected once,
+        those of the paths within the subtree are memoized (see subtree_paths).
+
+        Parameters
+        ----------
+        reference : Scenario
+            The subtree reference scenario
+
+        expression : TagExpression, optional
+            Only yield scenarios matching this tag expression
+
+        Returns
+        -------
+        Iterator[FlatScenario]
+            The flat scenarios in output order
+        """
+
+        path: List[Scenario] = self.base_scenarios + reference.path_scenarios()
+        prerequisites: List[Step] = [st for sc in path for st in sc.prerequisites()]
+        actions: List[Step] = [st for sc in path for st in sc.actions()]
+        organizational: List[Scenario] = [sc for sc in path if sc.is_organizational()]
+
+        for subtree_path in self.subtree_paths(reference.reference):  # type: ignore
+            scenario: Scenario = subtree_path.scenarios[-1]
+            if scenario.reference is not None or scenario.is_organizational():
+                continue
+            path_scenarios: List[Scenario] = path + subtree_path.scenarios
+            if expression is not None and not expression.evaluate(
+                FlatScenario.path_tags(path_scenarios)
+            ):
+                continue
+
+            path_fingerprint: str = FlatScenario.path_fingerprint_of(
+                [reference] + subtree_path.scenarios
+            )
+            for flat_scenario in FlatScenario.expand(
+                path_scenarios,
+                organizational + subtree_path.organizational + [scenario],
+                prerequisites
+                + subtree_path.prerequisites
+                + actions
+                + subtree_path.actions
+                + scenario.steps,
+            ):
+                flat_scenario.path_fingerprint = path_fingerprint
+                yield flat_scenario
+
+    def flat_scenarios_relaxed(
+        self,
+        tags: Optional[Union[str, TagExpression]] = None,
+        all_assertions: bool = False,
+    ) -> Iterator[FlatScenario]:
+        """Yields the flat scenarios representing the feature
+        using the "relaxed" flattening mode (one per leaf scenario).
+
+        Scenario outlines are expanded lazily: one flat scenario is yielded
+        per combination of the examples rows of the outlines along the path.
+
+        Parameters
+        ----------
+        tags : str or TagExpression, optional
+            Only yield scenarios whose leaf scenario matches this tag expression
+
+        all_assertions : bool, default = False
+            Whether or not to include the assertions of all scenarios along
+            each path, instead of those of the scenarios not validated by a
+            previous flat scenario only
+
+        Returns
+        -------
+        Iterator[FlatScenario]
+            The flat scenarios in output order
+        """
+
+        expression: Optional[TagExpression] = TagExpression.coerce(tags)
+        self.resolved_base_scenarios()
+        leaf_scenarios: Sequence[Scenario] = (
+            self.leaf_scenarios()
+            if expression is None
+            else [
+                sc
+                for sc in self.with_references(self.tagged_scenarios(expression))
+                if sc.vertex.outdegree() == 0
+            ]
+        )
+
+        yield from self.flat_scenarios_relaxed_for_paths(
+            (
+                path_scenarios
+                for scenario in leaf_scenarios
+                for path_scenarios in self.leaf_paths(scenario, expression)
+            ),
+            all_assertions=all_assertions,
+        )
+
+    def flat_scenarios_relaxed_for_paths(
+        self,
+        paths: Iterable[List[Scenario]],
+        start: int = 0,
+        all_assertions: bool = False,
+    ) -> Iterator[FlatScenario]:
+        """Yields the "relaxed" flat scenarios for paths to leaf scenarios.
+
+        Parameters
+        ----------
+        paths : Iterable[List[Scenario]]
+            The scenarios along each path in file order, root scenario first
+            (see leaf_paths)
+
+        start : int, default = 0
+            The position along the paths of the first scenario to validate.
+            The scenarios before it contribute their prerequisites and actions
+            only (they are validated by "strict" flat scenarios)
+
+        all_assertions : bool, default = False
+            Whether or not to include the assertions of all scenarios along
+            each path, instead of those of the scenarios not validated by a
+            previous flat scenario only
+
+        Returns
+        -------
+        Iterator[FlatScenario]
+            The flat scenarios in output order
         """
 
-        for scenario in self.leaf_scenarios():
+        # The assertions of a scenario are written to the first flat scenario
+        # passing through it only. Leaf scenarios are in file order, so the
+        # scenarios validated before are those shared with the previous path:
+        previous_path: List[Scenario] = []
+        for path_scenarios in paths:
+            shared: int = start
+            while (
+                not all_assertions
+                and shared < min(len(previous_path), len(path_scenarios))
+                and previous_path[shared] is path_scenarios[shared]
+            ):
+                shared += 1
+
             steps: List[Step] = []
             # organizational and validated scenarios used for naming:
             scenarios_for_naming: List[Scenario] = []
-            for path_scenario in scenario.path_scenarios():
+            for position, path_scenario in enumerate(path_scenarios):
                 steps += path_scenario.prerequisites()
                 steps += path_scenario.actions()
                 if path_scenario.is_organizational():
                     scenarios_for_naming.append(path_scenario)
-                elif not path_scenario.validated:
+                elif position >= shared:
                     steps += path_scenario.assertions()
-                    path_scenario.validated = True
                     scenarios_for_naming.append(path_scenario)
 
-            Feature.write_scenario_name(
-                flat_file, scenarios_for_naming, write_comment=write_comments
+            previous_path = path_scenarios
+            yield from FlatScenario.expand(path_scenarios, scenarios_for_naming, steps)
+
+    def flat_scenarios_auto(
+        self,
+        tags: Optional[Union[str, TagExpression]] = None,
+        durations: Optional[StepDurations] = None,
+        max_steps: Optional[int] = None,
+    ) -> Iterator[FlatScenario]:
+        """Yields the flat scenarios representing the feature using the
+        "auto" flattening mode: "relaxed" for the subtrees where that reduces
+        the estimated cost, "strict" elsewhere (see flattening_plan).
+
+        Parameters
+        ----------
+        tags : str or TagExpression, optional
+            Only yield scenarios matching this tag expression
+
+        durations : StepDurations, optional
+            Step durations to estimate costs with.
+            Costs are step counts if omitted
+
+        max_steps : int, optional
+            The maximum number of steps of the flat scenarios of subtrees
+            flattened in "relaxed" mode. Defaults to FlatteningPlan.MAX_STEPS
+
+        Returns
+        -------
+        Iterator[FlatScenario]
+            The flat scenarios in output order
+        """
+
+        expression: Optional[TagExpression] = TagExpression.coerce(tags)
+        base_scenarios: List[Scenario] = self.resolved_base_scenarios()
+        plan: FlatteningPlan = self.flattening_plan(
+            durations=durations, max_steps=max_steps
+        )
+        scenarios: Sequence[Scenario] = self.scenarios()
+        index: int = 0
+        while index < len(scenarios):
+            scenario: Scenario = scenarios[index]
+            if index not in plan.relaxed:
+                for flat_scenario in self.flat_scenarios_strict_for_scenario(
+                    scenario, base_scenarios, expression
+                ):
+                    if expression is None or expression.evaluate(flat_scenario.tags):
+                        yield flat_scenario
+                index += 1
+                continue
+
+            # The subtree (following the scenario in index order):
+            subtree: List[int] = sorted(self.graph.subcomponent(index, mode="out"))
+            paths: Iterator[List[Scenario]] = (
+                path_scenarios
+                for leaf_index in subtree
+                if scenarios[leaf_index].vertex.outdegree() == 0
+                for path_scenarios in self.leaf_paths(scenarios[leaf_index], expression)
+                if expression is None
+                or expression.evaluate(FlatScenario.path_tags(path_scenarios))
+            )
+            yield from self.flat_scenarios_relaxed_for_paths(
+                paths, start=len(base_scenarios) + scenario.level() - 1
+            )
+            index = subtree[-1] + 1
+
+    def flattening_plan(
+        self,
+        durations: Optional[StepDurations] = None,
+        max_steps: Optional[int] = None,
+    ) -> FlatteningPlan:
+        """Chooses the flattening mode of each subtree for the "auto"
+        flattening mode (see FlatteningPlan).
+
+        Parameters
+        ----------
+        durations : StepDurations, optional
+            Step durations to estimate costs with.
+            Costs are step counts if omitted
+
+        max_steps : int, optional
+            The maximum number of steps of the flat scenarios of subtrees
+            flattened in "relaxed" mode. Defaults to FlatteningPlan.MAX_STEPS
+
+        Returns
+        -------
+        FlatteningPlan
+            The plan, with estimates for the "strict", "relaxed"
+            and "auto" flattening modes
+        """
+
+        self.resolved_base_scenarios()
+        return FlatteningPlan.for_feature(
+            self, durations=durations, max_steps=max_steps
+        )
+
+    def smoke_suite(
+        self,
+        tags: Optional[Union[str, TagExpression]] = None,
+        durations: Optional[StepDurations] = None,
+    ) -> SmokeSuite:
+        """Selects the fewest flat scenarios exercising every distinct step
+        of the feature (see SmokeSuite).
+
+        The flat scenarios are selected from the "relaxed" flat scenarios,
+        each including the assertions of all scenarios along its path.
+
+        Parameters
+        ----------
+        tags : str or TagExpression, optional
+            Only select scenarios whose leaf scenario matches this tag expression
+
+        durations : StepDurations, optional
+            Step durations to weight the flat scenarios by.
+            Defaults to weighting them by their step count
+
+        Returns
+        -------
+        SmokeSuite
+            The selected flat scenarios and their coverage
+        """
+
+        return SmokeSuite.select(
+            self.flat_scenarios_relaxed(tags=tags, all_assertions=True),
+            durations=durations,
+        )
+
+    def leaf_paths(
+        self, leaf_scenario: Scenario, expression: Optional[TagExpression] = None
+    ) -> Iterator[List[Scenario]]:
+        """Yields the paths to a leaf scenario or, for a subtree reference,
+        to the leaf scenarios of the referenced subtree.
+
+        Parameters
+        ----------
+        leaf_scenario : Scenario
+            The leaf scenario or subtree reference scenario
+
+        expression : TagExpression, optional
+            Only yield paths to subtree scenarios matching this tag expression
+
+        Returns
+        -------
+        Iterator[List[Scenario]]
+            The scenarios along each path, root scenario first
+        """
+
+        path: List[Scenario] = self.base_scenarios + leaf_scenario.path_scenarios()
+        if leaf_scenario.reference is None:
+            yield path
+            return
+
+        for subtree_path in self.subtree_paths(leaf_scenario.reference):
+            if not subtree_path.is_leaf:
+                continue
+            path_scenarios: List[Scenario] = path + subtree_path.scenarios
+            if expression is None or expression.evaluate(
+                FlatScenario.path_tags(path_scenarios)
+            ):
+                yield path_scenarios
+
+    def resolved_base_scenarios(self) -> List[Scenario]:
+        """Returns the scenarios along the path to the imported scenario.
+
+        Returns
+        -------
+        List[Scenario]
+            The scenarios, root scenario of the extended feature first.
+            Empty if the feature does not extend another feature file
+
+        Raises
+        ------
+        InvalidFeatureFileError
+            If the import has not been resolved (see FeatureCache.resolve)
+        """
+
+        if self.extends is not None and not self.base_scenarios:
+            raise self.extends.error("Unresolved import")
+        return self.base_scenarios
+
+    def with_references(self, scenarios: List[Scenario]) -> List[Scenario]:
+        """Adds the subtree references to a list of scenarios
+        (the scenarios of a referenced subtree may match a tag expression
+        even if the reference does not).
+
+        Parameters
+        ----------
+        scenarios : List[Scenario]
+            Scenarios in index order
+
+        Returns
+        -------
+        List[Scenario]
+            The scenarios and all subtree references in index order
+        """
+
+        if len(self.subtrees) == 0:
+            return scenarios  # no references
+        references: List[Scenario] = [
+            sc for sc in self.scenarios() if sc.reference is not None
+        ]
+        return sorted(set(scenarios).union(references), key=lambda sc: sc.vertex.index)
+
+    def subtree_paths(
+        self, subtree_name: str, resolving: Tuple[str, ...] = ()
+    ) -> List[SubtreePath]:
+        """Returns the paths to the scenarios of a subtree in output order,
+        expanding the subtrees it references.
+
+        The paths are computed once per subtree and memoized (see Subtree.paths).
+
+        Parameters
+        ----------
+        subtree_name : str
+            The name of the subtree
+
+        resolving : Tuple[str, ...], default = ()
+            The names of the subtrees whose paths are being computed
+            (for cycle detection)
+
+        Returns
+        -------
+        List[SubtreePath]
+            The paths, root scenario of the subtree first
+
+        Raises
+        ------
+        InvalidFeatureFileError
+            If the subtree is unknown or references itself
+        """
+
+        subtree: Optional[Subtree] = self.subtrees.get(subtree_name)
+        if subtree is None:
+            raise InvalidFeatureFileError("Unknown subtree: {}".format(subtree_name))
+        if subtree.paths is not None:
+            return subtree.paths
+        if subtree_name in resolving:
+            raise InvalidFeatureFileError(
+                "Cyclic subtree reference: {}".format(
+                    " > ".join(resolving + (subtree_name,))
+                ),
+                line_no=subtree.line_no + 1,
+            )
+
+        paths: List[SubtreePath] = []
+        for scenario in subtree.feature.scenarios():
+            scenarios: List[Scenario] = scenario.path_scenarios()
+            paths.append(SubtreePath(scenarios))
+            if scenario.reference is not None:
+                for nested_path in self.subtree_paths(
+                    scenario.reference, resolving + (subtree_name,)
+                ):
+                    paths.append(SubtreePath(scenarios + nested_path.scenarios))
+
+        subtree.paths = paths
+        return paths
+
+    def tagged_scenarios(self, tags: Union[str, TagExpression]) -> List[Scenario]:
+        """Returns the scenarios whose own and inherited tags match a tag expression.
+
+        Unless the expression matches untagged scenarios (for example "not @slow"),
+        only the subtrees of the scenarios listed in the tag index are searched.
+
+        Parameters
+        ----------
+        tags : str or TagExpression
+            The tag expression
+
+        Returns
+        -------
+        List[Scenario]
+            The matching scenarios in index order
+        """
+
+        expression: TagExpression = (
+            tags if isinstance(tags, TagExpression) else TagExpression(tags)
+        )
+
+        # Tags inherited from the scenarios along the path to the imported scenario:
+        base_tags: List[str] = FlatScenario.path_tags(self.base_scenarios)
+        if base_tags:
+            return [
+                sc
+                for sc in self.scenarios()
+                if expression.evaluate(base_tags + sc.effective_tags())
+            ]
+
+        candidates: Sequence[Scenario]
+        if expression.evaluate([]):
+            candidates = self.scenarios()
+        else:
+            # A match requires at least one of the expression's tags, so
+            # only the subtrees of scenarios tagged with one of them can match:
+            vertex_indices: Set[int] = set()
+            for tag in expression.tags():
+                for vertex_index in self.tag_index.get(tag, []):
+                    if vertex_index not in vertex_indices:
+                        vertex_indices.update(
+                            self.graph.subcomponent(vertex_index, mode="out")
+                        )
+            candidates = [
+                self.graph.vs[vertex_index]["scenario"]
+                for vertex_index in sorted(vertex_indices)
+            ]
+
+        return [sc for sc in candidates if expression.evaluate(sc.effective_tags())]
+
+    def update_fingerprints(self) -> None:
+        """Computes the fingerprints of all scenarios in a single pass.
+
+        Parent scenarios always precede their children in index order,
+        so each parent's fingerprint is available when its children are hashed.
+        """
+
+        # Root scenarios continue from the imported scenario, if any:
+        base_fingerprint: Optional[str] = (
+            self.base_scenarios[-1].fingerprint if self.base_scenarios else None
+        )
+        for scenario in self.scenarios():
+            parent: Optional[Scenario] = scenario.parent()
+            scenario.update_fingerprint(
+                parent.fingerprint if parent is not None else base_fingerprint
             )
-            # Write steps:
-            Feature.write_scenario_steps(
-                flat_file, steps, write_comments=write_comments
+
+    def flat_fingerprints(self) -> Dict[str, str]:
+        """Returns the fingerprints of the "strict" flat scenarios by name.
+
+        The fingerprint of a flat scenario is the fingerprint
+        of its destination scenario, or, for flat scenarios expanded through
+        subtree references, that of the path through the references
+        (see FlatScenario.path_fingerprint).
+
+        Returns
+        -------
+        Dict[str, str]
+            The fingerprints by flat scenario name, in output order
+        """
+
+        return {
+            flat_scenario.name: str(
+                flat_scenario.path_fingerprint
+                or flat_scenario.scenario.fingerprint  # type: ignore
             )
-            flat_file.write("\n")  # Empty line to separate scenarios
+            for flat_scenario in self.flat_scenarios_strict()
+        }
 
-    def find(self, *scenario_names: List[str]) -> Optional[Scenario]:
+    def diff(self, other: "Feature") -> Tuple[List[str], List[str], List[str]]:
+        """Compares the "strict" flat scenarios of the feature with those of
+        another (usually newer) version of the feature by fingerprint.
+
+        Parameters
+        ----------
+        other : Feature
+            The other version of the feature
+
+        Returns
+        -------
+        Tuple[List[str], List[str], List[str]]
+            The names of the added, removed and changed flat scenarios
+        """
+
+        old_fingerprints: Dict[str, str] = self.flat_fingerprints()
+        new_fingerprints: Dict[str, str] = other.flat_fingerprints()
+
+        added: List[str] = [
+            name for name in new_fingerprints if name not in old_fingerprints
+        ]
+        removed: List[str] = [
+            name for name in old_fingerprints if name not in new_fingerprints
+        ]
+        changed: List[str] = [
+            name
+            for name, fingerprint in new_fingerprints.items()
+            if name in old_fingerprints and old_fingerprints[name] != fingerprint
+        ]
+        return (added, removed, changed)
+
+    def forest_index(self) -> "ForestIndex":
+        """Builds an array-backed index of the scenario trees
+        for vectorized queries (requires NumPy).
+
+        Returns
+        -------
+        ForestIndex
+            A new ForestIndex instance
+        """
+
+        from .forest_index import ForestIndex  # NumPy is an optional dependency
+
+        return ForestIndex.from_feature(self)
+
+    def outline(self) -> List[str]:
+        """Returns an outline of the scenario trees
+        (as printed by the command line interface).
+
+        Returns
+        -------
+        List[str]
+            One line per scenario. Organizational scenarios end with a colon
+        """
+
+        lines: List[str] = []
+        level_open: Dict[int, bool] = {}
+        branch_shape: str
+        later_sibling: bool
+        sib: Scenario
+        sib_index: Optional[int]
+
+        for sc in self.scenarios():
+            scenario_string = sc.name
+
+            # Indentation and branch shapes:
+            level: Optional[int] = sc.level()
+            index: Optional[int] = sc.index()
+            if level is None or index is None:
+                continue
+            if level > 1:
+                # indentation:
+                indentation: str = ""
+                for lvl in range(2, level):
+                    indentation += (
+                        "│   "
+                        if (lvl in level_open.keys() and level_open[lvl])
+                        else "    "
+                    )
+
+                # branch shape:
+                later_sibling = False
+                for sib in sc.siblings():
+                    sib_index = sib.index()
+                    if sib_index is None:
+                        continue
+                    if sib_index > index:
+                        later_sibling = True
+
+                if later_sibling is True:
+                    branch_shape = "├──"
+                    level_open[level] = True
+                else:
+                    branch_shape = "└──"
+                    level_open[level] = False
+
+                scenario_string = indentation + branch_shape + " " + scenario_string
+
+            # Colon for organizational scenarios:
+            if sc.is_organizational():
+                scenario_string += ":"
+
+            lines.append(scenario_string)
+
+        return lines
+
+    def find(self, *scenario_names: str) -> Optional[Scenario]:
         """Finds and returns a scenario by the names of all scenarios along the path
         from a root scenario to the destination scenario.
 
-        Used in tests only
+        Used to resolve imports (see FeatureCache.resolve) and in tests
 
         Parameters
         ----------
-        scenario_names : List[str]
-            List of scenario names
+        scenario_names : str
+            The scenario names
 
         Returns
         -------
@@ -635,33 +2374,76 @@ class Feature:
 
         return scenario
 
-    def scenarios(self) -> List[Scenario]:
+    def scenario_list(
+        self, kind: Literal["all", "root", "leaf"]
+    ) -> Tuple[Scenario, ...]:
+        """Returns all, the root or the leaf scenarios, listed once per
+        change of the graph.
+
+        The list is cached until scenarios are added to or replaced in the
+        graph (or vertices or edges are added to or removed from it).
+        It is shared by all callers, hence a tuple.
+
+        Parameters
+        ----------
+        kind : {"all", "root", "leaf"}
+            Which scenarios to list
+
+        Returns
+        -------
+        Tuple[Scenario, ...]
+            The scenarios in index order
+        """
+
+        graph: ig.Graph = self.graph
+        key: Tuple[int, int, int] = (self._revision, graph.vcount(), graph.ecount())
+        cached: Optional[Tuple[Tuple[int, int, int], Tuple[Scenario, ...]]] = (
+            self._scenario_lists.get(kind)
+        )
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        scenarios: Tuple[Scenario, ...] = (
+            tuple(graph.vs["scenario"]) if graph.vcount() else ()
+        )
+        if kind == "root":
+            scenarios = tuple(
+                sc for sc, degree in zip(scenarios, graph.indegree()) if degree == 0
+            )
+        elif kind == "leaf":
+            scenarios = tuple(
+                sc for sc, degree in zip(scenarios, graph.outdegree()) if degree == 0
+            )
+        self._scenario_lists[kind] = (key, scenarios)
+        return scenarios
+
+    def scenarios(self) -> Tuple[Scenario, ...]:
         """Returns all scenarios
 
         Returns
         -------
-        List[Scenario]
-            All scenarios in index order
+        Tuple[Scenario, ...]
+            All scenarios in index order (cached, see scenario_list)
         """
 
-        return [vx["scenario"] for vx in self.graph.vs]
+        return self.scenario_list("all")
 
-    def root_scenarios(self) -> List[Scenario]:
+    def root_scenarios(self) -> Tuple[Scenario, ...]:
         """Returns the root scenarios (scenarios with vertices without incoming edges).
 
         Returns
         -------
-        List[Scenario]
-            All root scenarios in index order
+        Tuple[Scenario, ...]
+            All root scenarios in index order (cached, see scenario_list)
         """
-        return [vx["scenario"] for vx in self.graph.vs if vx.indegree() == 0]
+        return self.scenario_list("root")
 
-    def leaf_scenarios(self) -> List[Scenario]:
+    def leaf_scenarios(self) -> Tuple[Scenario, ...]:
         """Returns the leaf scenarios (scenarios with vertices without outgoing edges).
 
         Returns
         -------
-        List[Scenario]
-            All leaf scenarios in index order
+        Tuple[Scenario, ...]
+            All leaf scenarios in index order (cached, see scenario_list)
         """
-        return [vx["scenario"] for vx in self.graph.vs if vx.outdegree() == 0]
+        return self.scenario_list("leaf")
@@ -0,0 +1,567 @@
+"""Defines the FeatureImport and FeatureCache Classes"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Optional, Dict, Tuple, List, Set, Iterator, Any, TYPE_CHECKING
+
+from .tag_expression import TagExpression
+from .tokens import Token
+from .exceptions import InvalidFeatureFileError
+from .output import OutputFile
+
+if TYPE_CHECKING:
+    from .feature import Feature
+
+CacheEntry = Tuple[int, int, bytes, "Feature"]
+"""A cached feature: modification time (ns), size and hash of the file,
+and the parsed feature"""
+
+FileStamp = List[Any]
+"""The state of a file: modification time (ns), size and hash (hex)
+of its content"""
+
+
+class FeatureImport:
+    """An import of a scenario of another feature file
+    ("Extends: login.feature > Log in > Logged in as admin").
+
+    The root scenarios of the importing feature continue from the imported
+    scenario, as if they were its child scenarios.
+    """
+
+    file_path: str
+    """The path to the extended feature file
+    (relative to the directory of the importing feature file)"""
+    scenario_names: List[str]
+    """The names of the scenarios along the path to the imported scenario"""
+    line_no: int
+    """The line number of the import line (starting at 0)"""
+    comment: Optional[str]
+    """The comment of the import line"""
+
+    def __init__(
+        self,
+        file_path: str,
+        scenario_names: List[str],
+        line_no: int,
+        comment: Optional[str] = None,
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the extended feature file
+
+        scenario_names : List[str]
+            The names of the scenarios along the path to the imported scenario
+
+        line_no : int
+            The line number of the import line (starting at 0)
+
+        comment : str, optional
+            A comment
+        """
+
+        self.file_path = file_path
+        self.scenario_names = scenario_names
+        self.line_no = line_no
+        self.comment = comment
+
+    @classmethod
+    def from_match(cls, match: re.Match, line_no: int) -> "FeatureImport":
+        """Creates a feature import from a match of Feature.EXTENDS_PATTERN.
+
+        Parameters
+        ----------
+        match : re.Match
+            The match of the import line
+
+        line_no : int
+            The line number of the import line (starting at 0)
+
+        Returns
+        -------
+        FeatureImport
+            A new FeatureImport instance
+        """
+
+        comment: Optional[str] = match["comment"]
+        return FeatureImport(
+            match["file_path"].strip(),
+            [name.strip() for name in match["scenario_names"].split(">")],
+            line_no,
+            comment=comment.strip() if comment is not None else None,
+        )
+
+    def line(self) -> str:
+        """Returns the import line (without comment)
+
+        Returns
+        -------
+        str
+            The import line
+        """
+
+        return "Extends: {} > {}".format(
+            self.file_path, " > ".join(self.scenario_names)
+        )
+
+    def error(self, message: str) -> InvalidFeatureFileError:
+        """Returns an error for the import line
+
+        Parameters
+        ----------
+        message : str
+            The error message (without line number and line)
+
+        Returns
+        -------
+        InvalidFeatureFileError
+            The error
+        """
+
+        return InvalidFeatureFileError(
+            "{message} at line {line_no}: {line}".format(
+                message=message, line_no=self.line_no + 1, line=self.line()
+            ),
+            line_no=self.line_no + 1,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, FeatureImport)
+            and self.file_path == other.file_path
+            and self.scenario_names == other.scenario_names
+        )
+
+    def __str__(self) -> str:
+        """Returns a string representation of the FeatureImport instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the FeatureImport instance
+        """
+
+        return "<FeatureImport: {}>".format(self.line())
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the FeatureImport instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the FeatureImport instance
+        """
+
+        return self.__str__()
+
+
+class FeatureCache:
+    """Parsed features by file path, invalidated when the file changes.
+
+    A file is considered unchanged if its modification time and size are
+    unchanged, or if its content hash is unchanged (for example after
+    a "touch" or after saving without changes).
+
+    Features extending another feature file are linked to the imported
+    scenario of its cached feature, so a base file shared by many feature
+    files is parsed once. When a base file changes, the features extending
+    it are linked again without parsing them again.
+    """
+
+    MANIFEST_FILE_NAME: str = ".manyworlds-batch.json"
+    """
+    str
+
+    The name of the file recording the input files of the flat feature
+    files in an output directory (see flatten_directory)
+    """
+
+    entries: Dict[str, CacheEntry]
+    """The cached features by real path"""
+    hits: int
+    """The number of requests answered from the cache"""
+    misses: int
+    """The number of requests that required parsing"""
+    _resolving: List[str]
+    """The real paths of the feature files being parsed or linked
+    (for detecting cyclic imports)"""
+
+    def __init__(self) -> None:
+        """Constructor method"""
+
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._resolving = []
+
+    @classmethod
+    def file_hash(cls, file_path: str) -> bytes:
+        """Returns the hash of a file's content
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file
+
+        Returns
+        -------
+        bytes
+            The hash
+        """
+
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as feature_file:
+            for block in iter(lambda: feature_file.read(1 << 20), b""):
+                hasher.update(block)
+        return hasher.digest()
+
+    def get(self, file_path: str) -> "Feature":
+        """Returns the parsed feature for a feature file,
+        parsing the file if it is not cached or has changed.
+
+        The imports of the feature are resolved (see resolve).
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the indented feature file
+
+        Returns
+        -------
+        Feature
+            The feature
+
+        Raises
+        ------
+        InvalidFeatureFileError
+            If the feature file or a feature file it extends is invalid
+        """
+
+        from .feature import Feature  # imported here to avoid a circular import
+
+        real_path: str = os.path.realpath(file_path)
+        self._resolving.append(real_path)
+        try:
+            stat: os.stat_result = os.stat(real_path)
+            entry: Optional[CacheEntry] = self.entries.get(real_path)
+            if entry is not None:
+                mtime_ns, size, digest, feature = entry
+                unchanged: bool = (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size)
+                if not unchanged and self.file_hash(real_path) == digest:
+                    self.entries[real_path] = (
+                        stat.st_mtime_ns,
+                        stat.st_size,
+                        digest,
+                        feature,
+                    )
+                    unchanged = True
+                if unchanged:
+                    self.hits += 1
+                    if feature.extends is not None:
+                        self.resolve(feature, real_path)  # the base may have changed
+                    return feature
+
+            self.misses += 1
+            self.entries.pop(real_path, None)
+            digest = self.file_hash(real_path)
+            feature = Feature.from_file(real_path, cache=self)
+            self.entries[real_path] = (stat.st_mtime_ns, stat.st_size, digest, feature)
+            return feature
+        finally:
+            self._resolving.pop()
+
+    def resolve(self, feature: "Feature", file_path: Optional[str] = None) -> None:
+        """Links a feature extending another feature file to the imported
+        scenario (see Feature.base_scenarios), parsing the extended feature
+        file unless it is cached.
+
+        Parameters
+        ----------
+        feature : Feature
+            The feature
+
+        file_path : str, optional
+            The path to the feature file (the path of the extended feature
+            file is relative to its directory). Defaults to the current
+            directory for features not read from a file
+
+        Raises
+        ------
+        InvalidFeatureFileError
+            If the extended feature file or scenario does not exist,
+            if the import is cyclic or if the extended feature file is invalid
+        """
+
+        feature_import: Optional[FeatureImport] = feature.extends
+        if feature_import is None:
+            return
+
+        directory: str = os.path.dirname(file_path) if file_path is not None else ""
+        base_path: str = os.path.realpath(
+            os.path.join(directory, feature_import.file_path)
+        )
+        if base_path in self._resolving:
+            raise feature_import.error("Cyclic import")
+        if not os.path.isfile(base_path):
+            raise feature_import.error("Missing feature file")
+
+        base: Feature = self.get(base_path)
+        scenario = base.find(*feature_import.scenario_names)
+        if scenario is None or scenario.reference is not None:
+            raise feature_import.error("Unknown scenario")
+
+        base_scenarios = base.base_scenarios + scenario.path_scenarios()
+        if feature.base_scenarios != base_scenarios:
+            feature.base_scenarios = base_scenarios
+            feature.update_fingerprints()
+
+    @classmethod
+    def read_import(cls, file_path: str) -> Optional[FeatureImport]:
+        """Reads the import of a feature file without parsing its scenarios.
+
+        Only the lines preceding the first scenario are read.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the feature file
+
+        Returns
+        -------
+        FeatureImport or None
+            The import, if the feature file extends another feature file
+        """
+
+        from .feature import Feature  # imported here to avoid a circular import
+
+        with open(file_path) as feature_file:
+            for token in Feature.tokenize(feature_file):
+                if token.kind == Token.EXTENDS:
+                    return FeatureImport.from_match(
+                        token.match, token.line_no  # type: ignore
+                    )
+                if token.kind in [Token.SCENARIO, Token.SUBTREE, Token.TAGS]:
+                    break
+        return None
+
+    def import_chain(self, file_path: str) -> Iterator[str]:
+        """Yields the real paths of a feature file and the feature files
+        it extends, directly or indirectly.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the feature file
+
+        Returns
+        -------
+        Iterator[str]
+            The real paths, starting with the feature file
+        """
+
+        real_path: Optional[str] = os.path.realpath(file_path)
+        seen: Set[str] = set()
+        while real_path is not None and real_path not in seen:
+            seen.add(real_path)
+            yield real_path
+            if not os.path.isfile(real_path):
+                return
+            feature_import: Optional[FeatureImport] = self.read_import(real_path)
+            real_path = (
+                os.path.realpath(
+                    os.path.join(os.path.dirname(real_path), feature_import.file_path)
+                )
+                if feature_import is not None
+                else None
+            )
+
+    @classmethod
+    def file_stamp(cls, file_path: str, stamp: Optional[FileStamp] = None) -> FileStamp:
+        """Returns the modification time, size and content hash of a file.
+
+        The file is not read if its modification time and size match
+        those of a previous stamp.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the file
+
+        stamp : FileStamp, optional
+            A previous stamp of the file
+
+        Returns
+        -------
+        FileStamp
+            The stamp
+        """
+
+        stat: os.stat_result = os.stat(file_path)
+        if stamp is not None and stamp[:2] == [stat.st_mtime_ns, stat.st_size]:
+            return stamp
+        return [stat.st_mtime_ns, stat.st_size, cls.file_hash(file_path).hex()]
+
+    @classmethod
+    def read_manifest(cls, output_dir: str) -> Dict[str, Any]:
+        """Reads the manifest of an output directory (see flatten_directory).
+
+        Parameters
+        ----------
+        output_dir : str
+            The directory with the flat feature files
+
+        Returns
+        -------
+        Dict[str, Any]
+            The manifest (empty if it is missing or unreadable)
+        """
+
+        try:
+            with open(
+                os.path.join(output_dir, cls.MANIFEST_FILE_NAME)
+            ) as manifest_file:
+                manifest: Any = json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+
+    def flatten_directory(
+        self,
+        input_dir: str,
+        output_dir: str,
+        mode: str = "strict",
+        write_comments: bool = False,
+        tags: Optional[str] = None,
+        force: bool = False,
+    ) -> Tuple[List[str], List[str], List[str]]:
+        """Writes a flat feature file for each indented feature file
+        (".feature") in a directory and its subdirectories.
+
+        The modification time, size and content hash of the feature files
+        each flat feature file was flattened from (the feature file and all
+        feature files it extends) are recorded in a manifest in the output
+        directory. Flat feature files whose feature files have the same
+        content as recorded are up to date and skipped, so only the feature
+        files that changed and the feature files depending on them are
+        processed. Feature files are only read for hashing if their
+        modification time or size changed. The options (mode, tags and
+        comments) are recorded, too: when they differ from those of the
+        previous run, all flat feature files are flattened again. Each
+        feature file is parsed at most once, however many feature files
+        extend it. Flat feature files whose content would not change are not
+        written (see OutputFile).
+
+        Parameters
+        ----------
+        input_dir : str
+            The directory with the indented feature files
+
+        output_dir : str
+            The directory for the flat feature files (with the same
+            relative paths)
+
+        mode : {"strict", "relaxed"}, default="strict"
+            Flattening mode. Either "strict" or "relaxed"
+
+        write_comments : bool, default = False
+            Whether or not to write comments
+
+        tags : str, optional
+            Only write scenarios matching this tag expression
+
+        force : bool, default = False
+            Whether or not to write up-to-date flat feature files, too
+
+        Returns
+        -------
+        Tuple[List[str], List[str], List[str]]
+            The paths of the written, of the unchanged and of the skipped
+            (up-to-date) flat feature files
+        """
+
+        expression: Optional[TagExpression] = TagExpression.coerce(tags)
+        options: Dict[str, Any] = {
+            "mode": mode,
+            "write_comments": write_comments,
+            "tags": expression.expression if expression is not None else None,
+        }
+        manifest: Dict[str, Any] = self.read_manifest(output_dir)
+        recorded: Dict[str, Any] = (
+            manifest.get("files", {}) if manifest.get("options") == options else {}
+        )
+        files: Dict[str, Any] = {}
+        written: List[str] = []
+        unchanged: List[str] = []
+        skipped: List[str] = []
+        try:
+            for directory, subdirectories, file_names in os.walk(input_dir):
+                subdirectories.sort()
+                for file_name in sorted(file_names):
+                    if not file_name.endswith(".feature"):
+                        continue
+                    input_path: str = os.path.join(directory, file_name)
+                    relative_path: str = os.path.relpath(input_path, input_dir)
+                    output_path: str = os.path.join(output_dir, relative_path)
+
+                    entry: Dict[str, Any] = recorded.get(relative_path, {})
+                    recorded_inputs: Dict[str, FileStamp] = entry.get("inputs", {})
+                    chain: List[str] = list(self.import_chain(input_path))
+                    inputs: Dict[str, FileStamp] = {
+                        path: self.file_stamp(path, recorded_inputs.get(path))
+                        for path in chain
+                        if os.path.isfile(path)
+                    }
+                    if (
+                        not force
+                        and os.path.isfile(output_path)
+                        and entry.get("output") == self.file_stamp(output_path)[:2]
+                        and len(inputs) == len(chain)
+                        and inputs.keys() == recorded_inputs.keys()
+                        and all(
+                            stamp[2] == recorded_inputs[path][2]
+                            for path, stamp in inputs.items()
+                        )
+                    ):
+                        files[relative_path] = {
+                            "inputs": inputs,
+                            "output": entry["output"],
+                        }
+                        skipped.append(output_path)
+                        continue
+
+                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                    output_file: OutputFile = self.get(input_path).flatten(
+                        output_path,
+                        mode=mode,  # type: ignore
+                        write_comments=write_comments,
+                        tags=expression,
+                    )
+                    if output_file.changed:
+                        written.append(output_path)
+                    else:
+                        unchanged.append(output_path)
+                    files[relative_path] = {
+                        "inputs": inputs,
+                        "output": self.file_stamp(output_path)[:2],
+                    }
+        finally:
+            if files or manifest:
+                os.makedirs(output_dir, exist_ok=True)
+                with OutputFile(
+                    os.path.join(output_dir, self.MANIFEST_FILE_NAME)
+                ) as manifest_file:
+                    manifest_file.write(
+                        json.dumps(
+                            {"options": options, "files": files},
+                            indent=1,
+                            sort_keys=True,
+                        )
+                    )
+        return written, unchanged, skipped
@@ -0,0 +1,319 @@
+"""Defines the FlatScenario Class"""
+
+import hashlib
+from typing import Optional, List, Dict, Iterator
+
+from .scenario import Scenario
+from .step import Step
+from .examples import substitute, example_bindings
+
+
+class FlatScenario:
+    """A scenario of a flat (no indentation) feature file
+
+    Assembled from the steps of the scenarios along a path in a scenario tree
+    """
+
+    name: str
+    """The name of the flat scenario"""
+    steps: List[Step]
+    """The steps of the flat scenario"""
+    comment: Optional[str]
+    """The comment of the destination scenario"""
+    tags: List[str]
+    """The own and inherited tags of the destination scenario"""
+    scenario: Optional[Scenario]
+    """The destination scenario (None if not backed by a scenario tree)"""
+    bindings: Dict[str, str]
+    """The example values substituted for the placeholders of the scenario
+    outlines along the path (empty if there are none)"""
+    path_fingerprint: Optional[str]
+    """The fingerprint of the path to the destination scenario, for flat
+    scenarios expanded through subtree references (whose destination
+    scenario's fingerprint ignores the path to the reference). None otherwise
+    (see path_fingerprint_of)"""
+
+    def __init__(
+        self,
+        name: str,
+        steps: List[Step],
+        comment: Optional[str] = None,
+        scenario: Optional[Scenario] = None,
+        tags: Optional[List[str]] = None,
+        bindings: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        name : str
+            The name of the flat scenario
+
+        steps : List[Step]
+            The steps of the flat scenario
+
+        comment : str, optional
+            A comment
+
+        scenario : Scenario, optional
+            The destination scenario in the scenario tree
+
+        tags : List[str], optional
+            The tags (including "@")
+
+        bindings : Dict[str, str], optional
+            The example values by placeholder name
+        """
+
+        self.name = name
+        self.steps = steps
+        self.comment = comment
+        self.scenario = scenario
+        self.tags = tags if tags is not None else []
+        self.bindings = bindings if bindings is not None else {}
+        self.path_fingerprint = None
+
+    @classmethod
+    def from_path(
+        cls,
+        scenarios_for_naming: List[Scenario],
+        steps: List[Step],
+        bindings: Optional[Dict[str, str]] = None,
+        tags: Optional[List[str]] = None,
+    ) -> "FlatScenario":
+        """Creates a flat scenario for the scenarios along a path.
+
+        Parameters
+        ----------
+        scenarios_for_naming : List[Scenario]
+            Organizational and validated scenarios along the path.
+            The last scenario is the destination scenario
+
+        steps : List[Step]
+            The steps of the flat scenario
+
+        bindings : Dict[str, str], optional
+            The example values to substitute for the placeholders
+            in the scenario names
+
+        tags : List[str], optional
+            The tags of the flat scenario. Defaults to the effective tags
+            of the destination scenario
+
+        Returns
+        -------
+        FlatScenario
+            A new FlatScenario instance
+        """
+
+        destination_scenario: Scenario = scenarios_for_naming[-1]
+        return FlatScenario(
+            cls.format_name(scenarios_for_naming, bindings=bindings),
+            steps,
+            comment=destination_scenario.comment,
+            scenario=destination_scenario,
+            tags=tags if tags is not None else destination_scenario.effective_tags(),
+            bindings=bindings,
+        )
+
+    @classmethod
+    def expand(
+        cls,
+        path_scenarios: List[Scenario],
+        scenarios_for_naming: List[Scenario],
+        steps: List[Step],
+    ) -> Iterator["FlatScenario"]:
+        """Yields one flat scenario for each combination of the examples rows
+        of the scenario outlines along a path.
+
+        The flat scenarios are created lazily, one at a time, so the cross
+        product of nested examples tables is never held in memory.
+
+        Parameters
+        ----------
+        path_scenarios : List[Scenario]
+            All scenarios along the path, root scenario first
+
+        scenarios_for_naming : List[Scenario]
+            Organizational and validated scenarios along the path.
+            The last scenario is the destination scenario
+
+        steps : List[Step]
+            The steps of the flat scenario (with placeholders)
+
+        Returns
+        -------
+        Iterator[FlatScenario]
+            A single flat scenario if there are no scenario outlines
+            with examples along the path
+        """
+
+        tags: List[str] = cls.path_tags(path_scenarios)
+        if not any([sc.examples for sc in path_scenarios]):
+            return iter([cls.from_path(scenarios_for_naming, steps, tags=tags)])
+
+        return (
+            cls.from_path(
+                scenarios_for_naming,
+                [step.substitute(bindings) for step in steps],
+                bindings=bindings,
+                tags=tags,
+            )
+            for bindings in example_bindings(path_scenarios)
+        )
+
+    @classmethod
+    def path_tags(cls, path_scenarios: List[Scenario]) -> List[str]:
+        """Returns the tags of the scenarios along a path.
+
+        Unlike Scenario.effective_tags, this includes the tags of the scenarios
+        along the path to a subtree reference.
+
+        Parameters
+        ----------
+        path_scenarios : List[Scenario]
+            All scenarios along the path, root scenario first
+
+        Returns
+        -------
+        List[str]
+            The tags, starting with the root scenario's tags, without duplicates
+        """
+
+        return list(dict.fromkeys(tag for sc in path_scenarios for tag in sc.tags))
+
+    @classmethod
+    def format_name(
+        cls, scenarios: List[Scenario], bindings: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Formats the name of a flat scenario.
+
+        Consecutive organizational scenarios are grouped in square brackets,
+        consecutive regular scenarios are joined using ">". Example values
+        not substituted into any of the names are appended in parentheses.
+
+        Parameters
+        ----------
+        scenarios : List[Scenario]
+            Organizational and validated scenarios along the path
+
+        bindings : Dict[str, str], optional
+            The example values to substitute for the placeholders
+            in the scenario names
+
+        Returns
+        -------
+        str
+            The flat scenario name
+        """
+
+        # (1) Group consecutive regular or organizational scenarios:
+        groups: List[List[Scenario]] = []
+
+        # Function for determining whether a scenario can be added to a current group:
+        def group_available_for_scenario(
+            gr: List[List[Scenario]], sc: Scenario
+        ) -> bool:
+            return (
+                len(gr) > 0
+                and len(gr[-1]) > 0
+                and gr[-1][-1].is_organizational() == sc.is_organizational()
+            )
+
+        for sc in scenarios:
+            if group_available_for_scenario(groups, sc):
+                groups[-1].append(sc)  # add to current group
+            else:
+                groups.append([sc])  # start new group
+
+        # (2) Format each group to strings:
+        group_strings: List[str] = []
+
+        def name(sc: Scenario) -> str:
+            return sc.name if bindings is None else substitute(sc.name, bindings)
+
+        for group in groups:
+            if group[-1].is_organizational():
+                group_strings.append(
+                    "[{}]".format(" / ".join([name(sc) for sc in group]))
+                )
+            else:
+                group_strings.append(" > ".join([name(sc) for sc in group]))
+
+        # (3) Append the example values not substituted into the names
+        # so that the flat scenarios of an outline have distinct names:
+        if bindings:
+            unused: List[str] = [
+                "{}: {}".format(placeholder, value)
+                for placeholder, value in bindings.items()
+                if not any("<{}>".format(placeholder) in sc.name for sc in scenarios)
+            ]
+            if len(unused) > 0:
+                group_strings.append("({})".format(", ".join(unused)))
+
+        # (4) Assemble name:
+        return " ".join(group_strings)
+
+    @classmethod
+    def path_fingerprint_of(cls, scenarios: List[Scenario]) -> str:
+        """Returns the fingerprint of a path through subtree references:
+        a hash of the fingerprints of the scenarios along it.
+
+        Parameters
+        ----------
+        scenarios : List[Scenario]
+            The scenarios along the path, starting with the subtree
+            reference (whose fingerprint covers the path to it)
+
+        Returns
+        -------
+        str
+            The fingerprint (hexadecimal)
+        """
+
+        hasher = hashlib.blake2b(digest_size=16)
+        for scenario in scenarios:
+            hasher.update(b"\x1e")
+            hasher.update((scenario.fingerprint or "").encode())
+        return hasher.hexdigest()
+
+    def fingerprint(self) -> str:
+        """Returns the fingerprint of the flat scenario.
+
+        The fingerprint is a hash of the full step path (conjunctions, names
+        and data tables of all steps). Names, comments and tags are ignored.
+
+        Returns
+        -------
+        str
+            The fingerprint (hexadecimal)
+        """
+
+        hasher = hashlib.blake2b(digest_size=16)
+        for step in self.steps:
+            step.update_hash(hasher)
+        return hasher.hexdigest()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the FlatScenario instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the FlatScenario instance
+        """
+
+        return "<FlatScenario: {} ({} steps)>".format(self.name, len(self.steps))
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the FlatScenario instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the FlatScenario instance
+        """
+
+        return self.__str__()
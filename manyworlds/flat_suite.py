@@ -0,0 +1,749 @@
+"""Defines the FlatSuite Class"""
+
+import json
+import mmap
+import struct
+import tempfile
+from typing import (
+    Optional,
+    Literal,
+    List,
+    Dict,
+    Tuple,
+    BinaryIO,
+    Iterator,
+    Any,
+    Union,
+    TextIO,
+    cast,
+)
+
+from .feature import Feature
+from .flat_scenario import FlatScenario
+from .ledger import Ledger
+from .durations import StepDurations
+from .tag_expression import TagExpression
+from .output import OutputFile
+from .step import Step, Prerequisite, Action, Assertion
+from .data_table import DataTable, DataTableRow
+
+
+class FlatSuite:
+    """A flattened feature stored in a compact, memory-mapped file.
+
+    Two formats are supported:
+
+    * "binary": A header, a deduplicated string table (step names, cells,
+      comments), the scenario records and an offsets index that allows
+      reading any flat scenario in O(1)
+    * "ndjson": One JSON object per line. The first line holds the feature
+      name and description, each following line one flat scenario
+
+    Strings and scenarios are decoded on access only, so opening a large
+    suite does not materialize its contents.
+    """
+
+    MAGIC: bytes = b"MWFS"
+    """
+    bytes
+
+    The magic number identifying a binary flat suite file
+    """
+
+    VERSION: int = 1
+    """
+    int
+
+    The version of the binary format
+    """
+
+    HEADER: struct.Struct = struct.Struct("<4sHHIIIQQQ")
+    """
+    struct.Struct
+
+    The binary file header:
+    magic, version, reserved, number of strings, number of scenarios,
+    feature name string id, description offset,
+    scenario index offset, string table offset
+    """
+
+    NO_STRING: int = 0xFFFFFFFF
+    """
+    int
+
+    String id representing a missing (None) string
+    """
+
+    STEP_TYPES: Dict[str, type] = {
+        "Given": Prerequisite,
+        "When": Action,
+        "Then": Assertion,
+    }
+    """
+    Dict[str, type]
+
+    Step subclasses by conjunction
+    """
+
+    STEP_CODES: List[str] = ["Given", "When", "Then"]
+    """
+    List[str]
+
+    Conjunctions by binary step code
+    """
+
+    format: Literal["binary", "ndjson"]
+    """The format of the file"""
+    name: Optional[str]
+    """The name of the feature"""
+    description: List[str]
+    """The description lines of the feature"""
+    _file: BinaryIO
+    _buffer: mmap.mmap
+    _scenario_count: int
+    _index_offset: int
+    _string_count: int
+    _strings_offset: int
+    _strings: Dict[int, str]
+    _line_offsets: List[int]
+
+    def __init__(self, file_path: str) -> None:
+        """Constructor method
+
+        Memory-maps the file. Use FlatSuite.open() instead.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to a binary or NDJSON flat suite file
+        """
+
+        self._file = open(file_path, "rb")
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._strings = {}
+        self._line_offsets = []
+        if self._buffer[: len(self.MAGIC)] == self.MAGIC:
+            self.format = "binary"
+            self._read_binary_header()
+        else:
+            self.format = "ndjson"
+            self._read_ndjson_header()
+
+    @classmethod
+    def open(cls, file_path: str) -> "FlatSuite":
+        """Opens a binary or NDJSON flat suite file.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the flat suite file
+
+        Returns
+        -------
+        FlatSuite
+            A new FlatSuite instance
+        """
+
+        return FlatSuite(file_path)
+
+    def close(self) -> None:
+        """Closes the memory map and the underlying file"""
+
+        self._buffer.close()
+        self._file.close()
+
+    def __enter__(self) -> "FlatSuite":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Returns the number of flat scenarios
+
+        Returns
+        -------
+        int
+            The number of flat scenarios
+        """
+
+        return self._scenario_count
+
+    def __getitem__(self, index: int) -> FlatScenario:
+        """Reads the flat scenario at the given position.
+
+        Parameters
+        ----------
+        index : int
+            The position of the flat scenario
+
+        Returns
+        -------
+        FlatScenario
+            The flat scenario
+        """
+
+        if index < 0:
+            index += self._scenario_count
+        if not 0 <= index < self._scenario_count:
+            raise IndexError("Flat scenario index out of range")
+
+        if self.format == "binary":
+            return self._read_binary_scenario(index)
+        else:
+            return self._read_ndjson_scenario(index)
+
+    def __iter__(self) -> Iterator[FlatScenario]:
+        """Yields all flat scenarios in order
+
+        Returns
+        -------
+        Iterator[FlatScenario]
+            The flat scenarios
+        """
+
+        for index in range(self._scenario_count):
+            yield self[index]
+
+    @classmethod
+    def write(
+        cls,
+        file_path: str,
+        feature: Feature,
+        mode: Literal["strict", "relaxed", "smoke", "auto"] = "strict",
+        format: Literal["binary", "ndjson"] = "binary",
+        tags: Optional[Union[str, TagExpression]] = None,
+        ledger: Optional[Ledger] = None,
+        durations: Optional[StepDurations] = None,
+        max_steps: Optional[int] = None,
+    ) -> OutputFile:
+        """Writes the flat scenarios of a feature to a flat suite file.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the flat suite file to be written
+
+        feature : Feature
+            The feature to flatten
+
+        mode : {"strict", "relaxed", "smoke", "auto"}, default="strict"
+            Flattening mode. Either "strict", "relaxed", "smoke" or "auto"
+
+        format : {"binary", "ndjson"}, default="binary"
+            File format. Either "binary" or "ndjson"
+
+        tags : str or TagExpression, optional
+            Only write scenarios matching this tag expression
+
+        ledger : Ledger, optional
+            Only write scenarios that are new, changed or previously failing
+            according to this ledger
+
+        durations : StepDurations, optional
+            Step durations to weight flat scenarios by in the "smoke" and
+            "auto" flattening modes (see Feature.smoke_suite and
+            Feature.flattening_plan)
+
+        max_steps : int, optional
+            The maximum number of steps of the flat scenarios of subtrees
+            flattened in "relaxed" mode in the "auto" flattening mode
+            (defaults to FlatteningPlan.MAX_STEPS)
+
+        Returns
+        -------
+        OutputFile
+            The written flat suite file
+        """
+
+        if format == "binary":
+            return cls.write_binary(
+                file_path,
+                feature,
+                mode=mode,
+                tags=tags,
+                ledger=ledger,
+                durations=durations,
+                max_steps=max_steps,
+            )
+        elif format == "ndjson":
+            return cls.write_ndjson(
+                file_path,
+                feature,
+                mode=mode,
+                tags=tags,
+                ledger=ledger,
+                durations=durations,
+                max_steps=max_steps,
+            )
+        else:
+            raise ValueError("Invalid flat suite format: {}".format(format))
+
+    @classmethod
+    def write_binary(
+        cls,
+        file_path: str,
+        feature: Feature,
+        mode: Literal["strict", "relaxed", "smoke", "auto"] = "strict",
+        tags: Optional[Union[str, TagExpression]] = None,
+        ledger: Optional[Ledger] = None,
+        durations: Optional[StepDurations] = None,
+        max_steps: Optional[int] = None,
+    ) -> OutputFile:
+        """Writes the flat scenarios of a feature to a binary flat suite file.
+
+        The flat suite file is replaced atomically, and only if its content
+        changed (see OutputFile), so that processes reading it (see
+        FlatSuite.open) never see a partly written file.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the flat suite file to be written
+
+        feature : Feature
+            The feature to flatten
+
+        mode : {"strict", "relaxed", "smoke", "auto"}, default="strict"
+            Flattening mode. Either "strict", "relaxed", "smoke" or "auto"
+
+        tags : str or TagExpression, optional
+            Only write scenarios matching this tag expression
+
+        ledger : Ledger, optional
+            Only write scenarios that are new, changed or previously failing
+            according to this ledger
+
+        durations : StepDurations, optional
+            Step durations to weight flat scenarios by in the "smoke" and
+            "auto" flattening modes (see Feature.smoke_suite and
+            Feature.flattening_plan)
+
+        max_steps : int, optional
+            The maximum number of steps of the flat scenarios of subtrees
+            flattened in "relaxed" mode in the "auto" flattening mode
+            (defaults to FlatteningPlan.MAX_STEPS)
+
+        Returns
+        -------
+        OutputFile
+            The written flat suite file
+        """
+
+        string_ids: Dict[str, int] = {}
+
+        def string_id(string: Optional[str]) -> int:
+            if string is None:
+                return cls.NO_STRING
+            if string not in string_ids:
+                string_ids[string] = len(string_ids)
+            return string_ids[string]
+
+        # Feature name and description:
+        name_id: int = string_id(feature.name)
+        description_ids: List[int] = [string_id(line) for line in feature.description]
+        description: bytes = struct.pack(
+            "<I{}I".format(len(description_ids)),
+            len(description_ids),
+            *description_ids,
+        )
+        description_offset: int = cls.HEADER.size
+
+        with tempfile.TemporaryFile() as records_file:
+            # Scenario records (collected first, since the header
+            # refers to the sections following them):
+            records_offset: int = description_offset + len(description)
+            scenario_offsets: List[int] = []
+            for flat_scenario in feature.flat_scenarios(
+                mode,
+                tags=tags,
+                ledger=ledger,
+                durations=durations,
+                max_steps=max_steps,
+            ):
+                scenario_offsets.append(records_offset + records_file.tell())
+                records_file.write(cls._pack_scenario(flat_scenario, string_id))
+            scenario_offsets.append(records_offset + records_file.tell())
+
+            # Scenario index:
+            index_offset: int = scenario_offsets[-1]
+            index: bytes = struct.pack(
+                "<{}Q".format(len(scenario_offsets)), *scenario_offsets
+            )
+
+            # String table:
+            strings_offset: int = index_offset + len(index)
+            encoded_strings: List[bytes] = [s.encode() for s in string_ids.keys()]
+            string_offsets: List[int] = [0]
+            for encoded_string in encoded_strings:
+                string_offsets.append(string_offsets[-1] + len(encoded_string))
+
+            with OutputFile(file_path, binary=True) as suite_file:
+                suite_file.write(
+                    cls.HEADER.pack(
+                        cls.MAGIC,
+                        cls.VERSION,
+                        0,
+                        len(string_ids),
+                        len(scenario_offsets) - 1,
+                        name_id,
+                        description_offset,
+                        index_offset,
+                        strings_offset,
+                    )
+                )
+                suite_file.write(description)
+                records_file.seek(0)
+                for block in iter(
+                    lambda: records_file.read(OutputFile.CHUNK_SIZE), b""
+                ):
+                    suite_file.write(block)
+                suite_file.write(index)
+                suite_file.write(
+                    struct.pack("<{}Q".format(len(string_offsets)), *string_offsets)
+                )
+                suite_file.write(b"".join(encoded_strings))
+        return suite_file
+
+    @classmethod
+    def _pack_scenario(cls, flat_scenario: FlatScenario, string_id: Any) -> bytes:
+        """Packs a flat scenario into a binary scenario record.
+
+        Parameters
+        ----------
+        flat_scenario : FlatScenario
+            The flat scenario
+
+        string_id : Callable[[Optional[str]], int]
+            Function returning the string table id for a string
+
+        Returns
+        -------
+        bytes
+            The binary scenario record
+        """
+
+        values: List[int] = [
+            string_id(flat_scenario.name),
+            string_id(flat_scenario.comment),
+            len(flat_scenario.tags),
+            len(flat_scenario.steps),
+        ]
+        values += [string_id(tag) for tag in flat_scenario.tags]
+        step_format: str = "<IIII{}I".format(len(flat_scenario.tags))
+        for step in flat_scenario.steps:
+            step_format += "BII"
+            values += [
+                cls.STEP_CODES.index(step.conjunction),
+                string_id(step.name),
+                string_id(step.comment),
+            ]
+            if step.data is None:
+                step_format += "II"
+                values += [0, 0]
+            else:
+                data_table: DataTable = step.data
+                column_count: int = len(data_table.columns)
+                step_format += "II{}I".format(data_table.row_count * (column_count + 1))
+                values += [data_table.row_count, column_count]
+                for row_num in range(data_table.row_count):
+                    values += [
+                        string_id(value) for value in data_table.row_values(row_num)
+                    ]
+                    values.append(string_id(data_table.comments.get(row_num)))
+
+        return struct.pack(step_format, *values)
+
+    @classmethod
+    def write_ndjson(
+        cls,
+        file_path: str,
+        feature: Feature,
+        mode: Literal["strict", "relaxed", "smoke", "auto"] = "strict",
+        tags: Optional[Union[str, TagExpression]] = None,
+        ledger: Optional[Ledger] = None,
+        durations: Optional[StepDurations] = None,
+        max_steps: Optional[int] = None,
+    ) -> OutputFile:
+        """Writes the flat scenarios of a feature to an NDJSON flat suite file.
+
+        The flat suite file is replaced atomically, and only if its content
+        changed (see OutputFile).
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the flat suite file to be written
+
+        feature : Feature
+            The feature to flatten
+
+        mode : {"strict", "relaxed", "smoke", "auto"}, default="strict"
+            Flattening mode. Either "strict", "relaxed", "smoke" or "auto"
+
+        tags : str or TagExpression, optional
+            Only write scenarios matching this tag expression
+
+        ledger : Ledger, optional
+            Only write scenarios that are new, changed or previously failing
+            according to this ledger
+
+        durations : StepDurations, optional
+            Step durations to weight flat scenarios by in the "smoke" and
+            "auto" flattening modes (see Feature.smoke_suite and
+            Feature.flattening_plan)
+
+        max_steps : int, optional
+            The maximum number of steps of the flat scenarios of subtrees
+            flattened in "relaxed" mode in the "auto" flattening mode
+            (defaults to FlatteningPlan.MAX_STEPS)
+
+        Returns
+        -------
+        OutputFile
+            The written flat suite file
+        """
+
+        with OutputFile(file_path) as suite_file:
+            suite_file.write(
+                json.dumps(
+                    {"feature": feature.name, "description": feature.description}
+                )
+                + "\n"
+            )
+            for flat_scenario in feature.flat_scenarios(
+                mode,
+                tags=tags,
+                ledger=ledger,
+                durations=durations,
+                max_steps=max_steps,
+            ):
+                steps: List[Dict[str, Any]] = []
+                for step in flat_scenario.steps:
+                    step_dict: Dict[str, Any] = {
+                        "type": step.conjunction,
+                        "name": step.name,
+                        "comment": step.comment,
+                    }
+                    if step.data is not None:
+                        step_dict["data"] = [
+                            [row.values, row.comment] for row in step.data.to_list()
+                        ]
+                    steps.append(step_dict)
+                suite_file.write(
+                    json.dumps(
+                        {
+                            "name": flat_scenario.name,
+                            "comment": flat_scenario.comment,
+                            "tags": flat_scenario.tags,
+                            "steps": steps,
+                        }
+                    )
+                    + "\n"
+                )
+
+        return suite_file
+
+    def _read_binary_header(self) -> None:
+        """Reads the header and the feature description of a binary flat suite"""
+
+        (
+            _magic,
+            version,
+            _reserved,
+            self._string_count,
+            self._scenario_count,
+            name_id,
+            description_offset,
+            self._index_offset,
+            self._strings_offset,
+        ) = self.HEADER.unpack_from(self._buffer, 0)
+        if version != self.VERSION:
+            raise ValueError("Unsupported flat suite version: {}".format(version))
+
+        self.name = self._string(name_id)
+        (description_count,) = struct.unpack_from(
+            "<I", self._buffer, description_offset
+        )
+        self.description = [
+            str(self._string(string_id))
+            for string_id in struct.unpack_from(
+                "<{}I".format(description_count), self._buffer, description_offset + 4
+            )
+        ]
+
+    def _string(self, string_id: int) -> Optional[str]:
+        """Returns a string from the string table
+
+        Parameters
+        ----------
+        string_id : int
+            The id of the string
+
+        Returns
+        -------
+        str, optional
+            The string (None for the missing string id)
+        """
+
+        if string_id == self.NO_STRING:
+            return None
+        if string_id not in self._strings:
+            start, end = struct.unpack_from(
+                "<QQ", self._buffer, self._strings_offset + 8 * string_id
+            )
+            blob_offset: int = self._strings_offset + 8 * (self._string_count + 1)
+            self._strings[string_id] = self._buffer[
+                blob_offset + start : blob_offset + end
+            ].decode()
+        return self._strings[string_id]
+
+    def _read_binary_scenario(self, index: int) -> FlatScenario:
+        """Reads a flat scenario from a binary flat suite
+
+        Parameters
+        ----------
+        index : int
+            The position of the flat scenario
+
+        Returns
+        -------
+        FlatScenario
+            The flat scenario
+        """
+
+        (offset,) = struct.unpack_from(
+            "<Q", self._buffer, self._index_offset + 8 * index
+        )
+        name_id, comment_id, tag_count, step_count = struct.unpack_from(
+            "<IIII", self._buffer, offset
+        )
+        offset += 16
+        tags: List[str] = [
+            str(self._string(tag_id))
+            for tag_id in struct.unpack_from(
+                "<{}I".format(tag_count), self._buffer, offset
+            )
+        ]
+        offset += 4 * tag_count
+
+        steps: List[Step] = []
+        for _ in range(step_count):
+            code, step_name_id, step_comment_id, row_count, column_count = (
+                struct.unpack_from("<BIIII", self._buffer, offset)
+            )
+            offset += 17
+            step: Step = self.STEP_TYPES[self.STEP_CODES[code]](
+                self._string(step_name_id), comment=self._string(step_comment_id)
+            )
+            if row_count > 0:
+                cells: Tuple[int, ...] = struct.unpack_from(
+                    "<{}I".format(row_count * (column_count + 1)), self._buffer, offset
+                )
+                offset += 4 * len(cells)
+                rows: List[DataTableRow] = []
+                for row_num in range(row_count):
+                    row_cells = cells[
+                        row_num
+                        * (column_count + 1) : (row_num + 1)
+                        * (column_count + 1)
+                    ]
+                    rows.append(
+                        DataTableRow(
+                            [str(self._string(cell)) for cell in row_cells[:-1]],
+                            self._string(row_cells[-1]),
+                        )
+                    )
+                step.data = DataTable.from_rows(rows)
+            steps.append(step)
+
+        return FlatScenario(
+            str(self._string(name_id)),
+            steps,
+            comment=self._string(comment_id),
+            tags=tags,
+        )
+
+    def _read_ndjson_header(self) -> None:
+        """Reads the header line and indexes the line offsets of an NDJSON flat suite"""
+
+        line_end: int = self._buffer.find(b"\n")
+        header: Dict[str, Any] = json.loads(self._buffer[:line_end])
+        self.name = header["feature"]
+        self.description = header["description"]
+
+        # Index line offsets without decoding the scenario lines:
+        offset: int = line_end + 1
+        while offset < len(self._buffer):
+            self._line_offsets.append(offset)
+            line_end = self._buffer.find(b"\n", offset)
+            offset = len(self._buffer) if line_end == -1 else line_end + 1
+        self._line_offsets.append(len(self._buffer))
+        self._scenario_count = len(self._line_offsets) - 1
+
+    def _read_ndjson_scenario(self, index: int) -> FlatScenario:
+        """Reads a flat scenario from an NDJSON flat suite
+
+        Parameters
+        ----------
+        index : int
+            The position of the flat scenario
+
+        Returns
+        -------
+        FlatScenario
+            The flat scenario
+        """
+
+        scenario_dict: Dict[str, Any] = json.loads(
+            self._buffer[self._line_offsets[index] : self._line_offsets[index + 1]]
+        )
+        steps: List[Step] = []
+        for step_dict in scenario_dict["steps"]:
+            step: Step = self.STEP_TYPES[step_dict["type"]](
+                step_dict["name"], comment=step_dict["comment"]
+            )
+            if "data" in step_dict:
+                step.data = DataTable.from_rows(
+                    DataTableRow(values, comment)
+                    for values, comment in step_dict["data"]
+                )
+            steps.append(step)
+
+        return FlatScenario(
+            scenario_dict["name"],
+            steps,
+            comment=scenario_dict["comment"],
+            tags=scenario_dict["tags"],
+        )
+
+    def write_feature(self, file_path: str, write_comments: bool = False) -> OutputFile:
+        """Writes the flat suite as a flat feature file.
+
+        The flat feature file is replaced atomically, and only if its content
+        changed (see OutputFile).
+
+        Parameters
+        ----------
+        file_path : str
+            Path to flat feature file to be written
+
+        write_comments : bool, default = False
+            Whether or not to write comments
+
+        Returns
+        -------
+        OutputFile
+            The written flat feature file
+        """
+
+        with OutputFile(file_path) as output_file:
+            flat_file: TextIO = cast(TextIO, output_file)
+            if self.name is not None:
+                Feature.write_feature_declaration(flat_file, self)  # type: ignore
+            for flat_scenario in self:
+                Feature.write_flat_scenario(
+                    flat_file, flat_scenario, write_comments=write_comments
+                )
+
+        return output_file
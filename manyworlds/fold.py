@@ -0,0 +1,461 @@
+"""Defines the ScenarioTrie Class"""
+
+import hashlib
+from typing import Optional, List, Dict, Tuple, Iterable, Iterator, TextIO
+
+from .step import Step, Prerequisite, Action, Assertion
+from .data_table import DataTable
+from .flat_scenario import FlatScenario
+from .feature import Feature
+from .events import Event, EventParser
+from .exceptions import InvalidFeatureFileError
+
+FoldedScenario = Tuple[int, str, List[Step], Optional[str], List[str]]
+"""A scenario of a folded feature: level, name, steps, comment and tags"""
+
+
+class TrieNode:
+    """A node of a ScenarioTrie, representing one context step"""
+
+    __slots__ = ("step", "children", "flat_scenarios")
+
+    step: Optional[Step]
+    """The step (None for the root node)"""
+    children: Dict[bytes, "TrieNode"]
+    """The child nodes by step key, in insertion order"""
+    flat_scenarios: List[Tuple[FlatScenario, List[Step]]]
+    """The flat scenarios whose context ends here, with their remaining steps"""
+
+    def __init__(self, step: Optional[Step] = None) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        step : Step, optional
+            The step
+        """
+
+        self.step = step
+        self.children = {}
+        self.flat_scenarios = []
+
+
+class ScenarioTrie:
+    """A prefix trie over the steps of the scenarios of a flat feature file.
+
+    Folding the trie turns the shared "Given"/"When" prefixes of flat
+    scenarios into parent scenarios, producing an indented feature that
+    flattens ("strict" mode) back to flat scenarios with the same steps.
+    """
+
+    name: Optional[str]
+    """The name of the feature"""
+    description: List[str]
+    """The description lines of the feature"""
+    root: TrieNode
+    """The root node"""
+    flat_scenario_count: int
+    """The number of flat scenarios inserted"""
+    flat_step_count: int
+    """The number of steps of all flat scenarios inserted"""
+
+    def __init__(self) -> None:
+        """Constructor method"""
+
+        self.name = None
+        self.description = []
+        self.root = TrieNode()
+        self.flat_scenario_count = 0
+        self.flat_step_count = 0
+
+    @classmethod
+    def step_key(cls, step: Step) -> bytes:
+        """Returns the key of a step in the trie.
+
+        Steps with the same type, name and data table have the same key.
+
+        Parameters
+        ----------
+        step : Step
+            The step
+
+        Returns
+        -------
+        bytes
+            The key (a hash of the step)
+        """
+
+        hasher = hashlib.blake2b(digest_size=16)
+        step.update_hash(hasher)
+        return hasher.digest()
+
+    @classmethod
+    def split_steps(cls, steps: List[Step]) -> Tuple[List[Step], List[Step]]:
+        """Splits the steps of a flat scenario into the context steps
+        (leading "Given" steps followed by "When" steps) and the remaining steps.
+
+        Only context steps are shared with other scenarios, so that "strict"
+        flattening (which puts the "Given" steps of all ancestor scenarios
+        before their "When" steps) restores the original step order.
+
+        Parameters
+        ----------
+        steps : List[Step]
+            The steps of the flat scenario
+
+        Returns
+        -------
+        Tuple[List[Step], List[Step]]
+            The context steps and the remaining steps
+        """
+
+        context_length: int = 0
+        for step in steps:
+            if isinstance(step, Prerequisite) and (
+                context_length == 0
+                or isinstance(steps[context_length - 1], Prerequisite)
+            ):
+                context_length += 1
+            elif isinstance(step, Action):
+                context_length += 1
+            else:
+                break
+        return (steps[:context_length], steps[context_length:])
+
+    def insert(
+        self, flat_scenario: FlatScenario, line_no: Optional[int] = None
+    ) -> None:
+        """Inserts a flat scenario into the trie.
+
+        Flat scenarios without assertions ("Then" steps) are rejected:
+        they would fold into organizational scenarios, which are not flattened.
+
+        Parameters
+        ----------
+        flat_scenario : FlatScenario
+            The flat scenario
+
+        line_no : int, optional
+            The number of the flat scenario's line (starting at 1),
+            for error messages
+
+        Raises
+        ------
+        InvalidFeatureFileError
+            If the flat scenario has no assertions
+        """
+
+        if not any(isinstance(step, Assertion) for step in flat_scenario.steps):
+            raise InvalidFeatureFileError(
+                "Flat scenario without assertions{at_line}: Scenario: {name}".format(
+                    at_line="" if line_no is None else " at line {}".format(line_no),
+                    name=flat_scenario.name,
+                ),
+                line_no=line_no,
+            )
+
+        context: List[Step]
+        remaining: List[Step]
+        context, remaining = self.split_steps(flat_scenario.steps)
+
+        node: TrieNode = self.root
+        for step in context:
+            key: bytes = self.step_key(step)
+            child: Optional[TrieNode] = node.children.get(key)
+            if child is None:
+                child = node.children[key] = TrieNode(step)
+            node = child
+        node.flat_scenarios.append((flat_scenario, remaining))
+
+        self.flat_scenario_count += 1
+        self.flat_step_count += len(flat_scenario.steps)
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "ScenarioTrie":
+        """Builds a trie from the scenarios of a flat feature file.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the flat feature file
+
+        Returns
+        -------
+        ScenarioTrie
+            A new ScenarioTrie instance
+        """
+
+        with open(file_path) as flat_file:
+            return cls.from_lines(flat_file)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "ScenarioTrie":
+        """Builds a trie from the lines of a flat feature.
+
+        The lines are consumed lazily and each flat scenario is inserted
+        as soon as it is complete, without building a scenario graph.
+
+        Parameters
+        ----------
+        lines : Iterable[str]
+            The lines of the flat feature (with or without newlines)
+
+        Returns
+        -------
+        ScenarioTrie
+            A new ScenarioTrie instance
+        """
+
+        trie = ScenarioTrie()
+        flat_scenario: Optional[FlatScenario] = None
+        scenario_line_no: Optional[int] = None
+        for event in EventParser.events(cls.align_lines(lines)):
+            if event.kind == Event.FEATURE:
+                trie.name = event.name
+
+            elif event.kind == Event.DESCRIPTION:
+                trie.description.append(event.name)  # type: ignore
+
+            elif event.kind == Event.SCENARIO_OPEN:
+                if event.level != 1:
+                    raise InvalidFeatureFileError(
+                        "Indented scenario in flat feature file "
+                        "at line {line_no}: Scenario: {name}".format(
+                            line_no=event.line_no + 1, name=event.name
+                        ),
+                        line_no=event.line_no + 1,
+                    )
+                if flat_scenario is not None:
+                    trie.insert(flat_scenario, line_no=scenario_line_no)
+                scenario_line_no = event.line_no + 1
+                flat_scenario = FlatScenario(
+                    event.name,  # type: ignore
+                    [],
+                    comment=event.comment,
+                    tags=event.tags,
+                )
+
+            elif event.kind == Event.EXAMPLES:
+                raise InvalidFeatureFileError(
+                    "Examples in flat feature file at line {line_no}".format(
+                        line_no=event.line_no + 1
+                    ),
+                    line_no=event.line_no + 1,
+                )
+
+            elif event.kind == Event.EXTENDS:
+                raise InvalidFeatureFileError(
+                    "Extends line in flat feature file at line {line_no}".format(
+                        line_no=event.line_no + 1
+                    ),
+                    line_no=event.line_no + 1,
+                )
+
+            elif event.kind in [Event.SUBTREE, Event.INCLUDE]:
+                raise InvalidFeatureFileError(
+                    "Subtree in flat feature file at line {line_no}".format(
+                        line_no=event.line_no + 1
+                    ),
+                    line_no=event.line_no + 1,
+                )
+
+            elif event.kind == Event.STEP:
+                flat_scenario.steps.append(event.step)  # type: ignore
+
+            elif event.kind == Event.TABLE_ROW:
+                last_step: Step = flat_scenario.steps[-1]  # type: ignore
+                if last_step.data:
+                    last_step.data.append(
+                        event.row, line_no=event.line_no + 1  # type: ignore
+                    )
+                else:
+                    last_step.data = DataTable(event.row)  # type: ignore
+
+        if flat_scenario is not None:
+            trie.insert(flat_scenario, line_no=scenario_line_no)
+        return trie
+
+    @classmethod
+    def align_lines(cls, lines: Iterable[str]) -> Iterator[str]:
+        """Removes the partial indentation of the "And" and "But" steps
+        of flat feature files (" And …"), which is not a valid indentation level.
+
+        Parameters
+        ----------
+        lines : Iterable[str]
+            The lines of the flat feature
+
+        Returns
+        -------
+        Iterator[str]
+            The aligned lines
+        """
+
+        for line in lines:
+            indentation: int = len(line) - len(line.lstrip(" "))
+            yield line[indentation:] if indentation < Feature.TAB_SIZE else line
+
+    def folded_scenarios(self) -> Iterator[FoldedScenario]:
+        """Yields the scenarios of the folded (indented) feature.
+
+        Chains of trie nodes without branches become a single scenario.
+        A shared prefix becomes the scenario of the first flat scenario
+        ending there if that flat scenario's remaining steps are all "Then"
+        steps, and an organizational scenario named after its last step otherwise.
+
+        Returns
+        -------
+        Iterator[FoldedScenario]
+            The scenarios in file order (depth first)
+        """
+
+        # Flat scenarios without context steps:
+        for flat_scenario, remaining in self.root.flat_scenarios:
+            yield self.folded_scenario(1, flat_scenario, remaining)
+
+        # Stack of (level, node, steps since the parent scenario):
+        stack: List[Tuple[int, TrieNode, List[Step]]] = [
+            (1, child, [child.step])  # type: ignore
+            for child in reversed(self.root.children.values())
+        ]
+        while len(stack) > 0:
+            level, node, segment = stack.pop()
+            children: List[TrieNode] = list(node.children.values())
+            terminals: List[Tuple[FlatScenario, List[Step]]] = node.flat_scenarios
+
+            # Follow chains of context steps shared by a single flat scenario:
+            if len(terminals) == 0 and len(children) == 1:
+                stack.append((level, children[0], segment + [children[0].step]))  # type: ignore
+                continue
+
+            if len(terminals) == 1 and len(children) == 0:
+                # A single flat scenario (leaf):
+                yield self.folded_scenario(
+                    level, terminals[0][0], segment + terminals[0][1]
+                )
+                continue
+
+            # Scenario for the shared prefix:
+            primary_index: Optional[int] = next(
+                (
+                    index
+                    for index, (_, remaining) in enumerate(terminals)
+                    if len(remaining) > 0
+                    and all(isinstance(st, Assertion) for st in remaining)
+                ),
+                None,
+            )
+            if primary_index is not None:
+                flat_scenario, remaining = terminals[primary_index]
+                yield self.folded_scenario(level, flat_scenario, segment + remaining)
+                terminals = terminals[:primary_index] + terminals[primary_index + 1 :]
+            else:
+                # Organizational scenario:
+                yield (level, segment[-1].name, segment, None, [])
+
+            # Flat scenarios without further context steps:
+            for flat_scenario, remaining in terminals:
+                yield self.folded_scenario(level + 1, flat_scenario, remaining)
+
+            # Scenarios sharing further context steps (pushed in reverse order):
+            for child in reversed(children):
+                stack.append((level + 1, child, [child.step]))  # type: ignore
+
+    @classmethod
+    def folded_scenario(
+        cls, level: int, flat_scenario: FlatScenario, steps: List[Step]
+    ) -> FoldedScenario:
+        """Returns the folded scenario for a flat scenario
+
+        Parameters
+        ----------
+        level : int
+            The level of the folded scenario
+
+        flat_scenario : FlatScenario
+            The flat scenario
+
+        steps : List[Step]
+            The steps of the folded scenario
+
+        Returns
+        -------
+        FoldedScenario
+            The folded scenario
+        """
+
+        return (
+            level,
+            flat_scenario.name,
+            steps,
+            flat_scenario.comment,
+            flat_scenario.tags,
+        )
+
+    def write(self, file_path: str, write_comments: bool = False) -> Tuple[int, int]:
+        """Writes the folded (indented) feature file.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the indented feature file to be written
+
+        write_comments : bool, default = False
+            Whether or not to write comments
+
+        Returns
+        -------
+        Tuple[int, int]
+            The number of scenarios and the number of steps
+            of the indented feature file
+        """
+
+        with open(file_path, "w") as indented_file:
+            return self.write_to(indented_file, write_comments=write_comments)
+
+    def write_to(
+        self, file_handle: TextIO, write_comments: bool = False
+    ) -> Tuple[int, int]:
+        """Writes the folded (indented) feature to a file handle.
+
+        Parameters
+        ----------
+        file_handle : TextIO
+            The file to write to
+
+        write_comments : bool, default = False
+            Whether or not to write comments
+
+        Returns
+        -------
+        Tuple[int, int]
+            The number of scenarios and the number of steps
+            of the indented feature
+        """
+
+        Feature.write_feature_declaration(file_handle, self)  # type: ignore
+
+        scenario_count: int = 0
+        step_count: int = 0
+        for level, name, steps, comment, tags in self.folded_scenarios():
+            indentation: str = " " * (Feature.TAB_SIZE * (level - 1))
+            if len(tags) > 0:
+                file_handle.write(indentation + " ".join(tags) + "\n")
+            scenario_string: str = "{indentation}Scenario: {name}".format(
+                indentation=indentation, name=name
+            )
+            if write_comments is True and comment is not None:
+                scenario_string += " # {comment}".format(comment=comment)
+            file_handle.write(scenario_string + "\n")
+            Feature.write_scenario_steps(
+                file_handle,
+                steps,
+                write_comments=write_comments,
+                indentation=indentation,
+            )
+            file_handle.write("\n")
+
+            scenario_count += 1
+            step_count += len(steps)
+
+        return (scenario_count, step_count)
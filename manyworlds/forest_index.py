@@ -0,0 +1,332 @@
+"""Defines the ForestIndex Class"""
+
+from typing import Optional, List
+
+try:
+    import numpy as np
+except ImportError as error:  # pragma: no cover
+    raise ImportError(
+        "The forest index requires NumPy: pip install manyworlds[index]"
+    ) from error
+
+from .scenario import Scenario
+from .step import Prerequisite, Action, Assertion
+
+
+class ForestIndex:
+    """A compact, array-backed index of the scenario trees of a feature.
+
+    Each array has one entry per scenario, by vertex index. Missing relatives
+    are represented by -1. Queries on the index are vectorized (NumPy),
+    so they do not call methods of individual scenarios.
+    """
+
+    parent: np.ndarray
+    """The vertex index of each scenario's parent"""
+    depth: np.ndarray
+    """The depth of each scenario (0 for root scenarios, Scenario.level() - 1)"""
+    first_child: np.ndarray
+    """The vertex index of each scenario's first child"""
+    next_sibling: np.ndarray
+    """The vertex index of each scenario's next sibling"""
+    preorder: np.ndarray
+    """The position of each scenario in a depth-first pre-order traversal"""
+    postorder: np.ndarray
+    """The position of each scenario in a depth-first post-order traversal"""
+    subtree_size: np.ndarray
+    """The number of scenarios in each scenario's subtree (including itself)"""
+    given_count: np.ndarray
+    """The number of "Given" steps of each scenario"""
+    when_count: np.ndarray
+    """The number of "When" steps of each scenario"""
+    then_count: np.ndarray
+    """The number of "Then" steps of each scenario"""
+    _scenarios: np.ndarray
+    _order: np.ndarray
+
+    def __init__(self, scenarios: List[Scenario], parent: np.ndarray) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        scenarios : List[Scenario]
+            All scenarios, by vertex index
+
+        parent : numpy.ndarray
+            The vertex index of each scenario's parent (-1 for root scenarios)
+        """
+
+        count: int = len(scenarios)
+        self._scenarios = np.empty(count, dtype=object)
+        self._scenarios[:] = scenarios
+        self.parent = parent.astype(np.int64)
+
+        self.given_count = np.fromiter(
+            (len(sc.steps_of_type(Prerequisite)) for sc in scenarios),
+            dtype=np.int64,
+            count=count,
+        )
+        self.when_count = np.fromiter(
+            (len(sc.steps_of_type(Action)) for sc in scenarios),
+            dtype=np.int64,
+            count=count,
+        )
+        self.then_count = np.fromiter(
+            (len(sc.steps_of_type(Assertion)) for sc in scenarios),
+            dtype=np.int64,
+            count=count,
+        )
+
+        # Depth (one iteration per level):
+        self.depth = np.zeros(count, dtype=np.int64)
+        ancestor: np.ndarray = self.parent.copy()
+        while (has_ancestor := ancestor >= 0).any():
+            self.depth += has_ancestor
+            ancestor = np.where(has_ancestor, self.parent[ancestor], -1)
+
+        # First child and next sibling (children in vertex index order):
+        children: np.ndarray = np.flatnonzero(self.parent >= 0)
+        children = children[np.argsort(self.parent[children], kind="stable")]
+        child_parents: np.ndarray = self.parent[children]
+        self.first_child = np.full(count, -1, dtype=np.int64)
+        self.next_sibling = np.full(count, -1, dtype=np.int64)
+        if len(children) > 0:
+            group_start: np.ndarray = np.ones(len(children), dtype=bool)
+            group_start[1:] = child_parents[1:] != child_parents[:-1]
+            self.first_child[child_parents[group_start]] = children[group_start]
+            same_parent: np.ndarray = ~group_start[1:]
+            self.next_sibling[children[:-1][same_parent]] = children[1:][same_parent]
+
+        # Subtree sizes (one iteration per level, deepest first):
+        self.subtree_size = np.ones(count, dtype=np.int64)
+        for level_depth in range(int(self.depth.max(initial=0)), 0, -1):
+            at_depth: np.ndarray = np.flatnonzero(self.depth == level_depth)
+            np.add.at(
+                self.subtree_size, self.parent[at_depth], self.subtree_size[at_depth]
+            )
+
+        # Pre-order and post-order:
+        self.preorder = self.compute_preorder()
+        self._order = np.empty(count, dtype=np.int64)
+        self._order[self.preorder] = np.arange(count)
+        self.postorder = self.preorder - self.depth + self.subtree_size - 1
+
+    @classmethod
+    def from_feature(cls, feature) -> "ForestIndex":  # type: ignore
+        """Builds the index for the scenario trees of a feature.
+
+        Parameters
+        ----------
+        feature : Feature
+            The feature
+
+        Returns
+        -------
+        ForestIndex
+            A new ForestIndex instance
+        """
+
+        scenarios: List[Scenario] = feature.scenarios()
+        parent: np.ndarray = np.full(len(scenarios), -1, dtype=np.int64)
+        edges: np.ndarray = np.array(feature.graph.get_edgelist(), dtype=np.int64)
+        if len(edges) > 0:
+            parent[edges[:, 1]] = edges[:, 0]
+        return ForestIndex(scenarios, parent)
+
+    def compute_preorder(self) -> np.ndarray:
+        """Computes the position of each scenario in a pre-order traversal.
+
+        For parsed features, vertex index order (file order) is a pre-order,
+        which is detected without a traversal.
+
+        Returns
+        -------
+        numpy.ndarray
+            The pre-order position of each scenario
+        """
+
+        count: int = len(self.parent)
+        indices: np.ndarray = np.arange(count)
+
+        # Vertex index order is a pre-order if each subtree is a contiguous
+        # range of vertex indices starting at its root:
+        last_descendant: np.ndarray = indices.copy()
+        for level_depth in range(int(self.depth.max(initial=0)), 0, -1):
+            at_depth: np.ndarray = np.flatnonzero(self.depth == level_depth)
+            np.maximum.at(
+                last_descendant, self.parent[at_depth], last_descendant[at_depth]
+            )
+        if (self.parent < indices).all() and (
+            last_descendant - indices + 1 == self.subtree_size
+        ).all():
+            return indices
+
+        # Otherwise, traverse the trees:
+        preorder: np.ndarray = np.empty(count, dtype=np.int64)
+        stack: List[int] = list(np.flatnonzero(self.parent < 0)[::-1])
+        position: int = 0
+        while len(stack) > 0:
+            index: int = stack.pop()
+            preorder[index] = position
+            position += 1
+            child: int = int(self.first_child[index])
+            children: List[int] = []
+            while child >= 0:
+                children.append(child)
+                child = int(self.next_sibling[child])
+            stack += children[::-1]
+        return preorder
+
+    def __len__(self) -> int:
+        """Returns the number of scenarios
+
+        Returns
+        -------
+        int
+            The number of scenarios
+        """
+
+        return len(self.parent)
+
+    def scenarios(self, indices: np.ndarray) -> List[Scenario]:
+        """Returns the scenarios for vertex indices
+
+        Parameters
+        ----------
+        indices : numpy.ndarray
+            Vertex indices
+
+        Returns
+        -------
+        List[Scenario]
+            The scenarios
+        """
+
+        return list(self._scenarios[indices])
+
+    def roots(self) -> np.ndarray:
+        """Returns the vertex indices of the root scenarios
+
+        Returns
+        -------
+        numpy.ndarray
+            The vertex indices, in index order
+        """
+
+        return np.flatnonzero(self.parent < 0)
+
+    def leaves(self) -> np.ndarray:
+        """Returns the vertex indices of the leaf scenarios
+
+        Returns
+        -------
+        numpy.ndarray
+            The vertex indices, in index order
+        """
+
+        return np.flatnonzero(self.first_child < 0)
+
+    def root_scenarios(self) -> List[Scenario]:
+        """Returns the root scenarios
+
+        Returns
+        -------
+        List[Scenario]
+            All root scenarios in index order
+        """
+
+        return self.scenarios(self.roots())
+
+    def leaf_scenarios(self) -> List[Scenario]:
+        """Returns the leaf scenarios
+
+        Returns
+        -------
+        List[Scenario]
+            All leaf scenarios in index order
+        """
+
+        return self.scenarios(self.leaves())
+
+    def descendants(self, index: int) -> np.ndarray:
+        """Returns the vertex indices of a scenario's subtree
+
+        Parameters
+        ----------
+        index : int
+            The vertex index of the scenario
+
+        Returns
+        -------
+        numpy.ndarray
+            The vertex indices of the scenario and its descendants, in pre-order
+        """
+
+        start: int = int(self.preorder[index])
+        return self._order[start : start + int(self.subtree_size[index])]
+
+    def is_ancestor(self, ancestors: np.ndarray, descendants: np.ndarray) -> np.ndarray:
+        """Returns whether scenarios are ancestors (or the same scenario)
+        of other scenarios, pairwise.
+
+        Parameters
+        ----------
+        ancestors : numpy.ndarray
+            Vertex indices of potential ancestors
+
+        descendants : numpy.ndarray
+            Vertex indices of potential descendants
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean array
+        """
+
+        return (self.preorder[ancestors] <= self.preorder[descendants]) & (
+            self.postorder[descendants] <= self.postorder[ancestors]
+        )
+
+    def prefix_costs(self, costs: Optional[np.ndarray] = None) -> np.ndarray:
+        """Returns the cumulative cost along the path from the root scenario
+        to each scenario (including the scenario itself).
+
+        Computed with a single cumulative sum over the pre-order:
+        each scenario's cost is added at the start of its subtree
+        and subtracted at its end.
+
+        Parameters
+        ----------
+        costs : numpy.ndarray, optional
+            The cost of each scenario (default: its number of steps)
+
+        Returns
+        -------
+        numpy.ndarray
+            The cumulative cost of each scenario
+        """
+
+        if costs is None:
+            costs = self.given_count + self.when_count + self.then_count
+        deltas: np.ndarray = np.zeros(len(self) + 1, dtype=np.asarray(costs).dtype)
+        np.add.at(deltas, self.preorder, costs)
+        np.add.at(deltas, self.preorder + self.subtree_size, -np.asarray(costs))
+        return np.cumsum(deltas)[self.preorder]
+
+    def strict_step_counts(self) -> np.ndarray:
+        """Returns the number of steps of each scenario's "strict" flat scenario
+        (the "Given" and "When" steps of its ancestors and all of its own steps).
+
+        Returns
+        -------
+        numpy.ndarray
+            The step count of each scenario's flat scenario
+        """
+
+        own_steps: np.ndarray = self.given_count + self.when_count + self.then_count
+        return (
+            self.prefix_costs(self.given_count + self.when_count)
+            - self.given_count
+            - self.when_count
+            + own_steps
+        )
@@ -0,0 +1,183 @@
+"""Defines the Ledger Class"""
+
+import sqlite3
+import time
+from typing import Optional, Iterable, Tuple, Set, Any
+
+
+class Ledger:
+    """A local pass/fail ledger of flat scenario results.
+
+    Results are keyed by flat scenario fingerprint (see FlatScenario.fingerprint)
+    and appended to an SQLite database. Only the most recent result for a
+    fingerprint counts. Use compact() to drop superseded results.
+    """
+
+    file_path: str
+    """The path to the ledger database file"""
+    connection: sqlite3.Connection
+    """The database connection"""
+
+    def __init__(self, file_path: str) -> None:
+        """Constructor method
+
+        Opens (and if necessary creates) the ledger database.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the ledger database file
+        """
+
+        self.file_path = file_path
+        self.connection = sqlite3.connect(file_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id INTEGER PRIMARY KEY, "
+            "fingerprint TEXT NOT NULL, "
+            "passed INTEGER NOT NULL, "
+            "recorded_at REAL NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS results_by_fingerprint "
+            "ON results (fingerprint, id)"
+        )
+        self.connection.commit()
+
+    def __enter__(self) -> "Ledger":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the database connection"""
+
+        self.connection.close()
+
+    def record(self, fingerprint: str, passed: bool) -> None:
+        """Records the result of running a flat scenario.
+
+        Parameters
+        ----------
+        fingerprint : str
+            The fingerprint of the flat scenario
+
+        passed : bool
+            Whether or not the flat scenario passed
+        """
+
+        self.record_many([(fingerprint, passed)])
+
+    def record_many(self, results: Iterable[Tuple[str, bool]]) -> None:
+        """Records the results of running several flat scenarios
+        in a single transaction.
+
+        Parameters
+        ----------
+        results : Iterable[Tuple[str, bool]]
+            Fingerprints and whether or not the flat scenarios passed
+        """
+
+        recorded_at: float = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO results (fingerprint, passed, recorded_at) "
+                "VALUES (?, ?, ?)",
+                (
+                    (fingerprint, int(passed), recorded_at)
+                    for fingerprint, passed in results
+                ),
+            )
+
+    def result(self, fingerprint: str) -> Optional[bool]:
+        """Returns the most recent result for a flat scenario.
+
+        Parameters
+        ----------
+        fingerprint : str
+            The fingerprint of the flat scenario
+
+        Returns
+        -------
+        bool, optional
+            Whether or not the flat scenario passed (None if never recorded)
+        """
+
+        row: Optional[Tuple[int]] = self.connection.execute(
+            "SELECT passed FROM results WHERE fingerprint = ? "
+            "ORDER BY id DESC LIMIT 1",
+            (fingerprint,),
+        ).fetchone()
+        return None if row is None else bool(row[0])
+
+    def verified_fingerprints(self) -> Set[str]:
+        """Returns the fingerprints of all flat scenarios
+        whose most recent result is a pass.
+
+        Returns
+        -------
+        Set[str]
+            The fingerprints
+        """
+
+        return {
+            fingerprint
+            for (fingerprint,) in self.connection.execute(
+                "SELECT fingerprint FROM results AS r "
+                "WHERE passed = 1 AND id = ("
+                "SELECT MAX(id) FROM results WHERE fingerprint = r.fingerprint)"
+            )
+        }
+
+    def is_verified(self, fingerprint: str) -> bool:
+        """Returns whether the most recent result for a flat scenario is a pass.
+
+        Parameters
+        ----------
+        fingerprint : str
+            The fingerprint of the flat scenario
+
+        Returns
+        -------
+        bool
+            Whether or not the flat scenario is verified
+        """
+
+        return self.result(fingerprint) is True
+
+    def compact(self, keep: Optional[Iterable[str]] = None) -> int:
+        """Drops superseded results and reclaims disk space.
+
+        Parameters
+        ----------
+        keep : Iterable[str], optional
+            If given, results for all other fingerprints are dropped as well
+            (for example those of flat scenarios that no longer exist)
+
+        Returns
+        -------
+        int
+            The number of results dropped
+        """
+
+        with self.connection:
+            dropped: int = self.connection.execute(
+                "DELETE FROM results WHERE id NOT IN ("
+                "SELECT MAX(id) FROM results GROUP BY fingerprint)"
+            ).rowcount
+            if keep is not None:
+                self.connection.execute(
+                    "CREATE TEMPORARY TABLE keep (fingerprint TEXT PRIMARY KEY)"
+                )
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO keep VALUES (?)",
+                    ((fingerprint,) for fingerprint in keep),
+                )
+                dropped += self.connection.execute(
+                    "DELETE FROM results "
+                    "WHERE fingerprint NOT IN (SELECT fingerprint FROM keep)"
+                ).rowcount
+                self.connection.execute("DROP TABLE keep")
+        self.connection.execute("VACUUM")
+        return dropped
@@ -0,0 +1,265 @@
+"""Defines the OutputFile Class"""
+
+import hashlib
+import os
+import stat
+import tempfile
+from types import TracebackType
+from typing import Optional, List, BinaryIO, Type, Union, cast
+
+
+class OutputFile:
+    """A text (or binary) file written atomically, and only if its content
+    changed.
+
+    Written text is collected into large chunks, which are written to a
+    temporary file next to the output file. When the OutputFile is closed,
+    the temporary file replaces the output file (atomically, with
+    os.replace) unless the output file already has the same content, in which
+    case the output file is left alone (its modification time included).
+    A failed write leaves the output file alone, too.
+
+    Symbolic links are followed: the file they point to is replaced.
+    Output paths that are not regular files (named pipes, "/dev/stdout")
+    are written to directly.
+
+    Usage:
+
+        with OutputFile("flat.feature") as flat_file:
+            flat_file.write("Feature: ...\\n")
+        flat_file.changed  # False if flat.feature was up to date
+
+    Binary files are written the same way, with binary=True and bytes.
+    """
+
+    CHUNK_SIZE: int = 1 << 20
+    """
+    int
+
+    The number of characters (or bytes) collected before they are written
+    to the temporary file
+    """
+
+    file_path: str
+    """The path to the output file"""
+    encoding: str
+    """The encoding of the output file"""
+    binary: bool
+    """Whether or not bytes are written rather than text"""
+    size: int
+    """The size (bytes) of the content written so far"""
+    changed: Optional[bool]
+    """Whether or not the output file was replaced
+    (None until the OutputFile is closed)"""
+    direct: bool
+    """Whether or not the output path is written to directly
+    (because it is not a regular file)"""
+
+    _chunks: List[Union[str, bytes]]
+    _chunk_length: int
+    _temp_file: Optional[BinaryIO]
+    _temp_path: Optional[str]
+    _target_path: str
+    _hash: "hashlib.blake2b"
+
+    def __init__(
+        self, file_path: str, encoding: str = "utf-8", binary: bool = False
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the output file
+
+        encoding : str, default = "utf-8"
+            The encoding of the output file
+
+        binary : bool, default = False
+            Whether or not bytes are written rather than text
+        """
+
+        self.file_path = file_path
+        self.encoding = encoding
+        self.binary = binary
+        self.size = 0
+        self.changed = None
+        self.direct = False
+        self._chunks = []
+        self._chunk_length = 0
+        self._temp_file = None
+        self._temp_path = None
+        self._target_path = file_path
+        self._hash = hashlib.blake2b(digest_size=16)
+
+    @property
+    def bytes_written(self) -> int:
+        """The number of bytes written to the output file
+        (0 if it was left alone)
+
+        Returns
+        -------
+        int
+            The number of bytes written
+        """
+
+        return self.size if self.changed else 0
+
+    def open(self) -> "OutputFile":
+        """Creates the temporary file next to the file the output path
+        points to, or opens the output path if it is not a regular file
+
+        Returns
+        -------
+        OutputFile
+            The OutputFile instance
+        """
+
+        if os.path.exists(self.file_path) and not os.path.isfile(self.file_path):
+            self.direct = True
+            self._temp_file = open(self.file_path, "wb")
+            return self
+
+        self._target_path = os.path.realpath(self.file_path)
+        file_descriptor, self._temp_path = tempfile.mkstemp(
+            prefix=".{}.".format(os.path.basename(self._target_path)),
+            suffix=".tmp",
+            dir=os.path.dirname(self._target_path),
+        )
+        self._temp_file = os.fdopen(file_descriptor, "wb")
+        return self
+
+    def write(self, text: Union[str, bytes]) -> int:
+        """Writes text (or bytes, if the output file is binary)
+
+        Parameters
+        ----------
+        text : str or bytes
+            The text or bytes
+
+        Returns
+        -------
+        int
+            The number of characters (or bytes) written
+        """
+
+        self._chunks.append(text)
+        self._chunk_length += len(text)
+        if self._chunk_length >= self.CHUNK_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        """Writes the collected text to the temporary file"""
+
+        if self._temp_file is None:
+            self.open()
+        data: bytes = (
+            b"".join(cast(List[bytes], self._chunks))
+            if self.binary
+            else "".join(cast(List[str], self._chunks)).encode(self.encoding)
+        )
+        self._chunks = []
+        self._chunk_length = 0
+        self._hash.update(data)
+        self._temp_file.write(data)  # type: ignore
+        self.size += len(data)
+
+    def close(self) -> None:
+        """Replaces the output file with the temporary file
+        if their content differs, and removes the temporary file otherwise
+        """
+
+        self.flush()
+        self._temp_file.close()  # type: ignore
+        if self.direct:
+            self.changed = True
+            return
+        if self.matches_output_file():
+            os.remove(self._temp_path)  # type: ignore
+            self.changed = False
+            return
+
+        # Files created by mkstemp are only accessible to their owner:
+        if os.path.exists(self._target_path):
+            mode: int = stat.S_IMODE(os.stat(self._target_path).st_mode)
+        else:
+            umask: int = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(self._temp_path, mode)  # type: ignore
+        os.replace(self._temp_path, self._target_path)  # type: ignore
+        self.changed = True
+
+    def discard(self) -> None:
+        """Removes the temporary file, leaving the output file alone
+        (unless it is written to directly)"""
+
+        if self._temp_file is not None:
+            self._temp_file.close()
+            if not self.direct:
+                os.remove(self._temp_path)  # type: ignore
+            self._temp_file = None
+        self.changed = self.direct
+
+    def matches_output_file(self) -> bool:
+        """Returns whether or not the output file has the content
+        written so far
+
+        Returns
+        -------
+        bool
+            Whether or not the output file has the written content
+        """
+
+        if (
+            not os.path.isfile(self._target_path)
+            or os.path.getsize(self._target_path) != self.size
+        ):
+            return False
+        output_hash = hashlib.blake2b(digest_size=16)
+        with open(self._target_path, "rb") as output_file:
+            while True:
+                data: bytes = output_file.read(self.CHUNK_SIZE)
+                if not data:
+                    break
+                output_hash.update(data)
+        return output_hash.digest() == self._hash.digest()
+
+    def __enter__(self) -> "OutputFile":
+        return self.open()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def __str__(self) -> str:
+        """Returns a string representation of the OutputFile instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the OutputFile instance
+        """
+
+        return "<OutputFile: {}>".format(self.file_path)
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the OutputFile instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the OutputFile instance
+        """
+
+        return self.__str__()
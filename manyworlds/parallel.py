@@ -0,0 +1,504 @@
+"""Defines functions for flattening the root scenario trees of a feature
+one at a time or in parallel"""
+
+import functools
+import io
+import multiprocessing
+import os
+from typing import (
+    Optional,
+    Literal,
+    List,
+    Tuple,
+    Iterable,
+    Iterator,
+    Union,
+    Set,
+    Dict,
+    TextIO,
+    cast,
+)
+
+from .feature import Feature
+from .scenario import Scenario
+from .subtree import Subtree
+from .feature_cache import FeatureCache
+from .ledger import Ledger
+from .tag_expression import TagExpression
+from .output import OutputFile
+
+Chunk = Tuple[int, List[str]]
+"""A part of a feature file: the number of its first line (starting at 0)
+and its lines"""
+
+ROOT_LINE_PREFIXES: Tuple[str, ...] = ("Scenario:", "Scenario Outline:", "Subtree:")
+"""The beginnings of lines starting a root scenario tree or subtree declaration"""
+
+BATCH_LINES: int = 1000
+"""The minimum number of lines per batch of root scenario trees"""
+
+_worker_subtrees: Dict[str, Subtree] = {}
+"""The subtrees parsed by init_worker, once per process"""
+
+
+def split_root_trees(lines: Iterable[str]) -> Iterator[Chunk]:
+    """Splits the lines of an indented feature at root scenarios
+    and subtree declarations.
+
+    The first chunk holds the lines preceding the first root scenario
+    (feature name and description), each further chunk holds one root
+    scenario tree or subtree declaration. Tag, comment and empty lines
+    directly preceding a root scenario belong to the root scenario's chunk.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        The lines of the indented feature (with newlines)
+
+    Returns
+    -------
+    Iterator[Chunk]
+        The chunks, in file order
+    """
+
+    start_line_no: int = 0
+    chunk_lines: List[str] = []
+    leading_line_count: int = 0  # trailing tag, comment and empty lines
+    for line in lines:
+        if line.startswith(ROOT_LINE_PREFIXES):
+            split_at: int = len(chunk_lines) - leading_line_count
+            yield (start_line_no, chunk_lines[:split_at])
+            start_line_no += split_at
+            chunk_lines = chunk_lines[split_at:]
+            leading_line_count = 0
+        elif (
+            line.strip() == ""
+            or Scenario.TAGS_PATTERN.match(line.rstrip("\n")) is not None
+            or Feature.COMMENT_PATTERN.match(line.rstrip("\n")) is not None
+        ):
+            leading_line_count += 1
+        else:
+            leading_line_count = 0
+        chunk_lines.append(line)
+    yield (start_line_no, chunk_lines)
+
+
+def divert_subtrees(
+    chunks: Iterable[Chunk], subtree_chunks: List[Chunk]
+) -> Iterator[Chunk]:
+    """Removes the subtree declarations from a sequence of chunks.
+
+    Parameters
+    ----------
+    chunks : Iterable[Chunk]
+        The chunks returned by split_root_trees (without the first chunk)
+
+    subtree_chunks : List[Chunk]
+        Receives the subtree declarations as they are encountered
+
+    Returns
+    -------
+    Iterator[Chunk]
+        The root scenario trees, in file order
+    """
+
+    for chunk in chunks:
+        # The first root line of a chunk (preceded by tag, comment
+        # and empty lines only):
+        root_line: str = next(
+            (line for line in chunk[1] if line.startswith(ROOT_LINE_PREFIXES)), ""
+        )
+        if root_line.startswith("Subtree:"):
+            subtree_chunks.append(chunk)
+        else:
+            yield chunk
+
+
+def parse_subtrees(
+    subtree_chunks: Iterable[Chunk], subtrees: Optional[Dict[str, Subtree]] = None
+) -> Dict[str, Subtree]:
+    """Parses subtree declarations.
+
+    Parameters
+    ----------
+    subtree_chunks : Iterable[Chunk]
+        The subtree declarations, in file order
+
+    subtrees : Dict[str, Subtree], optional
+        The subtrees parsed so far, which the subtree declarations
+        may reference. Receives the parsed subtrees
+
+    Returns
+    -------
+    Dict[str, Subtree]
+        The parsed subtrees, by name
+    """
+
+    if subtrees is None:
+        subtrees = {}
+    for start_line_no, lines in subtree_chunks:
+        subtrees.update(
+            Feature.from_lines(
+                lines, start_line_no=start_line_no, subtrees=subtrees
+            ).subtrees
+        )
+    return subtrees
+
+
+def batch_root_trees(chunks: Iterable[Chunk], batch_lines: int) -> Iterator[Chunk]:
+    """Combines consecutive root scenario trees into batches
+    to reduce the overhead per task.
+
+    Parameters
+    ----------
+    chunks : Iterable[Chunk]
+        The root scenario trees, in file order
+
+    batch_lines : int
+        The minimum number of lines per batch (except for the last batch)
+
+    Returns
+    -------
+    Iterator[Chunk]
+        The batches, in file order
+    """
+
+    batch: Optional[Chunk] = None
+    for start_line_no, lines in chunks:
+        if batch is None:
+            batch = (start_line_no, lines)
+        else:
+            batch[1].extend(lines)
+        if len(batch[1]) >= batch_lines:
+            yield batch
+            batch = None
+    if batch is not None:
+        yield batch
+
+
+def flatten_chunk(
+    chunk: Chunk,
+    mode: Literal["strict", "relaxed"] = "strict",
+    write_comments: bool = False,
+    tags: Optional[Union[str, TagExpression]] = None,
+    verified_fingerprints: Optional[Set[str]] = None,
+    subtrees: Optional[Dict[str, Subtree]] = None,
+    import_file_path: Optional[str] = None,
+) -> str:
+    """Parses one or more root scenario trees and renders their flat scenarios.
+
+    Parameters
+    ----------
+    chunk : Chunk
+        The root scenario trees
+
+    mode : {"strict", "relaxed"}, default="strict"
+        Flattening mode. Either "strict" or "relaxed"
+
+    write_comments : bool, default = False
+        Whether or not to write comments
+
+    tags : str or TagExpression, optional
+        Only render scenarios matching this tag expression
+
+    verified_fingerprints : Set[str], optional
+        Skip flat scenarios with these fingerprints (see Ledger)
+
+    subtrees : Dict[str, Subtree], optional
+        The parsed subtree declarations the root scenario trees may
+        reference (see parse_subtrees)
+
+    import_file_path : str, optional
+        The path to the feature file, if it extends another feature file
+        (see resolved_header)
+
+    Returns
+    -------
+    str
+        The flat scenarios
+    """
+
+    start_line_no, lines = chunk
+    feature: Feature = Feature.from_lines(
+        lines, start_line_no=start_line_no, subtrees=subtrees
+    )
+    if import_file_path is not None:
+        header: Feature = resolved_header(
+            import_file_path, os.stat(import_file_path).st_mtime_ns
+        )
+        feature.extends = header.extends
+        feature.base_scenarios = header.base_scenarios
+        feature.update_fingerprints()
+    flat_file = io.StringIO()
+    for flat_scenario in feature.flat_scenarios(mode, tags=tags):
+        if (
+            verified_fingerprints is not None
+            and flat_scenario.fingerprint() in verified_fingerprints
+        ):
+            continue
+        Feature.write_flat_scenario(
+            flat_file, flat_scenario, write_comments=write_comments
+        )
+    return flat_file.getvalue()
+
+
+def read_subtree_chunks(input_path: str) -> List[Chunk]:
+    """Reads the subtree declarations of an indented feature file.
+
+    Parameters
+    ----------
+    input_path : str
+        Path to the indented feature file
+
+    Returns
+    -------
+    List[Chunk]
+        The subtree declarations, in file order
+    """
+
+    subtree_chunks: List[Chunk] = []
+    with open(input_path) as indented_file:
+        chunks: Iterator[Chunk] = split_root_trees(indented_file)
+        next(chunks)  # feature name and description
+        for _ in divert_subtrees(chunks, subtree_chunks):
+            pass
+    return subtree_chunks
+
+
+def init_worker(subtree_chunks: List[Chunk]) -> None:
+    """Parses the subtree declarations once per process (see flatten_task).
+
+    Parameters
+    ----------
+    subtree_chunks : List[Chunk]
+        The subtree declarations, in file order
+    """
+
+    global _worker_subtrees
+    _worker_subtrees = parse_subtrees(subtree_chunks)
+
+
+def flatten_task(chunk: Chunk, **kwargs) -> str:
+    """Renders the flat scenarios of a batch of root scenario trees
+    with the subtrees parsed by init_worker (see flatten_chunk).
+
+    Parameters
+    ----------
+    chunk : Chunk
+        The batch of root scenario trees
+
+    **kwargs
+        Keyword arguments for flatten_chunk
+
+    Returns
+    -------
+    str
+        The flat scenarios
+    """
+
+    return flatten_chunk(chunk, subtrees=_worker_subtrees, **kwargs)
+
+
+def parse_header(chunks: Iterator[Chunk]) -> Feature:
+    """Parses the lines preceding the first root scenario
+    (feature name and description).
+
+    Parameters
+    ----------
+    chunks : Iterator[Chunk]
+        The chunks returned by split_root_trees. The first chunk is consumed
+
+    Returns
+    -------
+    Feature
+        A Feature instance without scenarios
+    """
+
+    start_line_no, lines = next(chunks)
+    return Feature.from_lines(lines, start_line_no=start_line_no)
+
+
+@functools.lru_cache(maxsize=16)
+def resolved_header(file_path: str, mtime_ns: int) -> Feature:
+    """Parses the lines preceding the first root scenario of a feature file
+    and resolves its import (see FeatureCache.resolve).
+
+    The result is cached, so that each process parses the extended feature
+    files once.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the feature file
+
+    mtime_ns : int
+        The modification time of the feature file (part of the cache key)
+
+    Returns
+    -------
+    Feature
+        A Feature instance without scenarios
+    """
+
+    with open(file_path) as indented_file:
+        header: Feature = parse_header(split_root_trees(indented_file))
+    FeatureCache().resolve(header, file_path)
+    return header
+
+
+def flatten_streaming(
+    input_path: str,
+    output_path: str,
+    mode: Literal["strict", "relaxed"] = "strict",
+    write_comments: bool = False,
+    tags: Optional[Union[str, TagExpression]] = None,
+    ledger: Optional[Ledger] = None,
+) -> OutputFile:
+    """Writes a flat feature file for an indented feature file,
+    one root scenario tree at a time.
+
+    Each root scenario tree is parsed, flattened, written and discarded
+    before the next one is read, so memory use is bounded by the largest
+    root scenario tree (and the subtree declarations) rather than by the
+    size of the file. The subtree declarations are read and parsed once
+    up front, so that subtrees may be included before they are declared.
+    The output is the same as that of Feature.flatten.
+
+    Parameters
+    ----------
+    input_path : str
+        Path to the indented feature file
+
+    output_path : str
+        Path to the flat feature file to be written
+
+    mode : {"strict", "relaxed"}, default="strict"
+        Flattening mode. Either "strict" or "relaxed"
+
+    write_comments : bool, default = False
+        Whether or not to write comments
+
+    tags : str or TagExpression, optional
+        Only write scenarios matching this tag expression
+
+    ledger : Ledger, optional
+        Only write scenarios that are new, changed or previously failing
+        according to this ledger
+
+    Returns
+    -------
+    OutputFile
+        The written flat feature file
+    """
+
+    verified_fingerprints: Optional[Set[str]] = (
+        ledger.verified_fingerprints() if ledger is not None else None
+    )
+    subtrees: Dict[str, Subtree] = parse_subtrees(read_subtree_chunks(input_path))
+    with open(input_path) as indented_file, OutputFile(output_path) as output_file:
+        flat_file: TextIO = cast(TextIO, output_file)
+        chunks: Iterator[Chunk] = split_root_trees(indented_file)
+        header: Feature = parse_header(chunks)
+        if header.name is not None:
+            Feature.write_feature_declaration(flat_file, header)
+        import_file_path: Optional[str] = (
+            input_path if header.extends is not None else None
+        )
+
+        for chunk in divert_subtrees(chunks, []):
+            flat_file.write(
+                flatten_chunk(
+                    chunk,
+                    mode=mode,
+                    write_comments=write_comments,
+                    tags=tags,
+                    verified_fingerprints=verified_fingerprints,
+                    subtrees=subtrees,
+                    import_file_path=import_file_path,
+                )
+            )
+
+    return output_file
+
+
+def flatten_parallel(
+    input_path: str,
+    output_path: str,
+    mode: Literal["strict", "relaxed"] = "strict",
+    write_comments: bool = False,
+    tags: Optional[Union[str, TagExpression]] = None,
+    processes: Optional[int] = None,
+    batch_lines: int = BATCH_LINES,
+) -> OutputFile:
+    """Writes a flat feature file for an indented feature file,
+    parsing and flattening its root scenario trees in a process pool.
+
+    The subtree declarations are read up front and sent to each worker
+    process once. The output is the same as that of Feature.flatten.
+    Line numbers of InvalidFeatureFileErrors refer to the whole input file.
+
+    Parameters
+    ----------
+    input_path : str
+        Path to the indented feature file
+
+    output_path : str
+        Path to the flat feature file to be written
+
+    mode : {"strict", "relaxed"}, default="strict"
+        Flattening mode. Either "strict" or "relaxed"
+
+    write_comments : bool, default = False
+        Whether or not to write comments
+
+    tags : str or TagExpression, optional
+        Only write scenarios matching this tag expression
+
+    processes : int, optional
+        The number of worker processes (default: the number of CPUs).
+        No worker processes are started if 1
+
+    batch_lines : int, default = BATCH_LINES
+        The minimum number of lines per task
+
+    Returns
+    -------
+    OutputFile
+        The written flat feature file
+    """
+
+    # Parsed here first, so that errors are raised before workers start:
+    subtree_chunks: List[Chunk] = read_subtree_chunks(input_path)
+    init_worker(subtree_chunks)
+
+    with open(input_path) as indented_file:
+        chunks: Iterator[Chunk] = split_root_trees(indented_file)
+        header: Feature = parse_header(chunks)
+
+        render = functools.partial(
+            flatten_task,
+            mode=mode,
+            write_comments=write_comments,
+            tags=tags,
+            import_file_path=input_path if header.extends is not None else None,
+        )
+        batches: Iterator[Chunk] = batch_root_trees(
+            divert_subtrees(chunks, []), batch_lines
+        )
+        with OutputFile(output_path) as output_file:
+            flat_file: TextIO = cast(TextIO, output_file)
+            if header.name is not None:
+                Feature.write_feature_declaration(flat_file, header)
+
+            if processes == 1:
+                for batch in batches:
+                    flat_file.write(render(batch))
+            else:
+                with multiprocessing.Pool(
+                    processes, initializer=init_worker, initargs=(subtree_chunks,)
+                ) as pool:
+                    # Results are returned in file order:
+                    for flat_scenarios in pool.imap(render, batches):
+                        flat_file.write(flat_scenarios)
+
+    return output_file
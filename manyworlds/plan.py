@@ -0,0 +1,420 @@
+"""Defines the FlatteningPlan Class"""
+
+from typing import (
+    Optional,
+    List,
+    Dict,
+    Set,
+    Tuple,
+    Sequence,
+    Callable,
+    TYPE_CHECKING,
+)
+
+from .scenario import Scenario
+from .step import Step
+from .durations import StepDurations
+
+if TYPE_CHECKING:
+    from .feature import Feature
+
+Estimate = Tuple[int, float, int]
+"""The flat scenarios of a subtree: their number, their total cost
+(excluding the steps of the ancestors of the subtree) and the number
+of steps of the longest one (idem)"""
+
+
+class FlatteningPlan:
+    """A choice of flattening mode for each subtree of a feature
+    (the "auto" flattening mode).
+
+    The "strict" flattening mode replays the steps of the ancestors of each
+    scenario once per scenario, the "relaxed" flattening mode once per leaf
+    scenario, but chains the actions and assertions of the scenarios along
+    the path. The plan flattens a subtree in "relaxed" mode if that reduces
+    the estimated cost of its flat scenarios (their step count, or their
+    running time given step durations) and none of them exceeds a maximum
+    number of steps. All other scenarios are flattened in "strict" mode.
+
+    Costs are estimated bottom-up in a single pass over the scenarios.
+    Scenario outlines are counted once, regardless of their examples.
+    """
+
+    MAX_STEPS: int = 20
+    """
+    int
+
+    The default maximum number of steps of the flat scenarios
+    of subtrees flattened in "relaxed" mode
+    """
+
+    relaxed: Set[int]
+    """The vertex indices of the scenarios whose subtrees are flattened
+    in "relaxed" mode (the topmost ones)"""
+    relaxed_scenarios: List[Scenario]
+    """The scenarios whose subtrees are flattened in "relaxed" mode
+    (the topmost ones, in index order)"""
+    estimates: Dict[str, Estimate]
+    """The number of flat scenarios, their total cost and the number of steps
+    of the longest one, by mode: "strict", "relaxed" and "auto" (the plan)"""
+    unit: str
+    """The unit of the costs ("steps" or "seconds")"""
+
+    def __init__(
+        self,
+        relaxed_scenarios: List[Scenario],
+        estimates: Dict[str, Estimate],
+        unit: str = "steps",
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        relaxed_scenarios : List[Scenario]
+            The scenarios whose subtrees are flattened in "relaxed" mode
+
+        estimates : Dict[str, Estimate]
+            The estimates by mode ("strict", "relaxed" and "auto")
+
+        unit : str, default = "steps"
+            The unit of the costs
+        """
+
+        self.relaxed_scenarios = relaxed_scenarios
+        self.relaxed = {sc.vertex.index for sc in relaxed_scenarios}
+        self.estimates = estimates
+        self.unit = unit
+
+    @classmethod
+    def for_feature(
+        cls,
+        feature: "Feature",
+        durations: Optional[StepDurations] = None,
+        max_steps: Optional[int] = None,
+    ) -> "FlatteningPlan":
+        """Chooses the flattening mode of each subtree of a feature.
+
+        Parameters
+        ----------
+        feature : Feature
+            The feature (with resolved imports)
+
+        durations : StepDurations, optional
+            Step durations to estimate costs with.
+            Costs are step counts if omitted
+
+        max_steps : int, optional
+            The maximum number of steps of the flat scenarios of subtrees
+            flattened in "relaxed" mode. Defaults to MAX_STEPS
+
+        Returns
+        -------
+        FlatteningPlan
+            A new FlatteningPlan instance
+        """
+
+        if max_steps is None:
+            max_steps = cls.MAX_STEPS
+
+        def cost(steps: List[Step]) -> float:
+            return len(steps) if durations is None else durations.total(steps)
+
+        scenarios: Sequence[Scenario] = feature.scenarios()
+        children: List[List[int]] = [[] for _ in scenarios]
+        parents: List[int] = [-1] * len(scenarios)
+        for parent, child in feature.graph.get_edgelist():
+            parents[child] = parent
+            children[parent].append(child)
+        for child_indices in children:
+            child_indices.sort()
+
+        # The prerequisites and actions of each scenario, replayed by the flat
+        # scenarios of its descendants:
+        setups: List[List[Step]] = [
+            sc.prerequisites() + sc.actions() for sc in scenarios
+        ]
+        setup_costs: List[float] = [cost(setup) for setup in setups]
+        base_setup: List[Step] = [
+            st for sc in feature.base_scenarios for st in sc.prerequisites()
+        ] + [st for sc in feature.base_scenarios for st in sc.actions()]
+
+        # The cost and number of the steps replayed by the flat scenarios
+        # of each subtree (those of the ancestors), top-down:
+        prefix_costs: List[float] = [0.0] * len(scenarios)
+        prefix_steps: List[int] = [0] * len(scenarios)
+        for index in range(len(scenarios)):
+            parent = parents[index]
+            if parent < 0:
+                prefix_costs[index] = cost(base_setup)
+                prefix_steps[index] = len(base_setup)
+            else:
+                prefix_costs[index] = prefix_costs[parent] + setup_costs[parent]
+                prefix_steps[index] = prefix_steps[parent] + len(setups[parent])
+
+        # The estimates of each subtree excluding the prefix, bottom-up:
+        none: Estimate = (0, 0.0, 0)
+        strict: List[Estimate] = [none] * len(scenarios)
+        relaxed: List[Estimate] = [none] * len(scenarios)
+        relaxed_first_steps: List[int] = [0] * len(scenarios)
+        auto: List[Estimate] = [none] * len(scenarios)
+        relaxed_choice: List[bool] = [False] * len(scenarios)
+        reference_estimates: Dict[str, Tuple[Estimate, Estimate, int]] = {}
+        for index in reversed(range(len(scenarios))):
+            scenario: Scenario = scenarios[index]
+            setup_steps: int = len(setups[index])
+            setup_cost: float = setup_costs[index]
+
+            if scenario.reference is not None:
+                if scenario.reference not in reference_estimates:
+                    reference_estimates[scenario.reference] = cls.reference_estimates(
+                        feature, scenario.reference, cost
+                    )
+                strict_inner, relaxed_inner, first_steps = reference_estimates[
+                    scenario.reference
+                ]
+                strict[index] = cls.extend(strict_inner, setup_steps, setup_cost)
+                relaxed[index] = cls.extend(relaxed_inner, setup_steps, setup_cost)
+                relaxed_first_steps[index] = setup_steps + first_steps
+                candidate: Estimate = strict[index]
+            else:
+                own: Estimate = (
+                    none
+                    if scenario.is_organizational()
+                    else (1, cost(scenario.steps), len(scenario.steps))
+                )
+                strict[index] = cls.combine(
+                    [own]
+                    + [
+                        cls.extend(strict[ch], setup_steps, setup_cost)
+                        for ch in children[index]
+                    ]
+                )
+                candidate = cls.combine(
+                    [own]
+                    + [
+                        cls.extend(auto[ch], setup_steps, setup_cost)
+                        for ch in children[index]
+                    ]
+                )
+                if not children[index]:
+                    relaxed[index] = (1, cost(scenario.steps), len(scenario.steps))
+                    relaxed_first_steps[index] = len(scenario.steps)
+                else:
+                    # The assertions are written to the first flat scenario only:
+                    assertions: List[Step] = scenario.assertions()
+                    combined: Estimate = cls.combine(
+                        [
+                            cls.extend(relaxed[ch], setup_steps, setup_cost)
+                            for ch in children[index]
+                        ]
+                    )
+                    relaxed_first_steps[index] = (
+                        setup_steps
+                        + len(assertions)
+                        + relaxed_first_steps[children[index][0]]
+                    )
+                    relaxed[index] = (
+                        combined[0],
+                        combined[1] + cost(assertions),
+                        max(combined[2], relaxed_first_steps[index]),
+                    )
+
+            # Flatten the subtree in "relaxed" mode if that is cheaper:
+            if (
+                relaxed[index][0] * prefix_costs[index] + relaxed[index][1]
+                < candidate[0] * prefix_costs[index] + candidate[1]
+            ) and prefix_steps[index] + relaxed[index][2] <= max_steps:
+                auto[index] = relaxed[index]
+                relaxed_choice[index] = True
+            else:
+                auto[index] = candidate
+
+        # The topmost scenarios flattened in "relaxed" mode:
+        relaxed_scenarios: List[Scenario] = []
+        covered: Set[int] = set()
+        for index, scenario in enumerate(scenarios):
+            if parents[index] >= 0 and parents[index] in covered:
+                covered.add(index)
+            elif relaxed_choice[index]:
+                relaxed_scenarios.append(scenario)
+                covered.add(index)
+
+        # The estimates of the feature, including the prefixes of imports:
+        roots: List[int] = [
+            index for index in range(len(scenarios)) if parents[index] < 0
+        ]
+        estimates: Dict[str, Estimate] = {
+            mode: cls.combine(
+                [
+                    cls.extend(
+                        subtree_estimates[index],
+                        prefix_steps[index],
+                        prefix_costs[index],
+                    )
+                    for index in roots
+                ]
+            )
+            for mode, subtree_estimates in [
+                ("strict", strict),
+                ("relaxed", relaxed),
+                ("auto", auto),
+            ]
+        }
+
+        return FlatteningPlan(
+            relaxed_scenarios,
+            estimates,
+            unit="steps" if durations is None else "seconds",
+        )
+
+    @classmethod
+    def extend(cls, estimate: Estimate, steps: int, cost: float) -> Estimate:
+        """Returns the estimate for the flat scenarios of a subtree
+        replaying additional steps
+
+        Parameters
+        ----------
+        estimate : Estimate
+            The estimate
+
+        steps : int
+            The number of replayed steps
+
+        cost : float
+            The cost of the replayed steps
+
+        Returns
+        -------
+        Estimate
+            The extended estimate
+        """
+
+        if estimate[0] == 0:
+            return estimate
+        return (estimate[0], estimate[1] + estimate[0] * cost, estimate[2] + steps)
+
+    @classmethod
+    def combine(cls, estimates: List[Estimate]) -> Estimate:
+        """Returns the estimate for the flat scenarios of several subtrees
+
+        Parameters
+        ----------
+        estimates : List[Estimate]
+            The estimates
+
+        Returns
+        -------
+        Estimate
+            The combined estimate
+        """
+
+        return (
+            sum(est[0] for est in estimates),
+            sum(est[1] for est in estimates),
+            max([est[2] for est in estimates], default=0),
+        )
+
+    @classmethod
+    def reference_estimates(
+        cls,
+        feature: "Feature",
+        subtree_name: str,
+        cost: Callable[[List[Step]], float],
+    ) -> Tuple[Estimate, Estimate, int]:
+        """Returns the estimates for flattening a referenced subtree in
+        "strict" and in "relaxed" mode (see Feature.subtree_paths).
+
+        Parameters
+        ----------
+        feature : Feature
+            The feature
+
+        subtree_name : str
+            The name of the referenced subtree
+
+        cost : Callable[[List[Step]], float]
+            The cost function
+
+        Returns
+        -------
+        Tuple[Estimate, Estimate, int]
+            The "strict" and "relaxed" estimates, and the number of steps
+            of the first "relaxed" flat scenario
+        """
+
+        strict: List[Estimate] = []
+        relaxed: List[Estimate] = []
+        previous_path: List[Scenario] = []
+        for subtree_path in feature.subtree_paths(subtree_name):
+            scenario: Scenario = subtree_path.scenarios[-1]
+            if scenario.reference is None and not scenario.is_organizational():
+                steps: List[Step] = (
+                    subtree_path.prerequisites + subtree_path.actions + scenario.steps
+                )
+                strict.append((1, cost(steps), len(steps)))
+            if not subtree_path.is_leaf:
+                continue
+
+            shared: int = 0
+            while (
+                shared < min(len(previous_path), len(subtree_path.scenarios))
+                and previous_path[shared] is subtree_path.scenarios[shared]
+            ):
+                shared += 1
+            steps = [
+                st
+                for position, sc in enumerate(subtree_path.scenarios)
+                for st in (
+                    sc.steps
+                    if position >= shared
+                    else sc.prerequisites() + sc.actions()
+                )
+            ]
+            relaxed.append((1, cost(steps), len(steps)))
+            previous_path = subtree_path.scenarios
+
+        return (
+            cls.combine(strict),
+            cls.combine(relaxed),
+            relaxed[0][2] if relaxed else 0,
+        )
+
+    def lines(self) -> List[str]:
+        """Returns a description of the plan for terminal output
+
+        Returns
+        -------
+        List[str]
+            One line per subtree flattened in "relaxed" mode
+        """
+
+        return [
+            "relaxed: {}".format(" > ".join(sc.name for sc in sc.path_scenarios()))
+            for sc in self.relaxed_scenarios
+        ]
+
+    def __str__(self) -> str:
+        """Returns a string representation of the FlatteningPlan instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the FlatteningPlan instance
+        """
+
+        return "<FlatteningPlan: {} relaxed subtrees>".format(
+            len(self.relaxed_scenarios)
+        )
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the FlatteningPlan instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the FlatteningPlan instance
+        """
+
+        return self.__str__()
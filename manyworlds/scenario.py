@@ -1,12 +1,16 @@
 """Defines the Scenario Class"""
+
 # needed to support "type[]" class type annotations in Python 3.8:
 from __future__ import annotations
 
+import hashlib
 import re
 import igraph as ig  # type: ignore
 from typing import Optional, Union, List
 
 from .step import Step, Prerequisite, Action, Assertion
+from .data_table import DataTable
+from .source import SourceSpan
 
 
 class Scenario:
@@ -15,7 +19,9 @@ class Scenario:
     SCENARIO_PATTERN: re.Pattern = re.compile(
         r"""
         ^                        # start of line
-        Scenario:                # "Scenario:" keyword
+        Scenario                 # "Scenario" keyword
+        (?P<outline>[ ]Outline)? # optional "Outline" keyword
+        :                        # colon
         [ ]                      # space
         (?P<scenario_name>[^#]*) # scenario name
         (?:\# (?P<comment>.+))?  # optional comment
@@ -27,6 +33,39 @@ class Scenario:
     re.Pattern
 
     Pattern describing a BDD scenario line ("Scenario: …")
+    or scenario outline line ("Scenario Outline: …")
+    followed by an optional comment
+    """
+
+    EXAMPLES_PATTERN: re.Pattern = re.compile(
+        r"""
+        ^                              # start of line
+        Examples:                      # "Examples:" keyword
+        (?:[ ]+\#[ ](?P<comment>.+))? # optional comment
+        $                              # end of line
+        """,
+        re.VERBOSE,
+    )
+    """
+    re.Pattern
+
+    Pattern describing the line preceding the examples table
+    of a scenario outline ("Examples:") followed by an optional comment
+    """
+
+    TAGS_PATTERN: re.Pattern = re.compile(
+        r"""
+        ^                                     # start of line
+        (?P<tags>@[^\s#@]+(?:[ ]+@[^\s#@]+)*) # space-delimited list of tags
+        (?:[ ]+\#[ ](?P<comment>.+))?          # optional comment
+        $                                     # end of line
+        """,
+        re.VERBOSE,
+    )
+    """
+    re.Pattern
+
+    Pattern describing a tag line ("@smoke @slow") preceding a scenario line
     followed by an optional comment
     """
 
@@ -35,14 +74,21 @@ class Scenario:
     vertex: ig.Vertex
     steps: List[Step]
     comment: Optional[str]
-    _validated: bool
+    tags: List[str]
+    outline: bool
+    examples: List[DataTable]
+    reference: Optional[str]
+    fingerprint: Optional[str]
+    span: Optional[SourceSpan]
 
     def __init__(
         self,
         name: str,
-        graph: ig.Graph,
+        graph: Optional[ig.Graph] = None,
         parent_scenario: Optional["Scenario"] = None,
         comment: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        outline: bool = False,
     ) -> None:
         """Constructor method
 
@@ -51,52 +97,90 @@ class Scenario:
         name : str
             The name of the scenario
 
-        graph : igraph.Graph
-            The graph
+        graph : igraph.Graph, optional
+            The graph. If omitted, the scenario must be attached
+            to a vertex later (see Scenario.attach)
 
         parent_scenario: Scenario (optional)
             The parent scenario to connect the new scenario to
+            (ignored if graph is omitted)
 
         comment : str, optional
+
+        tags : List[str], optional
+            The scenario's own tags (including "@")
+
+        outline : bool, default = False
+            Whether or not the scenario is a scenario outline
+            (see Scenario.examples)
         """
 
         self.name = name.strip()
-        self.graph = graph
-        self.vertex = graph.add_vertex()
-        self.vertex["scenario"] = self
         self.steps = []
-        self._validated = False
         self.comment = comment.strip() if comment is not None else None
-        if parent_scenario is not None:
-            self.graph.add_edge(parent_scenario.vertex, self.vertex)
-
-    @property
-    def validated(self) -> bool:
-        """The "validated" property
+        self.tags = tags if tags is not None else []
+        self.outline = outline
+        self.examples = []
+        self.reference = None
+        self.fingerprint = None
+        self.span = None
+        if graph is not None:
+            vertex: ig.Vertex = graph.add_vertex()
+            vertex["scenario"] = self
+            self.attach(graph, vertex)
+            if parent_scenario is not None:
+                self.graph.add_edge(parent_scenario.vertex, self.vertex)
+
+    def attach(self, graph: ig.Graph, vertex: ig.Vertex) -> None:
+        """Links the scenario to its vertex.
+
+        Used when the vertices of many scenarios are added to a graph at once.
 
-        Used to keep track of which scenarios had their assertions written
-        to an output scenario already so that assertions are not run multiple
-        times.
+        Parameters
+        ----------
+        graph : igraph.Graph
+            The graph
 
-        Returns
-        -------
-        bool
-            Whether or not this scenario has been validated
+        vertex : igraph.Vertex
+            The vertex representing the scenario
         """
-        return self._validated
 
-    @validated.setter
-    def validated(self, value: bool) -> None:
-        """The validated property setter
+        self.graph = graph
+        self.vertex = vertex
+
+    def update_fingerprint(self, parent_fingerprint: Optional[str] = None) -> str:
+        """Computes and stores the scenario's fingerprint.
+
+        The fingerprint is a hash of the scenario's name, steps, data tables
+        and examples tables and of the parent scenario's fingerprint, so it
+        changes whenever the scenario or any of its ancestors change.
+        Comments and tags are ignored.
 
         Parameters
         ----------
-        value : bool
-            Whether or not this scenario has been validated
+        parent_fingerprint : str, optional
+            The fingerprint of the parent scenario (None for root scenarios)
 
+        Returns
+        -------
+        str
+            The fingerprint (hexadecimal)
         """
 
-        self._validated = value
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update((parent_fingerprint or "").encode())
+        hasher.update(b"\x1e")
+        hasher.update(self.name.encode())
+        for step in self.steps:
+            step.update_hash(hasher)
+        for table in self.examples:
+            hasher.update(b"\x1c")
+            for row in table.to_list_of_list():
+                hasher.update(b"\x1d")
+                hasher.update("\x1f".join(row).encode())
+
+        self.fingerprint = hasher.hexdigest()
+        return self.fingerprint
 
     def prerequisites(self) -> List[Step]:
         """Returns all steps of type Prerequisite
@@ -258,6 +342,19 @@ class Scenario:
 
         return self.ancestors() + [self]
 
+    def effective_tags(self) -> List[str]:
+        """Returns the scenario's own tags and the tags inherited from its ancestors
+
+        Returns
+        -------
+        List[str]
+            The tags, starting with the root scenario's tags, without duplicates
+        """
+
+        return list(
+            dict.fromkeys(tag for sc in self.path_scenarios() for tag in sc.tags)
+        )
+
     def level(self) -> int:
         """Returns the scenario"s level in the scenario tree.
 
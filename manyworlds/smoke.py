@@ -0,0 +1,203 @@
+"""Defines the SmokeSuite Class"""
+
+import heapq
+from typing import Optional, List, Tuple, Set, FrozenSet, Iterable
+
+from .flat_scenario import FlatScenario
+from .durations import StepDurations
+from .step import Step
+
+StepKey = Tuple[str, str, Tuple[Tuple[str, ...], ...]]
+"""A distinct step: step type, name and data table rows"""
+
+
+class SmokeSuite:
+    """A small set of flat scenarios exercising every distinct step
+    (including every distinct assertion) of a feature at least once.
+
+    Selected from the flat scenarios of all leaf scenarios (with the
+    assertions of all scenarios along each path) by greedy weighted set
+    cover: the flat scenario exercising the most distinct steps not yet
+    exercised per step (or per second, given step durations) is selected
+    until all distinct steps are exercised.
+    """
+
+    flat_scenarios: List[FlatScenario]
+    """The selected flat scenarios in output order"""
+    candidate_count: int
+    """The number of flat scenarios the flat scenarios were selected from"""
+    candidate_cost: float
+    """The total cost of all candidate flat scenarios
+    (steps, or seconds given step durations)"""
+    cost: float
+    """The total cost of the selected flat scenarios"""
+    step_count: int
+    """The number of distinct steps of the candidate flat scenarios"""
+    covered_step_count: int
+    """The number of distinct steps exercised by the selected flat scenarios"""
+    assertion_count: int
+    """The number of distinct assertions of the candidate flat scenarios"""
+    covered_assertion_count: int
+    """The number of distinct assertions exercised by the selected
+    flat scenarios"""
+
+    def __init__(
+        self,
+        flat_scenarios: List[FlatScenario],
+        candidate_count: int,
+        candidate_cost: float,
+        cost: float,
+        step_keys: Set[StepKey],
+        covered_step_keys: Set[StepKey],
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        flat_scenarios : List[FlatScenario]
+            The selected flat scenarios in output order
+
+        candidate_count : int
+            The number of candidate flat scenarios
+
+        candidate_cost : float
+            The total cost of all candidate flat scenarios
+
+        cost : float
+            The total cost of the selected flat scenarios
+
+        step_keys : Set[StepKey]
+            The distinct steps of the candidate flat scenarios
+
+        covered_step_keys : Set[StepKey]
+            The distinct steps of the selected flat scenarios
+        """
+
+        self.flat_scenarios = flat_scenarios
+        self.candidate_count = candidate_count
+        self.candidate_cost = candidate_cost
+        self.cost = cost
+        self.step_count = len(step_keys)
+        self.covered_step_count = len(covered_step_keys)
+        self.assertion_count = len([key for key in step_keys if key[0] == "Then"])
+        self.covered_assertion_count = len(
+            [key for key in covered_step_keys if key[0] == "Then"]
+        )
+
+    @classmethod
+    def step_key(cls, step: Step) -> StepKey:
+        """Returns the key identifying a distinct step
+
+        Parameters
+        ----------
+        step : Step
+            The step
+
+        Returns
+        -------
+        StepKey
+            The step type, name and data table rows
+        """
+
+        return (
+            step.conjunction,
+            step.name,
+            (
+                tuple(tuple(row) for row in step.data.to_list_of_list())
+                if step.data is not None
+                else ()
+            ),
+        )
+
+    @classmethod
+    def select(
+        cls,
+        candidates: Iterable[FlatScenario],
+        durations: Optional[StepDurations] = None,
+    ) -> "SmokeSuite":
+        """Selects the flat scenarios of a smoke suite.
+
+        Uses lazy greedy set cover: the gain of a candidate only decreases
+        as steps are covered, so a candidate whose recomputed gain per cost
+        is still the highest is selected without recomputing the others.
+
+        Parameters
+        ----------
+        candidates : Iterable[FlatScenario]
+            The candidate flat scenarios in output order
+
+        durations : StepDurations, optional
+            Step durations to weight the candidates by. The candidates are
+            weighted by their step count if omitted
+
+        Returns
+        -------
+        SmokeSuite
+            A new SmokeSuite instance
+        """
+
+        flat_scenarios: List[FlatScenario] = list(candidates)
+        keys: List[FrozenSet[StepKey]] = [
+            frozenset(cls.step_key(step) for step in fs.steps) for fs in flat_scenarios
+        ]
+        costs: List[float] = [
+            durations.total(fs.steps) if durations is not None else len(fs.steps)
+            for fs in flat_scenarios
+        ]
+        step_keys: Set[StepKey] = set().union(*keys)
+
+        # Highest gain per cost first, earlier flat scenarios first on ties:
+        heap: List[Tuple[float, int]] = [
+            (-len(keys[index]) / max(costs[index], 1e-9), index)
+            for index in range(len(flat_scenarios))
+        ]
+        heapq.heapify(heap)
+        uncovered: Set[StepKey] = set(step_keys)
+        selected: List[int] = []
+        while uncovered and heap:
+            _, index = heapq.heappop(heap)
+            gain: int = len(keys[index] & uncovered)
+            if gain == 0:
+                continue
+            entry: Tuple[float, int] = (-gain / max(costs[index], 1e-9), index)
+            if heap and entry > heap[0]:
+                heapq.heappush(heap, entry)  # outdated, try again later
+                continue
+            selected.append(index)
+            uncovered -= keys[index]
+
+        selected.sort()
+        return SmokeSuite(
+            [flat_scenarios[index] for index in selected],
+            len(flat_scenarios),
+            sum(costs),
+            sum(costs[index] for index in selected),
+            step_keys,
+            step_keys - uncovered,
+        )
+
+    def __str__(self) -> str:
+        """Returns a string representation of the SmokeSuite instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the SmokeSuite instance
+        """
+
+        return "<SmokeSuite: {} of {} flat scenarios>".format(
+            len(self.flat_scenarios), self.candidate_count
+        )
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the SmokeSuite instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the SmokeSuite instance
+        """
+
+        return self.__str__()
@@ -0,0 +1,177 @@
+"""Defines the SourceSpan and MappedSource Classes"""
+
+import mmap
+from array import array
+from itertools import accumulate
+from typing import Optional, List, Iterator, Any
+
+BLOCK_SIZE: int = 1 << 20
+"""The number of bytes split into lines at a time"""
+
+
+class SourceSpan:
+    """The location of a line in a feature file"""
+
+    __slots__ = ("offset", "length", "line_no")
+
+    offset: int
+    """The byte offset of the line"""
+    length: int
+    """The length of the line in bytes (without newline)"""
+    line_no: int
+    """The line number (starting at 0)"""
+
+    def __init__(self, offset: int, length: int, line_no: int) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        offset : int
+            The byte offset of the line
+
+        length : int
+            The length of the line in bytes (without newline)
+
+        line_no : int
+            The line number (starting at 0)
+        """
+
+        self.offset = offset
+        self.length = length
+        self.line_no = line_no
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, SourceSpan)
+            and self.offset == other.offset
+            and self.length == other.length
+            and self.line_no == other.line_no
+        )
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the SourceSpan instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the SourceSpan instance
+        """
+
+        return "<SourceSpan: line {} (bytes {}-{})>".format(
+            self.line_no + 1, self.offset, self.offset + self.length
+        )
+
+
+class MappedSource:
+    """A memory-mapped feature file.
+
+    Iterating over a MappedSource yields its lines, split and decoded one
+    block at a time from the mapping without reading the whole file into
+    memory, and records the byte offset of each line, so that parsed
+    scenarios, steps and data table rows can keep compact source spans.
+    """
+
+    file_path: str
+    """The path to the feature file"""
+    line_offsets: array
+    """The byte offset of each line read so far, followed by the offset
+    of the end of the last line"""
+    _file: Any
+    _mapped: Optional[mmap.mmap]
+
+    def __init__(self, file_path: str) -> None:
+        """Constructor method
+
+        Maps the file into memory.
+
+        Parameters
+        ----------
+        file_path : str
+            The path to the feature file
+        """
+
+        self.file_path = file_path
+        self.line_offsets = array("q", [0])
+        self._file = open(file_path, "rb")
+        try:
+            self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped
+            self._mapped = None
+
+    def __enter__(self) -> "MappedSource":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmaps and closes the file"""
+
+        if self._mapped is not None:
+            self._mapped.close()
+        self._file.close()
+
+    def __iter__(self) -> Iterator[str]:
+        """Yields the lines of the file (with newlines)
+
+        Returns
+        -------
+        Iterator[str]
+            The lines
+        """
+
+        del self.line_offsets[1:]
+        if self._mapped is None:
+            return
+        mapped: mmap.mmap = self._mapped
+        offset: int = 0
+        while offset < len(mapped):
+            # Split blocks after a newline so that lines are not cut:
+            end: int = mapped.find(b"\n", offset + BLOCK_SIZE) + 1 or len(mapped)
+            raw_lines: List[bytes] = mapped[offset:end].splitlines(keepends=True)
+            self.line_offsets.pop()  # The end of the previous block
+            self.line_offsets.extend(accumulate(map(len, raw_lines), initial=offset))
+            yield from map(bytes.decode, raw_lines)
+            offset = end
+
+    def span(self, line_no: int) -> SourceSpan:
+        """Returns the span of a line that has been read
+
+        Parameters
+        ----------
+        line_no : int
+            The line number (starting at 0)
+
+        Returns
+        -------
+        SourceSpan
+            The span
+        """
+
+        start: int = self.line_offsets[line_no]
+        end: int = self.line_offsets[line_no + 1]
+        mapped: mmap.mmap = self._mapped  # type: ignore
+        if end > start and mapped[end - 1] == 10:  # "\n"
+            end -= 1
+        if end > start and mapped[end - 1] == 13:  # "\r"
+            end -= 1
+        return SourceSpan(start, end - start, line_no)
+
+    def text(self, span: SourceSpan) -> str:
+        """Returns the text of a span
+
+        Parameters
+        ----------
+        span : SourceSpan
+            The span
+
+        Returns
+        -------
+        str
+            The text (without newline)
+        """
+
+        if self._mapped is None:
+            return ""
+        return self._mapped[span.offset : span.offset + span.length].decode()
@@ -0,0 +1,283 @@
+"""Defines the SourceMap Class"""
+
+import bisect
+from array import array
+from typing import Optional, List, Tuple
+
+from .source import SourceSpan
+
+
+class SourceMap:
+    """A map from the lines of a flat feature file to the lines
+    of the indented feature file it was generated from.
+
+    Built line by line while the flat feature file is written (see
+    Feature.flatten). Consecutive output lines originating from consecutive
+    input lines (such as data table rows) are stored as a single range.
+    Line numbers start at 0.
+    """
+
+    MAGIC: bytes = b"MWSM\x01"
+    """Header of source map files (including the format version)"""
+
+    output_starts: array
+    """The first output line of each range"""
+    input_starts: array
+    """The first input line of each range"""
+    lengths: array
+    """The number of lines of each range"""
+    output_line_count: int
+    """The number of output lines added so far"""
+
+    def __init__(self) -> None:
+        """Constructor method"""
+
+        self.output_starts = array("q")
+        self.input_starts = array("q")
+        self.lengths = array("q")
+        self.output_line_count = 0
+
+    def add(self, span: Optional[SourceSpan] = None) -> None:
+        """Adds the next output line.
+
+        Parameters
+        ----------
+        span : SourceSpan, optional
+            The source span of the line's step, data table row or scenario.
+            The line is not mapped if omitted
+        """
+
+        output_line: int = self.output_line_count
+        self.output_line_count += 1
+        if span is None:
+            return
+
+        # Extend the last range?
+        if len(self.lengths) > 0:
+            length: int = self.lengths[-1]
+            if (
+                self.output_starts[-1] + length == output_line
+                and self.input_starts[-1] + length == span.line_no
+            ):
+                self.lengths[-1] += 1
+                return
+
+        self.output_starts.append(output_line)
+        self.input_starts.append(span.line_no)
+        self.lengths.append(1)
+
+    def skip(self, line_count: int) -> None:
+        """Adds output lines that are not mapped
+
+        Parameters
+        ----------
+        line_count : int
+            The number of lines
+        """
+
+        self.output_line_count += line_count
+
+    def ranges(self) -> List[Tuple[int, int, int]]:
+        """Returns the mapped ranges
+
+        Returns
+        -------
+        List[Tuple[int, int, int]]
+            The first output line, first input line and number of lines
+            of each range
+        """
+
+        return list(zip(self.output_starts, self.input_starts, self.lengths))
+
+    def lookup(self, output_line: int) -> Optional[int]:
+        """Returns the input line an output line originates from
+
+        Parameters
+        ----------
+        output_line : int
+            The output line (starting at 0)
+
+        Returns
+        -------
+        int, optional
+            The input line (starting at 0). None if the line is not mapped
+        """
+
+        index: int = bisect.bisect_right(self.output_starts, output_line) - 1
+        if index < 0:
+            return None
+        offset: int = output_line - self.output_starts[index]
+        if offset >= self.lengths[index]:
+            return None
+        return self.input_starts[index] + offset
+
+    def encode(self) -> bytes:
+        """Encodes the source map.
+
+        Each range is stored as three varints: the number of unmapped lines
+        since the previous range, the number of lines, and the difference
+        between its first input line and the line following the previous
+        range in the input (zigzag-encoded as it may be negative).
+
+        Returns
+        -------
+        bytes
+            The encoded source map
+        """
+
+        encoded = bytearray(self.MAGIC)
+        self.write_varint(encoded, self.output_line_count)
+        self.write_varint(encoded, len(self.lengths))
+        output_end: int = 0
+        input_end: int = 0
+        for output_start, input_start, length in self.ranges():
+            self.write_varint(encoded, output_start - output_end)
+            self.write_varint(encoded, length)
+            delta: int = input_start - input_end
+            self.write_varint(encoded, delta * 2 if delta >= 0 else -delta * 2 - 1)
+            output_end = output_start + length
+            input_end = input_start + length
+        return bytes(encoded)
+
+    @classmethod
+    def decode(cls, encoded: bytes) -> "SourceMap":
+        """Decodes a source map
+
+        Parameters
+        ----------
+        encoded : bytes
+            The encoded source map (see encode)
+
+        Returns
+        -------
+        SourceMap
+            A new SourceMap instance
+
+        Raises
+        ------
+        ValueError
+            If the data is not a source map
+        """
+
+        if not encoded.startswith(cls.MAGIC):
+            raise ValueError("Not a manyworlds source map")
+        try:
+            return cls.decode_ranges(encoded, len(cls.MAGIC))
+        except IndexError:
+            raise ValueError("Truncated manyworlds source map") from None
+
+    @classmethod
+    def decode_ranges(cls, encoded: bytes, position: int) -> "SourceMap":
+        """Decodes the line count and the ranges of a source map
+
+        Parameters
+        ----------
+        encoded : bytes
+            The encoded source map (see encode)
+
+        position : int
+            The position following the header
+
+        Returns
+        -------
+        SourceMap
+            A new SourceMap instance
+        """
+
+        source_map = SourceMap()
+        output_line_count, position = cls.read_varint(encoded, position)
+        range_count, position = cls.read_varint(encoded, position)
+        output_end: int = 0
+        input_end: int = 0
+        for _ in range(range_count):
+            gap, position = cls.read_varint(encoded, position)
+            length, position = cls.read_varint(encoded, position)
+            zigzag, position = cls.read_varint(encoded, position)
+            output_start: int = output_end + gap
+            input_start: int = input_end + (
+                zigzag // 2 if zigzag % 2 == 0 else -(zigzag + 1) // 2
+            )
+            source_map.output_starts.append(output_start)
+            source_map.input_starts.append(input_start)
+            source_map.lengths.append(length)
+            output_end = output_start + length
+            input_end = input_start + length
+        source_map.output_line_count = output_line_count
+        return source_map
+
+    def write(self, file_path: str) -> None:
+        """Writes the source map to a file
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the source map file
+        """
+
+        with open(file_path, "wb") as map_file:
+            map_file.write(self.encode())
+
+    @classmethod
+    def read(cls, file_path: str) -> "SourceMap":
+        """Reads a source map file
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the source map file
+
+        Returns
+        -------
+        SourceMap
+            A new SourceMap instance
+        """
+
+        with open(file_path, "rb") as map_file:
+            return cls.decode(map_file.read())
+
+    @classmethod
+    def write_varint(cls, encoded: bytearray, value: int) -> None:
+        """Appends an unsigned integer in LEB128 encoding
+        (7 bits per byte, least significant group first)
+
+        Parameters
+        ----------
+        encoded : bytearray
+            The buffer
+
+        value : int
+            The integer (not negative)
+        """
+
+        while value >= 0x80:
+            encoded.append((value & 0x7F) | 0x80)
+            value >>= 7
+        encoded.append(value)
+
+    @classmethod
+    def read_varint(cls, encoded: bytes, position: int) -> Tuple[int, int]:
+        """Reads an unsigned integer in LEB128 encoding
+
+        Parameters
+        ----------
+        encoded : bytes
+            The buffer
+
+        position : int
+            The position of the integer
+
+        Returns
+        -------
+        Tuple[int, int]
+            The integer and the position following it
+        """
+
+        value: int = 0
+        shift: int = 0
+        while True:
+            byte: int = encoded[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return (value, position)
+            shift += 7
@@ -1,9 +1,11 @@
 """Defines the Step Class and subclasses"""
 
 import re
-from typing import Optional, Literal
+from typing import Optional, Literal, Any, Dict
 
 from .data_table import DataTable
+from .examples import substitute
+from .source import SourceSpan
 
 
 class Step:
@@ -31,6 +33,7 @@ class Step:
     conjunction: Literal["Given", "When", "Then"]
     data: Optional[DataTable]
     comment: Optional[str]
+    span: Optional[SourceSpan]
 
     def __init__(
         self, name: str, data: Optional[DataTable] = None, comment: Optional[str] = None
@@ -52,6 +55,50 @@ class Step:
         self.name = name.strip()
         self.data = data
         self.comment = comment
+        self.span = None
+
+    def update_hash(self, hasher: Any) -> None:
+        """Feeds the step's conjunction, name and data table into a hash object.
+
+        Comments are ignored.
+
+        Parameters
+        ----------
+        hasher : hashlib hash object
+            The hash object to update
+        """
+
+        hasher.update(b"\x1e")
+        hasher.update(self.conjunction.encode())
+        hasher.update(b"\x1f")
+        hasher.update(self.name.encode())
+        if self.data is not None:
+            for row in self.data.to_list_of_list():
+                hasher.update(b"\x1d")
+                hasher.update("\x1f".join(row).encode())
+
+    def substitute(self, bindings: Dict[str, str]) -> "Step":
+        """Returns a copy of the step with the placeholders in its name
+        and data table replaced by example values.
+
+        Parameters
+        ----------
+        bindings : Dict[str, str]
+            The example values by placeholder name
+
+        Returns
+        -------
+        Prerequisite or Action or Assertion
+            A new instance of the step's class
+        """
+
+        step: Step = self.__class__(
+            substitute(self.name, bindings),
+            data=self.data.substitute(bindings) if self.data else None,
+            comment=self.comment,
+        )
+        step.span = self.span
+        return step
 
     def format(self, first_of_type: bool = True) -> str:
         """Returns a string representation of the Step instance
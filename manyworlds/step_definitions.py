@@ -0,0 +1,543 @@
+"""Defines the StepDefinition, StepDefinitions, StepMatch and MatchTable Classes"""
+
+import ast
+import json
+import re
+from typing import Optional, List, Dict, Tuple, Iterable, Any
+
+from .step import Step
+
+
+class StepDefinition:
+    """A step definition of a test runner: a regular expression
+    that step names are matched against"""
+
+    DECORATORS: Dict[str, Optional[str]] = {
+        "given": "Given",
+        "when": "When",
+        "then": "Then",
+        "step": None,
+    }
+    """
+    Dict[str, Optional[str]]
+
+    The conjunction of the steps matched by step definitions registered
+    with each decorator (None: steps of any type)
+    """
+
+    pattern: str
+    """The regular expression"""
+    conjunction: Optional[str]
+    """The type of steps the step definition applies to
+    ("Given", "When" or "Then", None for all steps)"""
+    location: str
+    """Where the step definition is defined ("file:line")"""
+    regex: re.Pattern
+    """The compiled regular expression"""
+    prefix: str
+    """The literal text every matching step name begins with (may be empty)"""
+
+    def __init__(
+        self, pattern: str, conjunction: Optional[str] = None, location: str = ""
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        pattern : str
+            The regular expression. Step names have to match it in full
+
+        conjunction : str, optional
+            The type of steps the step definition applies to
+            ("Given", "When" or "Then"). Applies to all steps if omitted
+
+        location : str, default = ""
+            Where the step definition is defined ("file:line")
+        """
+
+        self.pattern = pattern
+        self.conjunction = conjunction
+        self.location = location
+        self.regex = re.compile(pattern)
+        self.prefix = self.literal_prefix(pattern)
+
+    @classmethod
+    def literal_prefix(cls, pattern: str) -> str:
+        """Returns the literal text every string matching a regular
+        expression begins with.
+
+        Conservative: stops at the first character that is not a plain
+        or escaped literal, and returns an empty prefix for patterns
+        with top-level alternatives.
+
+        Parameters
+        ----------
+        pattern : str
+            The regular expression
+
+        Returns
+        -------
+        str
+            The literal prefix (may be empty)
+        """
+
+        if cls.has_top_level_alternatives(pattern):
+            return ""
+
+        prefix: List[str] = []
+        position: int = 1 if pattern.startswith("^") else 0
+        while position < len(pattern):
+            char: str = pattern[position]
+            length: int = 1
+            if char == "\\":
+                # Escaped metacharacters are literals, \d, \w etc. are not:
+                if position + 1 == len(pattern) or pattern[position + 1].isalnum():
+                    break
+                char = pattern[position + 1]
+                length = 2
+            elif char in ".^$*+?{}[]()":
+                break
+
+            # A literal followed by an optional quantifier is optional:
+            if pattern[position + length : position + length + 1] in ["*", "?", "{"]:
+                break
+
+            prefix.append(char)
+            position += length
+
+        return "".join(prefix)
+
+    @classmethod
+    def has_top_level_alternatives(cls, pattern: str) -> bool:
+        """Returns whether a regular expression has a "|" outside
+        of groups and character classes
+
+        Parameters
+        ----------
+        pattern : str
+            The regular expression
+
+        Returns
+        -------
+        bool
+            Whether or not the regular expression has top-level alternatives
+        """
+
+        depth: int = 0
+        in_class: bool = False
+        escaped: bool = False
+        for char in pattern:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif in_class:
+                in_class = char != "]"
+            elif char == "[":
+                in_class = True
+            elif char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif char == "|" and depth == 0:
+                return True
+        return False
+
+    def __repr__(self) -> str:
+        """Return a developer-friendly string representation
+
+        Returns
+        -------
+        str
+            The string representation
+        """
+
+        return "<StepDefinition: {pattern!r} ({location})>".format(
+            pattern=self.pattern, location=self.location
+        )
+
+
+class StepMatch:
+    """A step name matched by a step definition"""
+
+    __slots__ = ("definition", "arguments")
+
+    definition: StepDefinition
+    """The step definition"""
+    arguments: Tuple[Optional[str], ...]
+    """The captured arguments (the groups of the regular expression)"""
+
+    def __init__(
+        self, definition: StepDefinition, arguments: Tuple[Optional[str], ...]
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        definition : StepDefinition
+            The step definition
+
+        arguments : Tuple[Optional[str], ...]
+            The captured arguments
+        """
+
+        self.definition = definition
+        self.arguments = arguments
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the match as a dictionary (as written to match tables)
+
+        Returns
+        -------
+        Dict[str, Any]
+            The pattern and location of the step definition
+            and the captured arguments
+        """
+
+        return {
+            "pattern": self.definition.pattern,
+            "location": self.definition.location,
+            "arguments": list(self.arguments),
+        }
+
+
+class MatchTable:
+    """The step definitions matching each distinct step of a feature"""
+
+    matches: Dict[Tuple[str, str], List[StepMatch]]
+    """The matches by step conjunction and name, in order of first occurrence"""
+    step_count: int
+    """The number of steps in the feature (including repeated ones)"""
+    regex_count: int
+    """The number of regular expressions run to build the table"""
+
+    def __init__(self) -> None:
+        """Constructor method"""
+
+        self.matches = {}
+        self.step_count = 0
+        self.regex_count = 0
+
+    def lookup(self, step: Step) -> Optional[StepMatch]:
+        """Returns the match of a step
+
+        Parameters
+        ----------
+        step : Step
+            The step (of the feature or of one of its flat scenarios)
+
+        Returns
+        -------
+        StepMatch, optional
+            The match. None if the step is undefined or ambiguous
+        """
+
+        step_matches: List[StepMatch] = self.matches.get(
+            (step.conjunction, step.name), []
+        )
+        return step_matches[0] if len(step_matches) == 1 else None
+
+    def undefined(self) -> List[Tuple[str, str]]:
+        """Returns the steps not matched by any step definition
+
+        Returns
+        -------
+        List[Tuple[str, str]]
+            The conjunctions and names of the steps
+        """
+
+        return [key for key, step_matches in self.matches.items() if not step_matches]
+
+    def ambiguous(self) -> List[Tuple[str, str]]:
+        """Returns the steps matched by more than one step definition
+
+        Returns
+        -------
+        List[Tuple[str, str]]
+            The conjunctions and names of the steps
+        """
+
+        return [
+            key for key, step_matches in self.matches.items() if len(step_matches) > 1
+        ]
+
+    @classmethod
+    def status(cls, step_matches: List[StepMatch]) -> str:
+        """Returns the status of a step
+
+        Parameters
+        ----------
+        step_matches : List[StepMatch]
+            The matches of the step
+
+        Returns
+        -------
+        str
+            "matched", "undefined" or "ambiguous"
+        """
+
+        if len(step_matches) == 0:
+            return "undefined"
+        if len(step_matches) > 1:
+            return "ambiguous"
+        return "matched"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the match table as a dictionary
+
+        Returns
+        -------
+        Dict[str, Any]
+            A list of "steps" (with their "conjunction", "name", "status"
+            and "matches") and the lists of "undefined" and "ambiguous" steps
+        """
+
+        return {
+            "steps": [
+                {
+                    "conjunction": conjunction,
+                    "name": name,
+                    "status": self.status(step_matches),
+                    "matches": [step_match.to_dict() for step_match in step_matches],
+                }
+                for (conjunction, name), step_matches in self.matches.items()
+            ],
+            "undefined": [
+                "{} {}".format(conjunction, name)
+                for conjunction, name in self.undefined()
+            ],
+            "ambiguous": [
+                "{} {}".format(conjunction, name)
+                for conjunction, name in self.ambiguous()
+            ],
+        }
+
+    def write(self, file_path: str) -> None:
+        """Writes the match table to a JSON file
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the JSON file
+        """
+
+        with open(file_path, "w") as table_file:
+            json.dump(self.to_dict(), table_file, indent=2)
+            table_file.write("\n")
+
+
+class StepDefinitions:
+    """The step definitions of a test runner, indexed by literal prefix.
+
+    Only step definitions whose literal prefix is a prefix of a step name
+    are matched against it, so most regular expressions are never run.
+    """
+
+    definitions: List[StepDefinition]
+    """The step definitions, in order of definition"""
+    prefix_index: Dict[str, List[int]]
+    """The indices of the step definitions by literal prefix"""
+    prefix_lengths: List[int]
+    """The distinct lengths of the literal prefixes, in ascending order"""
+
+    def __init__(self, definitions: Iterable[StepDefinition]) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        definitions : Iterable[StepDefinition]
+            The step definitions
+        """
+
+        self.definitions = list(definitions)
+        self.prefix_index = {}
+        for index, definition in enumerate(self.definitions):
+            self.prefix_index.setdefault(definition.prefix, []).append(index)
+        self.prefix_lengths = sorted(set(len(prefix) for prefix in self.prefix_index))
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "StepDefinitions":
+        """Reads step definitions from a Python module or a pattern file.
+
+        In Python modules, the regular expressions passed to "given", "when",
+        "then" and "step" decorators are collected without importing the
+        module (as used by behave with the "re" step matcher or by pytest-bdd
+        with "parsers.re"). Pattern files contain one regular expression
+        per line. Empty lines and lines starting with "#" are ignored.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the Python module (".py") or the pattern file
+
+        Returns
+        -------
+        StepDefinitions
+            A new StepDefinitions instance
+        """
+
+        with open(file_path) as definitions_file:
+            source: str = definitions_file.read()
+
+        if file_path.endswith(".py"):
+            return cls.from_module_source(source, file_path=file_path)
+
+        return StepDefinitions(
+            StepDefinition(
+                line.strip(),
+                location="{file}:{line_no}".format(file=file_path, line_no=line_no),
+            )
+            for line_no, line in enumerate(source.splitlines(), start=1)
+            if line.strip() != "" and not line.lstrip().startswith("#")
+        )
+
+    @classmethod
+    def from_module_source(
+        cls, source: str, file_path: str = "<module>"
+    ) -> "StepDefinitions":
+        """Collects the step definitions of a Python module
+        from its source code (see from_file).
+
+        Parameters
+        ----------
+        source : str
+            The source code of the module
+
+        file_path : str, default = "<module>"
+            Path to the module (used in step definition locations)
+
+        Returns
+        -------
+        StepDefinitions
+            A new StepDefinitions instance
+        """
+
+        definitions: List[Tuple[int, StepDefinition]] = []  # by line number
+        for node in ast.walk(ast.parse(source, filename=file_path)):
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            for decorator in node.decorator_list:
+                if not isinstance(decorator, ast.Call) or len(decorator.args) == 0:
+                    continue
+                decorator_name: Optional[str] = cls.call_name(decorator)
+                if decorator_name not in StepDefinition.DECORATORS:
+                    continue
+
+                pattern: Any = decorator.args[0]
+                if isinstance(pattern, ast.Call) and cls.call_name(pattern) == "re":
+                    pattern = pattern.args[0] if len(pattern.args) > 0 else None
+                if isinstance(pattern, ast.Constant) and isinstance(pattern.value, str):
+                    definitions.append(
+                        (
+                            decorator.lineno,
+                            StepDefinition(
+                                pattern.value,
+                                conjunction=StepDefinition.DECORATORS[decorator_name],
+                                location="{file}:{line_no}".format(
+                                    file=file_path, line_no=decorator.lineno
+                                ),
+                            ),
+                        )
+                    )
+
+        definitions.sort(key=lambda entry: entry[0])  # ast.walk is breadth-first
+        return StepDefinitions(definition for _, definition in definitions)
+
+    @classmethod
+    def call_name(cls, call: ast.Call) -> Optional[str]:
+        """Returns the name of the function called (without module or object)
+
+        Parameters
+        ----------
+        call : ast.Call
+            The call
+
+        Returns
+        -------
+        str, optional
+            The name. None if the function is not called by name
+        """
+
+        if isinstance(call.func, ast.Name):
+            return call.func.id
+        if isinstance(call.func, ast.Attribute):
+            return call.func.attr
+        return None
+
+    def candidates(self, name: str) -> List[StepDefinition]:
+        """Returns the step definitions whose literal prefix
+        is a prefix of a step name
+
+        Parameters
+        ----------
+        name : str
+            The step name
+
+        Returns
+        -------
+        List[StepDefinition]
+            The step definitions, in order of definition
+        """
+
+        indices: List[int] = []
+        for length in self.prefix_lengths:
+            if length > len(name):
+                break
+            indices.extend(self.prefix_index.get(name[:length], []))
+        indices.sort()
+        return [self.definitions[index] for index in indices]
+
+    def match(
+        self, conjunction: str, name: str, table: Optional[MatchTable] = None
+    ) -> List[StepMatch]:
+        """Matches a step against the step definitions
+
+        Parameters
+        ----------
+        conjunction : str
+            The type of the step ("Given", "When" or "Then")
+
+        name : str
+            The name of the step
+
+        table : MatchTable, optional
+            A match table counting the regular expressions run
+
+        Returns
+        -------
+        List[StepMatch]
+            The matches (more than one if the step is ambiguous)
+        """
+
+        step_matches: List[StepMatch] = []
+        for definition in self.candidates(name):
+            if definition.conjunction not in [None, conjunction]:
+                continue
+            if table is not None:
+                table.regex_count += 1
+            match: Optional[re.Match] = definition.regex.fullmatch(name)
+            if match is not None:
+                step_matches.append(StepMatch(definition, match.groups()))
+        return step_matches
+
+    def match_steps(self, steps: Iterable[Step]) -> MatchTable:
+        """Matches each distinct step once against the step definitions
+
+        Parameters
+        ----------
+        steps : Iterable[Step]
+            The steps
+
+        Returns
+        -------
+        MatchTable
+            The matches of the distinct steps
+        """
+
+        table = MatchTable()
+        for step in steps:
+            table.step_count += 1
+            key: Tuple[str, str] = (step.conjunction, step.name)
+            if key not in table.matches:
+                table.matches[key] = self.match(step.conjunction, step.name, table)
+        return table
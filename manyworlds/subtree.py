@@ -0,0 +1,150 @@
+"""Defines the Subtree and SubtreePath Classes"""
+
+from typing import Optional, List, TYPE_CHECKING
+
+from .scenario import Scenario
+from .step import Step
+
+if TYPE_CHECKING:
+    from .feature import Feature
+
+
+class SubtreePath:
+    """A path from a root scenario of a subtree to one of its scenarios,
+    with the step blocks the path contributes to a flat scenario.
+
+    Subtree references along the path are expanded.
+    """
+
+    __slots__ = ("scenarios", "prerequisites", "actions", "organizational", "is_leaf")
+
+    scenarios: List[Scenario]
+    """The scenarios along the path (including subtree reference scenarios)"""
+    prerequisites: List[Step]
+    """The prerequisites of all scenarios along the path except the last one"""
+    actions: List[Step]
+    """The actions of all scenarios along the path except the last one"""
+    organizational: List[Scenario]
+    """The organizational scenarios along the path except the last one
+    (used for naming)"""
+    is_leaf: bool
+    """Whether the last scenario is a leaf scenario"""
+
+    def __init__(self, scenarios: List[Scenario]) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        scenarios : List[Scenario]
+            The scenarios along the path
+        """
+
+        ancestors: List[Scenario] = scenarios[:-1]
+        self.scenarios = scenarios
+        self.prerequisites = [st for sc in ancestors for st in sc.prerequisites()]
+        self.actions = [st for sc in ancestors for st in sc.actions()]
+        self.organizational = [sc for sc in ancestors if sc.is_organizational()]
+        self.is_leaf = (
+            scenarios[-1].reference is None and scenarios[-1].vertex.outdegree() == 0
+        )
+
+    def __str__(self) -> str:
+        """Returns a string representation of the SubtreePath instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the SubtreePath instance
+        """
+
+        return "<SubtreePath: {}>".format(" > ".join(sc.name for sc in self.scenarios))
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the SubtreePath instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the SubtreePath instance
+        """
+
+        return self.__str__()
+
+
+class Subtree:
+    """A named subtree of scenarios declared once in a feature file
+    ("Subtree: …") and referenced under other scenarios ("Include: …").
+
+    The subtree is parsed once. Its scenarios are shared by all references
+    and expanded only when flattening (see Feature.subtree_paths).
+    """
+
+    name: str
+    """The name of the subtree"""
+    comment: Optional[str]
+    """The comment of the subtree declaration line"""
+    line_no: int
+    """The line number of the subtree declaration line (starting at 0)"""
+    feature: "Feature"
+    """The scenarios of the subtree (one level shallower than in the file)"""
+    paths: Optional[List[SubtreePath]]
+    """The paths to all scenarios of the subtree in output order,
+    once expanded (see Feature.subtree_paths)"""
+
+    def __init__(
+        self,
+        name: str,
+        feature: "Feature",
+        line_no: int,
+        comment: Optional[str] = None,
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        name : str
+            The name of the subtree
+
+        feature : Feature
+            The (initially empty) feature receiving the scenarios of the subtree
+
+        line_no : int
+            The line number of the subtree declaration line (starting at 0)
+
+        comment : str, optional
+            A comment
+        """
+
+        self.name = name
+        self.feature = feature
+        self.line_no = line_no
+        self.comment = comment
+        self.paths = None
+
+    def __str__(self) -> str:
+        """Returns a string representation of the Subtree instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the Subtree instance
+        """
+
+        return "<Subtree: {} ({} scenarios)>".format(
+            self.name, len(self.feature.scenarios())
+        )
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the Subtree instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the Subtree instance
+        """
+
+        return self.__str__()
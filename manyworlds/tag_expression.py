@@ -0,0 +1,186 @@
+"""Defines the TagExpression Class"""
+
+import re
+from typing import Union, Tuple, List, Set, Iterable, Optional
+
+from .exceptions import InvalidTagExpressionError
+
+Node = Union[Tuple[str, str], Tuple[str, "Node"], Tuple[str, "Node", "Node"]]
+
+
+class TagExpression:
+    """A boolean expression over scenario tags, such as "@smoke and not @slow"
+
+    Supports the operators "and", "or" and "not" (in order of increasing
+    precedence) as well as parentheses.
+    """
+
+    TOKEN_PATTERN: re.Pattern = re.compile(
+        r"""
+        \s*                          # optional whitespace
+        (?P<token>\(|\)|@[^\s()@]+|[^\s()]+)
+        """,
+        re.VERBOSE,
+    )
+    """
+    re.Pattern
+
+    Pattern describing a single token of a tag expression
+    """
+
+    expression: str
+    """The tag expression as passed in"""
+    _tree: Node
+    _position: int
+    _tokens: List[str]
+
+    def __init__(self, expression: str) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        expression : str
+            The tag expression, for example "@smoke and not @slow"
+        """
+
+        self.expression = expression
+        self._tokens = [
+            match.group("token")
+            for match in self.TOKEN_PATTERN.finditer(expression.strip())
+        ]
+        self._position = 0
+        self._tree = self._parse_or()
+        if self._position < len(self._tokens):
+            raise self._error("Unexpected '{}'".format(self._tokens[self._position]))
+
+    def _error(self, message: str) -> InvalidTagExpressionError:
+        return InvalidTagExpressionError(
+            "Invalid tag expression '{expression}': {message}".format(
+                expression=self.expression, message=message
+            )
+        )
+
+    def _peek(self) -> str:
+        return (
+            self._tokens[self._position] if self._position < len(self._tokens) else ""
+        )
+
+    def _parse_or(self) -> Node:
+        node: Node = self._parse_and()
+        while self._peek() == "or":
+            self._position += 1
+            node = ("or", node, self._parse_and())
+        return node
+
+    def _parse_and(self) -> Node:
+        node: Node = self._parse_not()
+        while self._peek() == "and":
+            self._position += 1
+            node = ("and", node, self._parse_not())
+        return node
+
+    def _parse_not(self) -> Node:
+        if self._peek() == "not":
+            self._position += 1
+            return ("not", self._parse_not())
+        return self._parse_operand()
+
+    def _parse_operand(self) -> Node:
+        token: str = self._peek()
+        self._position += 1
+        if token == "(":
+            node: Node = self._parse_or()
+            if self._peek() != ")":
+                raise self._error("Missing ')'")
+            self._position += 1
+            return node
+        elif token.startswith("@"):
+            return ("tag", token)
+        elif token == "":
+            raise self._error("Unexpected end of expression")
+        else:
+            raise self._error("Unexpected '{}'".format(token))
+
+    def evaluate(self, tags: Iterable[str]) -> bool:
+        """Evaluates the expression for a set of tags.
+
+        Parameters
+        ----------
+        tags : Iterable[str]
+            The tags (including "@")
+
+        Returns
+        -------
+        bool
+            Whether or not the tags match the expression
+        """
+
+        tag_set: Set[str] = set(tags)
+
+        def evaluate_node(node: Node) -> bool:
+            if node[0] == "tag":
+                return node[1] in tag_set
+            elif node[0] == "not":
+                return not evaluate_node(node[1])  # type: ignore
+            elif node[0] == "and":
+                return evaluate_node(node[1]) and evaluate_node(node[2])  # type: ignore
+            else:  # node[0] == "or"
+                return evaluate_node(node[1]) or evaluate_node(node[2])  # type: ignore
+
+        return evaluate_node(self._tree)
+
+    def tags(self) -> Set[str]:
+        """Returns all tags referenced by the expression
+
+        Returns
+        -------
+        Set[str]
+            The referenced tags
+        """
+
+        return {token for token in self._tokens if token.startswith("@")}
+
+    @classmethod
+    def coerce(
+        cls, expression: Optional[Union[str, "TagExpression"]]
+    ) -> Optional["TagExpression"]:
+        """Parses an expression unless it is already parsed (or None)
+
+        Parameters
+        ----------
+        expression : str or TagExpression, optional
+            The expression
+
+        Returns
+        -------
+        TagExpression or None
+            The parsed expression
+        """
+
+        if expression is None or isinstance(expression, TagExpression):
+            return expression
+        return cls(expression)
+
+    def __str__(self) -> str:
+        """Returns a string representation of the TagExpression instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the TagExpression instance
+        """
+
+        return "<TagExpression: {}>".format(self.expression)
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the TagExpression instance
+        for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the TagExpression instance
+        """
+
+        return self.__str__()
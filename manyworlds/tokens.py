@@ -0,0 +1,102 @@
+"""Defines the Token Class"""
+
+import re
+from typing import Optional
+
+
+class Token:
+    """A classified, non-empty line of an indented feature file"""
+
+    __slots__ = ("line_no", "level", "kind", "line", "match")
+
+    FEATURE: str = "feature"
+    """A feature line ("Feature: …")"""
+    SCENARIO: str = "scenario"
+    """A scenario or scenario outline line ("Scenario: …", "Scenario Outline: …")"""
+    EXAMPLES: str = "examples"
+    """An examples line ("Examples:")"""
+    SUBTREE: str = "subtree"
+    """A subtree declaration line ("Subtree: …")"""
+    INCLUDE: str = "include"
+    """A subtree reference line ("Include: …")"""
+    EXTENDS: str = "extends"
+    """An import line ("Extends: … > …")"""
+    STEP: str = "step"
+    """A step line ("Given …", "When …", …)"""
+    TABLE_ROW: str = "table_row"
+    """A data table row ("| … |")"""
+    TAGS: str = "tags"
+    """A tag line ("@… @…")"""
+    COMMENT: str = "comment"
+    """A comment line ("# …")"""
+    TEXT: str = "text"
+    """Any other line (feature description line or invalid line)"""
+
+    line_no: int
+    """The line number in the input (starting at 0)"""
+    level: Optional[int]
+    """The indentation level (None if the indentation is invalid)"""
+    kind: str
+    """The kind of line (one of the kind constants above)"""
+    line: str
+    """The line without indentation and newline"""
+    match: Optional[re.Match]
+    """The pattern match for the line (None for text lines)"""
+
+    def __init__(
+        self,
+        line_no: int,
+        level: Optional[int],
+        kind: str,
+        line: str,
+        match: Optional[re.Match] = None,
+    ) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        line_no : int
+            The line number in the input (starting at 0)
+
+        level : int, optional
+            The indentation level (None if the indentation is invalid)
+
+        kind : str
+            The kind of line (Token.FEATURE, Token.SCENARIO, …)
+
+        line : str
+            The line without indentation and newline
+
+        match : re.Match, optional
+            The pattern match for the line
+        """
+
+        self.line_no = line_no
+        self.level = level
+        self.kind = kind
+        self.line = line
+        self.match = match
+
+    def __str__(self) -> str:
+        """Returns a string representation of the Token instance for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the Token instance
+        """
+
+        return "<Token: {} at line {} (level {}): {}>".format(
+            self.kind, self.line_no + 1, self.level, self.line
+        )
+
+    def __repr__(self) -> str:
+        """Returns a string representation of the Token instance for terminal output.
+
+        Returns
+        -------
+        str
+            String representation of the Token instance
+        """
+
+        return self.__str__()
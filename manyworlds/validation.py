@@ -0,0 +1,523 @@
+"""Defines the Validator Class and the validate function"""
+
+from typing import Optional, Iterable, List, Dict, Set, Tuple
+
+from .tokens import Token
+from .data_table import DataTable
+from .exceptions import InvalidFeatureFileError
+
+
+class Validator:
+    """Checks the indentation and line grammar of the tokens
+    of an indented feature file without building a scenario graph."""
+
+    feature_name_seen: bool
+    """Whether a feature line has been encountered"""
+    import_seen: bool
+    """Whether an import line has been encountered"""
+    scenario_level: Optional[int]
+    """The level of the last scenario (None before the first scenario)"""
+    scenario_has_steps: bool
+    """Whether the last scenario has steps"""
+    scenario_is_outline: bool
+    """Whether the last scenario is a scenario outline"""
+    scenario_has_examples: bool
+    """Whether the last scenario has an examples line"""
+    scenario_takes_steps: bool
+    """Whether steps can follow the last scenario line
+    (not after subtree declaration and subtree reference lines)"""
+    scenario_takes_children: bool
+    """Whether child scenarios can follow the last scenario line
+    (not after subtree reference lines)"""
+    subtree_names: Set[str]
+    """The names of the declared subtrees"""
+    subtree_name: Optional[str]
+    """The name of the subtree the last scenario belongs to, if any"""
+    includes: List[Tuple[Optional[str], str, Token]]
+    """The subtree references: the name of the subtree containing the
+    reference (None for the scenario trees), the name of the referenced
+    subtree and the reference line"""
+    tags_token: Optional[Token]
+    """The tag line awaiting its scenario, if any"""
+    examples_token: Optional[Token]
+    """The examples line awaiting its table, if any"""
+    table_width: Optional[int]
+    """The number of values of the header row of the current data table
+    or examples table (None outside of tables)"""
+
+    def __init__(self, known_subtrees: Iterable[str] = ()) -> None:
+        """Constructor method
+
+        Parameters
+        ----------
+        known_subtrees : Iterable[str], default = ()
+            The names of subtrees declared outside of the checked lines
+            that may be referenced
+        """
+
+        self.feature_name_seen = False
+        self.import_seen = False
+        self.scenario_level = None
+        self.scenario_has_steps = False
+        self.scenario_is_outline = False
+        self.scenario_has_examples = False
+        self.scenario_takes_steps = True
+        self.scenario_takes_children = True
+        self.subtree_names = set(known_subtrees)
+        self.subtree_name = None
+        self.includes = []
+        self.tags_token = None
+        self.examples_token = None
+        self.table_width = None
+
+    def check(self, token: Token) -> List[InvalidFeatureFileError]:
+        """Checks a token in the context of the tokens checked before it.
+
+        Parameters
+        ----------
+        token : Token
+            The next token of the feature file
+
+        Returns
+        -------
+        List[InvalidFeatureFileError]
+            The errors for the token. Empty if the token is valid
+        """
+
+        errors: List[InvalidFeatureFileError] = []
+
+        # A tag line must be followed by a scenario (or subtree reference)
+        # at the same level:
+        if self.tags_token is not None and token.kind != Token.COMMENT:
+            tags_token: Token = self.tags_token
+            self.tags_token = None
+            if token.kind not in [Token.SCENARIO, Token.INCLUDE]:
+                errors.append(self.tags_without_scenario_error(tags_token))
+            elif token.level != tags_token.level:
+                errors.append(
+                    InvalidFeatureFileError(
+                        "Invalid indentation at line {line_no}: {line}".format(
+                            line_no=tags_token.line_no + 1, line=tags_token.line
+                        ),
+                        line_no=tags_token.line_no + 1,
+                    )
+                )
+
+        # An examples line must be followed by a table:
+        if self.examples_token is not None and token.kind != Token.COMMENT:
+            examples_token: Token = self.examples_token
+            self.examples_token = None
+            if token.kind != Token.TABLE_ROW:
+                errors.append(self.examples_without_table_error(examples_token))
+
+        error: Optional[InvalidFeatureFileError] = self.check_line(token)
+        if error is not None:
+            errors.append(error)
+        return errors
+
+    def finish(self) -> List[InvalidFeatureFileError]:
+        """Checks for a dangling tag or examples line at the end of the feature file
+        and for references to unknown subtrees and cyclic subtree references.
+
+        Returns
+        -------
+        List[InvalidFeatureFileError]
+            The errors. Empty if there are none
+        """
+
+        errors: List[InvalidFeatureFileError] = []
+        if self.tags_token is not None:
+            errors.append(self.tags_without_scenario_error(self.tags_token))
+            self.tags_token = None
+        if self.examples_token is not None:
+            errors.append(self.examples_without_table_error(self.examples_token))
+            self.examples_token = None
+
+        # The subtrees referenced by each subtree:
+        references: Dict[str, List[str]] = {}
+        for container, subtree_name, token in self.includes:
+            if container is not None:
+                references.setdefault(container, []).append(subtree_name)
+
+        for container, subtree_name, token in self.includes:
+            message: Optional[str] = None
+            if subtree_name not in self.subtree_names:
+                message = "Unknown subtree"
+            elif container is not None and self.references_subtree(
+                references, subtree_name, container
+            ):
+                message = "Cyclic subtree reference"
+            if message is not None:
+                errors.append(
+                    InvalidFeatureFileError(
+                        "{message} at line {line_no}: {line}".format(
+                            message=message, line_no=token.line_no + 1, line=token.line
+                        ),
+                        line_no=token.line_no + 1,
+                    )
+                )
+        return errors
+
+    @classmethod
+    def references_subtree(
+        cls, references: Dict[str, List[str]], start: str, target: str
+    ) -> bool:
+        """Returns whether a subtree references another subtree,
+        directly or through other subtrees.
+
+        Parameters
+        ----------
+        references : Dict[str, List[str]]
+            The names of the subtrees referenced by each subtree
+
+        start : str
+            The name of the referencing subtree
+
+        target : str
+            The name of the referenced subtree
+
+        Returns
+        -------
+        bool
+            Whether target can be reached from start (or is start)
+        """
+
+        seen: Set[str] = set()
+        pending: List[str] = [start]
+        while len(pending) > 0:
+            name: str = pending.pop()
+            if name == target:
+                return True
+            if name not in seen:
+                seen.add(name)
+                pending += references.get(name, [])
+        return False
+
+    @classmethod
+    def tags_without_scenario_error(cls, tags_token: Token) -> InvalidFeatureFileError:
+        """Returns the error for a tag line that is not followed by a scenario
+
+        Parameters
+        ----------
+        tags_token : Token
+            The tag line
+
+        Returns
+        -------
+        InvalidFeatureFileError
+            The error
+        """
+
+        return InvalidFeatureFileError(
+            "Tags without scenario at line {line_no}: {line}".format(
+                line_no=tags_token.line_no + 1, line=tags_token.line
+            ),
+            line_no=tags_token.line_no + 1,
+        )
+
+    @classmethod
+    def examples_without_table_error(
+        cls, examples_token: Token
+    ) -> InvalidFeatureFileError:
+        """Returns the error for an examples line that is not followed by a table
+
+        Parameters
+        ----------
+        examples_token : Token
+            The examples line
+
+        Returns
+        -------
+        InvalidFeatureFileError
+            The error
+        """
+
+        return InvalidFeatureFileError(
+            "Examples without table at line {line_no}: {line}".format(
+                line_no=examples_token.line_no + 1, line=examples_token.line
+            ),
+            line_no=examples_token.line_no + 1,
+        )
+
+    def max_scenario_level(self) -> int:
+        """Returns the maximum level of the next scenario or subtree reference:
+        one level deeper than the last scenario, unless it is a subtree reference.
+
+        Returns
+        -------
+        int
+            The maximum level
+        """
+
+        if self.scenario_level is None:
+            return 1
+        return self.scenario_level + (1 if self.scenario_takes_children else 0)
+
+    def open_scenario(self, level: int) -> None:
+        """Resets the state for a new scenario, subtree declaration
+        or subtree reference line.
+
+        Parameters
+        ----------
+        level : int
+            The level of the line
+        """
+
+        if level == 1:
+            self.subtree_name = None  # root lines end a subtree
+        self.scenario_level = level
+        self.scenario_has_steps = False
+        self.scenario_is_outline = False
+        self.scenario_has_examples = False
+        self.scenario_takes_steps = True
+        self.scenario_takes_children = True
+
+    def check_line(self, token: Token) -> Optional[InvalidFeatureFileError]:
+        """Checks the indentation and grammar of a single token
+        in the context of the tokens checked before it.
+
+        Parameters
+        ----------
+        token : Token
+            The next token of the feature file
+
+        Returns
+        -------
+        InvalidFeatureFileError, optional
+            The error for the token, or None if the token is valid
+        """
+
+        line_no: int = token.line_no + 1
+
+        # Any line but a table row or comment ends a table:
+        if token.kind not in [Token.TABLE_ROW, Token.COMMENT]:
+            self.table_width = None
+
+        # Indentation:
+        if token.level is None:
+            return InvalidFeatureFileError(
+                "Invalid indentation at line {line_no}: {line}".format(
+                    line_no=line_no, line=token.line
+                ),
+                line_no=line_no,
+            )
+
+        if token.kind == Token.FEATURE:
+            if self.scenario_level is not None:
+                return InvalidFeatureFileError(
+                    "Feature line is allowed only at beginning of file "
+                    "but was encountered at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            self.feature_name_seen = True
+
+        elif token.kind == Token.SCENARIO:
+            max_level: int = self.max_scenario_level()
+            # Continue as if the scenario had been valid:
+            self.open_scenario(token.level)
+            self.scenario_is_outline = (
+                token.match.group("outline") is not None  # type: ignore
+            )
+            if token.level > max_level:
+                return InvalidFeatureFileError(
+                    "Excessive indentation at line {line_no}: "
+                    "Scenario: {name}".format(
+                        line_no=line_no,
+                        name=token.match.group("scenario_name"),  # type: ignore
+                    ),
+                    line_no=line_no,
+                )
+
+        elif token.kind == Token.STEP:
+            if self.scenario_level is None or not self.scenario_takes_steps:
+                return InvalidFeatureFileError(
+                    "Step outside of scenario at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            if token.level != self.scenario_level:
+                return InvalidFeatureFileError(
+                    "Invalid indentation at line {line_no}: {name}".format(
+                        line_no=line_no,
+                        name=token.match.group("name").strip(),  # type: ignore
+                    ),
+                    line_no=line_no,
+                )
+            if self.scenario_has_examples:
+                return InvalidFeatureFileError(
+                    "Step after examples at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            if (
+                token.match.group("conjunction") in ["And", "But"]  # type: ignore
+                and not self.scenario_has_steps
+            ):
+                return InvalidFeatureFileError(
+                    "Missing preceding step at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            self.scenario_has_steps = True
+
+        elif token.kind == Token.TAGS:
+            self.tags_token = token
+
+        elif token.kind == Token.SUBTREE:
+            subtree_name: str = token.match["subtree_name"].strip()  # type: ignore
+            self.open_scenario(1)
+            self.scenario_takes_steps = False
+            self.subtree_name = subtree_name
+            if token.level != 1:
+                return InvalidFeatureFileError(
+                    "Invalid indentation at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            if subtree_name in self.subtree_names:
+                return InvalidFeatureFileError(
+                    "Duplicate subtree at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            self.subtree_names.add(subtree_name)
+
+        elif token.kind == Token.INCLUDE:
+            max_level = self.max_scenario_level()
+            self.open_scenario(token.level)
+            self.scenario_takes_steps = False
+            self.scenario_takes_children = False
+            if token.level > max_level:
+                return InvalidFeatureFileError(
+                    "Excessive indentation at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            self.includes.append(
+                (
+                    self.subtree_name,
+                    token.match["subtree_name"].strip(),  # type: ignore
+                    token,
+                )
+            )
+
+        elif token.kind == Token.EXTENDS:
+            if token.level != 1:
+                return InvalidFeatureFileError(
+                    "Invalid indentation at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            if self.scenario_level is not None:
+                return InvalidFeatureFileError(
+                    "Extends line is allowed only before the first scenario "
+                    "but was encountered at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            if self.import_seen:
+                return InvalidFeatureFileError(
+                    "Duplicate extends line at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            self.import_seen = True
+
+        elif token.kind == Token.EXAMPLES:
+            if not self.scenario_is_outline:
+                return InvalidFeatureFileError(
+                    "Examples outside of scenario outline at line {line_no}: "
+                    "{line}".format(line_no=line_no, line=token.line),
+                    line_no=line_no,
+                )
+            if token.level != self.scenario_level:
+                return InvalidFeatureFileError(
+                    "Invalid indentation at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            self.scenario_has_examples = True
+            self.examples_token = token
+
+        elif token.kind == Token.TABLE_ROW:
+            if not self.scenario_has_steps and not self.scenario_has_examples:
+                return InvalidFeatureFileError(
+                    "Data table row without step at line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+            width: int = len(DataTable.parse_match(token.match).values)  # type: ignore
+            if self.table_width is None:
+                self.table_width = width
+            elif width != self.table_width:
+                return DataTable.row_length_error(width, self.table_width, line_no)
+
+        elif token.kind == Token.TEXT:
+            # Only feature description lines are allowed:
+            if not self.feature_name_seen or self.scenario_level is not None:
+                return InvalidFeatureFileError(
+                    "Unable to parse line {line_no}: {line}".format(
+                        line_no=line_no, line=token.line
+                    ),
+                    line_no=line_no,
+                )
+
+        return None
+
+
+def validate_lines(lines: Iterable[str]) -> List[InvalidFeatureFileError]:
+    """Validates the lines of an indented feature.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        The lines of the indented feature (with or without newlines)
+
+    Returns
+    -------
+    List[InvalidFeatureFileError]
+        All errors, in line order. Empty if the feature is valid
+    """
+
+    from .feature import Feature  # imported here to avoid a circular import
+
+    validator: Validator = Validator()
+    errors: List[InvalidFeatureFileError] = []
+    for token in Feature.tokenize(lines):
+        errors += validator.check(token)
+    errors += validator.finish()
+    errors.sort(key=lambda error: error.line_no or 0)  # stable
+    return errors
+
+
+def validate(file_path: str) -> List[InvalidFeatureFileError]:
+    """Validates an indented feature file without building a scenario graph.
+
+    All errors are reported, not only the first one.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the feature file
+
+    Returns
+    -------
+    List[InvalidFeatureFileError]
+        All errors, in line order. Empty if the file is valid
+    """
+
+    with open(file_path) as indented_file:
+        return validate_lines(indented_file)
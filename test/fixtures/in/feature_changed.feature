@@ -0,0 +1,65 @@
+Feature: User Deactivation
+
+    As an administrator
+    I want to deactivate users who leave the company
+    So that only authorized users have access to the system
+
+Scenario: View users
+Given the following users:
+    | Name   | Status      |
+    | Ben    | Active      |
+    | Alice  | Active      |
+    | Connie | Active      |
+    | Dan    | Deactivated | # inactive
+When I go to "Users"
+Then I see the following users:
+    | Name   | Status |
+    | Ben    | Active |
+    | Alice  | Active |
+    | Connie | Active |
+
+    Scenario: Deactivate user
+    When I click "Deactivate" for user "Ben"
+    And I click "OK"
+    Then I see the following users: # I no longer see Ben
+        | Name   | Status |
+        | Alice  | Active |
+        | Connie | Active |
+
+    Scenario: Bulk operations # on multiple users
+
+        Scenario: Select user
+        When I select user "Ben"
+        Then I see "1 user selected"
+
+            Scenario: Select multiple users
+            When I select user "Alice"
+            Then I see "2 users selected"
+
+                Scenario: Deselect all users
+                When I click "Deselect all"
+                Then I see "0 users selected"
+
+                Scenario: Bulk deactivate users
+                When I click "Deactivate all"
+                Then I see a confirmation dialog # changed comment only
+
+                    Scenario: Confirm bulk deactivation of users # by clicking "Yes"
+                    When I click "Yes"
+                    Then I see "0 users selected"
+                    And I see the following users: # I no longer see Ben or Alice
+                        | Name   | Status |
+                        | Connie | Active |
+
+                    Scenario: Cancel out of bulk deactivation of users
+                    When I click "Cancel"
+                    Then I see "2 users selected"
+                    And I see the following users:
+                        | Name   | Status |
+                        | Ben    | Active | # still there
+                        | Alice  | Active | # still there
+                        | Connie | Active |
+
+                    Scenario: Close bulk deactivation dialog
+                    When I press "Escape"
+                    Then I see "2 users selected"
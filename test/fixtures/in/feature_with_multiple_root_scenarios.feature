@@ -0,0 +1,56 @@
+Feature: User Management
+
+    As an administrator
+    I want to manage users
+
+@users
+Scenario: View users
+Given the following users:
+    | Name   | Status      |
+    | Ben    | Active      |
+    | Alice  | Active      |
+    | Dan    | Deactivated | # inactive
+When I go to "Users"
+Then I see the following users:
+    | Name   | Status |
+    | Ben    | Active |
+    | Alice  | Active |
+
+    @smoke
+    Scenario: Deactivate user
+    When I click "Deactivate" for user "Ben"
+    And I click "OK"
+    Then I see the following users: # I no longer see Ben
+        | Name   | Status |
+        | Alice  | Active |
+
+    Scenario: Bulk operations # on multiple users
+
+        Scenario: Select user
+        When I select user "Ben"
+        Then I see "1 user selected"
+
+# Invitations are independent of the user list
+@invitations @smoke
+Scenario: Invite user
+Given I am on the "Invitations" page
+When I enter "carol@example.com"
+And I click "Invite"
+Then I see "Invitation sent"
+
+    Scenario: Resend invitation
+    When I click "Resend" for "carol@example.com"
+    Then I see "Invitation sent again"
+
+    Scenario: Revoke invitation
+    When I click "Revoke" for "carol@example.com"
+    Then I see "Invitation revoked"
+
+Scenario: View audit log
+Given I am on the "Audit log" page
+Then I see "No entries"
+
+    @slow
+    Scenario: Filter audit log
+    When I filter by "Deactivation"
+    Then I see "No entries"
@@ -0,0 +1,31 @@
+Feature: User Deactivation
+
+Scenario Outline: View <role> users
+Given the following users:
+    | Name   | Role   |
+    | Ben    | <role> |
+    | Alice  | <role> |
+When I go to "Users" as <viewer>
+Then I see 2 users
+Examples:
+    | role    | viewer        |
+    | Admin   | an admin      |
+    | Manager | a super admin |
+
+    Scenario: Deactivate <role> user
+    When I click "Deactivate" for user "Ben"
+    Then I see 1 user
+
+    Scenario Outline: Select users
+    When I select <count> users
+    Then I see "<count> users selected"
+    Examples: # one user
+        | count |
+        | 1     |
+    Examples:
+        | count |
+        | 2     |
+
+        Scenario: Deselect all users
+        When I click "Deselect all"
+        Then I see "0 users selected" instead of <count>
@@ -0,0 +1,33 @@
+Feature: User Administration
+
+Scenario: View users
+Given the following users:
+    | Name  |
+    | Ben   |
+    | Alice |
+When I go to "Users"
+Then I see 2 users
+
+    Scenario: Sort users
+    When I sort by "Name"
+    Then I see "Alice" first
+
+        Scenario: Filter sorted users
+        When I filter by "Ben"
+        Then I see 1 user
+
+        Scenario: Export sorted users
+        When I click "Export"
+        Then I see "Export complete"
+
+    Scenario: Filter users
+    When I filter by "Ben"
+    Then I see 1 user
+
+        Scenario: Export filtered users
+        When I click "Export"
+        Then I see "Export complete"
+
+    Scenario: Export users
+    When I click "Export"
+    Then I see "Export complete"
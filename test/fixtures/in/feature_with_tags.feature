@@ -0,0 +1,36 @@
+Feature: User Deactivation
+
+@users
+Scenario: View users
+Given the following users:
+    | Name   | Status |
+    | Ben    | Active |
+    | Alice  | Active |
+When I go to "Users"
+Then I see the following users:
+    | Name   | Status |
+    | Ben    | Active |
+    | Alice  | Active |
+
+    @smoke
+    Scenario: Deactivate user
+    When I click "Deactivate" for user "Ben"
+    Then I see the following users:
+        | Name   | Status |
+        | Alice  | Active |
+
+    @smoke @bulk # operations on multiple users
+    Scenario: Bulk operations
+
+        Scenario: Select user
+        When I select user "Ben"
+        Then I see "1 user selected"
+
+            @slow
+            Scenario: Select multiple users
+            When I select user "Alice"
+            Then I see "2 users selected"
+
+    Scenario: Sort users
+    When I click "Name"
+    Then I see users sorted by name
@@ -0,0 +1,16 @@
+Feature: User Administration
+
+Extends: login.feature > Log in > Logged in as admin
+
+Scenario: View users
+When I go to "Users"
+Then I see the following users:
+    | Name  | Role  |
+    | Ben   | Admin |
+    | Alice | User  |
+
+    Scenario: Deactivate user
+    When I click "Deactivate" for user "Alice"
+    Then I see the following users:
+        | Name | Role  |
+        | Ben  | Admin |
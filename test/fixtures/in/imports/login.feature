@@ -0,0 +1,18 @@
+Feature: Login
+
+@login
+Scenario: Log in
+Given the following users:
+    | Name  | Role  |
+    | Ben   | Admin |
+    | Alice | User  |
+When I go to "Login"
+Then I see the login form
+
+    Scenario: Logged in as admin
+    When I log in as "Ben"
+    Then I see "Welcome, Ben"
+
+    Scenario: Logged in as user
+    When I log in as "Alice"
+    Then I see "Welcome, Alice"
@@ -0,0 +1,7 @@
+Feature: Profile
+
+Extends: login.feature > Log in > Logged in as user # any user
+
+Scenario: View profile
+When I go to "Profile"
+Then I see "Alice"
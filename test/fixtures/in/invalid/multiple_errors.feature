@@ -0,0 +1,9 @@
+Scenario: View users
+Whenx I go to "Users" # mis-spelled conjunction
+Then I see users
+
+   Scenario: Indented using 3 spaces instead of 4
+
+        Scenario: Indented 2 instead of 1 levels
+        When I go to "Users"
+            Then I see users # +1 indentation level
@@ -0,0 +1,22 @@
+Feature: User Administration
+
+@login
+Scenario: Log in > Logged in as admin > View users > Deactivate user
+Given the following users:
+    | Name  | Role  |
+    | Ben   | Admin |
+    | Alice | User  |
+When I go to "Login"
+Then I see the login form
+When I log in as "Ben"
+Then I see "Welcome, Ben"
+When I go to "Users"
+Then I see the following users:
+    | Name  | Role  |
+    | Ben   | Admin |
+    | Alice | User  |
+When I click "Deactivate" for user "Alice"
+Then I see the following users:
+    | Name | Role  |
+    | Ben  | Admin |
+
@@ -0,0 +1,66 @@
+Feature: User Deactivation
+
+Scenario: View Admin users > Deactivate Admin user (viewer: an admin)
+Given the following users:
+    | Name  | Role  |
+    | Ben   | Admin |
+    | Alice | Admin |
+When I go to "Users" as an admin
+Then I see 2 users
+When I click "Deactivate" for user "Ben"
+Then I see 1 user
+
+Scenario: View Manager users > Deactivate Manager user (viewer: a super admin)
+Given the following users:
+    | Name  | Role    |
+    | Ben   | Manager |
+    | Alice | Manager |
+When I go to "Users" as a super admin
+Then I see 2 users
+When I click "Deactivate" for user "Ben"
+Then I see 1 user
+
+Scenario: Select users > Deselect all users (role: Admin, viewer: an admin, count: 1)
+Given the following users:
+    | Name  | Role  |
+    | Ben   | Admin |
+    | Alice | Admin |
+When I go to "Users" as an admin
+ And I select 1 users
+Then I see "1 users selected"
+When I click "Deselect all"
+Then I see "0 users selected" instead of 1
+
+Scenario: Select users > Deselect all users (role: Admin, viewer: an admin, count: 2)
+Given the following users:
+    | Name  | Role  |
+    | Ben   | Admin |
+    | Alice | Admin |
+When I go to "Users" as an admin
+ And I select 2 users
+Then I see "2 users selected"
+When I click "Deselect all"
+Then I see "0 users selected" instead of 2
+
+Scenario: Select users > Deselect all users (role: Manager, viewer: a super admin, count: 1)
+Given the following users:
+    | Name  | Role    |
+    | Ben   | Manager |
+    | Alice | Manager |
+When I go to "Users" as a super admin
+ And I select 1 users
+Then I see "1 users selected"
+When I click "Deselect all"
+Then I see "0 users selected" instead of 1
+
+Scenario: Select users > Deselect all users (role: Manager, viewer: a super admin, count: 2)
+Given the following users:
+    | Name  | Role    |
+    | Ben   | Manager |
+    | Alice | Manager |
+When I go to "Users" as a super admin
+ And I select 2 users
+Then I see "2 users selected"
+When I click "Deselect all"
+Then I see "0 users selected" instead of 2
+
@@ -0,0 +1,24 @@
+Feature: User Administration
+
+Scenario: View users > Sort users > Filter sorted users
+Given the following users:
+    | Name  |
+    | Ben   |
+    | Alice |
+When I go to "Users"
+Then I see 2 users
+When I sort by "Name"
+Then I see "Alice" first
+When I filter by "Ben"
+Then I see 1 user
+
+Scenario: View users > Export users
+Given the following users:
+    | Name  |
+    | Ben   |
+    | Alice |
+When I go to "Users"
+Then I see 2 users
+When I click "Export"
+Then I see "Export complete"
+
@@ -0,0 +1,30 @@
+Feature: User Administration
+
+@login
+Scenario: View users
+Given the following users:
+    | Name  | Role  |
+    | Ben   | Admin |
+    | Alice | User  |
+When I go to "Login"
+ And I log in as "Ben"
+ And I go to "Users"
+Then I see the following users:
+    | Name  | Role  |
+    | Ben   | Admin |
+    | Alice | User  |
+
+@login
+Scenario: Deactivate user
+Given the following users:
+    | Name  | Role  |
+    | Ben   | Admin |
+    | Alice | User  |
+When I go to "Login"
+ And I log in as "Ben"
+ And I go to "Users"
+ And I click "Deactivate" for user "Alice"
+Then I see the following users:
+    | Name | Role  |
+    | Ben  | Admin |
+
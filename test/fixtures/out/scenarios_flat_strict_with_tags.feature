@@ -0,0 +1,24 @@
+Feature: User Deactivation
+
+@users @smoke
+Scenario: Deactivate user
+Given the following users:
+    | Name  | Status |
+    | Ben   | Active |
+    | Alice | Active |
+When I go to "Users"
+ And I click "Deactivate" for user "Ben"
+Then I see the following users:
+    | Name  | Status |
+    | Alice | Active |
+
+@users @smoke @bulk
+Scenario: [Bulk operations] Select user
+Given the following users:
+    | Name  | Status |
+    | Ben   | Active |
+    | Alice | Active |
+When I go to "Users"
+ And I select user "Ben"
+Then I see "1 user selected"
+
@@ -0,0 +1,38 @@
+from behave import given, when, then, step, use_step_matcher
+
+use_step_matcher("re")
+
+
+@given("the following users:")
+def step_users(context):
+    pass
+
+
+@when(r'I go to "(?P<page>[^"]+)"')
+def step_go_to(context, page):
+    pass
+
+
+@when(r'I click "(.+)"')
+def step_click(context, label):
+    pass
+
+
+@when(r'I click "([^"]+)" for user "([^"]+)"')
+def step_click_for_user(context, label, user):
+    pass
+
+
+@when(r'I (select|deselect) user "([^"]+)"')
+def step_select_user(context, action, user):
+    pass
+
+
+@then(r'I see "(\d+) users? selected"')
+def step_selected(context, count):
+    pass
+
+
+@step("I see the following users:")
+def step_see_users(context):
+    pass
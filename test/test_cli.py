@@ -32,3 +32,243 @@ def test_cli_hierarchy_output():
     assert filecmp.cmp(
         "test/out/scenario_hierarchy.txt", "test/fixtures/out/scenario_hierarchy.txt"
     )
+
+
+def test_cli_skips_unchanged_output(tmp_path):
+    size = os.path.getsize("test/fixtures/out/scenarios_flat_strict.feature")
+    reports = []
+    for run in range(2):
+        exit_status = os.system(
+            "python -m manyworlds --input test/fixtures/in/feature.feature "
+            "--output {output} --no-daemon > {report}".format(
+                output=tmp_path / "flat.feature", report=tmp_path / "report.txt"
+            )
+        )
+        assert exit_status == 0
+        with open(str(tmp_path / "report.txt")) as report_file:
+            reports.append(report_file.readlines()[-1])
+    assert reports == [
+        "flattened 1 scenario files ({} bytes written), "
+        "skipped 0 unchanged scenario files\n".format(size),
+        "flattened 0 scenario files (0 bytes written), "
+        "skipped 1 unchanged scenario files\n",
+    ]
+
+
+def test_cli_stdin_input():
+    exit_status = os.system(
+        "python -m manyworlds --input - "
+        "--output test/out/scenarios_flat_strict_stdin.feature "
+        "< test/fixtures/in/feature.feature > /dev/null"
+    )
+    assert exit_status == 0
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_strict_stdin.feature",
+        "test/fixtures/out/scenarios_flat_strict.feature",
+    )
+
+
+def test_cli_stdin_input_with_imports():
+    """Imports are relative to the current directory"""
+    exit_status = os.system(
+        "sed 's#login.feature#test/fixtures/in/imports/login.feature#' "
+        "test/fixtures/in/imports/admin.feature | python -m manyworlds --input - "
+        "--output test/out/scenarios_flat_strict_stdin_imports.feature > /dev/null"
+    )
+    assert exit_status == 0
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_strict_stdin_imports.feature",
+        "test/fixtures/out/scenarios_flat_strict_with_imports.feature",
+    )
+
+
+def test_cli_batch(tmp_path):
+    exit_status = os.system(
+        "python -m manyworlds batch test/fixtures/in/imports "
+        "--output {output_dir} > {output_dir}.txt".format(output_dir=tmp_path / "flat")
+    )
+    assert exit_status == 0
+    byte_count = sum(
+        os.path.getsize(str(tmp_path / "flat" / file_name))
+        for file_name in ["admin.feature", "login.feature", "profile.feature"]
+    )
+    with open(str(tmp_path / "flat.txt")) as batch_output:
+        assert batch_output.readlines() == [
+            "flattened 3 scenario files ({} bytes written), skipped 0 unchanged "
+            "and 0 up-to-date scenario files, parsed 3 scenario files\n".format(
+                byte_count
+            )
+        ]
+    assert filecmp.cmp(
+        str(tmp_path / "flat" / "admin.feature"),
+        "test/fixtures/out/scenarios_flat_strict_with_imports.feature",
+    )
+
+
+def test_cli_check():
+    exit_status = os.system(
+        "python -m manyworlds --check test/fixtures/in/feature.feature "
+        "test/fixtures/in/feature_with_organizational_scenarios.feature"
+    )
+    assert exit_status == 0
+
+
+def test_cli_check_invalid():
+    exit_status = os.system(
+        "python -m manyworlds --check test/fixtures/in/feature.feature "
+        "test/fixtures/in/invalid/multiple_errors.feature "
+        "> test/out/check_output.txt"
+    )
+    assert exit_status != 0
+    with open("test/out/check_output.txt") as check_output:
+        assert len(check_output.readlines()) == 4
+
+
+def test_cli_diff():
+    exit_status = os.system(
+        "python -m manyworlds diff test/fixtures/in/feature.feature "
+        "test/fixtures/in/feature_changed.feature > test/out/diff_output.txt"
+    )
+    assert exit_status == 0
+    with open("test/out/diff_output.txt") as diff_output:
+        assert diff_output.readlines() == [
+            "+ [Bulk operations] Close bulk deactivation dialog\n",
+            "- [Bulk operations] Deselect user\n",
+            "~ [Bulk operations] Confirm bulk deactivation of users\n",
+        ]
+
+
+def test_cli_only_unverified():
+    exit_status = os.system(
+        "python -m manyworlds --input test/fixtures/in/feature.feature "
+        "--output test/out/scenarios_flat_strict_unverified.feature "
+        "--ledger test/out/results.db --only-unverified > /dev/null"
+    )
+    assert exit_status == 0
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_strict_unverified.feature",
+        "test/fixtures/out/scenarios_flat_strict.feature",
+    )
+
+    exit_status = os.system(
+        "python -m manyworlds ledger test/out/results.db compact "
+        "--input test/fixtures/in/feature.feature > /dev/null"
+    )
+    assert exit_status == 0
+
+
+def test_cli_only_unverified_without_ledger():
+    exit_status = os.system(
+        "python -m manyworlds --input test/fixtures/in/feature.feature "
+        "--only-unverified 2> /dev/null"
+    )
+    assert exit_status != 0
+
+
+def test_cli_fold():
+    exit_status = os.system(
+        "python -m manyworlds fold test/fixtures/out/scenarios_flat_strict.feature "
+        "--output test/out/scenarios_folded_cli.feature > test/out/fold_output.txt"
+    )
+    assert exit_status == 0
+    with open("test/out/fold_output.txt") as fold_output:
+        assert fold_output.readlines() == [
+            "folded 9 flat scenarios (50 steps) into 9 scenarios (22 steps): "
+            "28 step executions saved (56%)\n"
+        ]
+
+
+def test_cli_jobs():
+    exit_status = os.system(
+        "python -m manyworlds --input test/fixtures/in/feature.feature "
+        "--output test/out/scenarios_flat_strict_jobs.feature --jobs 2"
+    )
+    assert exit_status == 0
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_strict_jobs.feature",
+        "test/fixtures/out/scenarios_flat_strict.feature",
+    )
+
+
+def test_cli_source_map():
+    exit_status = os.system(
+        "python -m manyworlds --input test/fixtures/in/feature.feature "
+        "--output test/out/scenarios_flat_strict_mapped.feature "
+        "--source-map test/out/scenarios_flat_strict_mapped.map > /dev/null"
+    )
+    assert exit_status == 0
+    exit_status = os.system(
+        "python -m manyworlds locate test/out/scenarios_flat_strict_mapped.map 30 "
+        "> test/out/locate_output.txt"
+    )
+    assert exit_status == 0
+    with open("test/out/locate_output.txt") as locate_output:
+        assert locate_output.readlines() == ["23\n"]  # And I click "OK"
+
+    exit_status = os.system(
+        "python -m manyworlds locate test/out/scenarios_flat_strict_mapped.map 2 "
+        "2> /dev/null"
+    )
+    assert exit_status != 0
+
+
+def test_cli_match():
+    exit_status = os.system(
+        "python -m manyworlds match test/fixtures/steps/steps.py "
+        "test/fixtures/in/feature.feature --output test/out/match_table.json "
+        "> test/out/match_output.txt"
+    )
+    assert exit_status != 0  # undefined and ambiguous steps
+    with open("test/out/match_output.txt") as match_output:
+        assert match_output.readlines() == [
+            "undefined: Then I see a confirmation dialog\n",
+            'ambiguous: When I click "Deactivate" for user "Ben" '
+            "(test/fixtures/steps/steps.py:16, test/fixtures/steps/steps.py:21)\n",
+            "matched 15 distinct steps (22 steps) against 7 step definitions "
+            "running 25 regular expressions: 1 undefined, 1 ambiguous\n",
+        ]
+    assert os.path.exists("test/out/match_table.json")
+
+
+def test_cli_smoke():
+    exit_status = os.system(
+        "python -m manyworlds "
+        "--input test/fixtures/in/feature_with_shared_steps.feature "
+        "--output test/out/scenarios_flat_smoke_cli.feature --mode smoke "
+        "> test/out/smoke_report.txt"
+    )
+    assert exit_status == 0
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_smoke_cli.feature",
+        "test/fixtures/out/scenarios_flat_smoke.feature",
+    )
+    with open("test/out/smoke_report.txt") as report_file:
+        report = report_file.read()
+    assert (
+        "smoke suite: 2 scenarios (12 steps) exercising 9 of 9 distinct steps (100%)"
+        in report
+    )
+    assert "relaxed: 4 scenarios (22 steps), smoke suite 50% fewer scenarios" in report
+
+
+def test_cli_durations_without_smoke_mode():
+    exit_status = os.system(
+        "python -m manyworlds --input test/fixtures/in/feature.feature "
+        "--durations durations.csv 2> /dev/null"
+    )
+    assert exit_status != 0
+
+
+def test_cli_auto():
+    exit_status = os.system(
+        "python -m manyworlds "
+        "--input test/fixtures/in/feature_with_shared_steps.feature "
+        "--output test/out/scenarios_flat_auto_cli.feature --mode auto "
+        "--max-steps 6 --durations test/fixtures/in/durations/junit.xml "
+        "> test/out/auto_plan.txt"
+    )
+    assert exit_status == 0
+    with open("test/out/auto_plan.txt") as plan_file:
+        plan = plan_file.read()
+    assert "relaxed: View users > Sort users\n" in plan
+    assert "auto: 5 scenarios (" in plan
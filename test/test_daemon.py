@@ -0,0 +1,199 @@
+"""Test the Daemon and Client classes"""
+
+import filecmp
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import manyworlds as mw
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Run a daemon in a thread and return a client for it"""
+    socket_path = str(tmp_path / "manyworlds.sock")
+    daemon = mw.Daemon(socket_path)
+    thread = threading.Thread(target=daemon.serve)
+    thread.start()
+    client = mw.Client(socket_path, timeout=10)
+    yield client
+    client.request({"command": "shutdown"})
+    thread.join()
+    assert not os.path.exists(socket_path)
+
+
+def test_ping(client):
+    assert client.is_running()
+    assert not mw.Client(client.socket_path + ".missing").is_running()
+
+
+def test_untrusted_sockets(client, tmp_path, monkeypatch):
+    """Requests are only sent to sockets owned by the current user"""
+    link_path = str(tmp_path / "link.sock")
+    os.symlink(client.socket_path, link_path)
+    assert not mw.Client(link_path).is_running()
+    with pytest.raises(PermissionError):
+        mw.Client(link_path).request({"command": "ping"})
+
+    file_path = str(tmp_path / "file.sock")
+    open(file_path, "w").close()
+    assert not mw.Client(file_path).is_running()
+
+    uid = os.getuid()
+    monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+    assert not client.is_running()
+    monkeypatch.undo()
+    assert client.is_running()
+
+
+def test_default_socket_path(monkeypatch):
+    monkeypatch.delenv("MANYWORLDS_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+    assert (
+        mw.client.default_socket_path()
+        == "/run/user/1000/manyworlds-{}.sock".format(os.getuid())
+    )
+    monkeypatch.setenv("MANYWORLDS_SOCKET", "/tmp/other.sock")
+    assert mw.client.default_socket_path() == "/tmp/other.sock"
+
+
+def test_flatten(client):
+    response = client.request(
+        {
+            "command": "flatten",
+            "input": "test/fixtures/in/feature.feature",
+            "output": "test/out/scenarios_flat_strict_daemon.feature",
+        }
+    )
+    assert response["ok"]
+    assert (
+        response["outline"]
+        == mw.Feature.from_file("test/fixtures/in/feature.feature").outline()
+    )
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_strict_daemon.feature",
+        "test/fixtures/out/scenarios_flat_strict.feature",
+    )
+
+
+def test_cache(client, tmp_path):
+    feature_path = str(tmp_path / "feature.feature")
+    shutil.copy("test/fixtures/in/feature.feature", feature_path)
+    request = {"command": "flatten", "input": feature_path}
+
+    def stats():
+        response = client.request({"command": "stats"})
+        return (response["hits"], response["misses"])
+
+    client.request(request)
+    assert stats() == (0, 1)
+    client.request(request)
+    assert stats() == (1, 1)
+
+    # Modification time changed, content unchanged:
+    os.utime(feature_path, ns=(0, 0))
+    client.request(request)
+    assert stats() == (2, 1)
+
+    # Content changed:
+    with open(feature_path, "a") as feature_file:
+        feature_file.write("\nScenario: Another root scenario\nThen a result\n")
+    response = client.request(request)
+    assert stats() == (2, 2)
+    assert response["outline"][-1] == "Another root scenario"
+
+
+def test_invalid_feature(client):
+    response = client.request(
+        {
+            "command": "flatten",
+            "input": "test/fixtures/in/invalid/excessive_indentation.feature",
+        }
+    )
+    assert not response["ok"]
+    assert response["line_no"] == 13
+    assert response["error"].startswith("Excessive indentation at line 13")
+
+
+def test_validate(client):
+    response = client.request(
+        {
+            "command": "validate",
+            "files": [
+                "test/fixtures/in/feature.feature",
+                "test/fixtures/in/invalid/excessive_indentation.feature",
+            ],
+        }
+    )
+    assert response["ok"]
+    assert response["errors"]["test/fixtures/in/feature.feature"] == []
+    assert [
+        error["line_no"]
+        for error in response["errors"][
+            "test/fixtures/in/invalid/excessive_indentation.feature"
+        ]
+    ] == [13]
+
+
+def test_invalid_requests(client):
+    assert client.request({"command": "frobnicate"}) == {
+        "ok": False,
+        "error": "Unknown command: frobnicate",
+    }
+    response = client.request({"command": "flatten", "input": "missing.feature"})
+    assert not response["ok"]
+    assert response["error"].startswith("FileNotFoundError")
+
+
+def test_cli_uses_daemon(tmp_path):
+    socket_path = str(tmp_path / "manyworlds.sock")
+    environment = dict(os.environ, MANYWORLDS_SOCKET=socket_path)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "manyworlds", "serve"],
+        env=environment,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        client = mw.Client(socket_path, timeout=10)
+        for _ in range(100):
+            if client.is_running():
+                break
+            time.sleep(0.1)
+
+        for _ in range(2):
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "manyworlds",
+                    "--input",
+                    "test/fixtures/in/feature.feature",
+                    "--output",
+                    "test/out/scenarios_flat_strict_cli_daemon.feature",
+                ],
+                env=environment,
+                capture_output=True,
+                text=True,
+            )
+            assert completed.returncode == 0
+            assert completed.stdout.splitlines()[0] == "View users"
+        assert filecmp.cmp(
+            "test/out/scenarios_flat_strict_cli_daemon.feature",
+            "test/fixtures/out/scenarios_flat_strict.feature",
+        )
+        stats = client.request({"command": "stats"})
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+        stop = subprocess.run(
+            [sys.executable, "-m", "manyworlds", "serve", "--stop"], env=environment
+        )
+        assert stop.returncode == 0
+        assert server.wait(timeout=10) == 0
+    finally:
+        if server.poll() is None:
+            server.kill()
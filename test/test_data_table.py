@@ -0,0 +1,140 @@
+"""Test the DataTable class"""
+
+import pytest
+
+import manyworlds as mw
+from manyworlds.data_table import DataTable, DataTableRow
+from manyworlds.exceptions import DataTableRowLengthError
+from manyworlds.validation import validate_lines
+
+
+def users_table():
+    data_table = DataTable(DataTableRow(["Name", "Role"]))
+    for values, comment in [
+        (["Ann", "Manager"], None),
+        (["Ben", "Manager"], "inactive"),
+        (["Christine", "Admin"], None),
+    ]:
+        data_table.append(DataTableRow(values, comment))
+    return data_table
+
+
+def test_columns():
+    data_table = users_table()
+    assert data_table.row_count == 4
+    assert data_table.columns == [
+        ["Name", "Ann", "Ben", "Christine"],
+        ["Role", "Manager", "Manager", "Admin"],
+    ]
+    assert data_table.columns[1][1] is data_table.columns[1][2]  # interned
+    assert data_table.column_widths == [9, 7]
+    assert data_table.comments == {2: "inactive"}
+
+
+def test_views():
+    data_table = users_table()
+    assert data_table.to_list_of_list() == [
+        ["Name", "Role"],
+        ["Ann", "Manager"],
+        ["Ben", "Manager"],
+        ["Christine", "Admin"],
+    ]
+    assert data_table.to_list_of_dict()[-1] == {"Name": "Christine", "Role": "Admin"}
+    assert len(data_table.to_list_of_dict()) == 3
+    assert [row.comment for row in data_table.to_list()] == [
+        None,
+        None,
+        "inactive",
+        None,
+    ]
+    assert data_table.header_row.values == ["Name", "Role"]
+    assert data_table.rows[1:][0].values == ["Ben", "Manager"]
+
+    # Views reflect rows appended later:
+    view = data_table.to_list_of_list()
+    data_table.append(DataTableRow(["Dan", "Guest"]))
+    assert len(view) == 5
+    assert view[4] == ["Dan", "Guest"]
+
+
+def test_uneven_rows():
+    data_table = DataTable(DataTableRow(["Name", "Role"]))
+    with pytest.raises(DataTableRowLengthError) as error_info:
+        data_table.append(DataTableRow(["Ben"]))
+    assert str(error_info.value) == "Data table row with 1 instead of 2 values"
+    with pytest.raises(DataTableRowLengthError):
+        data_table.append(DataTableRow(["Ben", "Manager", "extra"]), line_no=3)
+    assert data_table.row_count == 1
+
+    with pytest.raises(DataTableRowLengthError) as error_info:
+        mw.Feature.from_string(
+            "Scenario: View users\n"
+            "Given the following users:\n"
+            "    | Name | Role    |\n"
+            "    | Ben  | Manager |\n"
+            "    | Ann  |\n"
+            "Then I see the users\n"
+        )
+    assert error_info.value.line_no == 5
+    assert str(error_info.value) == (
+        "Data table row with 1 instead of 2 values at line 5"
+    )
+
+
+def test_validate_uneven_rows():
+    """Reports the error raised by the parser"""
+    for text in [
+        "Scenario: View users\n"
+        "Given the following users:\n"
+        "    | Name | Role    |\n"
+        "    # Ann is new\n"
+        "    | Ann  |\n"
+        "Then I see the users\n",
+        "Scenario Outline: View <name>\n"
+        "Then I see <name>\n"
+        "\n"
+        "Examples:\n"
+        "    | name | role    |\n"
+        "    | Ann  |\n",
+    ]:
+        with pytest.raises(DataTableRowLengthError) as error_info:
+            mw.Feature.from_string(text)
+        errors = validate_lines(text.splitlines())
+        assert [str(error) for error in errors] == [str(error_info.value)]
+        assert errors[0].line_no == error_info.value.line_no
+
+    # Each step has its own data table:
+    assert (
+        validate_lines(
+            [
+                "Scenario: View users",
+                "Given the following users:",
+                "    | Name | Role    |",
+                "    | Ann  | Manager |",
+                'When I select "Ann"',
+                "Then I see:",
+                "    | Name |",
+                "    | Ann  |",
+            ]
+        )
+        == []
+    )
+
+
+def test_rows_append():
+    data_table = DataTable(DataTableRow(["Name", "Role"]))
+    data_table.rows.append(DataTableRow(["Ben", "Manager"], "inactive"))
+    assert data_table.row_count == 2
+    assert data_table.rows[0].values == ["Ben", "Manager"]
+    assert data_table.rows[0].comment == "inactive"
+
+
+def test_substitution():
+    data_table = DataTable(DataTableRow(["Name", "Role"]))
+    data_table.append(DataTableRow(["<name>", ""]))
+    data_table.append(DataTableRow(["Ben", "Manager"]))
+
+    substituted = data_table.substitute({"name": "Alexandra"})
+    assert substituted.to_list_of_list()[1] == ["Alexandra", ""]
+    assert substituted.column_widths == [9, 7]
+    assert data_table.to_list_of_list()[1] == ["<name>", ""]
@@ -0,0 +1,138 @@
+"""Test the EventParser class"""
+
+import pytest
+
+import manyworlds as mw
+from manyworlds.events import Event
+
+
+def test_events():
+    with open("test/fixtures/in/feature.feature") as indented_file:
+        events = list(mw.EventParser.events(indented_file))
+
+    assert [(ev.kind, ev.line_no) for ev in events[:10]] == [
+        ("feature", 0),
+        ("description", 2),
+        ("description", 3),
+        ("description", 4),
+        ("scenario_open", 6),
+        ("step", 7),
+        ("table_row", 8),
+        ("table_row", 9),
+        ("table_row", 10),
+        ("table_row", 11),
+    ]
+    assert events[0].name == "User Deactivation"
+
+    bulk_operations = next(ev for ev in events if ev.name == "Bulk operations")
+    assert bulk_operations.kind == "scenario_open"
+    assert bulk_operations.level == 2
+    assert bulk_operations.comment == "on multiple users"
+
+    and_step = next(ev.step for ev in events if ev.line_no == 22)
+    assert isinstance(and_step, mw.step.Action)
+    assert and_step.name == 'I click "OK"'
+
+    # Each scenario is closed once, after its child scenarios:
+    opened = [ev.name for ev in events if ev.kind == Event.SCENARIO_OPEN]
+    closed = [ev.name for ev in events if ev.kind == Event.SCENARIO_CLOSE]
+    assert sorted(opened) == sorted(closed)
+    assert closed[-1] == "View users"
+    assert events[-1].kind == Event.SCENARIO_CLOSE
+    assert events[-1].level == 1
+
+
+def test_examples_events():
+    with open("test/fixtures/in/feature_with_outlines.feature") as indented_file:
+        events = list(mw.EventParser.events(indented_file))
+
+    assert events[1].kind == Event.SCENARIO_OPEN
+    assert events[1].outline
+    assert [(ev.kind, ev.line_no, ev.row.values) for ev in events[8:11]] == [
+        ("examples", 9, ["role", "viewer"]),
+        ("examples_row", 11, ["Admin", "an admin"]),
+        ("examples_row", 12, ["Manager", "a super admin"]),
+    ]
+    examples = [ev for ev in events if ev.kind == Event.EXAMPLES]
+    assert [(ev.level, ev.comment) for ev in examples] == [
+        (1, None),
+        (2, "one user"),
+        (2, None),
+    ]
+
+
+def test_subtree_events():
+    with open("test/fixtures/in/feature_with_subtrees.feature") as indented_file:
+        events = list(mw.EventParser.events(indented_file))
+
+    assert [(ev.kind, ev.line_no, ev.level, ev.name) for ev in events[4:6]] == [
+        ("subtree", 6, 1, "Bulk operations"),
+        ("scenario_open", 8, 2, "Select user"),
+    ]
+    include = [ev for ev in events if ev.kind == Event.INCLUDE][0]
+    assert (include.line_no, include.level, include.name, include.comment) == (
+        68,
+        2,
+        "Bulk operations",
+        "on multiple users",
+    )
+    closed = [ev.name for ev in events if ev.kind == Event.SCENARIO_CLOSE]
+    assert closed[-2:] == ["Deactivate user", "View users"]
+
+
+def test_extends_events():
+    with open("test/fixtures/in/imports/profile.feature") as indented_file:
+        events = list(mw.EventParser.events(indented_file))
+
+    assert events[1].kind == Event.EXTENDS
+    assert (events[1].line_no, events[1].name, events[1].comment) == (
+        2,
+        "login.feature",
+        "any user",
+    )
+    assert events[1].scenario_names == ["Log in", "Logged in as user"]
+
+
+def test_parse_with_handler():
+    class StepCounter(mw.EventHandler):
+        def __init__(self):
+            self.depth = 0
+            self.max_depth = 0
+            self.steps = 0
+
+        def scenario_open(self, event):
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+
+        def scenario_close(self, event):
+            self.depth -= 1
+
+        def step(self, event):
+            self.steps += 1
+
+    counter = StepCounter()
+    with open("test/fixtures/in/feature.feature") as indented_file:
+        mw.EventParser.parse(indented_file, counter)
+
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    assert counter.depth == 0
+    assert counter.max_depth == max(sc.level() for sc in feature.scenarios())
+    assert counter.steps == sum(len(sc.steps) for sc in feature.scenarios())
+
+
+def test_events_are_lazy():
+    lines = iter(["Feature: Lazy\n", "Scenario: First\n", "Given a step\n"])
+    events = mw.EventParser.events(lines)
+    assert next(events).kind == Event.FEATURE
+    assert next(lines) == "Scenario: First\n"
+
+
+def test_events_invalid():
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        list(
+            mw.EventParser.events(
+                ["Scenario: Root", "Given a step", "        Scenario: Too deep"]
+            )
+        )
+    assert error_info.value.line_no == 3
+    assert str(error_info.value).startswith("Excessive indentation at line 3")
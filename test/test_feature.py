@@ -1,6 +1,7 @@
 """Test the Feature class"""
 
 import os
+import random
 import filecmp
 
 import pytest
@@ -75,6 +76,39 @@ def test_from_file():
     assert leaf_scenario.comment == 'by clicking "OK"'
 
 
+def test_from_string():
+    """Test that parsing from a string matches parsing from a file"""
+    with open("test/fixtures/in/feature.feature") as indented_file:
+        feature = mw.Feature.from_string(indented_file.read())
+
+    assert feature.name == "User Deactivation"
+    assert len(feature.scenarios()) == 10
+    feature.flatten("test/out/scenarios_flat_strict_from_string.feature")
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_strict_from_string.feature",
+        "test/fixtures/out/scenarios_flat_strict.feature",
+    )
+
+
+def test_from_lines():
+    """Test parsing lines without newlines from an iterable"""
+    feature = mw.Feature.from_lines(
+        line
+        for line in [
+            "Scenario: View users",
+            'When I go to "Users"',
+            "Then I see users",
+            "    Scenario: Deactivate user",
+            '    When I click "Deactivate"',
+            "    Then I see fewer users",
+        ]
+    )
+
+    assert feature.name is None
+    assert len(feature.scenarios()) == 2
+    assert feature.find("View users", "Deactivate user").level() == 2
+
+
 def test_flatten_strict():
     """Test the 'flatten' method in 'strict' mode"""
     feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
@@ -134,3 +168,475 @@ def test_organizational_scenarios():
         "test/out/scenarios_flat_strict_with_organizational_scenarios.feature",
         "test/fixtures/out/scenarios_flat_strict_with_organizational_scenarios.feature",
     )
+
+
+def test_tags():
+    """Test parsing of tags and the tag index"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature_with_tags.feature")
+
+    bulk_operations = feature.find("View users", "Bulk operations")
+    assert bulk_operations.tags == ["@smoke", "@bulk"]
+    assert bulk_operations.comment is None
+    select_multiple_users = feature.find(
+        "View users", "Bulk operations", "Select user", "Select multiple users"
+    )
+    assert select_multiple_users.effective_tags() == [
+        "@users",
+        "@smoke",
+        "@bulk",
+        "@slow",
+    ]
+    assert feature.tag_index["@smoke"] == [1, 2]
+    assert [sc.name for sc in feature.tagged_scenarios("@bulk and not @slow")] == [
+        "Bulk operations",
+        "Select user",
+    ]
+    assert len(feature.tagged_scenarios("not @smoke")) == 2
+
+
+def test_scenario_outlines():
+    """Test parsing of scenario outlines and their examples tables"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature_with_outlines.feature")
+
+    view_users = feature.find("View <role> users")
+    assert view_users.outline
+    assert [table.to_list_of_dict() for table in view_users.examples] == [
+        [
+            {"role": "Admin", "viewer": "an admin"},
+            {"role": "Manager", "viewer": "a super admin"},
+        ]
+    ]
+    select_users = feature.find("View <role> users", "Select users")
+    assert [table.to_list_of_list() for table in select_users.examples] == [
+        [["count"], ["1"]],
+        [["count"], ["2"]],
+    ]
+    assert not feature.find("View <role> users", "Deactivate <role> user").outline
+
+    flat_scenario = list(feature.flat_scenarios_strict())[-1]
+    assert flat_scenario.bindings == {
+        "role": "Manager",
+        "viewer": "a super admin",
+        "count": "2",
+    }
+    assert flat_scenario.scenario.name == "Deselect all users"
+    assert flat_scenario.steps[0].data.to_list_of_list()[1] == ["Ben", "Manager"]
+    assert flat_scenario.steps[-1].name == 'I see "0 users selected" instead of 2'
+
+
+def test_scenario_outline_expansion_is_lazy():
+    """Test that nested examples tables are expanded one flat scenario at a time"""
+    rows = "".join("    | {} |\n".format(i) for i in range(1000))
+    feature = mw.Feature.from_string(
+        "Scenario Outline: A <a>\nWhen I do <a>\nThen I see <a>\n"
+        "Examples:\n    | a |\n" + rows + "    Scenario Outline: B <b>\n"
+        "    When I do <b>\n    Then I see <b>\n    Examples:\n        | b |\n"
+        + rows.replace("    |", "        |")
+        + "        Scenario Outline: C <c>\n        When I do <c>\n"
+        "        Then I see <a>, <b> and <c>\n        Examples:\n"
+        "            | c |\n" + rows.replace("    |", "            |")
+    )
+
+    flat_scenarios = feature.flat_scenarios_relaxed()
+    first = next(flat_scenarios)
+    second = next(flat_scenarios)
+    assert first.name == "A 0 > B 0 > C 0"
+    assert second.name == "A 0 > B 0 > C 1"
+    assert second.steps[-1].name == "I see 0, 0 and 1"
+
+
+def test_flatten_strict_with_outlines():
+    """Test the 'flatten' method in 'strict' mode with scenario outlines"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature_with_outlines.feature")
+    feature.flatten("test/out/scenarios_flat_strict_with_outlines.feature")
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_strict_with_outlines.feature",
+        "test/fixtures/out/scenarios_flat_strict_with_outlines.feature",
+    )
+
+
+def test_flatten_relaxed_with_outlines():
+    """Test the 'flatten' method in 'relaxed' mode with scenario outlines"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature_with_outlines.feature")
+    feature.flatten(
+        "test/out/scenarios_flat_relaxed_with_outlines.feature", mode="relaxed"
+    )
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_relaxed_with_outlines.feature",
+        "test/fixtures/out/scenarios_flat_relaxed_with_outlines.feature",
+    )
+
+
+def test_flatten_strict_with_subtrees():
+    """Test the 'flatten' method in 'strict' mode with a subtree reference"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature_with_subtrees.feature")
+    feature.flatten("test/out/scenarios_flat_strict_with_subtrees.feature")
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_strict_with_subtrees.feature",
+        "test/fixtures/out/scenarios_flat_strict.feature",
+    )
+
+
+def test_flatten_relaxed_with_subtrees():
+    """Test the 'flatten' method in 'relaxed' mode with a subtree reference"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature_with_subtrees.feature")
+    feature.flatten(
+        "test/out/scenarios_flat_relaxed_with_subtrees.feature", mode="relaxed"
+    )
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_relaxed_with_subtrees.feature",
+        "test/fixtures/out/scenarios_flat_relaxed.feature",
+    )
+
+
+NESTED_SUBTREES = (
+    "Subtree: Login\n"
+    "    @login\n"
+    "    Scenario: Log in\n"
+    "    When I log in\n"
+    "    Then I see the dashboard\n"
+    "        Include: Logout\n"
+    "Subtree: Logout\n"
+    "    Scenario: Log out\n"
+    "    When I log out\n"
+    "    Then I see the login page\n"
+    "Scenario: Admin\n"
+    "Given I am an admin\n"
+    "    @admin\n"
+    "    Include: Login\n"
+    "Scenario: User\n"
+    "Given I am a user\n"
+    "    Include: Login\n"
+)
+
+
+def test_subtree_references():
+    """Test that subtrees are parsed once and shared by their references"""
+    feature = mw.Feature.from_string(NESTED_SUBTREES)
+    assert list(feature.subtrees) == ["Login", "Logout"]
+    assert [sc.name for sc in feature.scenarios()] == [
+        "Admin",
+        "Login",
+        "User",
+        "Login",
+    ]
+    references = [sc for sc in feature.scenarios() if sc.reference is not None]
+    assert [sc.tags for sc in references] == [["@admin"], []]
+    assert all(sc.is_organizational() for sc in references)
+
+    assert [sc.name for sc in feature.flat_scenarios_strict()] == [
+        "[Admin / Login] Log in",
+        "[Admin / Login / Logout] Log out",
+        "[User / Login] Log in",
+        "[User / Login / Logout] Log out",
+    ]
+    assert [st.name for st in list(feature.flat_scenarios_strict())[1].steps] == [
+        "I am an admin",
+        "I log in",
+        "I log out",
+        "I see the login page",
+    ]
+
+
+def test_subtree_paths_are_memoized():
+    """Test that the paths of a subtree are expanded once per feature"""
+    feature = mw.Feature.from_string(NESTED_SUBTREES)
+    assert feature.subtrees["Login"].paths is None
+    paths = feature.subtree_paths("Login")
+    assert [[sc.name for sc in sp.scenarios] for sp in paths] == [
+        ["Log in"],
+        ["Log in", "Logout"],
+        ["Log in", "Logout", "Log out"],
+    ]
+    assert [sp.is_leaf for sp in paths] == [False, False, True]
+    assert feature.subtree_paths("Login") is paths
+    assert feature.subtrees["Logout"].paths is not None
+
+    list(feature.flat_scenarios_relaxed())
+    assert feature.subtree_paths("Login") is paths
+
+
+def test_flatten_subtrees_with_tags():
+    """Test that the tags along the path to a reference apply to the subtree"""
+    feature = mw.Feature.from_string(NESTED_SUBTREES)
+    assert [sc.name for sc in feature.flat_scenarios_strict(tags="@admin")] == [
+        "[Admin / Login] Log in",
+        "[Admin / Login / Logout] Log out",
+    ]
+    assert [
+        sc.tags for sc in feature.flat_scenarios_relaxed(tags="@login and not @admin")
+    ] == [["@login"]]
+
+
+def test_reparse_with_subtrees():
+    """Test that edits to a feature with subtrees re-parse the whole feature"""
+    feature = mw.Feature.from_string(NESTED_SUBTREES, keep_lines=True)
+    feature.apply_edit(8, 9, "    When I sign out\n")
+    assert [st.name for st in list(feature.flat_scenarios_strict())[1].steps][2] == (
+        "I sign out"
+    )
+
+
+def test_flatten_with_tags():
+    """Test the 'flatten' method with a tag expression"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature_with_tags.feature")
+    feature.flatten(
+        "test/out/scenarios_flat_strict_with_tags.feature",
+        tags="@smoke and not @slow",
+    )
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_strict_with_tags.feature",
+        "test/fixtures/out/scenarios_flat_strict_with_tags.feature",
+    )
+
+
+def test_fingerprints():
+    """Test that fingerprints cover the scenario and its ancestors only"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    changed_feature = mw.Feature.from_file("test/fixtures/in/feature_changed.feature")
+
+    # Unchanged scenario (comment changes are ignored):
+    path = ["View users", "Bulk operations", "Select user", "Select multiple users"]
+    assert (
+        feature.find(*path, "Bulk deactivate users").fingerprint
+        == changed_feature.find(*path, "Bulk deactivate users").fingerprint
+    )
+
+    # Changed scenario:
+    path += ["Bulk deactivate users"]
+    assert (
+        feature.find(*path, "Confirm bulk deactivation of users").fingerprint
+        != changed_feature.find(*path, "Confirm bulk deactivation of users").fingerprint
+    )
+
+
+def test_diff():
+    """Test the 'diff' method"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    changed_feature = mw.Feature.from_file("test/fixtures/in/feature_changed.feature")
+
+    added, removed, changed = feature.diff(changed_feature)
+    assert added == ["[Bulk operations] Close bulk deactivation dialog"]
+    assert removed == ["[Bulk operations] Deselect user"]
+    assert changed == ["[Bulk operations] Confirm bulk deactivation of users"]
+    assert feature.diff(feature) == ([], [], [])
+
+
+def test_diff_through_subtree_references():
+    """Editing a step above an Include: changes the included flat scenarios"""
+    with open("test/fixtures/in/feature_with_subtrees.feature") as feature_file:
+        text = feature_file.read()
+    feature = mw.Feature.from_string(text)
+    changed_feature = mw.Feature.from_string(
+        text.replace('When I go to "Users"', 'When I go to "All users"')
+    )
+
+    added, removed, changed = feature.diff(changed_feature)
+    assert (added, removed) == ([], [])
+    assert changed == list(feature.flat_fingerprints())
+    assert "[Bulk operations] Select user" in changed
+
+    # Two references to the same subtree have different fingerprints:
+    twice = mw.Feature.from_string(
+        text + '\nScenario: View admins\nWhen I go to "Admins"\n'
+        "Then I see the admins\n\n    Include: Bulk operations\n"
+    )
+    fingerprints = [
+        fs.path_fingerprint
+        for fs in twice.flat_scenarios_strict()
+        if fs.name == "[Bulk operations] Select user"
+    ]
+    assert len(fingerprints) == 2
+    assert fingerprints[0] != fingerprints[1]
+
+
+def test_append_scenario():
+    """Test that appended scenarios are added to the graph in bulk"""
+    feature = mw.Feature()
+    root = feature.append_scenario("Root", comment=None, at_level=1, line_no=0)
+    child = feature.append_scenario("Child", comment=None, at_level=2, line_no=1)
+    assert feature.graph.vcount() == 2
+    assert child.vertex.index == 1
+    assert child.parent() is root
+
+    # Appending after the graph was accessed:
+    feature.append_scenario("Sibling", comment=None, at_level=2, line_no=2)
+    grandchild = feature.append_scenario(
+        "Grandchild", comment=None, at_level=3, line_no=3
+    )
+    assert [sc.name for sc in feature.scenarios()] == [
+        "Root",
+        "Child",
+        "Sibling",
+        "Grandchild",
+    ]
+    assert [sc.name for sc in grandchild.ancestors()] == ["Root", "Sibling"]
+
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError):
+        feature.append_scenario("Too deep", comment=None, at_level=5, line_no=4)
+
+
+def test_cached_scenario_lists():
+    feature = mw.Feature.from_string(
+        "Scenario: View users\n"
+        "Then I see the users\n"
+        "\n"
+        "    Scenario: Deactivate user\n"
+        "    Then I see the active users\n",
+        keep_lines=True,
+    )
+    scenarios = feature.scenarios()
+    assert feature.scenarios() is scenarios
+    assert isinstance(scenarios, tuple)  # shared, hence immutable
+    assert [sc.name for sc in feature.leaf_scenarios()] == ["Deactivate user"]
+
+    # Replacing scenarios invalidates the lists:
+    feature.apply_edit(3, 5, "Scenario: Deactivate user\nThen I see the active users")
+    assert [sc.name for sc in feature.root_scenarios()] == [
+        "View users",
+        "Deactivate user",
+    ]
+
+    # So does appending scenarios:
+    scenarios = feature.scenarios()
+    feature.append_scenario("Sort users", comment=None, at_level=2, line_no=5)
+    assert feature.scenarios() is not scenarios
+    assert [sc.name for sc in feature.leaf_scenarios()] == [
+        "View users",
+        "Sort users",
+    ]
+
+
+def feature_state(feature):
+    """Everything a full parse determines about a feature"""
+    return (
+        feature.name,
+        feature.description,
+        [
+            (
+                sc.index(),
+                sc.name,
+                sc.comment,
+                sc.tags,
+                sc.outline,
+                sc.reference,
+                sc.fingerprint,
+                [(type(st).__name__, st.name, st.comment) for st in sc.steps],
+                [parent.index() for parent in sc.ancestors()],
+            )
+            for sc in feature.scenarios()
+        ],
+        feature.tag_index,
+        feature.outline(),
+        feature.flat_fingerprints(),
+        [flat_scenario.name for flat_scenario in feature.flat_scenarios_relaxed()],
+        [(sc.name, index) for sc, index in feature._open_scenarios],
+        list(feature._scenario_line_nos),
+        list(feature._scenario_levels),
+        {name: subtree.feature.outline() for name, subtree in feature.subtrees.items()},
+    )
+
+
+def test_apply_edit():
+    feature = mw.Feature.from_string(
+        "Feature: Users\n"
+        "\n"
+        "Scenario: View users\n"
+        'When I go to "Users"\n'
+        "Then I see the users\n"
+        "\n"
+        "    Scenario: Deactivate user\n"
+        '    When I click "Deactivate"\n'
+        "    Then I see the active users\n",
+        keep_lines=True,
+    )
+
+    # Insert a sibling scenario:
+    feature.apply_edit(
+        9,
+        9,
+        "\n"
+        "    Scenario: Sort users\n"
+        '    When I click "Name"\n'
+        "    Then I see sorted users\n",
+    )
+    assert feature.outline() == [
+        "View users",
+        "├── Deactivate user",
+        "└── Sort users",
+    ]
+
+    # Invalid edit:
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error:
+        feature.apply_edit(6, 7, "        Scenario: Deactivate user")
+    assert error.value.line_no == 7
+    assert feature.lines[6] == "        Scenario: Deactivate user"
+    assert len(feature.scenarios()) == 3
+
+    # Fixing it re-parses the lines of both edits:
+    feature.apply_edit(6, 7, "    Scenario: Deactivate users")
+    assert feature.find("View users", "Deactivate users") is not None
+
+    # Lines not kept:
+    with pytest.raises(ValueError):
+        mw.Feature.from_string("Feature: Users\n").apply_edit(0, 0, "")
+
+
+def test_apply_edit_matches_full_parse():
+    """Apply random edits and compare with a full parse after each edit"""
+    rng = random.Random(41)
+    fixtures = [
+        "test/fixtures/in/feature.feature",
+        "test/fixtures/in/feature_with_tags.feature",
+        "test/fixtures/in/feature_with_organizational_scenarios.feature",
+        "test/fixtures/in/feature_with_multiple_root_scenarios.feature",
+        "test/fixtures/in/feature_with_outlines.feature",
+        "test/fixtures/in/feature_with_subtrees.feature",
+    ]
+    pool = []
+    for fixture in fixtures:
+        with open(fixture) as fixture_file:
+            pool.extend(fixture_file.read().splitlines())
+    pool.extend(["Scenario: New root", "# comment", "", "@new", "Lorem ipsum"])
+
+    valid_count = 0
+    for fixture in fixtures:
+        with open(fixture) as fixture_file:
+            feature = mw.Feature.from_string(fixture_file.read(), keep_lines=True)
+        original_lines = list(feature.lines)
+        lines = list(original_lines)
+        for _ in range(150):
+            start = rng.randint(0, len(lines))
+            end = min(len(lines), start + rng.choice([0, 0, 1, 1, 2, 3, 5]))
+            kind = rng.random()
+            if kind < 0.3:  # lines from the fixtures
+                new_lines = [rng.choice(pool) for _ in range(rng.randint(0, 4))]
+            elif kind < 0.5:  # re-indented lines of the feature
+                new_lines = [
+                    rng.choice(["", "    "]) + line[rng.choice([0, 0, 4]) :]
+                    for line in lines[start:end]
+                ]
+            elif kind < 0.8:  # a copy of other lines of the feature
+                copy_start = rng.randint(0, len(lines))
+                new_lines = lines[copy_start : copy_start + rng.randint(1, 8)]
+            else:  # an undo of all edits
+                start, end, new_lines = 0, len(lines), original_lines
+
+            lines[start:end] = new_lines
+            new_text = "".join(line + "\n" for line in new_lines)
+            try:
+                expected = mw.Feature.from_string("\n".join(lines))
+            except mw.exceptions.InvalidFeatureFileError as expected_error:
+                with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error:
+                    feature.apply_edit(start, end, new_text)
+                assert str(error.value) == str(expected_error)
+                assert error.value.line_no == expected_error.line_no
+                assert feature.lines == lines
+                continue
+
+            feature.apply_edit(start, end, new_text)
+            assert feature.lines == lines
+            assert feature_state(feature) == feature_state(expected)
+            valid_count += 1
+
+    assert valid_count > 100
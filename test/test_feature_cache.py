@@ -0,0 +1,215 @@
+"""Test the FeatureCache and FeatureImport classes"""
+
+import filecmp
+import os
+import shutil
+import time
+
+import pytest
+
+import manyworlds as mw
+
+IMPORTS = "test/fixtures/in/imports"
+
+
+@pytest.fixture
+def imports_dir(tmp_path):
+    """Copy the feature files with imports to a temporary directory"""
+    shutil.copytree(IMPORTS, str(tmp_path / "in"))
+    return str(tmp_path / "in")
+
+
+def test_extends():
+    feature = mw.Feature.from_file(os.path.join(IMPORTS, "admin.feature"))
+    assert feature.extends.file_path == "login.feature"
+    assert feature.extends.scenario_names == ["Log in", "Logged in as admin"]
+    assert [sc.name for sc in feature.base_scenarios] == [
+        "Log in",
+        "Logged in as admin",
+    ]
+    assert feature.outline() == ["View users", "└── Deactivate user"]
+
+
+def test_flatten_strict_with_imports():
+    feature = mw.Feature.from_file(os.path.join(IMPORTS, "admin.feature"))
+    feature.flatten("test/out/scenarios_flat_strict_with_imports.feature")
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_strict_with_imports.feature",
+        "test/fixtures/out/scenarios_flat_strict_with_imports.feature",
+    )
+
+
+def test_flatten_relaxed_with_imports():
+    feature = mw.Feature.from_file(os.path.join(IMPORTS, "admin.feature"))
+    feature.flatten(
+        "test/out/scenarios_flat_relaxed_with_imports.feature", mode="relaxed"
+    )
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_relaxed_with_imports.feature",
+        "test/fixtures/out/scenarios_flat_relaxed_with_imports.feature",
+    )
+
+
+def test_flatten_with_inherited_tags():
+    feature = mw.Feature.from_file(os.path.join(IMPORTS, "admin.feature"))
+    assert [fs.name for fs in feature.flat_scenarios(tags="@login")] == [
+        "View users",
+        "Deactivate user",
+    ]
+    assert list(feature.flat_scenarios(tags="not @login")) == []
+
+
+def test_unresolved_import():
+    with open(os.path.join(IMPORTS, "admin.feature")) as feature_file:
+        feature = mw.Feature.from_string(feature_file.read())
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        list(feature.flat_scenarios())
+    assert str(error_info.value) == (
+        "Unresolved import at line 3: "
+        "Extends: login.feature > Log in > Logged in as admin"
+    )
+
+    mw.FeatureCache().resolve(feature, os.path.join(IMPORTS, "admin.feature"))
+    assert len(list(feature.flat_scenarios())) == 2
+
+
+def test_base_file_is_parsed_once(imports_dir):
+    cache = mw.FeatureCache()
+    admin = cache.get(os.path.join(imports_dir, "admin.feature"))
+    profile = cache.get(os.path.join(imports_dir, "profile.feature"))
+    login = cache.get(os.path.join(imports_dir, "login.feature"))
+    assert cache.misses == 3
+    assert admin.base_scenarios[0] is login.find("Log in")
+    assert profile.base_scenarios[0] is login.find("Log in")
+
+
+def test_changed_base_file_is_linked_again(imports_dir):
+    cache = mw.FeatureCache()
+    admin_path = os.path.join(imports_dir, "admin.feature")
+    admin = cache.get(admin_path)
+    fingerprint = admin.find("View users").fingerprint
+
+    login_path = os.path.join(imports_dir, "login.feature")
+    with open(login_path) as login_file:
+        login_text = login_file.read()
+    with open(login_path, "w") as login_file:
+        login_file.write(login_text.replace('"Ben"', '"Ben Admin"'))
+
+    assert cache.get(admin_path) is admin  # not parsed again
+    assert cache.misses == 3  # admin.feature, login.feature twice
+    assert admin.find("View users").fingerprint != fingerprint
+    steps = [st.name for st in next(admin.flat_scenarios()).steps]
+    assert 'I log in as "Ben Admin"' in steps
+
+
+def test_invalid_imports(tmp_path):
+    def parse(text):
+        feature_path = str(tmp_path / "feature.feature")
+        with open(feature_path, "w") as feature_file:
+            feature_file.write(text)
+        with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+            mw.Feature.from_file(feature_path)
+        return str(error_info.value)
+
+    shutil.copy(os.path.join(IMPORTS, "login.feature"), str(tmp_path))
+    assert parse("Extends: missing.feature > Log in\n") == (
+        "Missing feature file at line 1: Extends: missing.feature > Log in"
+    )
+    assert parse("Extends: login.feature > Log out\n") == (
+        "Unknown scenario at line 1: Extends: login.feature > Log out"
+    )
+    assert parse("Extends: feature.feature > Log in\n") == (
+        "Cyclic import at line 1: Extends: feature.feature > Log in"
+    )
+
+
+def test_flatten_directory(imports_dir, tmp_path):
+    output_dir = str(tmp_path / "out")
+    cache = mw.FeatureCache()
+    written, unchanged, skipped = cache.flatten_directory(imports_dir, output_dir)
+    assert [os.path.basename(path) for path in written] == [
+        "admin.feature",
+        "login.feature",
+        "profile.feature",
+    ]
+    assert unchanged == []
+    assert skipped == []
+    assert cache.misses == 3
+    assert filecmp.cmp(
+        os.path.join(output_dir, "admin.feature"),
+        "test/fixtures/out/scenarios_flat_strict_with_imports.feature",
+    )
+
+    # Up to date:
+    written, unchanged, skipped = mw.FeatureCache().flatten_directory(
+        imports_dir, output_dir
+    )
+    assert written == []
+    assert len(skipped) == 3
+
+    # Touched files with the same content are up to date, too:
+    output_mtime_ns = max(os.stat(path).st_mtime_ns for path in skipped)
+    login_path = os.path.join(imports_dir, "login.feature")
+    os.utime(login_path, ns=(output_mtime_ns + 1, output_mtime_ns + 1))
+    written, unchanged, skipped = cache.flatten_directory(imports_dir, output_dir)
+    assert len(skipped) == 3
+    assert cache.misses == 3
+
+    # Only the changed file and the files depending on it:
+    with open(login_path, "a") as login_file:
+        login_file.write("# no change to the flat feature files\n")
+    written, unchanged, skipped = cache.flatten_directory(imports_dir, output_dir)
+    assert written == []  # the flat feature files are unchanged
+    assert len(unchanged) == 3
+    assert max(os.stat(path).st_mtime_ns for path in unchanged) == output_mtime_ns
+
+    # Unchanged flat feature files are up to date afterwards:
+    written, unchanged, skipped = mw.FeatureCache().flatten_directory(
+        imports_dir, output_dir
+    )
+    assert len(skipped) == 3
+
+    profile_path = os.path.join(imports_dir, "profile.feature")
+    with open(profile_path) as profile_file:
+        profile_text = profile_file.read()
+    with open(profile_path, "w") as profile_file:
+        profile_file.write(profile_text.replace("Scenario: ", "Scenario: My ", 1))
+    future_ns = time.time_ns() + 10**10
+    os.utime(profile_path, ns=(future_ns, future_ns))
+    written, unchanged, skipped = mw.FeatureCache().flatten_directory(
+        imports_dir, output_dir
+    )
+    assert [os.path.basename(path) for path in written] == ["profile.feature"]
+
+
+def test_flatten_directory_with_other_options(imports_dir, tmp_path):
+    """Flattens all feature files again when the options change"""
+    output_dir = str(tmp_path / "out")
+    admin_path = os.path.join(output_dir, "admin.feature")
+    cache = mw.FeatureCache()
+    written, unchanged, skipped = cache.flatten_directory(
+        imports_dir, output_dir, tags="@admin"
+    )
+    assert len(written) == 3
+    written, unchanged, skipped = cache.flatten_directory(
+        imports_dir, output_dir, tags="@admin"
+    )
+    assert len(skipped) == 3
+
+    written, unchanged, skipped = cache.flatten_directory(imports_dir, output_dir)
+    assert skipped == []
+    assert filecmp.cmp(
+        admin_path, "test/fixtures/out/scenarios_flat_strict_with_imports.feature"
+    )
+
+    written, unchanged, skipped = cache.flatten_directory(
+        imports_dir, output_dir, mode="relaxed"
+    )
+    assert skipped == []
+    assert filecmp.cmp(
+        admin_path, "test/fixtures/out/scenarios_flat_relaxed_with_imports.feature"
+    )
+    written, unchanged, skipped = cache.flatten_directory(
+        imports_dir, output_dir, mode="relaxed"
+    )
+    assert len(skipped) == 3
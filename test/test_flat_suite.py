@@ -0,0 +1,75 @@
+"""Test the FlatSuite class"""
+
+import filecmp
+import os
+
+import pytest
+
+import manyworlds as mw
+
+
+@pytest.fixture(scope="module", params=["binary", "ndjson"])
+def suite_path(request):
+    """write the test feature to a flat suite file"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    path = "test/out/scenarios_flat_strict.{}".format(request.param)
+    mw.FlatSuite.write(path, feature, format=request.param)
+    return path
+
+
+def test_len(suite_path):
+    with mw.FlatSuite.open(suite_path) as suite:
+        assert len(suite) == 9
+
+
+def test_getitem(suite_path):
+    with mw.FlatSuite.open(suite_path) as suite:
+        assert suite.name == "User Deactivation"
+        assert len(suite.description) == 3
+
+        flat_scenario = suite[-2]
+        assert flat_scenario.name == (
+            "[Bulk operations] Confirm bulk deactivation of users"
+        )
+        assert flat_scenario.comment == 'by clicking "OK"'
+        assert [type(st) for st in flat_scenario.steps[:2]] == [
+            mw.step.Prerequisite,
+            mw.step.Action,
+        ]
+        data = flat_scenario.steps[0].data.to_list_of_dict()
+        assert data[3] == {"Name": "Dan", "Status": "Deactivated"}
+        assert flat_scenario.steps[0].data.rows[3].comment == "inactive"
+
+        with pytest.raises(IndexError):
+            suite[9]
+
+
+def test_write_feature(suite_path):
+    """Test that a flat suite renders to the same flat feature file"""
+    with mw.FlatSuite.open(suite_path) as suite:
+        suite.write_feature(suite_path + ".feature")
+    assert filecmp.cmp(
+        suite_path + ".feature",
+        "test/fixtures/out/scenarios_flat_strict.feature",
+    )
+
+
+def test_write_binary_replaces_changed_files_only(tmp_path):
+    """Binary flat suite files are replaced atomically, and only if changed"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    path = str(tmp_path / "flat.suite")
+    suite_file = mw.FlatSuite.write(path, feature)
+    assert suite_file.changed is True
+    assert suite_file.size == os.path.getsize(path)
+
+    with mw.FlatSuite.open(path) as suite:
+        # The open suite keeps reading the replaced file:
+        inode = os.stat(path).st_ino
+        assert mw.FlatSuite.write(path, feature).changed is False
+        assert os.stat(path).st_ino == inode
+        assert mw.FlatSuite.write(path, feature, tags="@smoke").changed is True
+        assert os.stat(path).st_ino != inode
+        assert len(suite) == 9
+    with mw.FlatSuite.open(path) as suite:
+        assert len(suite) == len(list(feature.flat_scenarios(tags="@smoke")))
+    assert os.listdir(str(tmp_path)) == ["flat.suite"]  # no temporary files
@@ -0,0 +1,104 @@
+"""Test the ScenarioTrie class"""
+
+import filecmp
+
+import pytest
+
+import manyworlds as mw
+
+
+def test_fold_strict():
+    """Folding a "strict" flat feature file restores the scenario tree"""
+    trie = mw.ScenarioTrie.from_file("test/fixtures/out/scenarios_flat_strict.feature")
+    assert trie.flat_scenario_count == 9
+    assert trie.flat_step_count == 50
+    assert trie.write("test/out/scenarios_folded_strict.feature") == (9, 22)
+
+    feature = mw.Feature.from_file("test/out/scenarios_folded_strict.feature")
+    assert [sc.name for sc in feature.root_scenarios()] == ["View users"]
+    feature.flatten("test/out/scenarios_folded_strict_flat.feature")
+    assert filecmp.cmp(
+        "test/out/scenarios_folded_strict_flat.feature",
+        "test/fixtures/out/scenarios_flat_strict.feature",
+    )
+
+
+def test_fold_relaxed():
+    """Folding a "relaxed" flat feature file preserves the steps of all scenarios"""
+    trie = mw.ScenarioTrie.from_file("test/fixtures/out/scenarios_flat_relaxed.feature")
+    trie.write("test/out/scenarios_folded_relaxed.feature")
+
+    original = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    folded = mw.Feature.from_file("test/out/scenarios_folded_relaxed.feature")
+    assert sorted(fs.fingerprint() for fs in folded.flat_scenarios()) == sorted(
+        fs.fingerprint() for fs in original.flat_scenarios("relaxed")
+    )
+
+
+def test_fold_with_tags():
+    trie = mw.ScenarioTrie.from_file(
+        "test/fixtures/out/scenarios_flat_strict_with_tags.feature"
+    )
+    trie.write("test/out/scenarios_folded_with_tags.feature")
+
+    original = mw.Feature.from_file("test/fixtures/in/feature_with_tags.feature")
+    folded = mw.Feature.from_file("test/out/scenarios_folded_with_tags.feature")
+    original_tags = {fs.fingerprint(): fs.tags for fs in original.flat_scenarios()}
+    folded_tags = {fs.fingerprint(): fs.tags for fs in folded.flat_scenarios()}
+    assert len(folded_tags) == 2
+    for fingerprint, tags in folded_tags.items():
+        assert tags == original_tags[fingerprint]
+
+
+def test_fold_indented_file():
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.ScenarioTrie.from_file("test/fixtures/in/feature.feature")
+    assert str(error_info.value) == (
+        "Indented scenario in flat feature file at line 21: Scenario: Deactivate user"
+    )
+
+
+def test_fold_scenario_without_assertions(tmp_path):
+    """Rejects flat scenarios that would not flatten back"""
+    flat_lines = [
+        "Feature: User Deactivation",
+        "",
+        "Scenario: View users",
+        "Given the following users:",
+        "    | Name | Status |",
+        "    | Ben  | Active |",
+        'When I go to "Users"',
+        "",
+        "Scenario: Deactivate user",
+        "Given the following users:",
+        "    | Name | Status |",
+        "    | Ben  | Active |",
+        'When I go to "Users"',
+        ' And I click "Deactivate" on user "Ben"',
+        'Then I see "Ben deactivated"',
+    ]
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.ScenarioTrie.from_lines(flat_lines)
+    assert error_info.value.line_no == 3
+    assert str(error_info.value) == (
+        "Flat scenario without assertions at line 3: Scenario: View users"
+    )
+
+    # With an assertion, the flat scenario survives the round trip:
+    flat_lines.insert(7, 'Then I see "Ben"')
+    trie = mw.ScenarioTrie.from_lines(flat_lines)
+    trie.write(str(tmp_path / "folded.feature"))
+    folded = mw.Feature.from_file(str(tmp_path / "folded.feature"))
+    assert [[step.name for step in fs.steps] for fs in folded.flat_scenarios()] == [
+        [
+            "the following users:",
+            'I go to "Users"',
+            'I see "Ben"',
+        ],
+        [
+            "the following users:",
+            'I go to "Users"',
+            'I click "Deactivate" on user "Ben"',
+            'I see "Ben deactivated"',
+        ],
+    ]
@@ -0,0 +1,82 @@
+"""Test the ForestIndex class"""
+
+import pytest
+
+import manyworlds as mw
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture(scope="module")
+def feature():
+    return mw.Feature.from_file(
+        "test/fixtures/in/feature_with_multiple_root_scenarios.feature"
+    )
+
+
+@pytest.fixture(scope="module")
+def index(feature):
+    return feature.forest_index()
+
+
+def test_arrays(feature, index):
+    scenarios = feature.scenarios()
+    assert len(index) == len(scenarios)
+    for sc in scenarios:
+        i = sc.index()
+        parent = sc.parent()
+        assert index.parent[i] == (parent.index() if parent is not None else -1)
+        assert index.depth[i] == sc.level() - 1
+        assert index.subtree_size[i] == 1 + sum(
+            1 for other in scenarios if sc in other.ancestors()
+        )
+        children = sc.children()
+        assert index.first_child[i] == (children[0].index() if children else -1)
+        assert index.given_count[i] == len(sc.prerequisites())
+        assert index.when_count[i] == len(sc.actions())
+        assert index.then_count[i] == len(sc.assertions())
+    assert list(index.preorder) == list(range(len(scenarios)))
+    assert sorted(index.postorder) == list(range(len(scenarios)))
+
+
+def test_next_sibling(feature, index):
+    invite_user = feature.find("Invite user")
+    resend, revoke = invite_user.children()
+    assert index.next_sibling[resend.index()] == revoke.index()
+    assert index.next_sibling[revoke.index()] == -1
+    assert index.next_sibling[invite_user.index()] == -1  # root scenario
+
+
+def test_roots_and_leaves(feature, index):
+    assert index.root_scenarios() == list(feature.root_scenarios())
+    assert index.leaf_scenarios() == list(feature.leaf_scenarios())
+
+
+def test_descendants(feature, index):
+    view_users = feature.find("View users")
+    assert index.scenarios(index.descendants(view_users.index())) == [view_users] + [
+        sc for sc in feature.scenarios() if view_users in sc.ancestors()
+    ]
+    assert index.is_ancestor(
+        np.array([view_users.index()] * 2),
+        np.array(
+            [
+                feature.find("View users", "Bulk operations", "Select user").index(),
+                feature.find("Invite user").index(),
+            ]
+        ),
+    ).tolist() == [True, False]
+
+
+def test_strict_step_counts(feature, index):
+    step_counts = index.strict_step_counts()
+    flat_step_counts = {
+        fs.scenario.index(): len(fs.steps) for fs in feature.flat_scenarios()
+    }
+    for vertex_index, step_count in flat_step_counts.items():
+        assert step_counts[vertex_index] == step_count
+
+
+def test_prefix_costs(feature, index):
+    costs = index.prefix_costs(np.ones(len(index), dtype=np.int64))
+    assert (costs == index.depth + 1).all()
@@ -52,3 +52,170 @@ def test_invalid_file_feature_after_scenario():
         str(error_info.value) == "Feature line is allowed only at beginning of file "
         "but was encountered at line 5: Feature: User Deactivation"
     )
+
+
+def test_invalid_file_step_outside_of_scenario():
+    """Test that the correct error is raised when attempting to parse invalid files"""
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.Feature.from_string('When I go to "Users"\n')
+    assert (
+        str(error_info.value)
+        == 'Step outside of scenario at line 1: When I go to "Users"'
+    )
+    assert error_info.value.line_no == 1
+
+
+def test_validate_valid_file():
+    """Test that no errors are reported for a valid file"""
+    assert mw.validate("test/fixtures/in/feature.feature") == []
+
+
+def test_validate_reports_all_errors():
+    """Test that all errors of an invalid file are reported"""
+    errors = mw.validate("test/fixtures/in/invalid/multiple_errors.feature")
+    assert [str(error) for error in errors] == [
+        'Unable to parse line 2: Whenx I go to "Users" # mis-spelled conjunction',
+        "Invalid indentation at line 5: Scenario: Indented using 3 spaces instead of 4",
+        "Excessive indentation at line 7: Scenario: Indented 2 instead of 1 levels",
+        "Invalid indentation at line 9: I see users",
+    ]
+    assert [error.line_no for error in errors] == [2, 5, 7, 9]
+
+
+def test_validate_matches_from_file():
+    """Test that the first reported error is the error raised by from_file"""
+    for name in [
+        "excessive_indentation",
+        "excessive_step_indentation",
+        "feature_after_scenario",
+        "indented_action",
+        "invalid_conjunction",
+        "invalid_indentation",
+    ]:
+        file_path = "test/fixtures/in/invalid/{}.feature".format(name)
+        with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+            mw.Feature.from_file(file_path)
+        assert str(mw.validate(file_path)[0]) == str(error_info.value)
+
+
+def test_invalid_file_tags_without_scenario():
+    """Test that the correct error is raised when attempting to parse invalid files"""
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.Feature.from_string(
+            "Scenario: View users\n"
+            'When I go to "Users"\n'
+            "@smoke\n"
+            "Then I see users\n"
+        )
+    assert str(error_info.value) == "Tags without scenario at line 3: @smoke"
+
+
+def test_invalid_file_examples_outside_of_scenario_outline():
+    """Test that the correct error is raised when attempting to parse invalid files"""
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.Feature.from_string(
+            "Scenario: View <role> users\n"
+            'When I go to "Users"\n'
+            "Then I see users\n"
+            "Examples:\n"
+            "    | role  |\n"
+            "    | Admin |\n"
+        )
+    assert (
+        str(error_info.value)
+        == "Examples outside of scenario outline at line 4: Examples:"
+    )
+
+
+def test_invalid_file_examples_without_table():
+    """Test that the correct error is raised when attempting to parse invalid files"""
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.Feature.from_string(
+            "Scenario Outline: View <role> users\n"
+            'When I go to "Users"\n'
+            "Then I see users\n"
+            "Examples:\n"
+        )
+    assert str(error_info.value) == "Examples without table at line 4: Examples:"
+
+
+def test_invalid_file_step_after_examples():
+    """Test that the correct error is raised when attempting to parse invalid files"""
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.Feature.from_string(
+            "Scenario Outline: View <role> users\n"
+            'When I go to "Users"\n'
+            "Examples:\n"
+            "    | role  |\n"
+            "    | Admin |\n"
+            "Then I see users\n"
+        )
+    assert str(error_info.value) == "Step after examples at line 6: Then I see users"
+
+
+def test_invalid_file_unknown_subtree():
+    """Test that the correct error is raised when attempting to parse invalid files"""
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.Feature.from_string(
+            "Scenario: View users\n"
+            'When I go to "Users"\n'
+            "Then I see users\n"
+            "    Include: Bulk operations\n"
+        )
+    assert (
+        str(error_info.value) == "Unknown subtree at line 4: Include: Bulk operations"
+    )
+
+
+def test_invalid_file_cyclic_subtree_reference():
+    """Test that the correct error is raised when attempting to parse invalid files"""
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.Feature.from_string(
+            "Subtree: Select\n"
+            "    Scenario: Select user\n"
+            '    When I select user "Ben"\n'
+            "        Include: Deselect\n"
+            "Subtree: Deselect\n"
+            "    Scenario: Deselect user\n"
+            '    When I deselect user "Ben"\n'
+            "        Include: Select\n"
+        )
+    assert error_info.value.line_no == 4
+    assert str(error_info.value).startswith("Cyclic subtree reference at line 4:")
+
+
+def test_invalid_file_duplicate_subtree():
+    """Test that the correct error is raised when attempting to parse invalid files"""
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.Feature.from_string(
+            "Subtree: Select\n"
+            "    Scenario: Select user\n"
+            "Subtree: Select\n"
+            "    Scenario: Select all users\n"
+        )
+    assert str(error_info.value) == "Duplicate subtree at line 3: Subtree: Select"
+
+
+def test_invalid_file_extends_after_scenario():
+    """Test that the correct error is raised when attempting to parse invalid files"""
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.Feature.from_string(
+            "Scenario: View users\n"
+            'When I go to "Users"\n'
+            "Extends: login.feature > Log in\n"
+        )
+    assert str(error_info.value) == (
+        "Extends line is allowed only before the first scenario "
+        "but was encountered at line 3: Extends: login.feature > Log in"
+    )
+
+
+def test_invalid_file_duplicate_extends():
+    """Test that the correct error is raised when attempting to parse invalid files"""
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.Feature.from_string(
+            "Extends: login.feature > Log in\n" "Extends: admin.feature > View users\n"
+        )
+    assert str(error_info.value) == (
+        "Duplicate extends line at line 2: Extends: admin.feature > View users"
+    )
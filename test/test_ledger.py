@@ -0,0 +1,53 @@
+"""Test the Ledger class"""
+
+import pytest
+
+import manyworlds as mw
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    """open an empty ledger"""
+    with mw.Ledger(str(tmp_path / "results.db")) as ledger:
+        yield ledger
+
+
+def test_record(ledger):
+    assert ledger.result("abc") is None
+    ledger.record("abc", False)
+    assert ledger.result("abc") is False
+    assert not ledger.is_verified("abc")
+    ledger.record("abc", True)
+    assert ledger.result("abc") is True
+    assert ledger.verified_fingerprints() == {"abc"}
+    ledger.record("abc", False)
+    assert ledger.verified_fingerprints() == set()
+
+
+def test_compact(ledger):
+    ledger.record_many([("abc", False), ("abc", True), ("def", True)])
+    assert ledger.compact() == 1
+    assert ledger.compact() == 0
+    assert ledger.compact(keep=["abc"]) == 1
+    assert ledger.result("abc") is True
+    assert ledger.result("def") is None
+
+
+def test_flatten_only_unverified(ledger):
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    flat_scenarios = list(feature.flat_scenarios())
+    ledger.record(flat_scenarios[0].fingerprint(), True)
+    ledger.record(flat_scenarios[1].fingerprint(), False)
+
+    unverified = list(feature.flat_scenarios(ledger=ledger))
+    assert [fs.name for fs in unverified] == [fs.name for fs in flat_scenarios[1:]]
+
+
+def test_fingerprint_survives_flat_suite(tmp_path):
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    path = str(tmp_path / "flat.suite")
+    mw.FlatSuite.write(path, feature)
+    with mw.FlatSuite.open(path) as suite:
+        assert [fs.fingerprint() for fs in suite] == [
+            fs.fingerprint() for fs in feature.flat_scenarios()
+        ]
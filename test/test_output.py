@@ -0,0 +1,123 @@
+"""Test the OutputFile class"""
+
+import filecmp
+import os
+import stat
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import manyworlds as mw
+
+
+def test_flatten_writes_changed_files_only(tmp_path):
+    output_path = str(tmp_path / "flat.feature")
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    output_file = feature.flatten(output_path)
+    assert output_file.changed is True
+    assert output_file.bytes_written == os.path.getsize(output_path)
+    assert filecmp.cmp(output_path, "test/fixtures/out/scenarios_flat_strict.feature")
+
+    mtime_ns = os.stat(output_path).st_mtime_ns - 10**9
+    os.utime(output_path, ns=(mtime_ns, mtime_ns))
+    output_file = feature.flatten(output_path)
+    assert output_file.changed is False
+    assert output_file.bytes_written == 0
+    assert os.stat(output_path).st_mtime_ns == mtime_ns
+
+    output_file = feature.flatten(output_path, mode="relaxed")
+    assert output_file.changed is True
+    assert filecmp.cmp(output_path, "test/fixtures/out/scenarios_flat_relaxed.feature")
+    assert os.listdir(str(tmp_path)) == ["flat.feature"]  # no temporary files
+
+
+def test_chunks_and_permissions(tmp_path):
+    output_path = str(tmp_path / "output.txt")
+    with open(output_path, "w") as existing_file:
+        existing_file.write("old")
+    os.chmod(output_path, 0o640)
+
+    output_file = mw.OutputFile(output_path)
+    output_file.CHUNK_SIZE = 4
+    with output_file:
+        output_file.write("ab")
+        assert output_file.size == 0  # collected
+        output_file.write("cdé")
+        assert output_file.size == 6  # written to the temporary file
+        output_file.write("f")
+    assert output_file.size == output_file.bytes_written == 7
+    with open(output_path, encoding="utf-8") as written_file:
+        assert written_file.read() == "abcdéf"
+    assert stat.S_IMODE(os.stat(output_path).st_mode) == 0o640
+
+
+def test_failed_write_leaves_output_alone(tmp_path):
+    output_path = str(tmp_path / "output.txt")
+    with open(output_path, "w") as existing_file:
+        existing_file.write("old")
+
+    with pytest.raises(ValueError):
+        with mw.OutputFile(output_path) as output_file:
+            output_file.write("new")
+            raise ValueError()
+    assert output_file.changed is False
+    with open(output_path) as existing_file:
+        assert existing_file.read() == "old"
+    assert os.listdir(str(tmp_path)) == ["output.txt"]
+
+
+def test_symbolic_link_target(tmp_path):
+    target_path = str(tmp_path / "target.feature")
+    link_path = str(tmp_path / "link.feature")
+    with open(target_path, "w") as target_file:
+        target_file.write("old")
+    os.symlink(target_path, link_path)
+
+    with mw.OutputFile(link_path) as output_file:
+        output_file.write("new")
+    assert output_file.changed is True
+    assert os.path.islink(link_path)
+    with open(target_path) as target_file:
+        assert target_file.read() == "new"
+    assert sorted(os.listdir(str(tmp_path))) == ["link.feature", "target.feature"]
+
+
+def test_named_pipe_target(tmp_path):
+    pipe_path = str(tmp_path / "flat.pipe")
+    os.mkfifo(pipe_path)
+    received = []
+
+    def read_pipe():
+        with open(pipe_path) as pipe:
+            received.append(pipe.read())
+
+    reader = threading.Thread(target=read_pipe)
+    reader.start()
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    output_file = feature.flatten(pipe_path)
+    reader.join(timeout=10)
+    assert output_file.direct is True
+    assert output_file.changed is True
+    with open("test/fixtures/out/scenarios_flat_strict.feature") as fixture_file:
+        assert received == [fixture_file.read()]
+    assert stat.S_ISFIFO(os.stat(pipe_path).st_mode)
+    assert os.listdir(str(tmp_path)) == ["flat.pipe"]
+
+
+def test_stdout_target():
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import manyworlds as mw; "
+            "mw.Feature.from_file('test/fixtures/in/feature.feature')"
+            ".flatten('/dev/stdout')",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    with open("test/fixtures/out/scenarios_flat_strict.feature") as fixture_file:
+        assert output == fixture_file.read()
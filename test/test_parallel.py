@@ -0,0 +1,244 @@
+"""Test flattening root scenario trees in parallel"""
+
+import filecmp
+
+import pytest
+
+import manyworlds as mw
+from manyworlds import parallel
+from manyworlds.parallel import split_root_trees
+
+MULTIPLE_ROOTS = "test/fixtures/in/feature_with_multiple_root_scenarios.feature"
+SUBTREES = "test/fixtures/in/feature_with_subtrees.feature"
+
+
+def test_split_root_trees():
+    with open(MULTIPLE_ROOTS) as indented_file:
+        chunks = list(split_root_trees(indented_file))
+    assert [start_line_no for start_line_no, _ in chunks] == [0, 4, 31, 47]
+    assert chunks[2][1][1:4] == [
+        "# Invitations are independent of the user list\n",
+        "@invitations @smoke\n",
+        "Scenario: Invite user\n",
+    ]
+
+
+@pytest.mark.parametrize(
+    "mode,write_comments,tags",
+    [
+        ("strict", False, None),
+        ("relaxed", True, None),
+        ("strict", True, "@smoke and not @slow"),
+    ],
+)
+@pytest.mark.parametrize("processes", [1, 2])
+def test_flatten_parallel(mode, write_comments, tags, processes):
+    """Produces the same output as Feature.flatten"""
+    mw.Feature.from_file(MULTIPLE_ROOTS).flatten(
+        "test/out/scenarios_flat_serial.feature",
+        mode=mode,
+        write_comments=write_comments,
+        tags=tags,
+    )
+    mw.flatten_parallel(
+        MULTIPLE_ROOTS,
+        "test/out/scenarios_flat_parallel.feature",
+        mode=mode,
+        write_comments=write_comments,
+        tags=tags,
+        processes=processes,
+        batch_lines=1,
+    )
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_parallel.feature",
+        "test/out/scenarios_flat_serial.feature",
+        shallow=False,
+    )
+
+
+def test_flatten_parallel_invalid_file(tmp_path):
+    """Reports line numbers in the whole input file"""
+    with open(MULTIPLE_ROOTS) as indented_file:
+        lines = indented_file.readlines()
+    lines[41] = "    " + lines[41]  # excessive step indentation
+    invalid_path = str(tmp_path / "invalid.feature")
+    with open(invalid_path, "w") as invalid_file:
+        invalid_file.writelines(lines)
+
+    with pytest.raises(mw.exceptions.InvalidFeatureFileError) as error_info:
+        mw.flatten_parallel(
+            invalid_path, str(tmp_path / "flat.feature"), processes=2, batch_lines=1
+        )
+    assert error_info.value.line_no == 42
+    assert str(error_info.value).startswith("Invalid indentation at line 42:")
+
+
+@pytest.mark.parametrize(
+    "mode,write_comments,tags",
+    [
+        ("strict", False, None),
+        ("relaxed", True, None),
+        ("strict", True, "@smoke and not @slow"),
+    ],
+)
+def test_flatten_streaming(mode, write_comments, tags):
+    """Produces the same output as Feature.flatten"""
+    mw.Feature.from_file(MULTIPLE_ROOTS).flatten(
+        "test/out/scenarios_flat_serial.feature",
+        mode=mode,
+        write_comments=write_comments,
+        tags=tags,
+    )
+    mw.flatten_streaming(
+        MULTIPLE_ROOTS,
+        "test/out/scenarios_flat_streaming.feature",
+        mode=mode,
+        write_comments=write_comments,
+        tags=tags,
+    )
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_streaming.feature",
+        "test/out/scenarios_flat_serial.feature",
+        shallow=False,
+    )
+
+
+@pytest.mark.parametrize("mode", ["strict", "relaxed"])
+@pytest.mark.parametrize("processes", [1, 2])
+def test_flatten_parallel_with_subtrees(mode, processes):
+    """Passes the subtree declarations to each worker process"""
+    mw.flatten_parallel(
+        SUBTREES,
+        "test/out/scenarios_flat_parallel.feature",
+        mode=mode,
+        processes=processes,
+        batch_lines=1,
+    )
+    mw.flatten_streaming(
+        SUBTREES, "test/out/scenarios_flat_streaming.feature", mode=mode
+    )
+    for output_path in [
+        "test/out/scenarios_flat_parallel.feature",
+        "test/out/scenarios_flat_streaming.feature",
+    ]:
+        assert filecmp.cmp(
+            output_path,
+            "test/fixtures/out/scenarios_flat_{}.feature".format(mode),
+            shallow=False,
+        )
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_flatten_parallel_with_later_subtrees(tmp_path, processes):
+    """Reads the subtree declarations up front, like Feature.flatten"""
+    indented_path = tmp_path / "indented.feature"
+    indented_path.write_text(
+        "Feature: Subtrees\n\n"
+        "Scenario: View users\n"
+        'When I go to "Users"\n'
+        'Then I see "Users"\n\n'
+        "    Include: Select\n\n"
+        "Subtree: Select\n\n"
+        "    Scenario: Select user\n"
+        '    When I select user "Ben"\n'
+        '    Then I see "1 user selected"\n'
+    )
+    mw.flatten_parallel(
+        str(indented_path),
+        str(tmp_path / "flat.feature"),
+        processes=processes,
+        batch_lines=1,
+    )
+    mw.flatten_streaming(str(indented_path), str(tmp_path / "streaming.feature"))
+    mw.Feature.from_file(str(indented_path)).flatten(str(tmp_path / "serial.feature"))
+    for file_name in ["flat.feature", "streaming.feature"]:
+        assert filecmp.cmp(
+            str(tmp_path / file_name), str(tmp_path / "serial.feature"), shallow=False
+        )
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_flatten_parallel_with_imports(processes):
+    """Resolves the import once per process"""
+    mw.flatten_parallel(
+        "test/fixtures/in/imports/admin.feature",
+        "test/out/scenarios_flat_parallel.feature",
+        processes=processes,
+        batch_lines=1,
+    )
+    mw.flatten_streaming(
+        "test/fixtures/in/imports/admin.feature",
+        "test/out/scenarios_flat_streaming.feature",
+    )
+    for output_path in [
+        "test/out/scenarios_flat_parallel.feature",
+        "test/out/scenarios_flat_streaming.feature",
+    ]:
+        assert filecmp.cmp(
+            output_path,
+            "test/fixtures/out/scenarios_flat_strict_with_imports.feature",
+            shallow=False,
+        )
+
+
+def test_split_root_trees_is_lazy():
+    """Reads no further than the end of the current root scenario tree"""
+    lines_read = []
+
+    def read_lines():
+        with open(MULTIPLE_ROOTS) as indented_file:
+            for line in indented_file:
+                lines_read.append(line)
+                yield line
+
+    chunks = split_root_trees(read_lines())
+    next(chunks)  # feature name and description
+    start_line_no, lines = next(chunks)
+    assert lines[-1] == '        Then I see "1 user selected"\n'
+    assert len(lines_read) == 35  # up to the next root scenario line
+
+
+def test_flatten_streaming_with_ledger(tmp_path):
+    feature = mw.Feature.from_file(MULTIPLE_ROOTS)
+    flat_scenarios = list(feature.flat_scenarios())
+    with mw.Ledger(str(tmp_path / "results.db")) as ledger:
+        ledger.record(flat_scenarios[0].fingerprint(), True)
+        mw.flatten_streaming(
+            MULTIPLE_ROOTS, str(tmp_path / "flat.feature"), ledger=ledger
+        )
+    flat_feature = mw.ScenarioTrie.from_file(str(tmp_path / "flat.feature"))
+    assert flat_feature.flat_scenario_count == len(flat_scenarios) - 1
+
+
+def test_flatten_streaming_parses_subtrees_once(tmp_path, monkeypatch):
+    """Parses each subtree declaration once, not once per root scenario tree"""
+    indented_path = tmp_path / "indented.feature"
+    indented_path.write_text(
+        "Feature: Subtrees\n\n"
+        "Subtree: Select\n\n"
+        "    Scenario: Select user\n"
+        '    When I select user "Ben"\n'
+        '    Then I see "1 user selected"\n\n'
+        + "".join(
+            "Scenario: View page {0}\n"
+            'When I go to "Page {0}"\n'
+            'Then I see "Page {0}"\n\n'
+            "    Include: Select\n\n".format(page)
+            for page in range(3)
+        )
+    )
+    parsed_chunks = []
+    parse_subtrees = parallel.parse_subtrees
+
+    def counting_parse_subtrees(subtree_chunks, subtrees=None):
+        subtree_chunks = list(subtree_chunks)
+        parsed_chunks.extend(subtree_chunks)
+        return parse_subtrees(subtree_chunks, subtrees)
+
+    monkeypatch.setattr(parallel, "parse_subtrees", counting_parse_subtrees)
+    mw.flatten_streaming(str(indented_path), str(tmp_path / "flat.feature"))
+    assert len(parsed_chunks) == 1
+    mw.Feature.from_file(str(indented_path)).flatten(str(tmp_path / "serial.feature"))
+    assert filecmp.cmp(
+        str(tmp_path / "flat.feature"), str(tmp_path / "serial.feature"), shallow=False
+    )
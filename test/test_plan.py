@@ -0,0 +1,79 @@
+"""Test the FlatteningPlan class"""
+
+import filecmp
+
+import manyworlds as mw
+
+FEATURE = "test/fixtures/in/feature_with_shared_steps.feature"
+
+
+def test_flatten_auto():
+    """Without a cap, relaxed flattening is never more expensive"""
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    feature.flatten("test/out/scenarios_flat_auto.feature", mode="auto")
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_auto.feature",
+        "test/fixtures/out/scenarios_flat_relaxed.feature",
+    )
+
+
+def test_flatten_auto_with_max_steps():
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    assert feature.flattening_plan(max_steps=8).lines() == []
+    feature.flatten(
+        "test/out/scenarios_flat_auto_max_steps.feature", mode="auto", max_steps=8
+    )
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_auto_max_steps.feature",
+        "test/fixtures/out/scenarios_flat_strict.feature",
+    )
+
+
+def test_flattening_plan():
+    feature = mw.Feature.from_file(FEATURE)
+    plan = feature.flattening_plan(max_steps=6)
+    assert plan.lines() == [
+        "relaxed: View users > Sort users",
+        "relaxed: View users > Filter users",
+    ]
+    assert plan.estimates == {
+        "strict": (7, 30, 5),
+        "relaxed": (4, 22, 7),
+        "auto": (5, 24, 6),
+    }
+    flat_scenarios = list(feature.flat_scenarios("auto", max_steps=6))
+    assert [fs.name for fs in flat_scenarios] == [
+        "View users",
+        "Sort users > Filter sorted users",
+        "Export sorted users",
+        "Filter users > Export filtered users",
+        "Export users",
+    ]
+    assert sum(len(fs.steps) for fs in flat_scenarios) == 24
+    assert max(len(fs.steps) for fs in flat_scenarios) == 6
+
+
+def test_flattening_plan_with_durations():
+    durations = mw.StepDurations.from_file("test/fixtures/in/durations/junit.xml")
+    assert durations.durations == {
+        "Given the following users:": 0.5,
+        'When I go to "Users"': 3.0,
+        'When I sort by "Name"': 1.0,
+        'Then I see "Alice" first': 1.0,
+        'When I filter by "Ben"': 0.25,
+        "Then I see 1 user": 0.25,
+        'When I click "Export"': 3.0,
+    }
+    plan = mw.Feature.from_file(FEATURE).flattening_plan(
+        durations=durations, max_steps=6
+    )
+    assert plan.unit == "seconds"
+    assert plan.estimates["auto"][0] == 5
+    assert plan.estimates["auto"][1] < plan.estimates["strict"][1]
+
+
+def test_flatten_auto_with_tags():
+    feature = mw.Feature.from_file("test/fixtures/in/feature_with_tags.feature")
+    assert [fs.name for fs in feature.flat_scenarios("auto", tags="@bulk")] == [
+        fs.name for fs in feature.flat_scenarios("relaxed", tags="@bulk")
+    ]
@@ -0,0 +1,63 @@
+"""Test the SmokeSuite and StepDurations classes"""
+
+import filecmp
+
+import manyworlds as mw
+
+FEATURE = "test/fixtures/in/feature_with_shared_steps.feature"
+
+
+def test_flatten_smoke():
+    feature = mw.Feature.from_file(FEATURE)
+    feature.flatten("test/out/scenarios_flat_smoke.feature", mode="smoke")
+    assert filecmp.cmp(
+        "test/out/scenarios_flat_smoke.feature",
+        "test/fixtures/out/scenarios_flat_smoke.feature",
+    )
+
+
+def test_smoke_suite_coverage():
+    suite = mw.Feature.from_file(FEATURE).smoke_suite()
+    assert suite.candidate_count == 4
+    assert len(suite.flat_scenarios) == 2
+    assert suite.step_count == suite.covered_step_count == 9
+    assert suite.assertion_count == suite.covered_assertion_count == 4
+    assert suite.cost == 12
+    assert suite.candidate_cost == 26
+
+
+def test_smoke_suite_with_durations():
+    durations = mw.StepDurations({'When I filter by "Ben"': 10.0}, default=1.0)
+    suite = mw.Feature.from_file(FEATURE).smoke_suite(durations=durations)
+    assert [fs.name for fs in suite.flat_scenarios] == [
+        "View users > Sort users > Filter sorted users",
+        "View users > Sort users > Export sorted users",
+    ]
+    assert suite.cost == 23.0
+
+
+def test_smoke_suite_with_tags():
+    feature = mw.Feature.from_file("test/fixtures/in/feature_with_tags.feature")
+    assert [fs.name for fs in feature.flat_scenarios("smoke", tags="@bulk")] == [
+        "View users [Bulk operations] Select user > Select multiple users"
+    ]
+
+
+def test_step_durations_from_csv(tmp_path):
+    csv_path = str(tmp_path / "durations.csv")
+    with open(csv_path, "w") as csv_file:
+        csv_file.write(
+            "step,seconds\n"
+            '"When I go to ""Users""",2\n'
+            '"When I go to ""Users""",4\n'
+            "Then I see 2 users,0.5\n"
+        )
+    durations = mw.StepDurations.from_csv(csv_path)
+    assert durations.durations == {
+        'When I go to "Users"': 3.0,
+        "Then I see 2 users": 0.5,
+    }
+    assert durations.default == 1.75
+    feature = mw.Feature.from_file(FEATURE)
+    steps = feature.find("View users").steps
+    assert durations.total(steps) == 1.75 + 3.0 + 0.5
@@ -0,0 +1,62 @@
+"""Test the MappedSource class"""
+
+import manyworlds as mw
+from manyworlds.source import MappedSource, SourceSpan
+
+
+def test_lines():
+    with MappedSource("test/fixtures/in/feature.feature") as source:
+        lines = list(source)
+    with open("test/fixtures/in/feature.feature") as indented_file:
+        assert lines == indented_file.readlines()
+
+
+def test_spans():
+    with MappedSource("test/fixtures/in/feature.feature") as source:
+        list(source)
+        span = source.span(20)
+        assert span == SourceSpan(520, 29, 20)
+        assert source.text(span) == "    Scenario: Deactivate user"
+
+
+def test_spans_of_parsed_feature():
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    deactivate_user = feature.find("View users", "Deactivate user")
+    assert deactivate_user.span.line_no == 20
+
+    with open("test/fixtures/in/feature.feature", "rb") as indented_file:
+        content = indented_file.read()
+
+    def text(span):
+        return content[span.offset : span.offset + span.length].decode()
+
+    assert text(deactivate_user.span) == "    Scenario: Deactivate user"
+    assert text(deactivate_user.steps[1].span) == '    And I click "OK"'
+    header_row = deactivate_user.steps[2].data.header_row
+    assert text(header_row.span) == "        | Name   | Status |"
+    assert text(deactivate_user.steps[2].data.rows[-1].span).strip() == (
+        "| Connie | Active |"
+    )
+
+
+def test_no_spans_without_file():
+    with open("test/fixtures/in/feature.feature") as indented_file:
+        feature = mw.Feature.from_stream(indented_file)
+    assert feature.scenarios()[0].span is None
+
+
+def test_empty_file(tmp_path):
+    empty_file = tmp_path / "empty.feature"
+    empty_file.write_text("")
+    with MappedSource(str(empty_file)) as source:
+        assert list(source) == []
+    assert mw.Feature.from_file(str(empty_file)).scenarios() == ()
+
+
+def test_spans_with_crlf(tmp_path):
+    crlf_file = tmp_path / "crlf.feature"
+    crlf_file.write_bytes(b"Scenario: First\r\nGiven a step\r\n")
+    feature = mw.Feature.from_file(str(crlf_file))
+    step = feature.scenarios()[0].steps[0]
+    assert step.name == "a step"
+    assert step.span == SourceSpan(17, 12, 1)
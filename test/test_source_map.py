@@ -0,0 +1,84 @@
+"""Test the SourceMap class"""
+
+import pytest
+
+import manyworlds as mw
+from manyworlds.source import SourceSpan
+
+
+def test_flatten_with_source_map():
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    feature.flatten(
+        "test/out/scenarios_flat_strict_mapped_api.feature",
+        source_map_path="test/out/scenarios_flat_strict_mapped_api.map",
+    )
+    source_map = mw.SourceMap.read("test/out/scenarios_flat_strict_mapped_api.map")
+
+    with open("test/fixtures/in/feature.feature") as indented_file:
+        input_lines = [line.strip() for line in indented_file]
+    with open("test/out/scenarios_flat_strict_mapped_api.feature") as flat_file:
+        output_lines = [line.strip() for line in flat_file]
+    assert source_map.output_line_count == len(output_lines)
+
+    mapped_line_count = 0
+    for output_line_no, output_line in enumerate(output_lines):
+        input_line_no = source_map.lookup(output_line_no)
+        if output_line == "" or output_line_no < 6:  # Feature declaration
+            assert input_line_no is None
+            continue
+        mapped_line_count += 1
+        input_line = input_lines[input_line_no]
+        if output_line.startswith("Scenario:"):
+            # Flat scenario names include organizational scenarios:
+            assert output_line.endswith(
+                input_line.split(" # ")[0].split("Scenario: ")[1]
+            )
+        elif output_line.startswith("|"):
+            assert output_line.split(" # ")[0].split() == (
+                input_line.split(" # ")[0].split()
+            )
+        else:
+            # Flat steps are written with "And" where indented steps are not:
+            assert output_line.split(" ", 1)[1] == (
+                input_line.split(" # ")[0].split(" ", 1)[1]
+            )
+    assert mapped_line_count > 0
+
+
+def test_ranges():
+    source_map = mw.SourceMap()
+    source_map.skip(2)
+    for line_no in [10, 11, 12, 3, 4, None, 20]:
+        source_map.add(SourceSpan(0, 0, line_no) if line_no is not None else None)
+    assert source_map.ranges() == [(2, 10, 3), (5, 3, 2), (8, 20, 1)]
+    assert [source_map.lookup(line_no) for line_no in range(10)] == [
+        None,
+        None,
+        10,
+        11,
+        12,
+        3,
+        4,
+        None,
+        20,
+        None,
+    ]
+
+
+def test_encode_decode():
+    source_map = mw.SourceMap()
+    for line_no in [5, 6, 7, 0, 1, 300, 100000, 2]:
+        source_map.add(SourceSpan(0, 0, line_no))
+        source_map.skip(1)
+    encoded = source_map.encode()
+    decoded = mw.SourceMap.decode(encoded)
+    assert decoded.ranges() == source_map.ranges()
+    assert decoded.output_line_count == source_map.output_line_count
+    assert len(encoded) < 8 * 3 * len(source_map.ranges())
+
+
+def test_decode_invalid():
+    with pytest.raises(ValueError):
+        mw.SourceMap.decode(b"not a source map")
+    with pytest.raises(ValueError):
+        mw.SourceMap.decode(mw.SourceMap.MAGIC + b"\x05\x80")
@@ -0,0 +1,94 @@
+"""Test the StepDefinitions class"""
+
+import json
+
+import manyworlds as mw
+from manyworlds.step_definitions import StepDefinition
+
+
+def test_literal_prefix():
+    assert StepDefinition.literal_prefix(r'I click "([^"]+)"') == 'I click "'
+    assert StepDefinition.literal_prefix(r"^I see (\d+) users$") == "I see "
+    assert StepDefinition.literal_prefix(r"I see \$\d+") == "I see $"
+    assert StepDefinition.literal_prefix(r"I see users?") == "I see user"
+    assert StepDefinition.literal_prefix(r"I (?:select|deselect) user") == "I "
+    assert StepDefinition.literal_prefix(r"I select user|I deselect user") == ""
+    assert StepDefinition.literal_prefix(r"I see [|] or \|") == "I see "
+    assert StepDefinition.literal_prefix(r"(?i)I go to") == ""
+
+
+def test_from_module():
+    definitions = mw.StepDefinitions.from_file("test/fixtures/steps/steps.py")
+    assert [
+        (definition.conjunction, definition.location)
+        for definition in definitions.definitions
+    ] == [
+        ("Given", "test/fixtures/steps/steps.py:6"),
+        ("When", "test/fixtures/steps/steps.py:11"),
+        ("When", "test/fixtures/steps/steps.py:16"),
+        ("When", "test/fixtures/steps/steps.py:21"),
+        ("When", "test/fixtures/steps/steps.py:26"),
+        ("Then", "test/fixtures/steps/steps.py:31"),
+        (None, "test/fixtures/steps/steps.py:36"),
+    ]
+
+    # Only definitions with a matching literal prefix are candidates:
+    assert [
+        definition.location for definition in definitions.candidates('I click "OK"')
+    ] == [
+        "test/fixtures/steps/steps.py:16",
+        "test/fixtures/steps/steps.py:21",
+        "test/fixtures/steps/steps.py:26",
+    ]
+
+
+def test_match_steps():
+    definitions = mw.StepDefinitions.from_file("test/fixtures/steps/steps.py")
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    table = definitions.match_steps(
+        step for sc in feature.scenarios() for step in sc.steps
+    )
+
+    assert table.step_count == 22
+    assert len(table.matches) == 15
+    assert table.undefined() == [("Then", "I see a confirmation dialog")]
+    assert table.ambiguous() == [("When", 'I click "Deactivate" for user "Ben"')]
+
+    # Steps are looked up by conjunction and name:
+    select_step = feature.find("View users", "Bulk operations", "Select user").steps[0]
+    step_match = table.lookup(select_step)
+    assert step_match.definition.location == "test/fixtures/steps/steps.py:26"
+    assert step_match.arguments == ("select", "Ben")
+    assert table.lookup(feature.find("View users").steps[2]).arguments == ()
+
+    # "Then" steps are not matched by "When" step definitions:
+    assert definitions.match("Then", 'I go to "Users"') == []
+
+
+def test_pattern_file(tmp_path):
+    definitions = mw.StepDefinitions.from_file("test/fixtures/steps/steps.txt")
+    assert [definition.location for definition in definitions.definitions] == [
+        "test/fixtures/steps/steps.txt:2",
+        "test/fixtures/steps/steps.txt:3",
+        "test/fixtures/steps/steps.txt:4",
+    ]
+    feature = mw.Feature.from_file("test/fixtures/in/feature.feature")
+    table = definitions.match_steps(
+        step for sc in feature.scenarios() for step in sc.steps
+    )
+    table.write(str(tmp_path / "match_table.json"))
+    with open(tmp_path / "match_table.json") as table_file:
+        table_dict = json.load(table_file)
+    assert table_dict["steps"][1] == {
+        "conjunction": "When",
+        "name": 'I go to "Users"',
+        "status": "matched",
+        "matches": [
+            {
+                "pattern": 'I go to "([^"]+)"',
+                "location": "test/fixtures/steps/steps.txt:3",
+                "arguments": ["Users"],
+            }
+        ],
+    }
+    assert len(table_dict["undefined"]) == 10
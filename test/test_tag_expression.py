@@ -0,0 +1,25 @@
+"""Test the TagExpression class"""
+
+import pytest
+
+import manyworlds as mw
+
+
+def test_evaluate():
+    expression = mw.TagExpression("@smoke and not (@slow or @flaky)")
+    assert expression.evaluate(["@smoke"])
+    assert not expression.evaluate(["@smoke", "@flaky"])
+    assert not expression.evaluate([])
+    assert expression.tags() == {"@smoke", "@slow", "@flaky"}
+
+
+def test_precedence():
+    expression = mw.TagExpression("@a or @b and not @c")
+    assert expression.evaluate(["@a", "@c"])
+    assert not expression.evaluate(["@b", "@c"])
+
+
+@pytest.mark.parametrize("expression", ["", "@a and", "(@a or @b", "@a @b", "smoke"])
+def test_invalid_expression(expression):
+    with pytest.raises(mw.exceptions.InvalidTagExpressionError):
+        mw.TagExpression(expression)